@@ -3,17 +3,33 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
+from reduccion_series import reducir_figura
+from kernels_conteo import (
+    codificar, codigos_edad, codigos_periodo, codigos_por_intervalos,
+    conteo_1d, conteo_2d, conteo_por_columna, tabla_cruzada_dispersa
+)
+
+# Frecuencias que pandas etiqueta con el final del periodo (las demás, con el inicio)
+FRECUENCIAS_FIN_PERIODO = {'M', 'ME', 'Y', 'YE', 'A'}
 
 class AnalizadorCOVID:
     def __init__(self, df):
         self.df = df
     
-    def generar_grafico_evolucion(self, columna_fecha='fecha_de_notificación', frecuencia='M'):
-        """Genera un gráfico de evolución temporal"""
-        # Agrupar por fecha
-        df_agrupado = self.df.groupby(
-            pd.Grouper(key=columna_fecha, freq=frecuencia)
-        ).size().reset_index(name='conteo')
+    def generar_grafico_evolucion(self, columna_fecha='fecha_de_notificación', frecuencia='M', ancho_px=None):
+        """
+        Genera un gráfico de evolución temporal. Las series más largas que el ancho
+        del gráfico se reducen con LTTB antes de enviarlas al navegador.
+        """
+        # Agrupar por periodo con bincount sobre los códigos de fecha
+        codigos, periodos = codigos_periodo(self.df[columna_fecha], frecuencia)
+        if frecuencia in FRECUENCIAS_FIN_PERIODO:
+            # Etiqueta en el último día del periodo, como pd.Grouper(freq='M')
+            periodos = (periodos + 1).astype('datetime64[D]') - 1
+        df_agrupado = pd.DataFrame({
+            columna_fecha: periodos.astype('datetime64[ns]'),
+            'conteo': conteo_1d(codigos, len(periodos))
+        })
         
         fig = px.line(
             df_agrupado,
@@ -23,7 +39,7 @@ class AnalizadorCOVID:
             labels={'conteo': 'Número de casos', columna_fecha: 'Fecha'}
         )
         
-        return fig
+        return reducir_figura(fig, ancho_px=ancho_px)
     
     def generar_grafico_barras(self, columna, top_n=10, titulo=None):
         """Genera un gráfico de barras para una columna categórica"""
@@ -31,7 +47,7 @@ class AnalizadorCOVID:
             titulo = f'Distribución por {columna}'
         
         # Contar valores y tomar los top_n
-        conteo = self.df[columna].value_counts().nlargest(top_n)
+        conteo = conteo_por_columna(self.df[columna]).head(top_n)
         
         fig = px.bar(
             x=conteo.index.astype(str),
@@ -49,15 +65,16 @@ class AnalizadorCOVID:
         if 'edad' not in self.df.columns or 'sexo' not in self.df.columns:
             return None
         
-        # Crear grupos de edad
-        bins = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 120]
-        labels = ['0-9', '10-19', '20-29', '30-39', '40-49', '50-59', '60-69', '70-79', '80-89', '90-99', '100+']
-        
-        df = self.df.copy()
-        df['grupo_edad'] = pd.cut(df['edad'], bins=bins, labels=labels, right=False)
+        # Grupos de edad y sexo como códigos enteros, sin copiar el DataFrame
+        codigos_grupo, grupos = codigos_edad(self.df['edad'])
+        codigos_sexo, sexos = codificar(self.df['sexo'])
         
         # Contar por grupo de edad y sexo
-        piramide = df.groupby(['grupo_edad', 'sexo']).size().unstack().fillna(0)
+        piramide = pd.DataFrame(
+            conteo_2d(codigos_grupo, len(grupos), codigos_sexo, len(sexos)),
+            index=pd.Index(grupos, name='grupo_edad'),
+            columns=sexos
+        )
         
         # Crear figura
         fig = go.Figure()
@@ -96,16 +113,72 @@ class AnalizadorCOVID:
         
         return fig
     
-    def generar_mapa_calor(self, columna_x, columna_y):
-        """Genera un mapa de calor entre dos variables categóricas"""
+    def generar_histograma(self, columna, color=None, ancho_bin=None, n_bins=50, titulo=None, opacity=0.7):
+        """
+        Genera un histograma agrupado en el servidor: solo se envían al navegador
+        los conteos por intervalo (como barras), no el valor de cada fila
+        """
+        if columna not in self.df.columns:
+            return None
+        
+        if titulo is None:
+            titulo = f'Distribución por {columna}'
+        
+        valores = pd.to_numeric(self.df[columna], errors='coerce').to_numpy(dtype=float)
+        finitos = np.isfinite(valores)
+        if not finitos.any():
+            return None
+        
+        inicio = np.floor(valores[finitos].min())
+        fin = valores[finitos].max()
+        if ancho_bin is None:
+            ancho_bin = max((fin - inicio) / n_bins, 1e-9)
+        n_bins = int((fin - inicio) // ancho_bin) + 1
+        bordes = inicio + np.arange(n_bins + 1) * ancho_bin
+        codigos_bin = codigos_por_intervalos(valores, bordes)
+        centros = bordes[:-1] + ancho_bin / 2
+        
+        if color is not None and color in self.df.columns:
+            codigos_color, categorias = codificar(self.df[color])
+        else:
+            codigos_color, categorias = np.zeros(len(valores), dtype=np.int64), ['Total']
+        
+        conteos = conteo_2d(codigos_color, len(categorias), codigos_bin, n_bins)
+        
+        fig = go.Figure()
+        for i, categoria in enumerate(categorias):
+            fig.add_trace(go.Bar(
+                x=centros,
+                y=conteos[i],
+                width=ancho_bin,
+                name=str(categoria),
+                opacity=opacity
+            ))
+        
+        fig.update_layout(
+            title=titulo,
+            barmode='overlay',
+            bargap=0,
+            xaxis_title=columna,
+            yaxis_title='Número de casos',
+            legend_title=color
+        )
+        
+        return fig
+    
+    def generar_mapa_calor(self, columna_x, columna_y, top_x=None, top_y=None):
+        """
+        Genera un mapa de calor entre dos variables categóricas. Con ``top_x`` /
+        ``top_y`` se muestran solo las categorías con más casos; la proporción de
+        cada fila se calcula sobre todos sus casos.
+        """
         if columna_x not in self.df.columns or columna_y not in self.df.columns:
             return None
         
-        # Crear tabla de contingencia
-        tabla = pd.crosstab(
-            index=self.df[columna_y],
-            columns=self.df[columna_x],
-            normalize='index'  # Normalizar por fila
+        # Tabla de contingencia dispersa; solo el bloque mostrado se vuelve denso
+        tabla = tabla_cruzada_dispersa(
+            self.df[columna_y], self.df[columna_x],
+            top_filas=top_y, top_columnas=top_x, normalizar_filas=True
         )
         
         fig = px.imshow(
@@ -136,6 +209,6 @@ class AnalizadorCOVID:
         
         resumen = {}
         for col in columnas:
-            resumen[col] = self.df[col].value_counts(normalize=True).head(10).to_dict()
+            resumen[col] = conteo_por_columna(self.df[col], normalizar=True).head(10).to_dict()
         
         return resumen
@@ -1,10 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import os
 import time
+import uuid
 
 # Configuración inicial para entornos de deployment
 st.set_page_config(
@@ -13,11 +11,26 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
-import numpy as np
 import json
 from pathlib import Path
-from procesamiento import ProcesadorCOVID
-from analisis import AnalizadorCOVID
+from importacion_diferida import importar_diferido
+from ejecucion_progresiva import EjecutorProgresivo
+from cache_figuras import CacheFiguras
+from huella_datos import huella_dataset
+from reconstruccion import ReconstructorCache, directorio_publicado
+from instrumentacion import REGISTRO, medido, memoria_rss_mb, activar_tracemalloc
+
+# pandas, numpy y plotly se importan la primera vez que se usan, y los módulos
+# del proyecto que dependen de ellos dentro de las funciones que los necesitan:
+# así la página se dibuja sin esperar a importarlos
+pd = importar_diferido('pandas')
+np = importar_diferido('numpy')
+px = importar_diferido('plotly.express')
+go = importar_diferido('plotly.graph_objects')
+
+# Cada etapa medida (descarga, lectura, conversión, estadísticas, muestra y
+# render de cada sección) se añade también a este log JSON
+REGISTRO.ruta_log = os.path.join('datos_procesados', 'instrumentacion.jsonl')
 
 # La configuración de la página se hace al inicio del archivo
 # para evitar problemas en entornos de deployment
@@ -40,33 +53,184 @@ if 'datos_cargados' not in st.session_state:
         'estados': []
     }
 
+@st.cache_resource
+def obtener_ejecutor_progresivo():
+    """Ejecutor compartido entre sesiones para los cálculos exactos en segundo plano"""
+    return EjecutorProgresivo()
+
+@st.cache_resource
+def obtener_ejecutor_carga_inicial():
+    """
+    Ejecutor propio para la carga inicial de cada sesión: no ocupa los hilos de las
+    vistas progresivas y descarta a los 10 minutos los datos que ninguna sesión recogió
+    """
+    return EjecutorProgresivo(max_hilos=2, max_resultados=16, ttl_resultados=600, prefijo='carga_inicial')
+
+@st.cache_resource
+def obtener_reconstructor():
+    """Reconstrucción de la caché en segundo plano, una sola para todas las sesiones"""
+    return ReconstructorCache('Casos_positivos_de_COVID-19_en_Colombia.csv')
+
+def _dibujar_terminado(clave, calcular_aproximado, dibujar):
+    """
+    Dibuja el resultado exacto si ya terminó (o el aproximado con un aviso si
+    falló) y devuelve False si el cálculo sigue en curso
+    """
+    ejecutor = obtener_ejecutor_progresivo()
+    exacto = ejecutor.resultado(clave)
+    if exacto is not None:
+        dibujar(exacto, exacto=True)
+        return True
+    
+    error = ejecutor.error(clave)
+    if error is not None:
+        st.warning(f"⚠️ No se pudo completar el cálculo exacto: {error}")
+        dibujar(calcular_aproximado(), exacto=False)
+        return True
+    return False
+
+@st.fragment(run_every=0.5)
+def _esperar_resultado_exacto(clave, aproximado, dibujar):
+    """
+    Muestra la versión aproximada hasta que termina el cálculo exacto y entonces
+    la reemplaza: solo se vuelve a ejecutar este fragmento, no la página
+    """
+    if not _dibujar_terminado(clave, lambda: aproximado, dibujar):
+        dibujar(aproximado, exacto=False)
+
+def mostrar_progresivo(clave, calcular_aproximado, calcular_exacto, dibujar):
+    """
+    Dibuja de inmediato un resultado aproximado y lo reemplaza en el mismo lugar
+    cuando termina el cálculo exacto, que corre en segundo plano sin bloquear
+    la siguiente interacción
+    """
+    if _dibujar_terminado(clave, calcular_aproximado, dibujar):
+        return
+    obtener_ejecutor_progresivo().enviar(clave, calcular_exacto)
+    _esperar_resultado_exacto(clave, calcular_aproximado(), dibujar)
+
+def seleccionar_seccion(opciones, clave):
+    """
+    Selector horizontal en lugar de st.tabs: st.tabs ejecuta el contenido de todas
+    las pestañas en cada rerun, aquí solo se ejecuta la sección elegida
+    """
+    return st.radio(
+        "Sección",
+        opciones,
+        horizontal=True,
+        key=clave,
+        label_visibility='collapsed'
+    )
+
+@st.cache_resource
+def obtener_cache_figuras():
+    """Caché de figuras compartida entre sesiones"""
+    return CacheFiguras()
+
+@st.cache_resource
+def obtener_cliente_agregaciones():
+    """Cliente del servicio local de agregaciones, compartido entre sesiones"""
+    from cliente_agregaciones import ClienteAgregaciones
+    return ClienteAgregaciones()
+
+def servicio_agregaciones():
+    """Cliente del servicio si está en marcha y sirve la misma versión de los datos cargados"""
+    cliente = obtener_cliente_agregaciones()
+    estado = cliente.estado()
+    if estado is None or estado['version'] != huella_dataset(st.session_state.analisis):
+        return None
+    return cliente
+
+def figura_en_cache(tipo, parametros, construir, filtros=None):
+    """
+    Devuelve la figura desde la caché compartida o la construye con ``construir()``.
+    La clave incluye la huella del dataset, así que una recarga invalida las figuras.
+    """
+    return obtener_cache_figuras().obtener_o_construir(
+        tipo,
+        parametros,
+        construir,
+        filtros=filtros,
+        huella=huella_dataset(st.session_state.analisis)
+    )
+
+def clave_datos():
+    """Identifica la versión de los datos cargados para las claves de caché"""
+    analisis = st.session_state.analisis or {}
+    return (analisis.get('total_registros'), analisis.get('ultima_actualizacion'))
+
+def obtener_tensor_casos(nivel='departamentos'):
+    """Tensor de casos diarios por región × día × estado (None si no hay datos)"""
+    procesador = st.session_state.procesador
+    if procesador is None:
+        return None
+    return procesador.obtener_tensor(st.session_state.datos_completos, nivel)
+
+def obtener_indice_temporal():
+    """Índice de sumas acumuladas por día de los datos cargados (None si no hay datos)"""
+    procesador = st.session_state.procesador
+    if procesador is None:
+        return None
+    return procesador.obtener_indice_temporal(st.session_state.datos_completos)
+
+def obtener_indicadores(nivel='departamentos'):
+    """Indicadores epidemiológicos por región de los datos cargados (None si no hay datos)"""
+    procesador = st.session_state.procesador
+    if procesador is None:
+        return None
+    return procesador.obtener_indicadores(st.session_state.datos_completos, nivel)
+
+def obtener_cambios(nivel='departamentos'):
+    """Cambios de tendencia y días anómalos por región de los datos cargados (None si no hay datos)"""
+    procesador = st.session_state.procesador
+    if procesador is None:
+        return None
+    return procesador.obtener_cambios(st.session_state.datos_completos, nivel)
+
+def obtener_retrasos():
+    """Histogramas de retrasos entre fechas de los datos cargados (None si no hay datos)"""
+    procesador = st.session_state.procesador
+    if procesador is None:
+        return None
+    return procesador.obtener_retrasos(st.session_state.datos_completos)
+
+def obtener_nowcast():
+    """Nowcast de casos recientes por departamento de los datos cargados (None si no hay datos)"""
+    procesador = st.session_state.procesador
+    if procesador is None:
+        return None
+    return procesador.obtener_nowcast(st.session_state.datos_completos)
+
+def obtener_geometrias(nivel='departamentos'):
+    """Geometrías simplificadas de departamentos o municipios (None si no hay archivo de límites)"""
+    procesador = st.session_state.procesador
+    if procesador is None:
+        return None
+    return procesador.obtener_geometrias(nivel)
+
 def get_memory_usage():
-    """Obtiene el uso de memoria actual en MB (simulado para evitar problemas de deployment)"""
-    return 0
+    """Obtiene la memoria residente del proceso en MB (0 si psutil no está disponible)"""
+    return memoria_rss_mb() or 0.0
 
 def verificar_archivos_cache():
     """Verifica si existen los archivos de caché necesarios"""
-    return os.path.exists('datos_procesados/datos_covid.parquet') and \
-           os.path.exists('datos_procesados/estadisticas.json')
+    directorio = directorio_publicado('datos_procesados')
+    return os.path.exists(os.path.join(directorio, 'datos_covid.parquet')) and \
+           os.path.exists(os.path.join(directorio, 'estadisticas.json'))
 
 def cargar_datos(forzar_actualizacion=False):
     """Carga los datos con monitoreo de recursos y análisis en caché"""
     try:
-        # Si se solicita forzar actualización, eliminar archivos de caché
+        # La actualización forzada se reconstruye en segundo plano: mientras tanto
+        # esta y las demás sesiones siguen usando la versión actual de la caché
         if forzar_actualizacion:
-            cache_files = [
-                'datos_procesados/datos_covid.parquet',
-                'datos_procesados/estadisticas.json'
-            ]
-            for cache_file in cache_files:
-                if os.path.exists(cache_file):
-                    try:
-                        os.remove(cache_file)
-                        st.info(f"🗑️ Eliminado archivo de caché: {cache_file}")
-                    except Exception as e:
-                        st.warning(f"⚠️ No se pudo eliminar {cache_file}: {e}")
+            if obtener_reconstructor().iniciar():
+                st.info("🔄 Reconstrucción iniciada en segundo plano. Los datos actuales siguen disponibles mientras termina.")
+            else:
+                st.info("🔄 Ya hay una reconstrucción en curso")
+            return True
         
-        if not forzar_actualizacion and st.session_state.get('datos_cargados', False):
+        if st.session_state.get('datos_cargados', False):
             st.info("Usando datos cargados previamente. Usa 'Forzar Actualización' si necesitas recargar los datos.")
             return True
 
@@ -78,6 +242,8 @@ def cargar_datos(forzar_actualizacion=False):
         # Verificar si los archivos de datos existen antes de intentar cargarlos
         ruta_archivo = 'Casos_positivos_de_COVID-19_en_Colombia.csv'
         
+        from procesamiento import ProcesadorCOVID
+        
         # Crear procesador
         st.session_state.procesador = ProcesadorCOVID(ruta_archivo)
         
@@ -99,10 +265,10 @@ def cargar_datos(forzar_actualizacion=False):
                 st.info(f"📁 Tamaño del archivo: {file_size:.1f} MB")
                 
                 # Si el archivo es muy pequeño (< 10MB), probablemente es muestra
-                if file_size < 10 and not forzar_actualizacion and cache_existente:
+                if file_size < 10 and cache_existente:
                     st.warning("⚠️ El archivo parece ser una muestra. Considera forzar la actualización para procesar el archivo completo.")
             
-            if cache_existente and not forzar_actualizacion:
+            if cache_existente:
                 try:
                     # Intentar cargar desde caché con manejo de errores mejorado
                     st.session_state.datos_completos = st.session_state.procesador.cargar_desde_cache()
@@ -138,10 +304,12 @@ def cargar_datos(forzar_actualizacion=False):
                 except Exception as e:
                     st.warning(f"Error al cargar desde caché: {str(e)}. Procediendo a cargar desde el archivo CSV...")
             
+            # Avance de la construcción, o de la de otro proceso si ya hay una en curso
+            barra = st.empty()
             resultado = st.session_state.procesador.cargar_datos(
-                remuestrear=forzar_actualizacion,
-                forzar_analisis=forzar_actualizacion
+                progreso=lambda fraccion, mensaje: barra.progress(fraccion, text=mensaje)
             )
+            barra.empty()
             
             st.session_state.datos_completos = resultado['datos']
             st.session_state.analisis = resultado['analisis']
@@ -177,6 +345,195 @@ def cargar_datos(forzar_actualizacion=False):
         st.error(traceback.format_exc())
         return False
 
+@st.fragment(run_every=1.0)
+def _esperar_reconstruccion():
+    """Muestra el avance de la reconstrucción y recarga la página cuando termina"""
+    estado = obtener_reconstructor().estado()
+    if estado['estado'] != 'en_curso':
+        st.rerun()
+    st.progress(estado['fraccion'], text=f"🔄 {estado['mensaje']} ({time.time() - estado['inicio']:.0f}s)")
+    st.caption("Mientras tanto se siguen mostrando los datos actuales")
+
+def mostrar_reconstruccion():
+    """Estado de la reconstrucción en segundo plano y paso a la versión nueva cuando está lista"""
+    estado = obtener_reconstructor().estado()
+    if estado['estado'] == 'en_curso':
+        _esperar_reconstruccion()
+    elif estado['estado'] == 'error':
+        st.error(f"❌ La reconstrucción falló: {estado['error']}")
+    elif estado['estado'] == 'terminado' and estado['version'] != huella_dataset(st.session_state.analisis):
+        st.success(f"✅ Nueva versión de los datos lista ({estado['fin'] - estado['inicio']:.0f}s)")
+        if st.button("📥 Usar la nueva versión", use_container_width=True, key='usar_version_nueva'):
+            st.session_state.datos_cargados = False
+            cargar_datos()
+
+def cargar_en_segundo_plano(ruta_archivo, progreso):
+    """
+    Carga inicial sin tocar la interfaz, para correr en un hilo del ejecutor:
+    devuelve lo que la sesión guarda en st.session_state cuando termina
+    """
+    from procesamiento import ProcesadorCOVID
+    
+    start_time = time.time()
+    mem_before = get_memory_usage()
+    cache_existente = verificar_archivos_cache()
+    procesador = ProcesadorCOVID(ruta_archivo)
+    
+    if not cache_existente and not os.path.exists(ruta_archivo):
+        progreso(0.0, "Descargando dataset")
+        if not procesador.descargar_dataset():
+            raise FileNotFoundError(f"No se encontró el archivo de datos: {ruta_archivo}")
+    
+    resultado = procesador.cargar_datos(progreso=progreso)
+    progreso(0.98, "Tomando la muestra")
+    df_muestra = procesador.obtener_muestreo_aleatorio(resultado['datos'], tamaño_muestra=50000)
+    
+    return {
+        'procesador': procesador,
+        'datos_completos': resultado['datos'],
+        'analisis': resultado['analisis'],
+        'df_muestra': df_muestra,
+        'metrics': {
+            'tiempo_carga': time.time() - start_time,
+            'memoria_usada': get_memory_usage() - mem_before,
+            'total_registros': len(resultado['datos']),
+            'ultima_actualizacion': resultado['analisis'].get('ultima_actualizacion', 'N/A'),
+            'cargado_desde_cache': cache_existente
+        }
+    }
+
+def aplicar_instantanea():
+    """
+    Pasa a la sesión la instantánea de arranque si corresponde a la caché
+    publicada: estadísticas, muestra pequeña y totales de la pestaña inicial
+    """
+    from instantanea import InstantaneaArranque
+    
+    st.session_state.instantanea = None
+    if not verificar_archivos_cache():
+        return
+    
+    inicio = time.time()
+    try:
+        directorio = directorio_publicado('datos_procesados')
+        with open(os.path.join(directorio, 'estadisticas.json'), 'r') as f:
+            huella = huella_dataset(json.load(f))
+        instantanea = InstantaneaArranque(os.path.join(directorio, 'instantanea'))
+        if not instantanea.esta_actualizado(huella):
+            return
+        st.session_state.analisis = instantanea.analisis()
+        muestra = instantanea.cargar_muestra()
+        periodo = instantanea.periodo()
+        st.session_state.df_muestra = muestra
+        if muestra is not None and periodo and 'fecha_de_notificación' in muestra.columns:
+            # Vista previa del periodo por defecto: la evolución diaria se estima
+            # con los pesos de la muestra hasta que la barra lateral tenga los datos
+            desde, hasta = pd.Timestamp(periodo['fecha_inicio']), pd.Timestamp(periodo['fecha_fin'])
+            fechas = muestra['fecha_de_notificación']
+            st.session_state.df_filtrado = muestra[(fechas >= desde) & (fechas < hasta + pd.Timedelta(days=1))]
+            st.session_state.filtros_activos = {
+                **st.session_state.filtros_activos,
+                'fecha_inicio': desde.date(),
+                'fecha_fin': hasta.date()
+            }
+        st.session_state.instantanea = {
+            'periodo': periodo,
+            'tiempo_carga': time.time() - inicio
+        }
+    except Exception as e:
+        st.warning(f"⚠️ No se pudo leer la instantánea de arranque: {str(e)}")
+
+@st.fragment(run_every=0.5)
+def _esperar_carga_inicial(clave):
+    """Muestra el avance de la carga inicial y recarga la página cuando termina"""
+    ejecutor = obtener_ejecutor_carga_inicial()
+    if ejecutor.listo(clave):
+        st.rerun()
+    fraccion, mensaje = ejecutor.avance(clave) or (0.0, "En espera")
+    st.progress(fraccion, text=f"⏳ Cargando datos en segundo plano: {mensaje}")
+
+def carga_inicial_en_segundo_plano():
+    """
+    Lanza la carga inicial en su propio ejecutor y, en cada rerun, muestra su
+    avance o aplica su resultado a la sesión: la página se dibuja sin esperar
+    a los datos
+    """
+    # La instantánea se muestra mientras tanto: la primera pantalla no espera
+    if 'instantanea' not in st.session_state:
+        aplicar_instantanea()
+    
+    if 'clave_carga_inicial' not in st.session_state:
+        st.session_state.clave_carga_inicial = ('carga_inicial', uuid.uuid4().hex)
+    clave = st.session_state.clave_carga_inicial
+    ejecutor = obtener_ejecutor_carga_inicial()
+    
+    carga = ejecutor.resultado(clave)
+    if carga is not None:
+        # El resultado es de esta sesión: se pasa a st.session_state y se libera
+        ejecutor.descartar(clave)
+        del st.session_state.clave_carga_inicial
+        for nombre, valor in carga.items():
+            st.session_state[nombre] = valor
+        st.session_state.datos_cargados = True
+        st.session_state.instantanea = None
+        return
+    
+    error = ejecutor.error(clave)
+    if error is not None:
+        st.error(f"Error al cargar los datos: {str(error)}")
+        st.info("Usa '🔄 Cargar Datos' para intentarlo de nuevo.")
+        return
+    
+    ruta_archivo = 'Casos_positivos_de_COVID-19_en_Colombia.csv'
+    ejecutor.enviar(clave, cargar_en_segundo_plano, ruta_archivo,
+                    lambda fraccion, mensaje: ejecutor.informar(clave, fraccion, mensaje))
+    _esperar_carga_inicial(clave)
+
+def mostrar_instrumentacion():
+    """Panel plegable con el tiempo, la CPU y la memoria de las últimas etapas medidas en el proceso"""
+    import tracemalloc
+    
+    with st.expander("📈 Rendimiento por etapa"):
+        rss = memoria_rss_mb()
+        if rss is not None:
+            st.caption(f"🧠 Memoria residente del proceso: {rss:,.0f} MB")
+        st.toggle(
+            "Medir picos de asignación (tracemalloc)",
+            value=tracemalloc.is_tracing(),
+            key='instrumentacion_tracemalloc',
+            on_change=lambda: activar_tracemalloc(st.session_state.instrumentacion_tracemalloc),
+            help="Hace más lentas las asignaciones de Python mientras está activo"
+        )
+        
+        registros = REGISTRO.registros()[-25:]
+        if not registros:
+            st.caption("Todavía no hay etapas medidas")
+            return
+        
+        def megas(valor, signo=''):
+            return f"{valor:{signo},.1f} MB" if valor is not None else "–"
+        filas = ["| Etapa | Tiempo | CPU | ΔRSS | Pico |", "|---|---:|---:|---:|---:|"]
+        for registro in reversed(registros):
+            nombre = registro['etapa'] + (f" · {registro['detalle']}" if registro['detalle'] else '')
+            filas.append(
+                f"| {nombre} | {registro['tiempo_s']:.2f} s | {registro['cpu_s']:.2f} s | "
+                f"{megas(registro['delta_rss_mb'], '+')} | {megas(registro['pico_mb'])} |"
+            )
+        st.markdown("\n".join(filas))
+        st.download_button(
+            "💾 Descargar JSON",
+            json.dumps(REGISTRO.registros(), ensure_ascii=False, indent=2),
+            file_name='instrumentacion.json',
+            mime='application/json',
+            use_container_width=True
+        )
+        st.caption(f"Log completo: `{REGISTRO.ruta_log}`")
+
+# Los datos se cargan en segundo plano al iniciar; se aplican antes de la barra
+# lateral para que sus filtros aparezcan en el mismo rerun en que terminan
+if not st.session_state.datos_cargados:
+    carga_inicial_en_segundo_plano()
+
 # Sidebar para controles
 with st.sidebar:
     st.header("⚙️ Configuración")
@@ -194,14 +551,16 @@ with st.sidebar:
                     use_container_width=True):
             cargar_datos(forzar_actualizacion=True)
     
+    mostrar_reconstruccion()
+    
     st.markdown("---")
     
     if st.session_state.datos_cargados and st.session_state.analisis:
         st.subheader("📅 Filtros")
         
         try:
-            fecha_min = datetime.strptime(st.session_state.analisis['rango_fechas']['min'], '%Y-%m-%d').date()
-            fecha_max = datetime.strptime(st.session_state.analisis['rango_fechas']['max'], '%Y-%m-%d').date()
+            fecha_min = datetime.strptime(st.session_state.analisis['rango_fechas']['min'][:10], '%Y-%m-%d').date()
+            fecha_max = datetime.strptime(st.session_state.analisis['rango_fechas']['max'][:10], '%Y-%m-%d').date()
             
             col1, col2 = st.columns(2)
             
@@ -248,10 +607,21 @@ with st.sidebar:
             
             # Verificar que df_muestra no sea None antes de copiar
             if st.session_state.df_muestra is not None:
-                df_filtrado = st.session_state.df_muestra.copy()
+                df_filtrado = st.session_state.df_muestra
+                nivel_muestra = len(st.session_state.df_muestra)
                 
                 # Aplicar filtros solo si el procesador está disponible
                 if st.session_state.procesador is not None:
+                    # Muestra estratificada más pequeña que conserva filas suficientes por estrato
+                    df_base, nivel_muestra = st.session_state.procesador.obtener_muestra_filtrada(
+                        st.session_state.datos_completos,
+                        departamentos=departamento_seleccionado,
+                        fecha_inicio=fecha_inicio,
+                        fecha_fin=fecha_fin
+                    )
+                    if df_base is not None:
+                        df_filtrado = df_base
+                    
                     if fecha_inicio or fecha_fin:
                         df_filtrado = st.session_state.procesador.filtrar_por_fecha(
                             df_filtrado, 
@@ -260,20 +630,75 @@ with st.sidebar:
                         )
                 
                 if departamento_seleccionado:
-                    df_filtrado = df_filtrado[df_filtrado['departamento'].isin(departamento_seleccionado)]
+                    df_filtrado = df_filtrado[df_filtrado['departamento_nom'].isin(departamento_seleccionado)]
                 
                 if estado_seleccionado:
                     df_filtrado = df_filtrado[df_filtrado['estado'].isin(estado_seleccionado)]
                 
                 st.session_state.df_filtrado = df_filtrado
                 
-                st.caption(f"📊 Mostrando {len(df_filtrado):,} de {len(st.session_state.df_muestra):,} registros")
+                if nivel_muestra is None:
+                    st.caption(f"📊 Mostrando {len(df_filtrado):,} registros (datos completos)")
+                else:
+                    st.caption(f"📊 Mostrando {len(df_filtrado):,} registros de la muestra estratificada de {nivel_muestra:,}")
+                
+                # Total exacto desde el índice de sumas acumuladas; si no está
+                # disponible, desde el servicio local de agregaciones o estimado
+                # en los datos completos con intervalo de confianza
+                indice = obtener_indice_temporal()
+                servicio = servicio_agregaciones() if indice is None else None
+                total_servicio = servicio.total(
+                    departamentos=departamento_seleccionado,
+                    estados=estado_seleccionado,
+                    fecha_inicio=fecha_inicio,
+                    fecha_fin=fecha_fin
+                ) if servicio is not None else None
+                if indice is not None:
+                    total = indice.total(fecha_inicio, fecha_fin, departamento_seleccionado, estado_seleccionado)
+                    st.caption(f"🎯 Casos con los filtros: {total:,} (exacto)")
+                elif total_servicio is not None:
+                    st.caption(f"🎯 Casos con los filtros: {total_servicio:,} (exacto, servicio de agregaciones)")
+                elif st.session_state.procesador is not None:
+                    from consultas_aproximadas import ConsultorAproximado
+                    consultor = ConsultorAproximado(
+                        st.session_state.procesador.muestreador,
+                        st.session_state.datos_completos
+                    )
+                    total = consultor.total(
+                        error_relativo=0.05,
+                        departamentos=departamento_seleccionado,
+                        estados=estado_seleccionado,
+                        fecha_inicio=fecha_inicio,
+                        fecha_fin=fecha_fin
+                    )
+                    if total is not None:
+                        if total['exacto']:
+                            st.caption(f"🎯 Casos con los filtros: {total['estimado']:,.0f} (exacto)")
+                        else:
+                            st.caption(
+                                f"🎯 Casos con los filtros: ≈{total['estimado']:,.0f} "
+                                f"(IC 95%: {total['limite_inferior']:,.0f} – {total['limite_superior']:,.0f}, "
+                                f"muestra de {total['nivel']:,})"
+                            )
             else:
                 st.warning("No hay datos cargados para filtrar")
             
         except Exception as e:
             st.error(f"Error en filtros: {str(e)}")
+    elif st.session_state.get('instantanea') and st.session_state.get('df_filtrado') is not None:
+        st.subheader("📅 Filtros")
+        filtros = st.session_state.filtros_activos
+        st.caption(
+            f"⏳ Vista previa del {filtros['fecha_inicio']} al {filtros['fecha_fin']} con "
+            f"{len(st.session_state.df_filtrado):,} registros de la muestra de arranque "
+            f"({len(st.session_state.df_muestra):,}); los filtros aparecen al terminar la carga"
+        )
+    
+    st.markdown("---")
+    mostrar_instrumentacion()
 
+@st.fragment
+@medido('render')
 def mostrar_estadisticas_generales():
     """Muestra un resumen de estadísticas generales"""
     st.subheader("📊 Estadísticas Generales")
@@ -282,6 +707,55 @@ def mostrar_estadisticas_generales():
         st.warning("Por favor carga los datos primero")
         return
     
+    try:
+        indice = obtener_indice_temporal()
+        filtros = st.session_state.filtros_activos
+        instantanea = st.session_state.get('instantanea') if not st.session_state.datos_cargados else None
+        comparacion = None
+        if indice is not None and filtros['fecha_inicio'] and filtros['fecha_fin']:
+            fecha_inicio, fecha_fin = filtros['fecha_inicio'], filtros['fecha_fin']
+            
+            # Cada tarjeta son dos consultas al índice de sumas acumuladas
+            comparacion = indice.comparar_periodos(
+                fecha_inicio, fecha_fin,
+                departamentos=filtros['departamentos'], estados=filtros['estados']
+            )
+            # Fallecidos y % mujeres con los mismos filtros que los casos del periodo
+            por_estado = indice.totales_por('estado', fecha_inicio, fecha_fin,
+                                            departamentos=filtros['departamentos'], estados=filtros['estados'])
+            por_sexo = indice.totales_por('sexo', fecha_inicio, fecha_fin,
+                                          departamentos=filtros['departamentos'], estados=filtros['estados'])
+        elif instantanea and instantanea['periodo']:
+            # Mientras cargan los datos completos, los totales del periodo por
+            # defecto precalculados en la instantánea de arranque
+            periodo = instantanea['periodo']
+            fecha_inicio = datetime.strptime(periodo['fecha_inicio'], '%Y-%m-%d').date()
+            fecha_fin = datetime.strptime(periodo['fecha_fin'], '%Y-%m-%d').date()
+            comparacion = periodo
+            por_estado = pd.Series(periodo['por_estado'], dtype='int64')
+            por_sexo = pd.Series(periodo['por_sexo'], dtype='int64')
+        
+        if comparacion is not None:
+            st.markdown("### 📅 Periodo Seleccionado")
+            st.caption(
+                f"{fecha_inicio} a {fecha_fin}, comparado con el periodo anterior de la misma duración"
+            )
+            dias = (fecha_fin - fecha_inicio).days + 1
+            
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric(
+                "Casos en el periodo",
+                f"{comparacion['actual']:,}",
+                delta=f"{comparacion['variacion']:+.1f}%" if comparacion['variacion'] is not None else None,
+                delta_color='inverse'
+            )
+            col2.metric("Promedio diario", f"{comparacion['actual'] / max(dias, 1):,.1f}")
+            col3.metric("Fallecidos", f"{int(por_estado.get('Fallecido', 0)):,}")
+            total_sexo = por_sexo.sum()
+            col4.metric("% Mujeres", f"{por_sexo.get('F', 0) / total_sexo * 100:.1f}%" if total_sexo else "N/A")
+    except Exception as e:
+        st.error(f"Error en métricas del periodo: {str(e)}")
+    
     try:
         if 'estadisticas_edad' in st.session_state.analisis:
             st.markdown("### 📏 Distribución por Edad")
@@ -296,19 +770,21 @@ def mostrar_estadisticas_generales():
             if 'distribucion_por_edad' in st.session_state.analisis:
                 dist_edad = st.session_state.analisis['distribucion_por_edad']
                 if dist_edad:
-                    df_edades = pd.DataFrame(
-                        [(str(k), v) for k, v in dist_edad.items()],
-                        columns=['Grupo de Edad', 'Cantidad']
-                    ).sort_values('Cantidad', ascending=False)
-                    
-                    fig = px.bar(
-                        df_edades, 
-                        x='Grupo de Edad', 
-                        y='Cantidad',
-                        title='Distribución de casos por grupo de edad',
-                        color='Cantidad',
-                        color_continuous_scale='Viridis'
-                    )
+                    def construir():
+                        df_edades = pd.DataFrame(
+                            [(str(k), v) for k, v in dist_edad.items()],
+                            columns=['Grupo de Edad', 'Cantidad']
+                        ).sort_values('Cantidad', ascending=False)
+                        fig = px.bar(
+                            df_edades, 
+                            x='Grupo de Edad', 
+                            y='Cantidad',
+                            title='Distribución de casos por grupo de edad',
+                            color='Cantidad',
+                            color_continuous_scale='Viridis'
+                        )
+                        return fig
+                    fig = figura_en_cache('bar', {'vista': 'edad_grupos'}, construir)
                     st.plotly_chart(fig, use_container_width=True)
     except Exception as e:
         st.error(f"Error en estadísticas de edad: {str(e)}")
@@ -318,21 +794,25 @@ def mostrar_estadisticas_generales():
             st.markdown("### 👥 Distribución por Sexo")
             conteo_sexo = st.session_state.analisis['conteo_por_sexo']
             if conteo_sexo:
-                df_sexo = pd.DataFrame(
-                    list(conteo_sexo.items()),
-                    columns=['Sexo', 'Cantidad']
-                )
-                
-                fig = px.pie(
-                    df_sexo, 
-                    values='Cantidad', 
-                    names='Sexo',
-                    title='Distribución de casos por sexo'
-                )
+                def construir():
+                    df_sexo = pd.DataFrame(
+                        list(conteo_sexo.items()),
+                        columns=['Sexo', 'Cantidad']
+                    )
+                    fig = px.pie(
+                        df_sexo, 
+                        values='Cantidad', 
+                        names='Sexo',
+                        title='Distribución de casos por sexo'
+                    )
+                    return fig
+                fig = figura_en_cache('pie', {'vista': 'sexo'}, construir)
                 st.plotly_chart(fig, use_container_width=True)
     except Exception as e:
         st.error(f"Error en distribución por sexo: {str(e)}")
 
+@st.fragment
+@medido('render')
 def mostrar_evolucion_temporal():
     """Muestra la evolución temporal de los casos"""
     st.subheader("📈 Evolución Temporal de Casos")
@@ -341,37 +821,100 @@ def mostrar_evolucion_temporal():
         st.warning("Por favor carga los datos primero")
         return
     
+    from consultas_aproximadas import mascara_filtros
+    from reduccion_series import reducir_figura
+    
     try:
         if 'casos_por_mes' in st.session_state.analisis:
-            df_evolucion = pd.DataFrame(
-                [(k, v) for k, v in st.session_state.analisis['casos_por_mes'].items()],
-                columns=['Fecha', 'Casos']
-            )
-            df_evolucion['Fecha'] = pd.to_datetime(df_evolucion['Fecha'])
-            df_evolucion = df_evolucion.sort_values('Fecha')
+            casos_por_mes = st.session_state.analisis['casos_por_mes']
             
-            fig = px.line(
-                df_evolucion,
-                x='Fecha',
-                y='Casos',
-                title='Evolución mensual de casos de COVID-19',
-                labels={'Casos': 'Número de casos', 'Fecha': 'Mes'},
-                markers=True
-            )
+            def construir():
+                df_evolucion = pd.DataFrame(
+                    [(k, v) for k, v in casos_por_mes.items()],
+                    columns=['Fecha', 'Casos']
+                )
+                df_evolucion['Fecha'] = pd.to_datetime(df_evolucion['Fecha'])
+                df_evolucion = df_evolucion.sort_values('Fecha')
+                
+                fig = px.line(
+                    df_evolucion,
+                    x='Fecha',
+                    y='Casos',
+                    title='Evolución mensual de casos de COVID-19',
+                    labels={'Casos': 'Número de casos', 'Fecha': 'Mes'},
+                    markers=True
+                )
+                
+                df_evolucion['Media Móvil (3 meses)'] = df_evolucion['Casos'].rolling(window=3).mean()
+                
+                fig.add_scatter(
+                    x=df_evolucion['Fecha'],
+                    y=df_evolucion['Media Móvil (3 meses)'],
+                    name='Media Móvil (3 meses)',
+                    line=dict(color='red', dash='dash')
+                )
+                return fig
+            fig = figura_en_cache('line', {'vista': 'evolucion_mensual'}, construir)
+            st.plotly_chart(fig, use_container_width=True)
+    except Exception as e:
+        st.error(f"Error en evolución temporal: {str(e)}")
+    
+    try:
+        df_filtrado = st.session_state.get('df_filtrado')
+        if df_filtrado is not None and 'fecha_de_notificación' in df_filtrado.columns:
+            st.markdown("### 📆 Evolución diaria con los filtros activos")
+            filtros = st.session_state.filtros_activos
+            datos_completos = st.session_state.datos_completos
             
-            df_evolucion['Media Móvil (3 meses)'] = df_evolucion['Casos'].rolling(window=3).mean()
+            def serie_diaria(df, pesos=None):
+                fechas = df['fecha_de_notificación'].dt.normalize()
+                if pesos is None:
+                    pesos = np.ones(len(df))
+                serie = pd.Series(pesos, index=df.index).groupby(fechas).sum().sort_index()
+                return serie.rename_axis('Fecha').reset_index(name='Casos')
             
-            fig.add_scatter(
-                x=df_evolucion['Fecha'],
-                y=df_evolucion['Media Móvil (3 meses)'],
-                name='Media Móvil (3 meses)',
-                line=dict(color='red', dash='dash')
-            )
+            def calcular_aproximado():
+                # Estimación desde la muestra: cada fila pesa lo que su estrato en la población
+                pesos = df_filtrado['peso_muestral'].to_numpy() if 'peso_muestral' in df_filtrado.columns else None
+                return serie_diaria(df_filtrado, pesos)
             
-            st.plotly_chart(fig, use_container_width=True)
+            def calcular_exacto():
+                mascara = mascara_filtros(
+                    datos_completos,
+                    departamentos=filtros['departamentos'],
+                    estados=filtros['estados'],
+                    fecha_inicio=filtros['fecha_inicio'],
+                    fecha_fin=filtros['fecha_fin']
+                )
+                return serie_diaria(datos_completos[mascara])
+            
+            def dibujar(df_diario, exacto):
+                fuente = "datos completos" if exacto else "estimación desde la muestra, calculando el valor exacto..."
+                fig = figura_en_cache(
+                    'line',
+                    {'vista': 'evolucion_diaria', 'exacto': exacto},
+                    lambda: reducir_figura(px.line(
+                        df_diario,
+                        x='Fecha',
+                        y='Casos',
+                        title=f'Casos diarios ({fuente})',
+                        labels={'Casos': 'Número de casos', 'Fecha': 'Fecha de notificación'}
+                    )),
+                    filtros=filtros
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            
+            if datos_completos is None:
+                dibujar(calcular_aproximado(), exacto=False)
+            else:
+                clave = ('evolucion_diaria', clave_datos(), tuple(sorted(filtros['departamentos'])),
+                         tuple(sorted(filtros['estados'])), str(filtros['fecha_inicio']), str(filtros['fecha_fin']))
+                mostrar_progresivo(clave, calcular_aproximado, calcular_exacto, dibujar)
     except Exception as e:
-        st.error(f"Error en evolución temporal: {str(e)}")
+        st.error(f"Error en evolución diaria: {str(e)}")
 
+@st.fragment
+@medido('render')
 def mostrar_distribucion_departamentos():
     """Muestra la distribución de casos por departamento"""
     st.subheader("🗺️ Distribución por Departamento")
@@ -405,40 +948,49 @@ def mostrar_distribucion_departamentos():
             
             # Gráfico de barras horizontal
             st.markdown("### 📊 Top 10 Departamentos")
-            fig = px.bar(
-                df_deptos.head(10).sort_values('Casos', ascending=True),
-                x='Casos',
-                y='Departamento',
-                orientation='h',
-                title='Departamentos con Mayor Número de Casos',
-                color='Casos',
-                color_continuous_scale='Viridis',
-                text='Casos'
-            )
-            fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-            fig.update_layout(height=500, showlegend=False)
+            def construir():
+                fig = px.bar(
+                    df_deptos.head(10).sort_values('Casos', ascending=True),
+                    x='Casos',
+                    y='Departamento',
+                    orientation='h',
+                    title='Departamentos con Mayor Número de Casos',
+                    color='Casos',
+                    color_continuous_scale='Viridis',
+                    text='Casos'
+                )
+                fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+                fig.update_layout(height=500, showlegend=False)
+                return fig
+            fig = figura_en_cache('bar', {'vista': 'top_departamentos'}, construir)
             st.plotly_chart(fig, use_container_width=True)
             
             # Gráfico de torta
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("### 🥧 Proporción de Casos")
-                fig_pie = px.pie(
-                    df_deptos.head(10),
-                    values='Casos',
-                    names='Departamento',
-                    title='Distribución Porcentual'
-                )
+                def construir():
+                    fig_pie = px.pie(
+                        df_deptos.head(10),
+                        values='Casos',
+                        names='Departamento',
+                        title='Distribución Porcentual'
+                    )
+                    return fig_pie
+                fig_pie = figura_en_cache('pie', {'vista': 'departamentos_proporcion'}, construir)
                 st.plotly_chart(fig_pie, use_container_width=True)
             
             with col2:
                 st.markdown("### 📈 Comparación")
-                fig_funnel = px.funnel(
-                    df_deptos.head(10),
-                    x='Casos',
-                    y='Departamento',
-                    title='Embudo de Casos'
-                )
+                def construir():
+                    fig_funnel = px.funnel(
+                        df_deptos.head(10),
+                        x='Casos',
+                        y='Departamento',
+                        title='Embudo de Casos'
+                    )
+                    return fig_funnel
+                fig_funnel = figura_en_cache('funnel', {'vista': 'departamentos_embudo'}, construir)
                 st.plotly_chart(fig_funnel, use_container_width=True)
             
             # Tabla de datos
@@ -460,6 +1012,8 @@ def mostrar_distribucion_departamentos():
             import traceback
             st.code(traceback.format_exc())
 
+@st.fragment
+@medido('render')
 def mostrar_piramide_edades():
     """Muestra la pirámide de edades por sexo"""
     st.subheader("👥 Pirámide de Edades")
@@ -502,82 +1056,90 @@ def mostrar_piramide_edades():
             
             # Pirámide de edades
             st.markdown("### 📊 Pirámide Poblacional")
-            fig = go.Figure()
-            
-            if 'F' in df_piramide.columns:
-                fig.add_trace(go.Bar(
-                    y=df_piramide.index,
-                    x=-df_piramide['F'].fillna(0),
-                    name='Mujeres',
-                    orientation='h',
-                    marker_color='#FF69B4',
-                    text=df_piramide['F'].fillna(0).astype(int),
-                    textposition='inside'
-                ))
-            
-            if 'M' in df_piramide.columns:
-                fig.add_trace(go.Bar(
-                    y=df_piramide.index,
-                    x=df_piramide['M'].fillna(0),
-                    name='Hombres',
-                    orientation='h',
-                    marker_color='#4169E1',
-                    text=df_piramide['M'].fillna(0).astype(int),
-                    textposition='inside'
-                ))
-            
-            fig.update_layout(
-                title='Distribución de Casos por Edad y Sexo',
-                barmode='overlay',
-                xaxis=dict(
-                    title='Número de casos',
-                    tickformat='.0f',
-                    zeroline=True,
-                    zerolinewidth=2,
-                    zerolinecolor='black'
-                ),
-                yaxis_title='Grupo de Edad',
-                showlegend=True,
-                height=600,
-                hovermode='y unified'
-            )
-            
+            def construir():
+                fig = go.Figure()
+                
+                if 'F' in df_piramide.columns:
+                    fig.add_trace(go.Bar(
+                        y=df_piramide.index,
+                        x=-df_piramide['F'].fillna(0),
+                        name='Mujeres',
+                        orientation='h',
+                        marker_color='#FF69B4',
+                        text=df_piramide['F'].fillna(0).astype(int),
+                        textposition='inside'
+                    ))
+                
+                if 'M' in df_piramide.columns:
+                    fig.add_trace(go.Bar(
+                        y=df_piramide.index,
+                        x=df_piramide['M'].fillna(0),
+                        name='Hombres',
+                        orientation='h',
+                        marker_color='#4169E1',
+                        text=df_piramide['M'].fillna(0).astype(int),
+                        textposition='inside'
+                    ))
+                
+                fig.update_layout(
+                    title='Distribución de Casos por Edad y Sexo',
+                    barmode='overlay',
+                    xaxis=dict(
+                        title='Número de casos',
+                        tickformat='.0f',
+                        zeroline=True,
+                        zerolinewidth=2,
+                        zerolinecolor='black'
+                    ),
+                    yaxis_title='Grupo de Edad',
+                    showlegend=True,
+                    height=600,
+                    hovermode='y unified'
+                )
+                return fig
+            fig = figura_en_cache('figure', {'vista': 'piramide'}, construir)
             st.plotly_chart(fig, use_container_width=True)
             
             # Gráfico de distribución porcentual
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("### 📈 Distribución por Edad")
-                df_total_edad = pd.DataFrame({
-                    'Grupo': df_piramide.index,
-                    'Total': df_piramide.sum(axis=1)
-                })
-                fig_edad = px.bar(
-                    df_total_edad,
-                    x='Grupo',
-                    y='Total',
-                    title='Total de Casos por Grupo de Edad',
-                    color='Total',
-                    color_continuous_scale='Blues'
-                )
-                fig_edad.update_layout(xaxis_tickangle=-45)
+                def construir():
+                    df_total_edad = pd.DataFrame({
+                        'Grupo': df_piramide.index,
+                        'Total': df_piramide.sum(axis=1)
+                    })
+                    fig_edad = px.bar(
+                        df_total_edad,
+                        x='Grupo',
+                        y='Total',
+                        title='Total de Casos por Grupo de Edad',
+                        color='Total',
+                        color_continuous_scale='Blues'
+                    )
+                    fig_edad.update_layout(xaxis_tickangle=-45)
+                    return fig_edad
+                fig_edad = figura_en_cache('bar', {'vista': 'piramide_total_edad'}, construir)
                 st.plotly_chart(fig_edad, use_container_width=True)
             
             with col2:
                 st.markdown("### 🥧 Proporción por Sexo")
                 if 'F' in df_piramide.columns and 'M' in df_piramide.columns:
-                    sexo_total = pd.DataFrame({
-                        'Sexo': ['Mujeres', 'Hombres'],
-                        'Casos': [df_piramide['F'].sum(), df_piramide['M'].sum()]
-                    })
-                    fig_sexo = px.pie(
-                        sexo_total,
-                        values='Casos',
-                        names='Sexo',
-                        title='Distribución por Sexo',
-                        color='Sexo',
-                        color_discrete_map={'Mujeres': '#FF69B4', 'Hombres': '#4169E1'}
-                    )
+                    def construir():
+                        sexo_total = pd.DataFrame({
+                            'Sexo': ['Mujeres', 'Hombres'],
+                            'Casos': [df_piramide['F'].sum(), df_piramide['M'].sum()]
+                        })
+                        fig_sexo = px.pie(
+                            sexo_total,
+                            values='Casos',
+                            names='Sexo',
+                            title='Distribución por Sexo',
+                            color='Sexo',
+                            color_discrete_map={'Mujeres': '#FF69B4', 'Hombres': '#4169E1'}
+                        )
+                        return fig_sexo
+                    fig_sexo = figura_en_cache('pie', {'vista': 'piramide_sexo'}, construir)
                     st.plotly_chart(fig_sexo, use_container_width=True)
             
             # Tabla detallada
@@ -596,6 +1158,8 @@ def mostrar_piramide_edades():
             import traceback
             st.code(traceback.format_exc())
 
+@st.fragment
+@medido('render')
 def mostrar_tendencias_temporales():
     """Muestra tendencias temporales avanzadas"""
     st.subheader("📅 Tendencias Temporales")
@@ -604,6 +1168,9 @@ def mostrar_tendencias_temporales():
         st.warning("⚠️ Por favor carga los datos primero")
         return
     
+    from nowcasting import REGION_TOTAL
+    from deteccion_cambios import TIPOS_EVENTO
+    
     try:
         # Debug info
         with st.expander("🔍 Información de Depuración"):
@@ -611,6 +1178,7 @@ def mostrar_tendencias_temporales():
             if 'casos_por_semana' in st.session_state.analisis:
                 st.write(f"Total semanas: {len(st.session_state.analisis['casos_por_semana'])}")
         
+        df_semanal = None
         if 'casos_por_semana' in st.session_state.analisis:
             df_semanal = pd.DataFrame(
                 [(k, v) for k, v in st.session_state.analisis['casos_por_semana'].items()],
@@ -618,7 +1186,17 @@ def mostrar_tendencias_temporales():
             )
             df_semanal['Fecha'] = pd.to_datetime(df_semanal['Fecha'])
             df_semanal = df_semanal.sort_values('Fecha')
-            
+        elif obtener_tensor_casos() is not None:
+            # Semanas (terminadas en domingo) desde el tensor de casos diarios; la
+            # última se descarta si aún no está completa para no simular una caída
+            tensor = obtener_tensor_casos()
+            diarios = tensor.serie().sum(axis=1)
+            semanales = diarios.resample('W-SUN').sum()
+            if len(semanales) and semanales.index[-1] > diarios.index[-1]:
+                semanales = semanales.iloc[:-1]
+            df_semanal = semanales.rename('Casos').rename_axis('Fecha').reset_index()
+        
+        if df_semanal is not None and len(df_semanal):
             # Métricas de tendencia
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -635,76 +1213,176 @@ def mostrar_tendencias_temporales():
             df_semanal['Año'] = df_semanal['Fecha'].dt.year
             df_semanal['Semana'] = df_semanal['Fecha'].dt.isocalendar().week
             
+            # Cambios de tendencia nacionales detectados sobre la serie diaria
+            cambios = obtener_cambios()
+            cambios_nacionales = (cambios.eventos([REGION_TOTAL], ['aumento', 'descenso'])
+                                  if cambios is not None else None)
+            
             # Gráfico de tendencia general
             st.markdown("### 📊 Evolución Semanal Completa")
-            fig_linea = go.Figure()
-            fig_linea.add_trace(go.Scatter(
-                x=df_semanal['Fecha'],
-                y=df_semanal['Casos'],
-                mode='lines',
-                name='Casos Semanales',
-                line=dict(color='#1f77b4', width=2),
-                fill='tozeroy',
-                fillcolor='rgba(31, 119, 180, 0.3)'
-            ))
-            
-            # Media móvil de 4 semanas
-            df_semanal['Media_Movil'] = df_semanal['Casos'].rolling(window=4).mean()
-            fig_linea.add_trace(go.Scatter(
-                x=df_semanal['Fecha'],
-                y=df_semanal['Media_Movil'],
-                mode='lines',
-                name='Media Móvil (4 semanas)',
-                line=dict(color='red', width=2, dash='dash')
-            ))
-            
-            fig_linea.update_layout(
-                title='Evolución Semanal de Casos',
-                xaxis_title='Fecha',
-                yaxis_title='Número de Casos',
-                hovermode='x unified',
-                height=500
+            def construir():
+                fig_linea = go.Figure()
+                fig_linea.add_trace(go.Scatter(
+                    x=df_semanal['Fecha'],
+                    y=df_semanal['Casos'],
+                    mode='lines',
+                    name='Casos Semanales',
+                    line=dict(color='#1f77b4', width=2),
+                    fill='tozeroy',
+                    fillcolor='rgba(31, 119, 180, 0.3)'
+                ))
+                
+                # Media móvil de 4 semanas
+                df_semanal['Media_Movil'] = df_semanal['Casos'].rolling(window=4).mean()
+                fig_linea.add_trace(go.Scatter(
+                    x=df_semanal['Fecha'],
+                    y=df_semanal['Media_Movil'],
+                    mode='lines',
+                    name='Media Móvil (4 semanas)',
+                    line=dict(color='red', width=2, dash='dash')
+                ))
+                
+                if cambios_nacionales is not None:
+                    for _, cambio in cambios_nacionales.iterrows():
+                        fig_linea.add_vline(
+                            x=cambio['Fecha'],
+                            line=dict(color='#d62728' if cambio['tipo'] == 'aumento' else '#2ca02c', width=1, dash='dot')
+                        )
+                
+                fig_linea.update_layout(
+                    title='Evolución Semanal de Casos',
+                    xaxis_title='Fecha',
+                    yaxis_title='Número de Casos',
+                    hovermode='x unified',
+                    height=500
+                )
+                return fig_linea
+            fig_linea = figura_en_cache(
+                'figure',
+                {'vista': 'evolucion_semanal', 'cambios': cambios_nacionales is not None},
+                construir
             )
             st.plotly_chart(fig_linea, use_container_width=True)
             
+            if cambios_nacionales is not None and len(cambios_nacionales):
+                with st.expander(f"📍 Cambios de tendencia nacionales ({len(cambios_nacionales)})"):
+                    st.caption("Líneas rojas: la tendencia pasa al alza; verdes: a la baja")
+                    st.dataframe(
+                        pd.DataFrame({
+                            'Fecha': cambios_nacionales['Fecha'].dt.date,
+                            'Cambio': cambios_nacionales['tipo'].map(TIPOS_EVENTO),
+                            'Intensidad (CUSUM)': cambios_nacionales['valor'].round(1)
+                        }),
+                        use_container_width=True
+                    )
+            
+            # Las últimas semanas aún no están reportadas por completo: se muestran
+            # por inicio de síntomas junto con su estimación corregida por retraso
+            nowcast = obtener_nowcast()
+            if nowcast is not None:
+                st.markdown("### 🔮 Semanas Recientes Corregidas por Retraso")
+                region = st.selectbox(
+                    "Región:",
+                    options=nowcast.regiones(),
+                    index=0,
+                    key='region_nowcast'
+                )
+                df_nowcast = nowcast.resultados(region, 'W')
+                
+                def construir():
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(
+                        x=pd.concat([df_nowcast['fecha'], df_nowcast['fecha'][::-1]]),
+                        y=pd.concat([df_nowcast['limite_superior'], df_nowcast['limite_inferior'][::-1]]),
+                        fill='toself',
+                        fillcolor='rgba(214, 39, 40, 0.2)',
+                        line=dict(color='rgba(0, 0, 0, 0)'),
+                        hoverinfo='skip',
+                        name='Intervalo 95%'
+                    ))
+                    fig.add_trace(go.Bar(
+                        x=df_nowcast['fecha'],
+                        y=df_nowcast['observados'],
+                        name='Reportados a la fecha',
+                        marker_color='#1f77b4'
+                    ))
+                    fig.add_trace(go.Scatter(
+                        x=df_nowcast['fecha'],
+                        y=df_nowcast['estimados'],
+                        mode='lines+markers',
+                        name='Estimados (nowcast)',
+                        line=dict(color='#d62728', width=2)
+                    ))
+                    fig.update_layout(
+                        title=f'Casos por Semana de Inicio de Síntomas - {region}',
+                        xaxis_title='Semana (termina en domingo)',
+                        yaxis_title='Número de Casos',
+                        hovermode='x unified',
+                        height=450
+                    )
+                    return fig
+                fig = figura_en_cache('figure', {'vista': 'nowcast_semanal', 'region': region}, construir)
+                st.plotly_chart(fig, use_container_width=True)
+                
+                ultima = df_nowcast.iloc[-1]
+                st.caption(
+                    f"Corte al {nowcast.metadatos()['ultimo_reporte']}. La última semana completa "
+                    f"(hasta el {ultima['fecha']:%Y-%m-%d}) tiene "
+                    f"{ultima['observados']:,.0f} casos reportados, aproximadamente el "
+                    f"{ultima['proporcion_reportada']:.0%} de los "
+                    f"{ultima['estimados']:,.0f} esperados cuando se complete el reporte "
+                    f"({ultima['limite_inferior']:,.0f}–{ultima['limite_superior']:,.0f}). "
+                    "La estimación usa la distribución del retraso entre inicio de síntomas y "
+                    "reporte de las semanas anteriores."
+                )
+            
             # Comparación por año
             st.markdown("### 📈 Comparación Anual por Semana")
-            df_agrupado = df_semanal.groupby(['Año', 'Semana'])['Casos'].sum().reset_index()
-            df_pivot = df_agrupado.pivot(index='Semana', columns='Año', values='Casos')
-            
-            fig = go.Figure()
-            colors = px.colors.qualitative.Set2
-            for idx, col in enumerate(df_pivot.columns):
-                fig.add_trace(go.Scatter(
-                    x=df_pivot.index,
-                    y=df_pivot[col].fillna(0),
-                    mode='lines+markers',
-                    name=f'Año {col}',
-                    line=dict(width=2),
-                    marker=dict(size=6)
-                ))
+            def semanas_por_año():
+                df_agrupado = df_semanal.groupby(['Año', 'Semana'])['Casos'].sum().reset_index()
+                return df_agrupado.pivot(index='Semana', columns='Año', values='Casos')
             
-            fig.update_layout(
-                title='Comparación de Casos Semanales por Año',
-                xaxis_title='Semana del Año',
-                yaxis_title='Número de Casos',
-                legend_title='Año',
-                hovermode='x unified',
-                height=500
-            )
+            def construir():
+                df_pivot = semanas_por_año()
+                fig = go.Figure()
+                colors = px.colors.qualitative.Set2
+                for idx, col in enumerate(df_pivot.columns):
+                    fig.add_trace(go.Scatter(
+                        x=df_pivot.index,
+                        y=df_pivot[col].fillna(0),
+                        mode='lines+markers',
+                        name=f'Año {col}',
+                        line=dict(width=2),
+                        marker=dict(size=6)
+                    ))
+                
+                fig.update_layout(
+                    title='Comparación de Casos Semanales por Año',
+                    xaxis_title='Semana del Año',
+                    yaxis_title='Número de Casos',
+                    legend_title='Año',
+                    hovermode='x unified',
+                    height=500
+                )
+                return fig
+            fig = figura_en_cache('figure', {'vista': 'comparacion_anual'}, construir)
             st.plotly_chart(fig, use_container_width=True)
             
             # Mapa de calor por año y semana
             st.markdown("### 🔥 Mapa de Calor - Intensidad por Semana")
-            fig_heatmap = px.imshow(
-                df_pivot.fillna(0).T,
-                labels=dict(x="Semana", y="Año", color="Casos"),
-                x=df_pivot.index,
-                y=df_pivot.columns,
-                color_continuous_scale='YlOrRd',
-                aspect="auto"
-            )
-            fig_heatmap.update_layout(height=400)
+            def construir():
+                df_pivot = semanas_por_año()
+                fig_heatmap = px.imshow(
+                    df_pivot.fillna(0).T,
+                    labels=dict(x="Semana", y="Año", color="Casos"),
+                    x=df_pivot.index,
+                    y=df_pivot.columns,
+                    color_continuous_scale='YlOrRd',
+                    aspect="auto"
+                )
+                fig_heatmap.update_layout(height=400)
+                return fig_heatmap
+            fig_heatmap = figura_en_cache('imshow', {'vista': 'intensidad_semanal'}, construir)
             st.plotly_chart(fig_heatmap, use_container_width=True)
             
             # Métricas de casos por estado
@@ -731,19 +1409,22 @@ def mostrar_tendencias_temporales():
                     st.metric("🟡 Activos", f"{activos:,}".replace(",", "."))
                 
                 # Gráfico de distribución de estados
-                df_estados = pd.DataFrame(
-                    list(conteo_por_estado.items()),
-                    columns=['Estado', 'Casos']
-                )
-                fig_estados = px.bar(
-                    df_estados,
-                    x='Estado',
-                    y='Casos',
-                    title='Distribución de Casos por Estado',
-                    color='Estado',
-                    text='Casos'
-                )
-                fig_estados.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+                def construir():
+                    df_estados = pd.DataFrame(
+                        list(conteo_por_estado.items()),
+                        columns=['Estado', 'Casos']
+                    )
+                    fig_estados = px.bar(
+                        df_estados,
+                        x='Estado',
+                        y='Casos',
+                        title='Distribución de Casos por Estado',
+                        color='Estado',
+                        text='Casos'
+                    )
+                    fig_estados.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+                    return fig_estados
+                fig_estados = figura_en_cache('bar', {'vista': 'estados'}, construir)
                 st.plotly_chart(fig_estados, use_container_width=True)
         else:
             st.info("📊 No hay datos de tendencias semanales disponibles")
@@ -753,6 +1434,8 @@ def mostrar_tendencias_temporales():
             import traceback
             st.code(traceback.format_exc())
 
+@st.fragment
+@medido('render')
 def mostrar_analisis_avanzado():
     """Muestra análisis avanzados y gráficos adicionales"""
     st.subheader("🔬 Análisis Avanzado")
@@ -761,6 +1444,8 @@ def mostrar_analisis_avanzado():
         st.warning("⚠️ Por favor carga los datos primero")
         return
     
+    from retrasos import NOMBRES_RETRASOS
+    
     # Debug expandible
     with st.expander("🔍 Información de Depuración - Datos Disponibles"):
         st.write("Claves en análisis:", list(st.session_state.analisis.keys()))
@@ -770,11 +1455,11 @@ def mostrar_analisis_avanzado():
             else:
                 st.write(f"❌ {key}: No disponible")
     
-    tab_tipo_contagio, tab_recuperacion, tab_ubicacion, tab_etnia = st.tabs([
-        "🦠 Tipo de Contagio", "✅ Recuperación", "📍 Ubicación", "👨‍👩‍👧 Etnia"
-    ])
+    seccion = seleccionar_seccion([
+        "🦠 Tipo de Contagio", "✅ Recuperación", "📍 Ubicación", "👨‍👩‍👧 Etnia", "⏱️ Retrasos"
+    ], 'seccion_analisis_avanzado')
     
-    with tab_tipo_contagio:
+    if seccion == "🦠 Tipo de Contagio":
         try:
             if 'conteo_por_tipo_de_contagio' in st.session_state.analisis:
                 st.markdown("### 🦠 Distribución por Tipo de Contagio")
@@ -794,28 +1479,34 @@ def mostrar_analisis_avanzado():
                 
                 col1, col2 = st.columns([2, 1])
                 with col1:
-                    fig = px.pie(
-                        df_contagio.head(10),
-                        values='Cantidad',
-                        names='Tipo',
-                        title='Distribución de Casos por Tipo de Contagio (Top 10)',
-                        hole=0.4
-                    )
-                    fig.update_traces(textposition='inside', textinfo='percent+label')
+                    def construir():
+                        fig = px.pie(
+                            df_contagio.head(10),
+                            values='Cantidad',
+                            names='Tipo',
+                            title='Distribución de Casos por Tipo de Contagio (Top 10)',
+                            hole=0.4
+                        )
+                        fig.update_traces(textposition='inside', textinfo='percent+label')
+                        return fig
+                    fig = figura_en_cache('pie', {'vista': 'tipo_contagio'}, construir)
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with col2:
-                    fig_bar = px.bar(
-                        df_contagio.head(10).sort_values('Cantidad', ascending=True),
-                        x='Cantidad',
-                        y='Tipo',
-                        orientation='h',
-                        title='Casos por Tipo',
-                        color='Cantidad',
-                        color_continuous_scale='Reds',
-                        text='Cantidad'
-                    )
-                    fig_bar.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+                    def construir():
+                        fig_bar = px.bar(
+                            df_contagio.head(10).sort_values('Cantidad', ascending=True),
+                            x='Cantidad',
+                            y='Tipo',
+                            orientation='h',
+                            title='Casos por Tipo',
+                            color='Cantidad',
+                            color_continuous_scale='Reds',
+                            text='Cantidad'
+                        )
+                        fig_bar.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+                        return fig_bar
+                    fig_bar = figura_en_cache('bar', {'vista': 'tipo_contagio_barras'}, construir)
                     st.plotly_chart(fig_bar, use_container_width=True)
                 
                 # Tabla detallada
@@ -830,7 +1521,7 @@ def mostrar_analisis_avanzado():
                 import traceback
                 st.code(traceback.format_exc())
     
-    with tab_recuperacion:
+    elif seccion == "✅ Recuperación":
         try:
             if 'conteo_por_recuperado' in st.session_state.analisis:
                 st.markdown("### ✅ Distribución por Estado de Recuperación")
@@ -851,12 +1542,15 @@ def mostrar_analisis_avanzado():
                 
                 col1, col2 = st.columns([2, 1])
                 with col1:
-                    fig = px.sunburst(
-                        df_recuperacion,
-                        path=['Estado'],
-                        values='Cantidad',
-                        title='Jerarquía de Estados de Recuperación'
-                    )
+                    def construir():
+                        fig = px.sunburst(
+                            df_recuperacion,
+                            path=['Estado'],
+                            values='Cantidad',
+                            title='Jerarquía de Estados de Recuperación'
+                        )
+                        return fig
+                    fig = figura_en_cache('sunburst', {'vista': 'recuperacion'}, construir)
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with col2:
@@ -871,7 +1565,7 @@ def mostrar_analisis_avanzado():
                 import traceback
                 st.code(traceback.format_exc())
     
-    with tab_ubicacion:
+    elif seccion == "📍 Ubicación":
         try:
             if 'conteo_por_ubicacion_del_caso' in st.session_state.analisis:
                 st.markdown("### 📍 Distribución por Ubicación del Caso")
@@ -892,29 +1586,35 @@ def mostrar_analisis_avanzado():
                 
                 col1, col2 = st.columns([2, 1])
                 with col1:
-                    fig = px.bar(
-                        df_ubicacion.head(10),
-                        x='Cantidad',
-                        y='Ubicación',
-                        orientation='h',
-                        color='Cantidad',
-                        color_continuous_scale='Blues',
-                        title='Top 10 Ubicaciones con Más Casos',
-                        text='Cantidad'
-                    )
-                    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-                    fig.update_layout(height=500)
+                    def construir():
+                        fig = px.bar(
+                            df_ubicacion.head(10),
+                            x='Cantidad',
+                            y='Ubicación',
+                            orientation='h',
+                            color='Cantidad',
+                            color_continuous_scale='Blues',
+                            title='Top 10 Ubicaciones con Más Casos',
+                            text='Cantidad'
+                        )
+                        fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+                        fig.update_layout(height=500)
+                        return fig
+                    fig = figura_en_cache('bar', {'vista': 'ubicacion'}, construir)
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with col2:
                     # Gráfico de dona
-                    fig_pie = px.pie(
-                        df_ubicacion.head(5),
-                        values='Cantidad',
-                        names='Ubicación',
-                        title='Top 5 Ubicaciones',
-                        hole=0.4
-                    )
+                    def construir():
+                        fig_pie = px.pie(
+                            df_ubicacion.head(5),
+                            values='Cantidad',
+                            names='Ubicación',
+                            title='Top 5 Ubicaciones',
+                            hole=0.4
+                        )
+                        return fig_pie
+                    fig_pie = figura_en_cache('pie', {'vista': 'ubicacion_top5'}, construir)
                     st.plotly_chart(fig_pie, use_container_width=True)
                 
                 st.markdown("#### 📋 Datos Completos")
@@ -928,7 +1628,7 @@ def mostrar_analisis_avanzado():
                 import traceback
                 st.code(traceback.format_exc())
     
-    with tab_etnia:
+    elif seccion == "👨‍👩‍👧 Etnia":
         try:
             if 'conteo_por_pertenencia_etnica' in st.session_state.analisis:
                 st.markdown("### 👨‍👩‍👧 Distribución por Pertenencia Étnica")
@@ -948,18 +1648,21 @@ def mostrar_analisis_avanzado():
                 
                 col1, col2 = st.columns([2, 1])
                 with col1:
-                    fig = px.bar(
-                        df_etnia.head(15),
-                        x='Cantidad',
-                        y='Etnia',
-                        orientation='h',
-                        color='Cantidad',
-                        color_continuous_scale='Viridis',
-                        title='Top 15 Etnias con Más Casos',
-                        text='Cantidad'
-                    )
-                    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-                    fig.update_layout(height=600)
+                    def construir():
+                        fig = px.bar(
+                            df_etnia.head(15),
+                            x='Cantidad',
+                            y='Etnia',
+                            orientation='h',
+                            color='Cantidad',
+                            color_continuous_scale='Viridis',
+                            title='Top 15 Etnias con Más Casos',
+                            text='Cantidad'
+                        )
+                        fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+                        fig.update_layout(height=600)
+                        return fig
+                    fig = figura_en_cache('bar', {'vista': 'etnia'}, construir)
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with col2:
@@ -971,12 +1674,15 @@ def mostrar_analisis_avanzado():
                 
                 # Gráfico de treemap
                 st.markdown("#### 🌳 Vista Jerárquica")
-                fig_tree = px.treemap(
-                    df_etnia.head(20),
-                    path=['Etnia'],
-                    values='Cantidad',
-                    title='Distribución Jerárquica de Etnias (Top 20)'
-                )
+                def construir():
+                    fig_tree = px.treemap(
+                        df_etnia.head(20),
+                        path=['Etnia'],
+                        values='Cantidad',
+                        title='Distribución Jerárquica de Etnias (Top 20)'
+                    )
+                    return fig_tree
+                fig_tree = figura_en_cache('treemap', {'vista': 'etnia_jerarquia'}, construir)
                 st.plotly_chart(fig_tree, use_container_width=True)
             else:
                 st.info("📊 No hay datos de etnia disponibles")
@@ -986,6 +1692,98 @@ def mostrar_analisis_avanzado():
                 import traceback
                 st.code(traceback.format_exc())
 
+    elif seccion == "⏱️ Retrasos":
+        try:
+            retrasos = obtener_retrasos()
+            if retrasos is not None and retrasos.retrasos_disponibles():
+                st.markdown("### ⏱️ Retrasos entre Fechas del Caso")
+                nombres_agrupacion = {'departamento': 'Departamento', 'grupo_edad': 'Grupo de edad', 'mes': 'Mes'}
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    retraso = st.selectbox(
+                        "Retraso",
+                        retrasos.retrasos_disponibles(),
+                        format_func=NOMBRES_RETRASOS.get,
+                        key='retrasos_tipo'
+                    )
+                with col2:
+                    agrupacion = st.selectbox(
+                        "Agrupar por",
+                        retrasos.agrupaciones_disponibles(),
+                        format_func=nombres_agrupacion.get,
+                        key='retrasos_agrupacion'
+                    )
+                
+                # Métricas globales desde el histograma total
+                total = retrasos.cuantiles(retraso)
+                resumen = retrasos.metadatos()['resumen'][retraso]
+                col1, col2, col3, col4 = st.columns(4)
+                if not total.empty:
+                    col1.metric("Mediana", f"{total['p50'].iloc[0]:.0f} días")
+                    col2.metric("Media", f"{total['media'].iloc[0]:.1f} días")
+                    col3.metric("Percentil 90", f"{total['p90'].iloc[0]:.0f} días")
+                col4.metric("Casos con ambas fechas", f"{resumen['en_rango']:,}")
+                if resumen['fuera_de_rango']:
+                    st.caption(
+                        f"Se excluyen {resumen['fuera_de_rango']:,} casos con retrasos negativos "
+                        f"o mayores a {retrasos.metadatos()['max_retraso']} días"
+                    )
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    def construir():
+                        histograma = retrasos.histograma(retraso).reset_index()
+                        fig = px.bar(
+                            histograma,
+                            x='Días',
+                            y='Casos',
+                            title=f'Distribución: {NOMBRES_RETRASOS[retraso]}'
+                        )
+                        fig.update_layout(bargap=0)
+                        return fig
+                    fig = figura_en_cache('bar', {'vista': 'retrasos_histograma', 'retraso': retraso}, construir)
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                with col2:
+                    por_grupo = retrasos.cuantiles(retraso, agrupacion)
+                    def construir():
+                        tabla = por_grupo.reset_index()
+                        fig = go.Figure(go.Scatter(
+                            x=tabla[agrupacion],
+                            y=tabla['p50'],
+                            mode='markers',
+                            name='Mediana',
+                            error_y=dict(
+                                type='data',
+                                symmetric=False,
+                                array=tabla['p75'] - tabla['p50'],
+                                arrayminus=tabla['p50'] - tabla['p25']
+                            )
+                        ))
+                        fig.update_layout(
+                            title=f'Mediana y rango intercuartílico por {nombres_agrupacion[agrupacion].lower()}',
+                            xaxis_title=nombres_agrupacion[agrupacion],
+                            yaxis_title='Días'
+                        )
+                        return fig
+                    fig = figura_en_cache(
+                        'figure', {'vista': 'retrasos_grupos', 'retraso': retraso, 'agrupacion': agrupacion}, construir
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                st.markdown("#### 📋 Cuantiles por Grupo")
+                st.dataframe(por_grupo.round(2), use_container_width=True)
+            else:
+                st.info("📊 No hay fechas suficientes para calcular retrasos")
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+            with st.expander("Ver detalles"):
+                import traceback
+                st.code(traceback.format_exc())
+
+@st.fragment
+@medido('render')
 def mostrar_comparativas_geographicas():
     """Muestra análisis comparativos y geográficos"""
     st.subheader("🗺️ Análisis Comparativos y Geográficos")
@@ -994,6 +1792,13 @@ def mostrar_comparativas_geographicas():
         st.warning("⚠️ Por favor carga los datos primero")
         return
     
+    from analisis import AnalizadorCOVID
+    from reduccion_series import reducir_figura
+    from indicadores import INDICADORES
+    from deteccion_cambios import TIPOS_EVENTO
+    from geometrias import ARCHIVOS_LIMITES, DIRECTORIO_LIMITES, casos_por_codigo, codigo_departamento
+    from tensor_casos import COLUMNA_NOMBRE_MUNICIPIO, codificar_municipios
+    
     # Debug info
     with st.expander("🔍 Información de Depuración"):
         st.write("Datos disponibles:")
@@ -1003,11 +1808,11 @@ def mostrar_comparativas_geographicas():
             st.write(f"✅ Departamentos: {len(st.session_state.analisis['top_departamentos'])}")
         st.write(f"Muestra cargada: {st.session_state.datos_cargados}")
     
-    tab_municipios, tab_evolucion_dpto, tab_comparacion = st.tabs([
-        "🏘️ Top Municipios", "📊 Evolución por Departamento", "🔍 Comparación"
-    ])
+    seccion = seleccionar_seccion([
+        "🏘️ Top Municipios", "🗺️ Mapa", "📊 Evolución por Departamento", "🔍 Comparación", "📈 Indicadores"
+    ], 'seccion_comparativas')
     
-    with tab_municipios:
+    if seccion == "🏘️ Top Municipios":
         try:
             if 'top_municipios' in st.session_state.analisis:
                 st.markdown("### 🏘️ Top Municipios con Más Casos")
@@ -1029,18 +1834,49 @@ def mostrar_comparativas_geographicas():
                     st.metric("📊 % Top 10", f"{porcentaje_top:.1f}%")
                 
                 # Gráfico de barras
-                fig = px.bar(
-                    df_municipios.head(20),
-                    x='Casos',
-                    y='Municipio',
-                    orientation='h',
-                    title='Top 20 Municipios con Más Casos',
-                    color='Casos',
-                    color_continuous_scale='Blues'
-                )
-                fig.update_layout(height=600)
+                def construir():
+                    fig = px.bar(
+                        df_municipios.head(20),
+                        x='Casos',
+                        y='Municipio',
+                        orientation='h',
+                        title='Top 20 Municipios con Más Casos',
+                        color='Casos',
+                        color_continuous_scale='Blues'
+                    )
+                    fig.update_layout(height=600)
+                    return fig
+                fig = figura_en_cache('bar', {'vista': 'top_municipios'}, construir)
                 st.plotly_chart(fig, use_container_width=True)
                 
+                # Mapa de calor municipio × variable (tabla dispersa, solo el bloque mostrado es denso)
+                datos_completos = st.session_state.datos_completos
+                if datos_completos is not None and COLUMNA_NOMBRE_MUNICIPIO in datos_completos.columns:
+                    variables = [c for c in ['estado', 'sexo', 'tipo_de_contagio', 'ubicacion_del_caso', 'recuperado', 'pa_s_de_origen', 'pertenencia_etnica']
+                                 if c in datos_completos.columns]
+                    if variables:
+                        st.markdown("#### 🌡️ Municipios vs. otras variables")
+                        col1, col2 = st.columns([2, 1])
+                        with col1:
+                            variable = st.selectbox("Variable", variables, key='mapa_calor_variable')
+                        with col2:
+                            top_municipios = st.slider("Municipios mostrados", 10, 100, 30, step=10, key='mapa_calor_top')
+                        
+                        def construir():
+                            # Filas por código DIVIPOLA: los municipios homónimos no se suman
+                            codigos, municipios = codificar_municipios(datos_completos)
+                            df_calor = pd.DataFrame({
+                                'Municipio': pd.Categorical.from_codes(codigos, municipios),
+                                variable: datos_completos[variable].to_numpy()
+                            })
+                            return AnalizadorCOVID(df_calor).generar_mapa_calor(
+                                variable, 'Municipio', top_x=15, top_y=top_municipios
+                            ).update_layout(height=max(400, 18 * top_municipios))
+                        fig_calor = figura_en_cache(
+                            'imshow', {'vista': 'municipios_vs', 'variable': variable, 'top': top_municipios}, construir
+                        )
+                        st.plotly_chart(fig_calor, use_container_width=True)
+                
                 # Tabla detallada
                 st.markdown("#### 📋 Datos Completos")
                 df_municipios['Porcentaje'] = (df_municipios['Casos'] / df_municipios['Casos'].sum() * 100).round(2)
@@ -1053,18 +1889,513 @@ def mostrar_comparativas_geographicas():
                 import traceback
                 st.code(traceback.format_exc())
     
-    with tab_evolucion_dpto:
-        st.info("📊 Funcionalidad en desarrollo")
+    elif seccion == "🗺️ Mapa":
+        try:
+            datos_completos = st.session_state.datos_completos
+            col1, col2 = st.columns(2)
+            with col1:
+                nivel = st.radio(
+                    "Nivel",
+                    ['departamentos', 'municipios'],
+                    format_func=str.capitalize,
+                    horizontal=True,
+                    key='mapa_nivel'
+                )
+            geometrias = obtener_geometrias(nivel)
+            columna = 'departamento' if nivel == 'departamentos' else 'ciudad_municipio'
+            
+            if geometrias is None:
+                archivo, campos_codigo, _ = ARCHIVOS_LIMITES[nivel]
+                st.info(
+                    f"🗺️ No están los límites de {nivel}: el mapa usa "
+                    f"`{os.path.join(DIRECTORIO_LIMITES, archivo)}` (GeoJSON simplificado del Marco "
+                    f"Geoestadístico Nacional del DANE, versionado con el código) con el código "
+                    f"DIVIPOLA en la propiedad `{campos_codigo[0]}`."
+                )
+            elif datos_completos is None or columna not in datos_completos.columns:
+                st.info(f"📊 Los datos no tienen la columna '{columna}' con el código DIVIPOLA")
+            else:
+                # Departamentos para enfocar el mapa, por código DIVIPOLA
+                departamentos = datos_completos[['departamento', 'departamento_nom']].drop_duplicates('departamento')
+                departamentos['departamento'] = pd.to_numeric(departamentos['departamento'], errors='coerce')
+                departamentos = departamentos[departamentos['departamento'] < 1000].sort_values('departamento_nom')
+                opciones = dict(zip(departamentos['departamento'].astype(int), departamentos['departamento_nom']))
+                with col2:
+                    enfoque = st.selectbox(
+                        "Enfocar en:",
+                        options=[None, *opciones],
+                        format_func=lambda codigo: "🇨🇴 Todo el país" if codigo is None else opciones[codigo],
+                        key='mapa_enfoque'
+                    )
+                
+                # Solo se envían las regiones visibles con el detalle que pide su zoom
+                codigos = None
+                if enfoque is not None:
+                    codigos = [c for c in geometrias.codigos().tolist()
+                               if (codigo_departamento(c) if nivel == 'municipios' else c) == enfoque]
+                centro, zoom = geometrias.vista(codigos)
+                detalle = geometrias.detalle_para_zoom(zoom)
+                geojson = geometrias.geojson(detalle, codigos)
+                
+                casos = casos_por_codigo(datos_completos[columna], nivel)
+                
+                def construir():
+                    df_mapa = geometrias.nombres().rename('Nombre').to_frame()
+                    df_mapa['Casos'] = casos.reindex(df_mapa.index, fill_value=0)
+                    if codigos is not None:
+                        df_mapa = df_mapa.loc[codigos]
+                    df_mapa = df_mapa.reset_index()
+                    fig = px.choropleth_map(
+                        df_mapa,
+                        geojson=geojson,
+                        locations='codigo',
+                        color='Casos',
+                        hover_name='Nombre',
+                        hover_data={'codigo': True, 'Casos': ':,'},
+                        color_continuous_scale='Reds',
+                        map_style='carto-positron',
+                        center=centro,
+                        zoom=zoom,
+                        opacity=0.75
+                    )
+                    fig.update_layout(height=650, margin=dict(l=0, r=0, t=30, b=0))
+                    return fig
+                fig = figura_en_cache(
+                    'choropleth_map', {'vista': 'mapa', 'nivel': nivel, 'enfoque': enfoque}, construir
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
+                sin_geometria = casos.index.difference(geometrias.codigos())
+                kb = len(json.dumps(geojson)) / 1024
+                st.caption(
+                    f"Detalle {detalle} para zoom {zoom:.1f}: {len(geojson['features']):,} {nivel}, "
+                    f"{kb:,.0f} KB de geometría. Unión por código DIVIPOLA"
+                    + (f"; {casos.loc[sin_geometria].sum():,} casos con códigos sin límite en el archivo."
+                       if len(sin_geometria) else ".")
+                )
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+            with st.expander("Ver detalles"):
+                import traceback
+                st.code(traceback.format_exc())
+    
+    elif seccion == "📊 Evolución por Departamento":
+        try:
+            tensor = obtener_tensor_casos()
+            if tensor is not None:
+                st.markdown("### 📊 Evolución Diaria por Departamento")
+                totales = tensor.totales_por_estado().sum(axis=1).sort_values(ascending=False)
+                
+                col1, col2, col3 = st.columns([2, 2, 1])
+                with col1:
+                    departamentos = st.multiselect(
+                        "Departamentos",
+                        list(totales.index),
+                        default=list(totales.index[:5]),
+                        key='evolucion_departamentos'
+                    )
+                with col2:
+                    estados = st.multiselect(
+                        "Estados (vacío = todos)",
+                        tensor.estados(),
+                        key='evolucion_estados'
+                    )
+                with col3:
+                    ventana = st.selectbox("Media móvil (días)", [1, 7, 14, 28], index=1, key='evolucion_ventana')
+                marcar_eventos = st.checkbox(
+                    "Marcar cambios de tendencia y días anómalos",
+                    value=True,
+                    key='evolucion_eventos'
+                )
+                
+                if departamentos:
+                    # Corte del tensor: días × departamentos elegidos
+                    serie = tensor.serie(departamentos, estados)
+                    if ventana > 1:
+                        serie = serie.rolling(window=ventana, min_periods=1).mean()
+                    cambios = obtener_cambios() if marcar_eventos else None
+                    eventos = cambios.eventos(departamentos) if cambios is not None else None
+                    
+                    def construir():
+                        df_evolucion = serie.reset_index().melt(id_vars='Fecha', var_name='Departamento', value_name='Casos')
+                        fig = px.line(
+                            df_evolucion,
+                            x='Fecha',
+                            y='Casos',
+                            color='Departamento',
+                            title=f'Casos diarios por departamento (media móvil de {ventana} días)' if ventana > 1
+                            else 'Casos diarios por departamento',
+                            labels={'Casos': 'Número de casos', 'Fecha': 'Fecha de notificación'}
+                        )
+                        fig = reducir_figura(fig)
+                        if eventos is not None and len(eventos):
+                            # Cada evento se marca sobre la curva de su departamento
+                            valores = serie.stack()
+                            for tipo, simbolo, color in [('aumento', 'triangle-up', '#d62728'),
+                                                         ('descenso', 'triangle-down', '#2ca02c'),
+                                                         ('pico', 'x', '#9467bd'),
+                                                         ('caida', 'x', '#8c564b')]:
+                                del_tipo = eventos[eventos['tipo'] == tipo]
+                                if len(del_tipo) == 0:
+                                    continue
+                                fig.add_trace(go.Scatter(
+                                    x=del_tipo['Fecha'],
+                                    y=valores.reindex(list(zip(del_tipo['Fecha'], del_tipo['Región']))).to_numpy(),
+                                    mode='markers',
+                                    name=TIPOS_EVENTO[tipo],
+                                    text=del_tipo['Región'],
+                                    hovertemplate='%{text}<br>%{x|%Y-%m-%d}: ' + TIPOS_EVENTO[tipo] + '<extra></extra>',
+                                    marker=dict(symbol=simbolo, size=11, color=color, line=dict(width=1, color='white'))
+                                ))
+                        return fig
+                    fig = figura_en_cache(
+                        'line',
+                        {'vista': 'evolucion_departamentos', 'departamentos': departamentos,
+                         'estados': estados, 'ventana': ventana, 'eventos': eventos is not None},
+                        construir
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    # Pico de cada departamento
+                    picos = pd.DataFrame({
+                        'Fecha pico': serie.idxmax().dt.date,
+                        'Casos en el pico': serie.max().round(1),
+                        'Total de casos': totales.reindex(serie.columns)
+                    })
+                    st.dataframe(picos, use_container_width=True)
+                else:
+                    st.info("Selecciona al menos un departamento")
+            else:
+                st.info("📊 No hay datos de evolución por departamento disponibles")
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+            with st.expander("Ver detalles"):
+                import traceback
+                st.code(traceback.format_exc())
+    
+    elif seccion == "🔍 Comparación":
+        try:
+            tensor = obtener_tensor_casos()
+            if tensor is not None:
+                st.markdown("### 🔍 Comparación entre Departamentos")
+                totales = tensor.totales_por_estado().sum(axis=1).sort_values(ascending=False)
+                fechas = tensor.fechas()
+                
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    departamentos = st.multiselect(
+                        "Departamentos a comparar",
+                        list(totales.index),
+                        default=list(totales.index[:3]),
+                        key='comparacion_departamentos'
+                    )
+                with col2:
+                    rango = st.date_input(
+                        "Periodo",
+                        value=(fechas[0].date(), fechas[-1].date()),
+                        min_value=fechas[0].date(),
+                        max_value=fechas[-1].date(),
+                        key='comparacion_periodo'
+                    )
+                
+                if departamentos and isinstance(rango, tuple) and len(rango) == 2:
+                    fecha_inicio, fecha_fin = rango
+                    por_estado = tensor.totales_por_estado(departamentos, fecha_inicio, fecha_fin)
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        def construir():
+                            df_estado = por_estado.reset_index().melt(id_vars='Región', var_name='Estado', value_name='Casos')
+                            fig = px.bar(
+                                df_estado,
+                                x='Región',
+                                y='Casos',
+                                color='Estado',
+                                title='Casos por estado en el periodo',
+                                labels={'Región': 'Departamento'}
+                            )
+                            return fig
+                        fig = figura_en_cache(
+                            'bar',
+                            {'vista': 'comparacion_estados', 'departamentos': departamentos,
+                             'periodo': [str(fecha_inicio), str(fecha_fin)]},
+                            construir
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                    
+                    with col2:
+                        def construir():
+                            acumulado = tensor.serie(departamentos, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin).cumsum()
+                            df_acumulado = acumulado.reset_index().melt(id_vars='Fecha', var_name='Departamento', value_name='Casos')
+                            fig = px.line(
+                                df_acumulado,
+                                x='Fecha',
+                                y='Casos',
+                                color='Departamento',
+                                title='Casos acumulados en el periodo',
+                                labels={'Casos': 'Casos acumulados'}
+                            )
+                            return reducir_figura(fig)
+                        fig = figura_en_cache(
+                            'line',
+                            {'vista': 'comparacion_acumulado', 'departamentos': departamentos,
+                             'periodo': [str(fecha_inicio), str(fecha_fin)]},
+                            construir
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                    
+                    # Tabla comparativa con la proporción de cada estado
+                    st.markdown("#### 📋 Resumen Comparativo")
+                    resumen = por_estado.copy()
+                    resumen['Total'] = resumen.sum(axis=1)
+                    for estado in por_estado.columns:
+                        resumen[f'% {estado}'] = (por_estado[estado] / resumen['Total'].where(resumen['Total'] > 0) * 100).round(2)
+                    st.dataframe(resumen, use_container_width=True)
+                else:
+                    st.info("Selecciona al menos un departamento y un periodo")
+            else:
+                st.info("📊 No hay datos de comparación disponibles")
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+            with st.expander("Ver detalles"):
+                import traceback
+                st.code(traceback.format_exc())
+
+    elif seccion == "📈 Indicadores":
+        try:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                nivel = st.radio(
+                    "Nivel",
+                    ['departamentos', 'municipios'],
+                    format_func=str.capitalize,
+                    horizontal=True,
+                    key='indicadores_nivel'
+                )
+            with col2:
+                indicador = st.selectbox(
+                    "Indicador",
+                    list(INDICADORES.keys()),
+                    format_func=INDICADORES.get,
+                    index=list(INDICADORES.keys()).index('rt'),
+                    key='indicadores_indicador'
+                )
+            with col3:
+                minimo_casos = st.number_input(
+                    "Mínimo de casos en 7 días",
+                    min_value=0,
+                    value=30,
+                    step=10,
+                    key='indicadores_minimo'
+                )
+            
+            indicadores = obtener_indicadores(nivel)
+            if indicadores is not None:
+                st.markdown(f"### 📈 Ranking de {nivel.capitalize()} por {INDICADORES[indicador]}")
+                fechas = indicadores.fechas()
+                fecha = st.slider(
+                    "Fecha",
+                    min_value=fechas[0].date(),
+                    max_value=fechas[-1].date(),
+                    value=fechas[-1].date(),
+                    key='indicadores_fecha'
+                )
+                st.caption(
+                    "Rt estimado con un intervalo serial gamma (media 4.7 días, desviación 2.9) "
+                    "sobre ventanas de 7 días; la letalidad es acumulada a la fecha."
+                )
+                
+                # El tiempo de duplicación más corto es el más preocupante
+                ranking = indicadores.ranking(
+                    indicador,
+                    top_n=20,
+                    minimo_casos_7d=minimo_casos,
+                    ascendente=(indicador == 'tiempo_duplicacion'),
+                    fecha=fecha
+                )
+                if not ranking.empty:
+                    def construir():
+                        df_ranking = ranking.reset_index()
+                        fig = px.bar(
+                            df_ranking.iloc[::-1],
+                            x=indicador,
+                            y='Región',
+                            orientation='h',
+                            color=indicador,
+                            color_continuous_scale='Reds',
+                            title=f'Top 20 {nivel} por {INDICADORES[indicador]} ({fecha})',
+                            labels={indicador: INDICADORES[indicador]}
+                        )
+                        if indicador == 'rt':
+                            fig.add_vline(x=1, line_dash='dash', line_color='gray')
+                        fig.update_layout(height=600)
+                        return fig
+                    fig = figura_en_cache(
+                        'bar',
+                        {'vista': 'ranking_indicadores', 'nivel': nivel, 'indicador': indicador,
+                         'minimo': minimo_casos, 'fecha': str(fecha)},
+                        construir
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    st.markdown("#### 📋 Todos los Indicadores")
+                    tabla = ranking.rename(columns={**INDICADORES, 'casos_7d': 'Casos 7 días'})
+                    st.dataframe(tabla.round(2), use_container_width=True)
+                else:
+                    st.info("Ninguna región cumple el mínimo de casos en la fecha elegida")
+            else:
+                st.info("📊 No hay datos para calcular indicadores")
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+            with st.expander("Ver detalles"):
+                import traceback
+                st.code(traceback.format_exc())
+
+@st.fragment
+@medido('render')
+def mostrar_pronosticos():
+    """Pronósticos de casos diarios por departamento o municipio"""
+    st.subheader("🔮 Pronósticos de Casos")
+    
+    if not st.session_state.analisis or st.session_state.datos_completos is None:
+        st.warning("⚠️ Por favor carga los datos primero")
+        return
+    
+    from pronosticos import MODELOS
     
-    with tab_comparacion:
-        st.info("📊 Funcionalidad en desarrollo")
+    try:
+        col1, col2 = st.columns(2)
+        with col1:
+            nivel = st.radio(
+                "Nivel",
+                ['departamentos', 'municipios'],
+                format_func=str.capitalize,
+                horizontal=True,
+                key='pronosticos_nivel'
+            )
+        with col2:
+            modelo = st.selectbox(
+                "Modelo",
+                list(MODELOS.keys()),
+                format_func=MODELOS.get,
+                key='pronosticos_modelo'
+            )
+        
+        procesador = st.session_state.procesador
+        datos_completos = st.session_state.datos_completos
+        
+        def calcular_exacto():
+            # False en lugar de None para que el ejecutor lo dé por terminado
+            return procesador.obtener_pronosticos(datos_completos, nivel) or False
+        
+        def dibujar(pronosticos, exacto):
+            if not exacto:
+                st.info(f"⏳ Ajustando los modelos para todos los {nivel} en segundo plano...")
+                return
+            if not pronosticos:
+                st.info("📊 No hay suficientes días de datos para pronosticar")
+                return
+            
+            metadatos = pronosticos.metadatos()
+            resumen = pronosticos.resumen(modelo)
+            regiones = resumen.sort_values('actual', ascending=False).index.tolist()
+            region = st.selectbox("Región:", regiones, key=f'pronosticos_region_{nivel}')
+            
+            def construir():
+                # Historia reciente (media de 7 días) seguida del pronóstico con su intervalo
+                historia = obtener_tensor_casos(nivel).serie([region])[region].rolling(7).mean().iloc[-90:]
+                serie = pronosticos.serie(region, modelo)
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=serie.index.append(serie.index[::-1]),
+                    y=pd.concat([serie['limite_superior'], serie['limite_inferior'][::-1]]),
+                    fill='toself',
+                    fillcolor='rgba(214, 39, 40, 0.2)',
+                    line=dict(color='rgba(0, 0, 0, 0)'),
+                    hoverinfo='skip',
+                    name='Intervalo 95%'
+                ))
+                fig.add_trace(go.Scatter(
+                    x=historia.index,
+                    y=historia,
+                    mode='lines',
+                    name='Media 7 días',
+                    line=dict(color='#1f77b4', width=2)
+                ))
+                fig.add_trace(go.Scatter(
+                    x=serie.index,
+                    y=serie['estimado'],
+                    mode='lines',
+                    name='Pronóstico',
+                    line=dict(color='#d62728', width=2, dash='dash')
+                ))
+                fig.update_layout(
+                    title=f'Pronóstico a {metadatos["horizonte"]} días - {region}',
+                    xaxis_title='Fecha',
+                    yaxis_title='Casos diarios (media 7 días)',
+                    hovermode='x unified',
+                    height=500
+                )
+                return fig
+            fig = figura_en_cache(
+                'figure', {'vista': 'pronostico', 'nivel': nivel, 'modelo': modelo, 'region': region}, construir
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            fila = resumen.loc[region]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("📊 Casos diarios actuales", f"{fila['actual']:,.1f}")
+            col2.metric(
+                f"🔮 En {metadatos['horizonte']} días",
+                f"{fila['pronostico']:,.1f}",
+                f"{fila['variacion']:+.1f}%" if pd.notna(fila['variacion']) else None,
+                delta_color='inverse'
+            )
+            col3.metric("🎯 Error en validación", f"{fila[f'error_{modelo}']:.1f}%")
+            
+            st.markdown(f"#### 📋 {nivel.capitalize()} con Mayor Crecimiento Esperado")
+            tabla = resumen[resumen['actual'] >= 5].sort_values('variacion', ascending=False).head(15)
+            st.dataframe(
+                tabla.rename(columns={
+                    'actual': 'Casos diarios',
+                    'pronostico': f'Pronóstico ({metadatos["horizonte"]} días)',
+                    'variacion': 'Variación (%)',
+                    'crecimiento_diario': 'Crecimiento diario (%)',
+                    **{f'error_{m}': f'Error {nombre} (%)' for m, nombre in MODELOS.items()}
+                }).round(1),
+                use_container_width=True
+            )
+            st.caption(
+                f"Modelos ajustados sobre el logaritmo de la media de 7 días hasta el "
+                f"{metadatos['ultima_fecha']}; el error es el de pronosticar los últimos "
+                f"{metadatos['dias_validacion']} días con los datos anteriores. "
+                f"{len(regiones):,} regiones en {metadatos['segundos']:.2f}s con "
+                f"{metadatos['procesos']} proceso(s)."
+            )
+        
+        clave = ('pronosticos', nivel, clave_datos())
+        mostrar_progresivo(clave, lambda: None, calcular_exacto, dibujar)
+    except Exception as e:
+        st.error(f"❌ Error en pronósticos: {str(e)}")
+        with st.expander("Ver detalles del error"):
+            import traceback
+            st.code(traceback.format_exc())
+
+# Secciones del tablero; cada una es un fragmento, de modo que sus propios
+# controles vuelven a ejecutar solo esa sección
+SECCIONES = {
+    "📈 Estadísticas Generales": mostrar_estadisticas_generales,
+    "📅 Evolución Temporal": mostrar_evolucion_temporal,
+    "🗺️ Departamentos": mostrar_distribucion_departamentos,
+    "👥 Pirámide de Edades": mostrar_piramide_edades,
+    "📆 Tendencias Semanales": mostrar_tendencias_temporales,
+    "🔬 Análisis Avanzado": mostrar_analisis_avanzado,
+    "🏘️ Comparativas Geográficas": mostrar_comparativas_geographicas,
+    "🔮 Pronósticos": mostrar_pronosticos
+}
 
 def main():
     """Función principal de la aplicación"""
-    # Cargar datos automáticamente al iniciar si no están cargados
-    if not st.session_state.get('datos_cargados', False):
-        cargar_datos()
-    
     # Mostrar métricas si los datos están cargados
     if st.session_state.datos_cargados and st.session_state.metrics:
         metrics = st.session_state.metrics
@@ -1072,34 +2403,16 @@ def main():
         col1.metric("💾 Registros", f"{metrics['total_registros']:,}")
         col2.metric("⏱️ Tiempo de carga", f"{metrics['tiempo_carga']:.2f}s")
         col3.metric("🔄 Fuente", "Caché" if metrics['cargado_desde_cache'] else "CSV")
+    elif st.session_state.get('instantanea'):
+        instantanea = st.session_state.instantanea
+        col1, col2, col3 = st.columns(3)
+        col1.metric("💾 Registros", f"{st.session_state.analisis['total_registros']:,}")
+        col2.metric("⏱️ Tiempo de carga", f"{instantanea['tiempo_carga']:.2f}s")
+        col3.metric("🔄 Fuente", "Instantánea")
     
-    # Crear pestañas para diferentes secciones
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "📈 Estadísticas Generales", 
-        "📅 Evolución Temporal", 
-        "🗺️ Departamentos", 
-        "👥 Pirámide de Edades",
-        "🔬 Análisis Avanzado",
-        "🏘️ Comparativas Geográficas"
-    ])
-    
-    with tab1:
-        mostrar_estadisticas_generales()
-    
-    with tab2:
-        mostrar_evolucion_temporal()
-    
-    with tab3:
-        mostrar_distribucion_departamentos()
-    
-    with tab4:
-        mostrar_piramide_edades()
-    
-    with tab5:
-        mostrar_analisis_avanzado()
-    
-    with tab6:
-        mostrar_comparativas_geographicas()
+    # Solo se ejecuta la sección visible: st.tabs calcularía y serializaría las ocho
+    seccion = seleccionar_seccion(list(SECCIONES), 'seccion_activa')
+    SECCIONES[seccion]()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
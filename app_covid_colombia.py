@@ -3,6 +3,9 @@ import requests
 import plotly.express as px
 import streamlit as st
 from datetime import datetime
+from reduccion_series import reducir_figura
+from analisis import AnalizadorCOVID
+from cliente_agregaciones import ClienteAgregaciones
 
 # Configuración de la página
 st.set_page_config(
@@ -11,6 +14,11 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def obtener_cliente():
+    """Cliente del servicio local de agregaciones, compartido entre sesiones"""
+    return ClienteAgregaciones()
+
 def obtener_datos():
     """Obtiene los datos de la API de Datos Abiertos de Colombia"""
     url = "https://www.datos.gov.co/resource/gt2j-8ykr.json"
@@ -103,25 +111,104 @@ def mostrar_graficos(df):
             title='Evolución de casos por fecha de reporte',
             labels={'Casos': 'Número de casos', 'Fecha': 'Fecha de reporte'}
         )
+        # Reducir la serie diaria al número de puntos que el gráfico puede mostrar
+        reducir_figura(fig2)
         st.plotly_chart(fig2, use_container_width=True)
     
     # Distribución por edad y sexo
     if 'edad' in df.columns and 'sexo' in df.columns:
-        fig3 = px.histogram(
-            df,
-            x='edad',
+        # Agrupado en el servidor: solo viajan los conteos por edad, no cada fila
+        fig3 = AnalizadorCOVID(df).generar_histograma(
+            'edad',
             color='sexo',
-            title='Distribución de casos por edad y sexo',
-            labels={'edad': 'Edad', 'sexo': 'Sexo', 'count': 'Número de casos'},
-            barmode='overlay',
+            ancho_bin=1,
+            titulo='Distribución de casos por edad y sexo',
             opacity=0.7
         )
+        if fig3 is not None:
+            fig3.update_layout(xaxis_title='Edad', legend_title='Sexo')
+            st.plotly_chart(fig3, use_container_width=True)
+
+def mostrar_estadisticas_servicio(cliente, estadisticas):
+    """Muestra las estadísticas generales calculadas por el servicio de agregaciones"""
+    st.subheader("📊 Estadísticas Generales")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total de casos", estadisticas['total_registros'])
+    
+    with col2:
+        recuperados = cliente.conteo('recuperado')
+        if recuperados is not None:
+            st.metric("Casos recuperados", int(recuperados.loc[recuperados['recuperado'] == 'Recuperado', 'casos'].sum()))
+    
+    with col3:
+        st.metric("Fallecidos", estadisticas.get('conteo_por_estado', {}).get('Fallecido', 0))
+    
+    with col4:
+        ultima_fecha = estadisticas.get('rango_fechas', {}).get('max')
+        if ultima_fecha:
+            st.metric("Última actualización", ultima_fecha[:10])
+
+def mostrar_graficos_servicio(cliente):
+    """Muestra los gráficos con los conteos y figuras que construye el servicio"""
+    st.subheader("📈 Análisis de Datos")
+    
+    # Gráfico de casos por departamento
+    casos_por_depto = cliente.conteo('departamento_nom', top=10)
+    if casos_por_depto is not None:
+        casos_por_depto.columns = ['Departamento', 'Casos']
+        fig1 = px.bar(
+            casos_por_depto,
+            x='Departamento',
+            y='Casos',
+            title='Top 10 Departamentos con más casos',
+            color='Casos',
+            color_continuous_scale='Viridis'
+        )
+        st.plotly_chart(fig1, use_container_width=True)
+    
+    # Gráfico de evolución temporal
+    df_fecha = cliente.serie('fecha_reporte_web', 'D')
+    if df_fecha is not None:
+        df_fecha.columns = ['Fecha', 'Casos']
+        fig2 = px.line(
+            df_fecha,
+            x='Fecha',
+            y='Casos',
+            title='Evolución de casos por fecha de reporte',
+            labels={'Casos': 'Número de casos', 'Fecha': 'Fecha de reporte'}
+        )
+        reducir_figura(fig2)
+        st.plotly_chart(fig2, use_container_width=True)
+    
+    # Distribución por edad y sexo
+    fig3 = cliente.figura(
+        'histograma',
+        columna='edad',
+        color='sexo',
+        ancho_bin=1,
+        titulo='Distribución de casos por edad y sexo'
+    )
+    if fig3 is not None:
+        fig3.update_layout(xaxis_title='Edad', legend_title='Sexo')
         st.plotly_chart(fig3, use_container_width=True)
 
 def main():
     st.title("📊 Análisis de Casos de COVID-19 en Colombia")
     st.markdown("Datos obtenidos de [Datos Abiertos Colombia](https://www.datos.gov.co/)")
     
+    # Con el servicio local de agregaciones en marcha no se descarga ni procesa
+    # una copia propia de los datos
+    cliente = obtener_cliente()
+    estadisticas = cliente.estadisticas()
+    if estadisticas is not None:
+        st.caption(f"🌐 Agregados del servicio local ({cliente.url})")
+        mostrar_estadisticas_servicio(cliente, estadisticas)
+        mostrar_graficos_servicio(cliente)
+        return
+    
     # Mostrar indicador de carga mientras se obtienen los datos
     with st.spinner('Cargando datos...'):
         datos = obtener_datos()
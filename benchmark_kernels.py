@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks de los kernels de conteo frente a los caminos de pandas que
+reemplazan (value_counts, groupby, crosstab, pd.cut)
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+from kernels_conteo import (
+    codificar, codigos_edad, codigos_periodo, conteo_1d, conteo_2d,
+    conteo_por_columna, tabla_cruzada, tabla_cruzada_dispersa, BORDES_EDAD, ETIQUETAS_EDAD
+)
+
+def crear_datos(n, semilla=0):
+    """Dataset sintético con las columnas de los gráficos del dashboard"""
+    rng = np.random.default_rng(semilla)
+    departamentos = [f'Departamento {i}' for i in range(33)]
+    municipios = [f'Municipio {i}' for i in range(1100)]
+    return pd.DataFrame({
+        'departamento_nom': pd.Categorical(rng.choice(departamentos, n)),
+        'ciudad_municipio_nom': rng.choice(municipios, n),
+        'sexo': pd.Categorical(rng.choice(['F', 'M'], n)),
+        'estado': pd.Categorical(rng.choice(['Leve', 'Moderado', 'Grave', 'Fallecido'], n)),
+        'edad': rng.integers(0, 105, n),
+        'fecha_de_notificación': pd.Timestamp('2020-03-01') + pd.to_timedelta(rng.integers(0, 900, n), unit='D')
+    })
+
+def medir(funcion, repeticiones=3):
+    """Mejor tiempo (segundos) de varias ejecuciones"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def piramide_pandas(df):
+    df = df.copy()
+    df['grupo_edad'] = pd.cut(df['edad'], bins=BORDES_EDAD, labels=ETIQUETAS_EDAD, right=False)
+    return df.groupby(['grupo_edad', 'sexo'], observed=False).size().unstack().fillna(0)
+
+def piramide_kernels(df):
+    codigos_grupo, grupos = codigos_edad(df['edad'])
+    codigos_sexo, sexos = codificar(df['sexo'])
+    return conteo_2d(codigos_grupo, len(grupos), codigos_sexo, len(sexos))
+
+def evolucion_kernels(df):
+    codigos, periodos = codigos_periodo(df['fecha_de_notificación'], 'D')
+    return conteo_1d(codigos, len(periodos))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    print(f"🔄 Generando {n:,} registros sintéticos...")
+    df = crear_datos(n)
+    
+    casos = [
+        ('Barras (departamento)',
+         lambda: df['departamento_nom'].value_counts(),
+         lambda: conteo_por_columna(df['departamento_nom'])),
+        ('Barras (municipio, texto)',
+         lambda: df['ciudad_municipio_nom'].value_counts(),
+         lambda: conteo_por_columna(df['ciudad_municipio_nom'])),
+        ('Pirámide edad × sexo',
+         lambda: piramide_pandas(df),
+         lambda: piramide_kernels(df)),
+        ('Evolución diaria',
+         lambda: df.groupby(pd.Grouper(key='fecha_de_notificación', freq='D')).size(),
+         lambda: evolucion_kernels(df)),
+        ('Mapa de calor departamento × estado',
+         lambda: pd.crosstab(df['departamento_nom'], df['estado'], normalize='index'),
+         lambda: tabla_cruzada(df['departamento_nom'], df['estado'], normalizar_filas=True)),
+        ('Mapa de calor municipio × edad (top 30)',
+         lambda: pd.crosstab(df['ciudad_municipio_nom'], df['edad'], normalize='index'),
+         lambda: tabla_cruzada_dispersa(df['ciudad_municipio_nom'], df['edad'], top_filas=30, top_columnas=30, normalizar_filas=True)),
+        ('Resumen categórico',
+         lambda: {c: df[c].value_counts(normalize=True).head(10).to_dict() for c in ('departamento_nom', 'sexo', 'estado')},
+         lambda: {c: conteo_por_columna(df[c], normalizar=True).head(10).to_dict() for c in ('departamento_nom', 'sexo', 'estado')}),
+    ]
+    
+    print(f"\n{'Caso':<45}{'pandas (ms)':>14}{'kernels (ms)':>14}{'speedup':>10}")
+    for nombre, con_pandas, con_kernels in casos:
+        t_pandas = medir(con_pandas)
+        t_kernels = medir(con_kernels)
+        print(f"{nombre:<45}{t_pandas * 1000:>14.1f}{t_kernels * 1000:>14.1f}{t_pandas / t_kernels:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
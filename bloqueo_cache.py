@@ -0,0 +1,182 @@
+"""
+Bloqueo entre procesos para construir la caché una sola vez.
+
+El bloqueo es un archivo creado con ``O_CREAT | O_EXCL``: solo un proceso
+puede crearlo, y ese proceso construye. El mismo archivo es la marca de
+"construcción en curso": guarda el pid, el equipo, la etapa y el avance, y se
+reescribe en cada etapa. Los demás procesos esperan a que desaparezca (y
+leen la marca para mostrar el avance) en lugar de repetir la construcción.
+Un bloqueo cuyo proceso ya no existe, o que lleva demasiado tiempo sin
+actualizarse, se considera abandonado y se elimina: primero se aparta con un
+nombre único y solo se borra si sigue siendo el bloqueo abandonado que se leyó,
+así dos procesos que lo retiran a la vez no borran el que uno de ellos acaba
+de tomar.
+"""
+
+import os
+import json
+import time
+import socket
+import threading
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Sin actualizar la marca durante este tiempo, la construcción se da por abandonada
+MAX_INACTIVIDAD = 30 * 60
+INTERVALO_ESPERA = 0.5
+
+
+def proceso_vivo(pid):
+    """
+    Indica si existe un proceso con ese pid en este equipo. En Windows
+    ``os.kill`` termina el proceso en lugar de comprobarlo, así que sin psutil
+    solo se comprueba en POSIX (y en Windows se da por vivo: cuenta la inactividad)
+    """
+    if PSUTIL_AVAILABLE:
+        return psutil.pid_exists(pid)
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BloqueoConstruccion:
+    def __init__(self, ruta, max_inactividad=MAX_INACTIVIDAD):
+        self.ruta = ruta
+        self.max_inactividad = max_inactividad
+        self.adquirido = False
+    
+    def _contenido(self, etapa, fraccion):
+        return json.dumps({
+            'pid': os.getpid(),
+            'equipo': socket.gethostname(),
+            'etapa': etapa,
+            'fraccion': fraccion,
+            'actualizado': time.time()
+        }).encode('utf-8')
+    
+    def _leer(self):
+        """Bytes del archivo de bloqueo (None si no existe)"""
+        try:
+            with open(self.ruta, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    
+    def marca(self):
+        """Contenido de la marca de construcción en curso (None si no hay construcción)"""
+        contenido = self._leer()
+        try:
+            return json.loads(contenido or b'{}') if contenido is not None else None
+        except ValueError:
+            return None
+    
+    def abandonado(self, contenido=None):
+        """
+        Indica si el bloqueo existe pero su proceso murió o dejó de actualizarlo
+        (evaluado sobre ``contenido`` si se pasa, los bytes leídos del bloqueo)
+        """
+        try:
+            edad = time.time() - os.path.getmtime(self.ruta)
+        except FileNotFoundError:
+            return False
+        if contenido is None:
+            contenido = self._leer() or b''
+        try:
+            marca = json.loads(contenido or b'{}')
+        except ValueError:
+            marca = {}
+        if marca.get('equipo') == socket.gethostname() and 'pid' in marca:
+            if not proceso_vivo(marca['pid']):
+                return True
+        return edad > self.max_inactividad
+    
+    def retirar_abandonado(self, contenido):
+        """
+        Retira el bloqueo si sigue siendo el que se leyó como ``contenido``: se
+        aparta con un nombre único y, si resulta que otro proceso ya lo había
+        reemplazado por uno suyo, se devuelve a su sitio en lugar de borrarlo
+        """
+        apartado = f"{self.ruta}.abandonado.{os.getpid()}.{threading.get_ident()}"
+        try:
+            os.rename(self.ruta, apartado)
+        except FileNotFoundError:
+            return
+        with open(apartado, 'rb') as f:
+            actual = f.read()
+        if actual != contenido:
+            try:
+                os.link(apartado, self.ruta)
+            except FileExistsError:
+                pass
+        else:
+            print(f"🧹 Eliminando bloqueo abandonado: {self.ruta}")
+        os.remove(apartado)
+    
+    def adquirir(self, etapa='Iniciando'):
+        """Intenta tomar el bloqueo sin esperar; elimina antes uno abandonado"""
+        os.makedirs(os.path.dirname(self.ruta) or '.', exist_ok=True)
+        for _ in range(2):
+            try:
+                descriptor = os.open(self.ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                contenido = self._leer()
+                if contenido is not None and not self.abandonado(contenido):
+                    return False
+                if contenido is not None:
+                    self.retirar_abandonado(contenido)
+                continue
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(self._contenido(etapa, 0.0))
+            self.adquirido = True
+            return True
+        return False
+    
+    def marcar(self, etapa, fraccion=None):
+        """Actualiza la marca con la etapa actual (solo quien tiene el bloqueo)"""
+        if not self.adquirido:
+            return
+        temporal = f"{self.ruta}.{os.getpid()}"
+        with open(temporal, 'wb') as f:
+            f.write(self._contenido(etapa, fraccion))
+        os.replace(temporal, self.ruta)
+    
+    def liberar(self):
+        if self.adquirido:
+            self.adquirido = False
+            try:
+                os.remove(self.ruta)
+            except FileNotFoundError:
+                pass
+    
+    def esperar(self, timeout=None, al_avanzar=None):
+        """
+        Espera a que otro proceso libere el bloqueo (o lo abandone). ``al_avanzar``
+        recibe la marca en cada consulta. Devuelve False si se agotó el tiempo.
+        """
+        inicio = time.monotonic()
+        while os.path.exists(self.ruta) and not self.abandonado():
+            if timeout is not None and time.monotonic() - inicio > timeout:
+                return False
+            marca = self.marca()
+            if al_avanzar is not None and marca:
+                al_avanzar(marca)
+            time.sleep(INTERVALO_ESPERA)
+        return True
+    
+    def __enter__(self):
+        while not self.adquirir():
+            self.esperar()
+        return self
+    
+    def __exit__(self, *exc):
+        self.liberar()
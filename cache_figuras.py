@@ -0,0 +1,93 @@
+"""
+Caché de figuras Plotly compartida entre sesiones.
+
+Cada figura se identifica por el tipo de gráfico, sus parámetros, el estado de
+los filtros y la huella del dataset. Se guarda la figura construida, con un
+límite de entradas y de bytes (se descartan las menos usadas recientemente);
+un acierto se ahorra toda la preparación de datos y la construcción de la figura.
+Las figuras en caché se comparten entre sesiones y no deben modificarse.
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import plotly.io as pio
+
+from huella_datos import huella_dataset
+
+
+class CacheFiguras:
+    def __init__(self, max_entradas=256, max_bytes=64 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    @staticmethod
+    def clave(tipo, parametros=None, filtros=None, huella=None):
+        """Clave estable para un gráfico: tipo, parámetros, filtros y versión de los datos"""
+        especificacion = json.dumps(
+            {'tipo': tipo, 'parametros': parametros, 'filtros': filtros, 'huella': huella},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha1(especificacion.encode('utf-8')).hexdigest()
+    
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada['figura']
+    
+    @staticmethod
+    def tamaño(figura):
+        """Bytes que ocupa la figura serializada, para el límite de memoria"""
+        return len(pio.to_json(figura, validate=False))
+    
+    def guardar(self, clave, figura):
+        """Guarda la figura, descartando las menos usadas si se pasa de los límites"""
+        tamaño = self.tamaño(figura)
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= anterior['bytes']
+            self._entradas[clave] = {'figura': figura, 'bytes': tamaño}
+            self._bytes += tamaño
+            while self._entradas and (len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes):
+                _, descartada = self._entradas.popitem(last=False)
+                self._bytes -= descartada['bytes']
+        return figura
+    
+    def obtener_o_construir(self, tipo, parametros, construir, filtros=None, huella=None):
+        """
+        Devuelve la figura en caché o la construye con ``construir()`` y la guarda.
+        ``construir`` debe hacer también la preparación de los datos de la figura,
+        para que un acierto no la repita.
+        """
+        clave = self.clave(tipo, parametros, filtros, huella)
+        figura = self.obtener(clave)
+        if figura is None:
+            figura = self.guardar(clave, construir())
+        return figura
+    
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+    
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos
+            }
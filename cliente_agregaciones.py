@@ -0,0 +1,144 @@
+"""
+Cliente del servicio local de agregaciones.
+
+Los dashboards y scripts piden estadísticas, conteos y figuras al proceso del
+servicio en lugar de cargar el dataset por su cuenta. Cada respuesta se guarda
+con su ETag y se revalida con ``If-None-Match``: si los datos no cambiaron el
+servicio contesta 304 sin cuerpo. Si el servicio no responde, los métodos
+devuelven None y quien llama usa su propio camino.
+"""
+
+import io
+import os
+import json
+import time
+import threading
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+import pandas as pd
+
+URL_POR_DEFECTO = 'http://127.0.0.1:8765'
+TIPO_ARROW = 'application/vnd.apache.arrow.stream'
+# Tras un fallo de conexión no se vuelve a intentar durante este tiempo
+ESPERA_REINTENTO = 30.0
+
+
+def parametros_filtros(departamentos=None, estados=None, fecha_inicio=None, fecha_fin=None):
+    """Filtros de la barra lateral como parámetros de la URL del servicio"""
+    parametros = {}
+    if departamentos:
+        parametros['departamentos'] = ','.join(departamentos)
+    if estados:
+        parametros['estados'] = ','.join(estados)
+    if fecha_inicio:
+        parametros['fecha_inicio'] = str(fecha_inicio)
+    if fecha_fin:
+        parametros['fecha_fin'] = str(fecha_fin)
+    return parametros
+
+
+def decodificar_tabla(cuerpo, tipo):
+    """DataFrame desde el cuerpo de una respuesta (Arrow IPC o JSON compacto)"""
+    if tipo.startswith(TIPO_ARROW):
+        import pyarrow as pa
+        return pa.ipc.open_stream(io.BytesIO(cuerpo)).read_all().to_pandas()
+    contenido = json.loads(cuerpo)
+    tabla = pd.DataFrame(contenido['datos'], columns=contenido['columnas'])
+    for columna in contenido['fechas']:
+        tabla[columna] = pd.to_datetime(tabla[columna])
+    return tabla
+
+
+class ClienteAgregaciones:
+    def __init__(self, url=None, timeout=5.0, formato='arrow'):
+        self.url = (url or os.environ.get('COVID_SERVICIO_URL', URL_POR_DEFECTO)).rstrip('/')
+        self.timeout = timeout
+        self.formato = formato
+        self._respuestas = {}
+        self._lock = threading.Lock()
+        self._ultimo_fallo = None
+        self.revalidadas = 0
+    
+    def _pedir(self, ruta, parametros=None, tabla=False):
+        """
+        Respuesta decodificada de una ruta del servicio (None si no está disponible).
+        Las respuestas guardadas se revalidan con su ETag.
+        """
+        if self._ultimo_fallo is not None and time.monotonic() - self._ultimo_fallo < ESPERA_REINTENTO:
+            return None
+        url = f"{self.url}{ruta}"
+        if parametros:
+            url += '?' + urlencode(sorted(parametros.items()))
+        cabeceras = {'Accept': TIPO_ARROW if tabla and self.formato == 'arrow' else 'application/json'}
+        with self._lock:
+            guardada = self._respuestas.get(url)
+        if guardada is not None:
+            cabeceras['If-None-Match'] = guardada[0]
+        
+        try:
+            with urlopen(Request(url, headers=cabeceras), timeout=self.timeout) as respuesta:
+                cuerpo = respuesta.read()
+                etag = respuesta.headers.get('ETag')
+                tipo = respuesta.headers.get('Content-Type', 'application/json')
+        except HTTPError as e:
+            if e.code == 304 and guardada is not None:
+                self.revalidadas += 1
+                return guardada[1].copy() if tabla else guardada[1]
+            print(f"⚠️ El servicio de agregaciones respondió {e.code} en {ruta}")
+            return None
+        except (URLError, OSError):
+            self._ultimo_fallo = time.monotonic()
+            return None
+        
+        self._ultimo_fallo = None
+        valor = decodificar_tabla(cuerpo, tipo) if tabla else json.loads(cuerpo)
+        if etag is not None:
+            with self._lock:
+                self._respuestas[url] = (etag, valor)
+        return valor.copy() if tabla else valor
+    
+    def disponible(self):
+        """Indica si el servicio responde"""
+        return self.estado() is not None
+    
+    def estado(self):
+        return self._pedir('/estado')
+    
+    def estadisticas(self):
+        """Estadísticas generales del dataset cargado en el servicio"""
+        return self._pedir('/estadisticas')
+    
+    def total(self, **filtros):
+        """Casos con los filtros de la barra lateral"""
+        respuesta = self._pedir('/total', parametros_filtros(**filtros))
+        return None if respuesta is None else respuesta['total']
+    
+    def conteo(self, columna, top=None, **filtros):
+        """Casos por categoría de ``columna`` (columnas: columna, casos), de mayor a menor"""
+        parametros = {'columna': columna, **parametros_filtros(**filtros)}
+        if top:
+            parametros['top'] = top
+        return self._pedir('/conteo', parametros, tabla=True)
+    
+    def serie(self, columna_fecha='fecha_de_notificación', frecuencia='D', **filtros):
+        """Casos por periodo (columnas: Fecha, casos)"""
+        parametros = {'columna_fecha': columna_fecha, 'frecuencia': frecuencia, **parametros_filtros(**filtros)}
+        return self._pedir('/serie', parametros, tabla=True)
+    
+    def evolucion(self, regiones=None, nivel='departamentos', **filtros):
+        """Casos diarios por región (columna Fecha y una columna por región)"""
+        parametros = {'nivel': nivel, **parametros_filtros(**filtros)}
+        if regiones:
+            parametros['regiones'] = ','.join(regiones)
+        return self._pedir('/evolucion', parametros, tabla=True)
+    
+    def figura(self, tipo, filtros=None, **parametros):
+        """Figura Plotly de ``AnalizadorCOVID`` construida en el servicio"""
+        parametros = {'tipo': tipo, **{k: v for k, v in parametros.items() if v is not None},
+                      **parametros_filtros(**(filtros or {}))}
+        respuesta = self._pedir('/figura', parametros)
+        if respuesta is None:
+            return None
+        import plotly.graph_objects as go
+        return go.Figure(respuesta, skip_invalid=True)
@@ -0,0 +1,157 @@
+"""
+Consultas aproximadas sobre las muestras estratificadas.
+
+Los conteos se estiman a partir de la muestra escalando por los pesos
+muestrales, con intervalos de confianza del estimador estratificado. Si el
+error pedido no se alcanza, la consulta sube al siguiente nivel de muestra y,
+en último caso, se resuelve de forma exacta sobre los datos completos.
+"""
+
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+from muestreo import MuestreadorEstratificado, COLUMNA_DEPARTAMENTO, COLUMNA_FECHA, COLUMNA_PESO
+
+
+def mascara_filtros(df, departamentos=None, estados=None, fecha_inicio=None, fecha_fin=None):
+    """Máscara booleana con los filtros de la barra lateral"""
+    mascara = np.ones(len(df), dtype=bool)
+    if departamentos and COLUMNA_DEPARTAMENTO in df.columns:
+        mascara &= df[COLUMNA_DEPARTAMENTO].isin(departamentos).to_numpy()
+    if estados and 'estado' in df.columns:
+        mascara &= df['estado'].isin(estados).to_numpy()
+    if COLUMNA_FECHA in df.columns:
+        if fecha_inicio:
+            mascara &= (df[COLUMNA_FECHA] >= pd.Timestamp(fecha_inicio)).to_numpy()
+        if fecha_fin:
+            mascara &= (df[COLUMNA_FECHA] <= pd.Timestamp(fecha_fin)).to_numpy()
+    return mascara
+
+
+def estimar_conteos(muestra, mascara, codigos_grupo, n_grupos, confianza=0.95):
+    """
+    Estimador estratificado de conteos por grupo (Horvitz-Thompson con pesos
+    N_h / n_h) y su varianza con corrección por población finita.
+    Devuelve (estimado, semiancho_del_intervalo) por grupo.
+    """
+    departamento, mes = MuestreadorEstratificado.claves_estrato(muestra)
+    codigos_dpto = pd.factorize(departamento)[0]
+    codigos_mes, valores_mes = pd.factorize(mes)
+    estrato = codigos_dpto.astype(np.int64) * len(valores_mes) + codigos_mes
+    n_estratos = int(estrato.max()) + 1 if len(estrato) else 0
+    
+    n_h = np.bincount(estrato, minlength=n_estratos).astype(float)
+    if COLUMNA_PESO in muestra.columns:
+        pesos = muestra[COLUMNA_PESO].to_numpy(dtype=float)
+    else:
+        pesos = np.ones(len(muestra))
+    poblacion_h = np.bincount(estrato, weights=pesos, minlength=n_estratos)
+    
+    seleccion = mascara & (codigos_grupo >= 0)
+    conteo = np.bincount(
+        estrato[seleccion] * n_grupos + codigos_grupo[seleccion],
+        minlength=n_estratos * n_grupos
+    ).reshape(n_estratos, n_grupos)
+    
+    n_seguro = np.maximum(n_h, 1)[:, None]
+    p = conteo / n_seguro
+    estimado = (poblacion_h[:, None] * p).sum(axis=0)
+    
+    fpc = np.clip(1 - n_h / np.maximum(poblacion_h, 1), 0, 1)
+    factor = poblacion_h ** 2 * fpc / np.maximum(n_h - 1, 1)
+    varianza = (factor[:, None] * p * (1 - p)).sum(axis=0)
+    
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    return estimado, z * np.sqrt(varianza)
+
+
+class ConsultorAproximado:
+    def __init__(self, muestreador, datos_completos=None):
+        self.muestreador = muestreador
+        self.datos_completos = datos_completos
+    
+    def conteo_por_grupo(self, columna=None, error_relativo=0.05, confianza=0.95, top_n=10,
+                         departamentos=None, estados=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Estima el número de casos por categoría de ``columna`` (o el total si es
+        None) con los filtros dados. Empieza por la muestra más pequeña y escala
+        mientras el error relativo de los ``top_n`` grupos supere el objetivo.
+        """
+        filtros = dict(departamentos=departamentos, estados=estados,
+                       fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
+        
+        for nivel in self.muestreador.niveles_disponibles():
+            muestra = self.muestreador.cargar_muestra(nivel)
+            tabla = self._estimar(muestra, columna, filtros, confianza)
+            error_max = self._error_maximo(tabla, top_n)
+            if error_max <= error_relativo:
+                return {'tabla': tabla, 'nivel': nivel, 'exacto': False, 'error_relativo_max': error_max}
+        
+        if self.datos_completos is None:
+            # Sin datos completos en memoria se devuelve la mejor estimación disponible
+            disponibles = self.muestreador.niveles_disponibles()
+            if not disponibles:
+                return None
+            return {'tabla': tabla, 'nivel': disponibles[-1], 'exacto': False, 'error_relativo_max': error_max}
+        
+        tabla = self._exacto(self.datos_completos, columna, filtros)
+        return {'tabla': tabla, 'nivel': None, 'exacto': True, 'error_relativo_max': 0.0}
+    
+    def total(self, error_relativo=0.05, confianza=0.95, **filtros):
+        """Estima el total de casos que cumplen los filtros"""
+        resultado = self.conteo_por_grupo(None, error_relativo=error_relativo, confianza=confianza, **filtros)
+        if resultado is None:
+            return None
+        fila = resultado['tabla'].iloc[0]
+        return {
+            'estimado': float(fila['estimado']),
+            'limite_inferior': float(fila['limite_inferior']),
+            'limite_superior': float(fila['limite_superior']),
+            'nivel': resultado['nivel'],
+            'exacto': resultado['exacto']
+        }
+    
+    @staticmethod
+    def _codigos(df, columna):
+        if columna is None:
+            return np.zeros(len(df), dtype=np.int64), np.array(['Total'], dtype=object)
+        codigos, categorias = pd.factorize(df[columna], sort=True)
+        return codigos.astype(np.int64), np.asarray(categorias, dtype=object)
+    
+    def _estimar(self, muestra, columna, filtros, confianza):
+        mascara = mascara_filtros(muestra, **filtros)
+        codigos, categorias = self._codigos(muestra, columna)
+        estimado, semiancho = estimar_conteos(muestra, mascara, codigos, max(len(categorias), 1), confianza)
+        # Sin aciertos en la muestra la varianza estimada es 0, pero eso no hace
+        # exacto el cero: se acota con la regla del tres (p <= 3/n) y el mayor peso
+        peso_max = float(muestra[COLUMNA_PESO].max()) if COLUMNA_PESO in muestra.columns and len(muestra) else 1.0
+        tabla = pd.DataFrame({
+            'grupo': categorias,
+            'estimado': estimado,
+            'limite_inferior': np.maximum(estimado - semiancho, 0),
+            'limite_superior': np.where(estimado > 0, estimado + semiancho, 3 * peso_max),
+            'error_relativo': np.divide(semiancho, estimado, out=np.full(len(estimado), np.inf), where=estimado > 0)
+        })
+        return tabla.sort_values('estimado', ascending=False, ignore_index=True)
+    
+    def _exacto(self, df, columna, filtros):
+        mascara = mascara_filtros(df, **filtros)
+        codigos, categorias = self._codigos(df, columna)
+        conteo = np.bincount(codigos[mascara & (codigos >= 0)], minlength=len(categorias)).astype(float)
+        tabla = pd.DataFrame({
+            'grupo': categorias,
+            'estimado': conteo,
+            'limite_inferior': conteo,
+            'limite_superior': conteo,
+            'error_relativo': 0.0
+        })
+        return tabla.sort_values('estimado', ascending=False, ignore_index=True)
+    
+    @staticmethod
+    def _error_maximo(tabla, top_n):
+        # Si ningún grupo tiene aciertos en la muestra el objetivo no se cumple
+        principales = tabla[tabla['estimado'] > 0].head(top_n)
+        if principales.empty:
+            return float('inf')
+        return float(principales['error_relativo'].max())
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Conversión del dataset a Parquet con ajustes de escritura configurables.
+
+Un solo conversor para el CSV fuente: lee el CSV (por bloques si es grande),
+tipa las fechas y la edad y escribe el Parquet con el códec (snappy, zstd o
+lz4), el nivel de compresión, las filas por grupo y las columnas con
+diccionario y estadísticas que se le indiquen. Los ajustes por defecto son
+los de ``to_parquet``.
+
+``autoajustar`` elige los ajustes midiendo candidatos sobre una muestra del
+dataset: el tiempo de lectura completa (la carga de la caché), el de un
+escaneo de las columnas que filtran los tableros sobre el último mes y el
+tamaño del archivo. Cada medida se divide por la mejor de los candidatos y
+gana la menor suma ponderada. Los ajustes elegidos se guardan en JSON para que
+``ProcesadorCOVID`` los use al escribir el Parquet fuente y la caché.
+
+Uso: ``python conversion_parquet.py CSV [PARQUET] [--codec zstd] [--nivel 3]
+[--filas-por-grupo N] [--diccionario auto] [--estadisticas consulta] [--autoajustar]``
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import pandas as pd
+
+from instrumentacion import medir_etapa
+
+COLUMNAS_FECHA = ['fecha_de_notificación', 'fecha_reporte_web', 'fecha_inicio_sintomas',
+                  'fecha_muerte', 'fecha_diagnostico', 'fecha_recuperado']
+COLUMNAS_NUMERICAS = ['edad']
+# Columnas por las que filtran y agrupan los tableros
+COLUMNAS_CONSULTA = ['fecha_de_notificación', 'departamento_nom', 'ciudad_municipio_nom', 'estado', 'sexo', 'edad']
+
+CODECS = ('snappy', 'zstd', 'lz4')
+# Códecs con niveles de compresión
+CODECS_CON_NIVEL = ('zstd',)
+CONFIGURACION_POR_DEFECTO = {
+    'codec': 'snappy',
+    'nivel': None,
+    'filas_por_grupo': 1024 * 1024,
+    'diccionario': 'todas',
+    'estadisticas': 'todas'
+}
+# Proporción máxima de valores distintos para que una columna de texto use diccionario ('auto')
+MAX_PROPORCION_DISTINTOS = 0.1
+TAMAÑO_BLOQUE_CSV = 50_000
+MB_CSV_GRANDE = 1000
+
+TAMAÑO_MUESTRA_AJUSTE = 200_000
+PESOS_AJUSTE = {'lectura': 0.5, 'escaneo': 0.3, 'tamaño': 0.2}
+NIVELES_CANDIDATOS = [('snappy', None), ('lz4', None), ('zstd', 1), ('zstd', 3), ('zstd', 9)]
+FILAS_POR_GRUPO_CANDIDATAS = (128 * 1024, 512 * 1024, 1024 * 1024)
+DICCIONARIOS_CANDIDATOS = ('auto', 'todas')
+DIAS_ESCANEO = 30
+
+
+def leer_csv(ruta):
+    """Lee el CSV fuente como texto, por bloques si pesa más de 1 GB"""
+    tamaño = os.path.getsize(ruta) / (1024 * 1024)
+    opciones = dict(delimiter=',', on_bad_lines='skip', low_memory=False, dtype=str)
+    if tamaño <= MB_CSV_GRANDE:
+        return pd.read_csv(ruta, **opciones)
+    
+    print(f"📁 Archivo grande detectado ({tamaño:.1f} MB). Leyendo en bloques de {TAMAÑO_BLOQUE_CSV:,} filas...")
+    try:
+        bloques = []
+        total_filas = 0
+        for bloque in pd.read_csv(ruta, chunksize=TAMAÑO_BLOQUE_CSV, **opciones):
+            bloques.append(bloque)
+            total_filas += len(bloque)
+            if total_filas % (TAMAÑO_BLOQUE_CSV * 10) == 0:  # Mostrar progreso cada 500k filas
+                print(f"📥 Procesadas {total_filas:,} filas...")
+        print(f"✅ Lectura completada: {total_filas:,} filas en total")
+        return pd.concat(bloques, ignore_index=True)
+    except Exception as e:
+        print(f"❌ Error procesando CSV grande: {e}")
+        # Fallback: motor de Python, más lento pero más tolerante
+        print("🔄 Intentando método alternativo...")
+        return pd.read_csv(ruta, delimiter=',', on_bad_lines='skip', dtype=str, engine='python')
+
+
+def convertir_tipos(df):
+    """Convierte las columnas de fecha y la edad (los valores inválidos quedan nulos)"""
+    for col in COLUMNAS_FECHA:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in COLUMNAS_NUMERICAS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def columnas_diccionario(tabla):
+    """Columnas de texto con pocos valores distintos, que se benefician de la codificación por diccionario"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    columnas = []
+    for nombre, columna in zip(tabla.column_names, tabla.columns):
+        if not (pa.types.is_string(columna.type) or pa.types.is_large_string(columna.type)):
+            continue
+        if len(columna) == 0 or pc.count_distinct(columna).as_py() <= MAX_PROPORCION_DISTINTOS * len(columna):
+            columnas.append(nombre)
+    return columnas
+
+
+def _columnas(opcion, tabla, automaticas):
+    """True, False o lista de columnas para una opción 'todas', 'ninguna', automática o lista"""
+    if opcion == 'todas':
+        return True
+    if opcion == 'ninguna':
+        return False
+    columnas = automaticas() if isinstance(opcion, str) else opcion
+    return [c for c in columnas if c in tabla.column_names]
+
+
+def argumentos_escritura(tabla, configuracion):
+    """Argumentos de ``pyarrow.parquet.write_table`` para una configuración"""
+    configuracion = {**CONFIGURACION_POR_DEFECTO, **(configuracion or {})}
+    codec = configuracion['codec']
+    if codec not in CODECS:
+        raise ValueError(f"Códec no soportado: {codec} (opciones: {', '.join(CODECS)})")
+    argumentos = {
+        'compression': codec,
+        'row_group_size': int(configuracion['filas_por_grupo']),
+        'use_dictionary': _columnas(configuracion['diccionario'], tabla, lambda: columnas_diccionario(tabla)),
+        'write_statistics': _columnas(configuracion['estadisticas'], tabla, lambda: COLUMNAS_CONSULTA)
+    }
+    if codec in CODECS_CON_NIVEL and configuracion['nivel'] is not None:
+        argumentos['compression_level'] = int(configuracion['nivel'])
+    return argumentos
+
+
+def escribir_parquet(df, ruta, configuracion=None):
+    """Escribe ``df`` en ``ruta`` con los ajustes de ``configuracion`` (los de ``to_parquet`` si es None)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(tabla, ruta, **argumentos_escritura(tabla, configuracion))
+
+
+def cargar_ajustes(ruta):
+    """Configuración guardada por ``guardar_ajustes`` (None si no hay)"""
+    if not ruta or not os.path.exists(ruta):
+        return None
+    with open(ruta, 'r') as f:
+        return json.load(f)['configuracion']
+
+
+def guardar_ajustes(ruta, configuracion, resultados=None):
+    """Guarda la configuración elegida y, si se pasan, las medidas de los candidatos"""
+    temporal = f"{ruta}.{os.getpid()}"
+    with open(temporal, 'w') as f:
+        json.dump({'configuracion': configuracion, 'candidatos': resultados or []}, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def _medir(funcion, repeticiones):
+    """Menor tiempo de ``repeticiones`` ejecuciones"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def medir_configuracion(df, configuracion, ruta, repeticiones=3):
+    """Tiempo de lectura completa, de escaneo del último mes y tamaño en bytes de ``df`` escrito con ``configuracion``"""
+    import pyarrow.parquet as pq
+    escribir_parquet(df, ruta, configuracion)
+    
+    columnas = [c for c in COLUMNAS_CONSULTA if c in df.columns]
+    filtros = None
+    if 'fecha_de_notificación' in df.columns and df['fecha_de_notificación'].notna().any():
+        desde = df['fecha_de_notificación'].max() - pd.Timedelta(days=DIAS_ESCANEO)
+        filtros = [('fecha_de_notificación', '>=', desde)]
+    return {
+        'lectura': _medir(lambda: pd.read_parquet(ruta), repeticiones),
+        'escaneo': _medir(lambda: pq.read_table(ruta, columns=columnas or None, filters=filtros), repeticiones),
+        'tamaño': os.path.getsize(ruta)
+    }
+
+
+def candidatos_ajuste():
+    """Configuraciones que compara ``autoajustar``: códec y nivel × filas por grupo × diccionario"""
+    return [
+        {**CONFIGURACION_POR_DEFECTO, 'codec': codec, 'nivel': nivel, 'filas_por_grupo': filas,
+         'diccionario': diccionario, 'estadisticas': 'consulta'}
+        for codec, nivel in NIVELES_CANDIDATOS
+        for filas in FILAS_POR_GRUPO_CANDIDATAS
+        for diccionario in DICCIONARIOS_CANDIDATOS
+    ]
+
+
+def autoajustar(df, candidatos=None, tamaño_muestra=TAMAÑO_MUESTRA_AJUSTE, pesos=None, repeticiones=3):
+    """
+    Mide cada candidato sobre una muestra de ``df`` y devuelve ``(mejor, resultados)``.
+    
+    Las filas por grupo se escalan a la muestra para que tenga tantos grupos
+    como tendría el dataset completo; la configuración devuelta conserva las
+    del dataset completo.
+    """
+    candidatos = candidatos or candidatos_ajuste()
+    pesos = {**PESOS_AJUSTE, **(pesos or {})}
+    muestra = df.sample(n=tamaño_muestra, random_state=42).sort_index() if len(df) > tamaño_muestra else df
+    escala = len(muestra) / max(len(df), 1)
+    
+    print(f"🎯 Autoajustando la escritura Parquet: {len(candidatos)} candidatos sobre {len(muestra):,} filas...")
+    resultados = []
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'candidato.parquet')
+        for candidato in candidatos:
+            en_muestra = {**candidato, 'filas_por_grupo': max(1, round(candidato['filas_por_grupo'] * escala))}
+            resultados.append({'configuracion': candidato, **medir_configuracion(muestra, en_muestra, ruta, repeticiones)})
+    
+    mejores = {medida: max(min(r[medida] for r in resultados), 1e-9) for medida in pesos}
+    for resultado in resultados:
+        resultado['puntuacion'] = round(sum(peso * resultado[medida] / mejores[medida] for medida, peso in pesos.items()), 4)
+    resultados.sort(key=lambda r: r['puntuacion'])
+    
+    mejor = resultados[0]
+    print(f"   ✅ {describir(mejor['configuracion'])}: lectura {mejor['lectura'] * 1000:.1f} ms, "
+          f"escaneo {mejor['escaneo'] * 1000:.1f} ms, {mejor['tamaño'] / 1024:,.0f} KB en la muestra")
+    return mejor['configuracion'], resultados
+
+
+def describir(configuracion):
+    """Resumen legible de una configuración"""
+    configuracion = {**CONFIGURACION_POR_DEFECTO, **(configuracion or {})}
+    codec = configuracion['codec'] + (f"-{configuracion['nivel']}" if configuracion['nivel'] is not None else '')
+    return (f"{codec}, {configuracion['filas_por_grupo']:,} filas por grupo, "
+            f"diccionario {configuracion['diccionario']}, estadísticas {configuracion['estadisticas']}")
+
+
+def convertir_csv(ruta_csv, ruta_parquet=None, configuracion=None, autoajuste=False, ruta_ajustes=None):
+    """
+    Convierte el CSV fuente a Parquet y devuelve el DataFrame convertido.
+    
+    Con ``autoajuste`` la configuración se elige con ``autoajustar`` y se guarda
+    en ``ruta_ajustes``; si no se pasa configuración se usa la guardada allí.
+    """
+    ruta_parquet = ruta_parquet or ruta_csv.replace('.csv', '.parquet')
+    inicio = time.time()
+    tamaño_csv = os.path.getsize(ruta_csv) / (1024 * 1024)
+    print(f"📊 Convirtiendo {ruta_csv} ({tamaño_csv:.1f} MB) a formato Parquet...")
+    with medir_etapa('parseo', ruta_csv):
+        df = leer_csv(ruta_csv)
+    with medir_etapa('conversion_tipos'):
+        df = convertir_tipos(df)
+    print(f"✅ CSV leído: {len(df):,} registros, {len(df.columns)} columnas")
+    
+    if autoajuste:
+        configuracion, resultados = autoajustar(df)
+        if ruta_ajustes:
+            guardar_ajustes(ruta_ajustes, configuracion, resultados)
+    elif configuracion is None:
+        configuracion = cargar_ajustes(ruta_ajustes)
+    
+    print(f"💾 Guardando Parquet ({describir(configuracion)})...")
+    temporal = f"{ruta_parquet}.{os.getpid()}"
+    with medir_etapa('escritura_parquet', 'fuente'):
+        escribir_parquet(df, temporal, configuracion)
+    os.replace(temporal, ruta_parquet)
+    
+    tamaño_parquet = os.path.getsize(ruta_parquet) / (1024 * 1024)
+    print(f"   ✅ {ruta_parquet}: {tamaño_parquet:.1f} MB ({tamaño_csv / max(tamaño_parquet, 1e-9):.1f}x menor) "
+          f"en {time.time() - inicio:.1f}s")
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversión del dataset de COVID-19 a Parquet")
+    parser.add_argument('csv', nargs='?', default='Casos_positivos_de_COVID-19_en_Colombia.csv')
+    parser.add_argument('parquet', nargs='?', default=None)
+    parser.add_argument('--codec', choices=CODECS)
+    parser.add_argument('--nivel', type=int, help="nivel de compresión (zstd)")
+    parser.add_argument('--filas-por-grupo', type=int)
+    parser.add_argument('--diccionario', help="'todas', 'ninguna', 'auto' o columnas separadas por comas")
+    parser.add_argument('--estadisticas', help="'todas', 'ninguna', 'consulta' o columnas separadas por comas")
+    parser.add_argument('--autoajustar', action='store_true', help="elige los ajustes midiendo candidatos sobre una muestra")
+    parser.add_argument('--ajustes', help="JSON de ajustes a usar, o donde guardar los del autoajuste")
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.csv):
+        print(f"❌ No se encontró el archivo: {args.csv}")
+        return 1
+    
+    def opcion_columnas(valor):
+        return valor if valor in (None, 'todas', 'ninguna', 'auto', 'consulta') else valor.split(',')
+    configuracion = None
+    manuales = {
+        'codec': args.codec, 'nivel': args.nivel, 'filas_por_grupo': args.filas_por_grupo,
+        'diccionario': opcion_columnas(args.diccionario), 'estadisticas': opcion_columnas(args.estadisticas)
+    }
+    if any(valor is not None for valor in manuales.values()):
+        configuracion = {**(cargar_ajustes(args.ajustes) or CONFIGURACION_POR_DEFECTO),
+                         **{clave: valor for clave, valor in manuales.items() if valor is not None}}
+    
+    convertir_csv(args.csv, args.parquet, configuracion, args.autoajustar, args.ajustes)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
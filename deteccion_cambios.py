@@ -0,0 +1,287 @@
+"""
+Detección en línea de cambios de tendencia y de días anómalos por región.
+
+Cada región se modela por tramos de crecimiento exponencial: sobre el
+logaritmo de la suma de 7 días se ajusta una recta por mínimos cuadrados que
+se actualiza día a día con sumas acumuladas, y un CUSUM de dos lados sobre el
+error de pronóstico a un paso detecta cuándo la tendencia cambió (inicio o fin
+de una ola); ahí empieza un tramo nuevo. Los días anómalos (caídas o picos de
+reporte) se puntúan contra la mediana de la última semana con la MAD de los
+desvíos recientes. Todas las regiones avanzan a la vez: el
+estado es un conjunto de arreglos por región, se guarda en disco y cada
+actualización procesa solo los días nuevos.
+"""
+
+import os
+import json
+import warnings
+import numpy as np
+import pandas as pd
+
+from huella_datos import corresponde
+
+REGION_TOTAL = 'Total nacional'
+
+# CUSUM: deriva, umbral y límite de cada error, en desviaciones estándar del
+# error a un paso
+DERIVA_CUSUM = 1.0
+UMBRAL_CUSUM = 16.0
+LIMITE_ERROR = 3.0
+# Días mínimos de un tramo antes de vigilar su tendencia, y errores mínimos
+# para estimar su ruido
+MIN_DIAS_TRAMO = 14
+MIN_RESIDUOS = 7
+
+# Anomalías: |z robusto| del desvío frente a la mediana de la última semana
+VENTANA_ROBUSTA = 28
+UMBRAL_ANOMALIA = 4.0
+MINIMO_CASOS_ANOMALIA = 20
+ESCALA_MAD = 1.4826
+
+# Los últimos días se vuelven a procesar en cada actualización, porque el
+# reporte tardío aún los modifica
+DIAS_REVISION = 14
+
+TIPOS_EVENTO = {
+    'aumento': 'Cambio de tendencia al alza',
+    'descenso': 'Cambio de tendencia a la baja',
+    'pico': 'Pico anómalo',
+    'caida': 'Caída anómala'
+}
+
+
+def estado_inicial(n_regiones):
+    """Estado del detector antes del primer día, con un arreglo por variable y región"""
+    return {
+        'dia': np.zeros(1, dtype=np.int64),
+        'ultimos_7': np.zeros((n_regiones, 7)),
+        'ultimos_log': np.full((n_regiones, 7), np.nan),
+        'desvios': np.full((n_regiones, VENTANA_ROBUSTA), np.nan),
+        'residuos': np.full((n_regiones, VENTANA_ROBUSTA), np.nan),
+        # Sumas del tramo actual para la recta: n, Σt, Σy, Σty, Σt²
+        'tramo_n': np.zeros(n_regiones),
+        'tramo_t': np.zeros(n_regiones),
+        'tramo_y': np.zeros(n_regiones),
+        'tramo_ty': np.zeros(n_regiones),
+        'tramo_tt': np.zeros(n_regiones),
+        'cusum_alza': np.zeros(n_regiones),
+        'cusum_baja': np.zeros(n_regiones),
+        'inicio_alza': np.full(n_regiones, -1, dtype=np.int64),
+        'inicio_baja': np.full(n_regiones, -1, dtype=np.int64)
+    }
+
+
+def copiar_estado(estado):
+    return {nombre: valores.copy() for nombre, valores in estado.items()}
+
+
+def _recta(estado):
+    """Pendiente e intercepto de la recta del tramo actual (NaN si aún no hay puntos suficientes)"""
+    n = estado['tramo_n']
+    denominador = n * estado['tramo_tt'] - estado['tramo_t'] ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pendiente = np.where(denominador > 0, (n * estado['tramo_ty'] - estado['tramo_t'] * estado['tramo_y']) / denominador, np.nan)
+        intercepto = (estado['tramo_y'] - pendiente * estado['tramo_t']) / n
+    return pendiente, intercepto
+
+
+def actualizar(estado, casos):
+    """
+    Avanza un día para todas las regiones con los casos de ese día y devuelve
+    los eventos detectados como (región, día, tipo, valor); el valor es el z
+    robusto de las anomalías o el CUSUM (con signo) de los cambios
+    """
+    dia = int(estado['dia'][0])
+    casos = np.asarray(casos, dtype=np.float64)
+    eventos = []
+    
+    # Anomalía: desvío del día frente a la mediana de la última semana, en
+    # unidades de la MAD de los desvíos recientes (la semana sigue la tendencia)
+    log_casos = np.log1p(casos)
+    desvios = estado['desvios']
+    with warnings.catch_warnings():
+        # Las regiones sin días previos dan medianas vacías (NaN)
+        warnings.simplefilter('ignore', RuntimeWarning)
+        referencia = np.nanmedian(estado['ultimos_log'], axis=1)
+        centro = np.nanmedian(desvios, axis=1)
+        mad = np.nanmedian(np.abs(desvios - centro[:, np.newaxis]), axis=1)
+    desvio = log_casos - referencia
+    z = (desvio - centro) / (ESCALA_MAD * mad + 0.05)
+    completos = ~np.isnan(desvios).any(axis=1)
+    esperado = referencia + centro
+    relevantes = np.maximum(casos, np.expm1(esperado)) >= MINIMO_CASOS_ANOMALIA
+    anomalos = completos & relevantes & (np.abs(z) > UMBRAL_ANOMALIA)
+    for region in np.flatnonzero(anomalos):
+        eventos.append((int(region), dia, 'pico' if z[region] > 0 else 'caida', float(z[region])))
+    # Los días anómalos se reemplazan por su valor esperado en lo que sigue
+    estado['desvios'] = np.roll(desvios, -1, axis=1)
+    estado['desvios'][:, -1] = np.where(anomalos, centro, desvio)
+    estado['ultimos_log'] = np.roll(estado['ultimos_log'], -1, axis=1)
+    estado['ultimos_log'][:, -1] = np.where(anomalos, esperado, log_casos)
+    
+    # Suma de 7 días en escala logarítmica; los días anómalos no mueven la tendencia
+    estado['ultimos_7'] = np.roll(estado['ultimos_7'], -1, axis=1)
+    estado['ultimos_7'][:, -1] = np.where(anomalos, np.expm1(esperado), casos)
+    y = np.log1p(estado['ultimos_7'].sum(axis=1))
+    
+    # Error a un paso respecto a la recta del tramo, normalizado por la MAD de los errores recientes
+    pendiente, intercepto = _recta(estado)
+    vigilados = (estado['tramo_n'] >= MIN_DIAS_TRAMO) & ~np.isnan(pendiente)
+    error = np.where(vigilados, y - (intercepto + pendiente * dia), 0.0)
+    residuos = estado['residuos']
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        escala = ESCALA_MAD * np.nanmedian(np.abs(residuos), axis=1)
+    # Sin errores suficientes para medir el ruido del tramo no se vigila aún
+    suficientes = (~np.isnan(residuos)).sum(axis=1) >= MIN_RESIDUOS
+    escala = np.where(suficientes, np.maximum(escala, 0.01), np.inf)
+    # Error acotado (CUSUM robusto): un día extremo no basta para declarar un cambio
+    estandarizado = np.clip(np.where(vigilados, error / escala, 0.0), -LIMITE_ERROR, LIMITE_ERROR)
+    
+    estado['cusum_alza'] = np.maximum(0, estado['cusum_alza'] + estandarizado - DERIVA_CUSUM)
+    estado['cusum_baja'] = np.maximum(0, estado['cusum_baja'] - estandarizado - DERIVA_CUSUM)
+    # Día en que empezó cada racha: el cambio se fecha ahí, no en la alarma
+    estado['inicio_alza'] = np.where(estado['cusum_alza'] > 0, np.where(estado['inicio_alza'] >= 0, estado['inicio_alza'], dia), -1)
+    estado['inicio_baja'] = np.where(estado['cusum_baja'] > 0, np.where(estado['inicio_baja'] >= 0, estado['inicio_baja'], dia), -1)
+    
+    alza = estado['cusum_alza'] > UMBRAL_CUSUM
+    baja = estado['cusum_baja'] > UMBRAL_CUSUM
+    cambio = alza | baja
+    for region in np.flatnonzero(cambio):
+        inicio = estado['inicio_alza'][region] if alza[region] else estado['inicio_baja'][region]
+        intensidad = estado['cusum_alza'][region] if alza[region] else -estado['cusum_baja'][region]
+        eventos.append((int(region), int(inicio), 'aumento' if alza[region] else 'descenso', float(intensidad)))
+    
+    estado['residuos'] = np.roll(residuos, -1, axis=1)
+    estado['residuos'][:, -1] = np.where(vigilados & ~cambio, error, np.nan)
+    
+    # Un cambio abre un tramo nuevo; si no, el día se suma al tramo actual
+    # (desde que la suma de 7 días está completa)
+    for nombre in ('tramo_n', 'tramo_t', 'tramo_y', 'tramo_ty', 'tramo_tt', 'cusum_alza', 'cusum_baja'):
+        estado[nombre][cambio] = 0.0
+    estado['inicio_alza'][cambio] = -1
+    estado['inicio_baja'][cambio] = -1
+    estado['residuos'][cambio] = np.nan
+    if dia >= 6:
+        estado['tramo_n'] += 1
+        estado['tramo_t'] += dia
+        estado['tramo_y'] += y
+        estado['tramo_ty'] += dia * y
+        estado['tramo_tt'] += dia * dia
+    estado['dia'][0] = dia + 1
+    return eventos
+
+
+class DetectorCambios:
+    def __init__(self, directorio='datos_procesados/cambios', nombre='departamentos', dias_revision=DIAS_REVISION):
+        self.directorio = directorio
+        self.nombre = nombre
+        self.dias_revision = dias_revision
+        self.ruta_estado = os.path.join(directorio, f'{nombre}_estado.npz')
+        self.ruta_eventos = os.path.join(directorio, f'{nombre}_eventos.parquet')
+        self.ruta_metadatos = os.path.join(directorio, f'{nombre}.json')
+        self._eventos = None
+        self._metadatos = None
+    
+    def _estado_guardado(self, regiones, fecha_inicio):
+        """Estado y eventos del último punto de control si siguen valiendo para el tensor"""
+        metadatos = self.metadatos()
+        if (metadatos is None or not os.path.exists(self.ruta_estado) or metadatos['regiones'] != regiones
+                or metadatos['fecha_inicio'] != fecha_inicio):
+            return None, None
+        with np.load(self.ruta_estado) as archivo:
+            estado = {nombre: archivo[nombre] for nombre in archivo.files}
+        eventos = self._tabla()
+        if 'dia_deteccion' not in eventos.columns:
+            return None, None
+        # Los cambios se fechan al inicio de la racha pero se detectan días después:
+        # se conservan los detectados antes del punto de control, que no se repiten
+        return estado, eventos[eventos['dia_deteccion'] < int(estado['dia'][0])]
+    
+    def construir(self, tensor):
+        """
+        Procesa los días del tensor que no se han visto (más los de revisión)
+        para todas las regiones y el total nacional, y guarda eventos y estado
+        """
+        metadatos_tensor = tensor.metadatos()
+        if metadatos_tensor is None:
+            return False
+        
+        casos = np.asarray(tensor.tensor().sum(axis=2), dtype=np.float64)
+        casos = np.concatenate([casos.sum(axis=0, keepdims=True), casos])
+        regiones = [REGION_TOTAL] + list(metadatos_tensor['regiones'])
+        n_dias = casos.shape[1]
+        
+        estado, previos = self._estado_guardado(regiones, metadatos_tensor['fecha_inicio'])
+        if estado is None or int(estado['dia'][0]) > n_dias:
+            estado, previos = estado_inicial(len(regiones)), None
+        desde = int(estado['dia'][0])
+        print(f"📍 Detectando cambios de tendencia por {self.nombre} (días {desde:,}–{n_dias - 1:,})...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        # El punto de control queda antes de los días de revisión
+        control = max(n_dias - self.dias_revision, desde)
+        eventos = []
+        estado_control = copiar_estado(estado)
+        for dia in range(desde, n_dias):
+            if dia == control:
+                estado_control = copiar_estado(estado)
+            eventos.extend((*evento, dia) for evento in actualizar(estado, casos[:, dia]))
+        if control == n_dias:
+            estado_control = copiar_estado(estado)
+        
+        nuevos = pd.DataFrame(eventos, columns=['region', 'dia', 'tipo', 'valor', 'dia_deteccion'])
+        for columna in ('region', 'dia', 'dia_deteccion'):
+            nuevos[columna] = nuevos[columna].astype(np.int64)
+        nuevos['tipo'] = nuevos['tipo'].astype(str)
+        tabla = nuevos if previos is None else pd.concat([previos, nuevos], ignore_index=True)
+        tabla.to_parquet(self.ruta_eventos, index=False)
+        np.savez(self.ruta_estado, **estado_control)
+        
+        metadatos = {
+            'huella': metadatos_tensor.get('huella'),
+            'total_registros': metadatos_tensor['total_registros'],
+            'regiones': regiones,
+            'fecha_inicio': metadatos_tensor['fecha_inicio'],
+            'n_dias': n_dias,
+            'dia_control': int(estado_control['dia'][0])
+        }
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2, ensure_ascii=False)
+        
+        conteo = tabla['tipo'].value_counts()
+        print(f"   ✅ {n_dias - desde:,} días procesados: {conteo.get('aumento', 0) + conteo.get('descenso', 0):,} "
+              f"cambios de tendencia y {conteo.get('pico', 0) + conteo.get('caida', 0):,} días anómalos")
+        self._eventos = tabla
+        self._metadatos = metadatos
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self, huella):
+        """Indica si los eventos guardados corresponden a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return corresponde(metadatos, huella) and os.path.exists(self.ruta_eventos)
+    
+    def _tabla(self):
+        if self._eventos is None:
+            self._eventos = pd.read_parquet(self.ruta_eventos)
+        return self._eventos
+    
+    def eventos(self, regiones=None, tipos=None):
+        """Eventos detectados con su fecha y región, opcionalmente solo de algunas regiones o tipos"""
+        metadatos = self.metadatos()
+        tabla = self._tabla()
+        if tipos is not None:
+            tabla = tabla[tabla['tipo'].isin(tipos)]
+        tabla = tabla.assign(
+            Fecha=pd.Timestamp(metadatos['fecha_inicio']) + pd.to_timedelta(tabla['dia'], unit='D'),
+            Región=np.asarray(metadatos['regiones'], dtype=object)[tabla['region'].to_numpy()]
+        )
+        if regiones is not None:
+            tabla = tabla[tabla['Región'].isin(regiones)]
+        return tabla.sort_values(['Fecha', 'region', 'dia_deteccion', 'tipo']).reset_index(drop=True)
@@ -0,0 +1,92 @@
+"""
+Ejecución progresiva de vistas: se dibuja primero un resultado rápido (muestra
+o pre-agregado) y el cálculo exacto sobre los datos completos corre en un hilo
+de fondo; cuando termina, la vista lo reemplaza en el mismo lugar.
+
+Con ``ttl_resultados`` un resultado terminado que nadie recoge (la sesión que
+lo pidió se cerró) se descarta pasado ese tiempo en lugar de quedarse en
+memoria hasta que lo desplacen otros.
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class EjecutorProgresivo:
+    def __init__(self, max_hilos=2, max_resultados=64, ttl_resultados=None, prefijo='progresivo'):
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix=prefijo)
+        self._tareas = OrderedDict()
+        self._avances = {}
+        self._max_resultados = max_resultados
+        self._ttl_resultados = ttl_resultados
+        self._lock = threading.Lock()
+    
+    def enviar(self, clave, funcion, *args, **kwargs):
+        """Lanza el cálculo en segundo plano si no existe ya una tarea con esa clave"""
+        with self._lock:
+            futuro = self._tareas.get(clave)
+            if futuro is None:
+                futuro = self._pool.submit(funcion, *args, **kwargs)
+                self._tareas[clave] = futuro
+                nueva = True
+                # Se descartan los resultados más antiguos para acotar la memoria
+                while len(self._tareas) > self._max_resultados:
+                    antigua, _ = self._tareas.popitem(last=False)
+                    self._avances.pop(antigua, None)
+            else:
+                self._tareas.move_to_end(clave)
+                nueva = False
+        # Fuera del lock: si la tarea ya terminó, el callback corre en este hilo
+        if nueva and self._ttl_resultados is not None:
+            futuro.add_done_callback(functools.partial(self._programar_caducidad, clave))
+        return futuro
+    
+    def _programar_caducidad(self, clave, futuro):
+        temporizador = threading.Timer(self._ttl_resultados, self._caducar, (clave, futuro))
+        temporizador.daemon = True
+        temporizador.start()
+    
+    def _caducar(self, clave, futuro):
+        """Descarta el resultado si sigue sin recoger (y no lo reemplazó otra tarea con la misma clave)"""
+        with self._lock:
+            if self._tareas.get(clave) is futuro:
+                del self._tareas[clave]
+                self._avances.pop(clave, None)
+    
+    def listo(self, clave):
+        with self._lock:
+            futuro = self._tareas.get(clave)
+        return futuro is not None and futuro.done()
+    
+    def resultado(self, clave):
+        """Resultado exacto si ya terminó; None si sigue en curso, falló o no existe"""
+        with self._lock:
+            futuro = self._tareas.get(clave)
+        if futuro is None or not futuro.done() or futuro.exception() is not None:
+            return None
+        return futuro.result()
+    
+    def error(self, clave):
+        with self._lock:
+            futuro = self._tareas.get(clave)
+        if futuro is None or not futuro.done():
+            return None
+        return futuro.exception()
+    
+    def informar(self, clave, fraccion, mensaje):
+        """Lo llama la tarea en curso para publicar su avance"""
+        with self._lock:
+            self._avances[clave] = (fraccion, mensaje)
+    
+    def avance(self, clave):
+        """Último ``(fraccion, mensaje)`` informado por la tarea, o None"""
+        with self._lock:
+            return self._avances.get(clave)
+    
+    def descartar(self, clave):
+        """Olvida una tarea terminada cuyo resultado ya se usó"""
+        with self._lock:
+            self._tareas.pop(clave, None)
+            self._avances.pop(clave, None)
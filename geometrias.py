@@ -0,0 +1,306 @@
+"""
+Geometrías de departamentos y municipios para los mapas coropléticos.
+
+Los límites se leen de un GeoJSON local (por ejemplo el Marco Geoestadístico
+Nacional del DANE) y se simplifican una sola vez con Douglas-Peucker en varios
+niveles de detalle. Cada nivel se guarda cuantizado a enteros y con
+codificación delta en un .npz, de modo que al dibujar solo se decodifica el
+nivel adecuado para el zoom y las regiones visibles. Las regiones se
+identifican por su código DIVIPOLA entero, el mismo de las columnas
+'departamento' y 'ciudad_municipio' del dataset.
+
+Los límites de ambos niveles se versionan con el código en ``datos_geograficos/``
+y nunca se descargan al arrancar ni en el pipeline.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+DIRECTORIO_LIMITES = 'datos_geograficos'
+
+# Nivel: (archivo GeoJSON, propiedades candidatas con el código DIVIPOLA y con el nombre)
+ARCHIVOS_LIMITES = {
+    'departamentos': ('departamentos.geojson', ('DPTO_CCDGO', 'DPTO', 'codigo'), ('DPTO_CNMBR', 'NOMBRE_DPT', 'nombre')),
+    'municipios': ('municipios.geojson', ('MPIO_CDPMP', 'MPIO_CCNCT', 'codigo'), ('MPIO_CNMBR', 'NOMBRE_MPI', 'nombre'))
+}
+
+# Detalle: (tolerancia de simplificación en grados, decimales de la cuantización)
+DETALLES = {
+    'baja': (0.03, 2),
+    'media': (0.008, 3),
+    'alta': (0.002, 4)
+}
+# Zoom máximo (escala de los mapas web) con el que se usa cada detalle
+ZOOM_DETALLE = (('baja', 5.5), ('media', 7.5), ('alta', np.inf))
+
+CENTRO_COLOMBIA = {'lat': 4.6, 'lon': -74.1}
+ZOOM_COLOMBIA = 4.4
+
+
+def codigo_departamento(codigos):
+    """
+    Código DIVIPOLA del departamento; los distritos que el dataset reporta como
+    departamento (Barranquilla 8001, Cartagena 13001, Santa Marta 47001...) se
+    asignan al suyo
+    """
+    codigos = np.asarray(codigos, dtype=np.int64)
+    return np.where(codigos >= 1000, codigos // 1000, codigos)
+
+
+def casos_por_codigo(codigos, nivel='departamentos'):
+    """Casos por código DIVIPOLA entero (los nulos y no numéricos se descartan)"""
+    valores = pd.to_numeric(pd.Series(np.asarray(codigos)), errors='coerce').dropna().to_numpy(dtype=np.int64)
+    if nivel == 'departamentos':
+        valores = codigo_departamento(valores)
+    valores = valores[valores >= 0]
+    conteos = np.bincount(valores)
+    presentes = np.flatnonzero(conteos)
+    return pd.Series(conteos[presentes], index=pd.Index(presentes, name='codigo'), name='casos')
+
+
+def douglas_peucker(puntos, tolerancia):
+    """Máscara de los puntos que conserva Douglas-Peucker con la tolerancia dada"""
+    n = len(puntos)
+    conservar = np.zeros(n, dtype=bool)
+    conservar[[0, n - 1]] = True
+    pila = [(0, n - 1)]
+    while pila:
+        inicio, fin = pila.pop()
+        if fin <= inicio + 1:
+            continue
+        a, b = puntos[inicio], puntos[fin]
+        tramo = puntos[inicio + 1:fin]
+        direccion = b - a
+        longitud = np.hypot(*direccion)
+        if longitud == 0:
+            # Anillo cerrado: el primer corte es el punto más lejano al inicio
+            distancias = np.hypot(*(tramo - a).T)
+        else:
+            distancias = np.abs(direccion[0] * (tramo[:, 1] - a[1]) - direccion[1] * (tramo[:, 0] - a[0])) / longitud
+        k = int(np.argmax(distancias))
+        if distancias[k] > tolerancia:
+            medio = inicio + 1 + k
+            conservar[medio] = True
+            pila.extend([(inicio, medio), (medio, fin)])
+    return conservar
+
+
+def simplificar_anillo(anillo, tolerancia, exterior=False):
+    """
+    Anillo simplificado (cerrado); None si colapsa. Los anillos exteriores
+    reducen la tolerancia hasta conservar al menos un triángulo.
+    """
+    anillo = np.asarray(anillo, dtype=np.float64)
+    if len(anillo) < 4:
+        return None
+    while True:
+        simplificado = anillo[douglas_peucker(anillo, tolerancia)]
+        if len(simplificado) >= 4 or not exterior or tolerancia < 1e-7:
+            return simplificado if len(simplificado) >= 4 else None
+        tolerancia /= 4
+
+
+def simplificar_poligonos(poligonos, tolerancia):
+    """Polígonos (listas de anillos) simplificados, sin los que colapsan ni sus huecos colapsados"""
+    resultado = []
+    for poligono in poligonos:
+        exterior = simplificar_anillo(poligono[0], tolerancia, exterior=True)
+        if exterior is None:
+            continue
+        internos = (simplificar_anillo(anillo, tolerancia) for anillo in poligono[1:])
+        resultado.append([exterior, *[anillo for anillo in internos if anillo is not None]])
+    return resultado
+
+
+def leer_limites(ruta, campos_codigo, campos_nombre):
+    """Códigos, nombres y polígonos (listas de anillos) de cada entidad del GeoJSON"""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    
+    entidades = []
+    for entidad in datos['features']:
+        propiedades = entidad.get('properties') or {}
+        geometria = entidad.get('geometry') or {}
+        campo_codigo = next((c for c in campos_codigo if c in propiedades), None)
+        if campo_codigo is None or geometria.get('type') not in ('Polygon', 'MultiPolygon'):
+            continue
+        nombre = next((propiedades[c] for c in campos_nombre if c in propiedades), str(propiedades[campo_codigo]))
+        poligonos = [geometria['coordinates']] if geometria['type'] == 'Polygon' else geometria['coordinates']
+        entidades.append((int(propiedades[campo_codigo]), str(nombre), poligonos))
+    return entidades
+
+
+class GeometriasDivipola:
+    def __init__(self, directorio='datos_procesados/geometrias', nivel='departamentos', ruta_limites=None):
+        archivo, self.campos_codigo, self.campos_nombre = ARCHIVOS_LIMITES[nivel]
+        self.directorio = directorio
+        self.nivel = nivel
+        self.ruta_limites = ruta_limites or os.path.join(DIRECTORIO_LIMITES, archivo)
+        self.ruta_geometrias = os.path.join(directorio, f'{nivel}.npz')
+        self.ruta_metadatos = os.path.join(directorio, f'{nivel}.json')
+        self._arreglos = None
+        self._metadatos = None
+        self._geojson = {}
+    
+    def firma_limites(self):
+        """Tamaño y fecha de modificación del archivo de límites (su versión)"""
+        if not os.path.exists(self.ruta_limites):
+            return None
+        estado = os.stat(self.ruta_limites)
+        return [estado.st_size, int(estado.st_mtime)]
+    
+    def construir(self):
+        """Simplifica los límites en cada nivel de detalle y guarda su codificación compacta"""
+        firma = self.firma_limites()
+        if firma is None:
+            return False
+        
+        print(f"🗺️ Simplificando geometrías de {self.nivel}...")
+        os.makedirs(self.directorio, exist_ok=True)
+        entidades = leer_limites(self.ruta_limites, self.campos_codigo, self.campos_nombre)
+        if not entidades:
+            return False
+        codigos = np.array([codigo for codigo, _, _ in entidades], dtype=np.int64)
+        todos = np.concatenate([np.asarray(anillo, dtype=np.float64)[:, :2]
+                                for _, _, poligonos in entidades for poligono in poligonos for anillo in poligono])
+        # Origen en grados enteros: cae en la rejilla de cuantización de todos los detalles
+        origen = np.floor(todos.min(axis=0))
+        
+        arreglos = {'codigos': codigos, 'origen': origen}
+        cajas = []
+        for _, _, poligonos in entidades:
+            puntos = np.concatenate([np.asarray(poligono[0], dtype=np.float64)[:, :2] for poligono in poligonos])
+            cajas.append(np.concatenate([puntos.min(axis=0), puntos.max(axis=0)]))
+        arreglos['cajas'] = np.array(cajas)
+        
+        # Se simplifica de la más fina a la más gruesa partiendo del resultado
+        # anterior, que ya tiene muchos menos puntos que el original
+        simplificados = {}
+        actuales = [[[np.asarray(anillo, dtype=np.float64)[:, :2] for anillo in poligono] for poligono in poligonos]
+                    for _, _, poligonos in entidades]
+        for detalle in reversed(list(DETALLES)):
+            actuales = [simplificar_poligonos(poligonos, DETALLES[detalle][0]) for poligonos in actuales]
+            simplificados[detalle] = actuales
+        
+        resumen = {}
+        for detalle, (_, decimales) in DETALLES.items():
+            coordenadas, anillos, poligonos_inicio, entidades_inicio = [], [0], [0], [0]
+            for poligonos in simplificados[detalle]:
+                for poligono in poligonos:
+                    for anillo in poligono:
+                        # Cuantización a enteros, sin puntos repetidos consecutivos
+                        enteros = np.round((anillo - origen) * 10 ** decimales).astype(np.int64)
+                        distintos = np.concatenate([[True], (np.diff(enteros, axis=0) != 0).any(axis=1)])
+                        coordenadas.append(enteros[distintos])
+                        anillos.append(anillos[-1] + int(distintos.sum()))
+                    poligonos_inicio.append(len(anillos) - 1)
+                entidades_inicio.append(len(poligonos_inicio) - 1)
+            
+            # Delta sobre todo el arreglo: decodificar es una sola suma acumulada
+            enteros = np.concatenate(coordenadas)
+            deltas = np.diff(enteros, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+            tipo = np.int16 if np.abs(deltas).max() < np.iinfo(np.int16).max else np.int32
+            arreglos[f'{detalle}__deltas'] = deltas.astype(tipo)
+            arreglos[f'{detalle}__anillos'] = np.array(anillos, dtype=np.int32)
+            arreglos[f'{detalle}__poligonos'] = np.array(poligonos_inicio, dtype=np.int32)
+            arreglos[f'{detalle}__entidades'] = np.array(entidades_inicio, dtype=np.int32)
+            resumen[detalle] = {'puntos': int(len(enteros)), 'bytes': int(arreglos[f'{detalle}__deltas'].nbytes)}
+        
+        np.savez_compressed(self.ruta_geometrias, **arreglos)
+        metadatos = {
+            'firma_limites': firma,
+            'nombres': [nombre for _, nombre, _ in entidades],
+            'puntos_originales': int(len(todos)),
+            'detalles': resumen
+        }
+        self._arreglos = arreglos
+        self._metadatos = metadatos
+        self._geojson = {}
+        # Tamaño del GeoJSON que se envía al navegador con todas las entidades
+        for detalle in DETALLES:
+            resumen[detalle]['kb_geojson'] = round(len(json.dumps(self.geojson(detalle))) / 1024, 1)
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2, ensure_ascii=False)
+        
+        for detalle, valores in resumen.items():
+            print(f"   ✅ Detalle {detalle}: {valores['puntos']:,} de {len(todos):,} puntos "
+                  f"({valores['kb_geojson']:,.0f} KB en GeoJSON)")
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self):
+        """Indica si las geometrías guardadas corresponden al archivo de límites actual"""
+        metadatos = self.metadatos()
+        return (metadatos is not None and os.path.exists(self.ruta_geometrias)
+                and metadatos.get('firma_limites') == self.firma_limites())
+    
+    def arreglos(self):
+        if self._arreglos is None:
+            with np.load(self.ruta_geometrias) as archivo:
+                self._arreglos = {nombre: archivo[nombre] for nombre in archivo.files}
+        return self._arreglos
+    
+    def codigos(self):
+        return self.arreglos()['codigos']
+    
+    def nombres(self):
+        """Nombre de cada entidad por código DIVIPOLA"""
+        return pd.Series(self.metadatos()['nombres'], index=pd.Index(self.codigos(), name='codigo'), name='nombre')
+    
+    @staticmethod
+    def detalle_para_zoom(zoom):
+        """Nivel de detalle más simple que se ve bien con ese zoom"""
+        return next(detalle for detalle, maximo in ZOOM_DETALLE if zoom <= maximo)
+    
+    def vista(self, codigos=None):
+        """Centro y zoom que encuadran las entidades dadas (todas si no se indican)"""
+        cajas = self.arreglos()['cajas']
+        if codigos is not None:
+            cajas = cajas[np.isin(self.codigos(), list(codigos))]
+        if len(cajas) == 0:
+            return CENTRO_COLOMBIA, ZOOM_COLOMBIA
+        minimo, maximo = cajas[:, :2].min(axis=0), cajas[:, 2:].max(axis=0)
+        extension = max(maximo[0] - minimo[0], (maximo[1] - minimo[1]) * 1.5, 0.05)
+        zoom = float(np.clip(np.log2(360 / extension) + 0.2, 3, 11))
+        return {'lon': float((minimo[0] + maximo[0]) / 2), 'lat': float((minimo[1] + maximo[1]) / 2)}, zoom
+    
+    def geojson(self, detalle='baja', codigos=None):
+        """FeatureCollection del nivel de detalle con el código DIVIPOLA como ``id``"""
+        clave = (detalle, None if codigos is None else tuple(sorted(int(c) for c in codigos)))
+        if clave in self._geojson:
+            return self._geojson[clave]
+        
+        arreglos = self.arreglos()
+        decimales = DETALLES[detalle][1]
+        puntos = np.cumsum(arreglos[f'{detalle}__deltas'].astype(np.int64), axis=0) / 10 ** decimales + arreglos['origen']
+        puntos = np.round(puntos, decimales).tolist()
+        anillos = arreglos[f'{detalle}__anillos']
+        poligonos = arreglos[f'{detalle}__poligonos']
+        entidades = arreglos[f'{detalle}__entidades']
+        nombres = self.metadatos()['nombres']
+        seleccion = set(clave[1]) if clave[1] is not None else None
+        
+        features = []
+        for i, codigo in enumerate(self.codigos().tolist()):
+            if seleccion is not None and codigo not in seleccion:
+                continue
+            coordenadas = [
+                [puntos[anillos[r]:anillos[r + 1]] for r in range(poligonos[p], poligonos[p + 1])]
+                for p in range(entidades[i], entidades[i + 1])
+            ]
+            if coordenadas:
+                features.append({
+                    'type': 'Feature',
+                    'id': codigo,
+                    'properties': {'nombre': nombres[i]},
+                    'geometry': {'type': 'MultiPolygon', 'coordinates': coordenadas}
+                })
+        self._geojson[clave] = {'type': 'FeatureCollection', 'features': features}
+        return self._geojson[clave]
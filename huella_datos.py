@@ -0,0 +1,23 @@
+"""
+Huella de la versión del dataset.
+
+La huella sale de las estadísticas publicadas (número de registros y fecha de
+generación), así que cambia con cada construcción de la caché aunque el
+número de filas sea el mismo. Los artefactos precalculados la guardan en sus
+metadatos y solo se consideran al día si coincide con la vigente.
+"""
+
+import hashlib
+
+
+def huella_dataset(analisis):
+    """Huella de la versión del dataset a partir de sus estadísticas"""
+    if not analisis:
+        return None
+    base = f"{analisis.get('total_registros')}|{analisis.get('ultima_actualizacion')}"
+    return hashlib.sha1(base.encode('utf-8')).hexdigest()[:16]
+
+
+def corresponde(metadatos, huella):
+    """Indica si unos metadatos guardados se construyeron con la versión del dataset de esa huella"""
+    return metadatos is not None and huella is not None and metadatos.get('huella') == huella
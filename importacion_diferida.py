@@ -0,0 +1,44 @@
+"""
+Importación diferida de módulos pesados para que la aplicación arranque rápido.
+
+``importar_diferido('pandas')`` devuelve un sustituto del módulo que lo importa
+de verdad la primera vez que se usa uno de sus atributos (``pd.DataFrame``).
+El sustituto no se registra en ``sys.modules``: los demás módulos que hacen
+``import pandas`` lo siguen importando de forma normal, así que solo se
+difiere lo que la aplicación todavía no necesita para dibujar la página.
+"""
+
+import threading
+import importlib
+
+
+class ModuloDiferido:
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+        self._lock = threading.Lock()
+    
+    def _cargar(self):
+        if self._modulo is None:
+            with self._lock:
+                if self._modulo is None:
+                    self._modulo = importlib.import_module(self._nombre)
+        return self._modulo
+    
+    def cargado(self):
+        return self._modulo is not None
+    
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+    
+    def __dir__(self):
+        return dir(self._cargar())
+    
+    def __repr__(self):
+        estado = 'cargado' if self.cargado() else 'sin cargar'
+        return f"<módulo diferido '{self._nombre}' ({estado})>"
+
+
+def importar_diferido(nombre):
+    """Sustituto de ``importlib.import_module(nombre)`` que importa en el primer uso"""
+    return ModuloDiferido(nombre)
@@ -0,0 +1,206 @@
+"""
+Indicadores epidemiológicos calculados en lote para todas las regiones.
+
+A partir de la matriz región × día de casos (y de fallecidos) del tensor de
+casos se calculan, sin recorrer región por región: incidencia diaria (media
+de 7 días), crecimiento a 7 y 14 días, tiempo de duplicación, letalidad y un
+Rt tipo Cori con el intervalo serial aplicado por convolución sobre los días.
+El resultado se guarda por versión del dataset.
+"""
+
+import os
+import json
+import math
+import numpy as np
+import pandas as pd
+
+from huella_datos import corresponde
+
+# Intervalo serial de SARS-CoV-2 (gamma, en días)
+MEDIA_INTERVALO_SERIAL = 4.7
+DESVIACION_INTERVALO_SERIAL = 2.9
+MAX_DIAS_INTERVALO_SERIAL = 20
+
+# Ventana y prior Gamma(forma, escala) del Rt
+VENTANA_RT = 7
+PRIOR_FORMA_RT = 1.0
+PRIOR_ESCALA_RT = 5.0
+
+ESTADO_FALLECIDO = 'Fallecido'
+INDICADORES = {
+    'incidencia': 'Incidencia diaria (media 7 días)',
+    'crecimiento_7d': 'Crecimiento 7 días (%)',
+    'crecimiento_14d': 'Crecimiento 14 días (%)',
+    'tiempo_duplicacion': 'Tiempo de duplicación (días)',
+    'letalidad': 'Letalidad (%)',
+    'rt': 'Rt'
+}
+
+
+def suma_movil(matriz, ventana):
+    """Suma de los últimos ``ventana`` días para cada región y día (eje 1)"""
+    acumulado = np.zeros((matriz.shape[0], matriz.shape[1] + 1), dtype=np.float64)
+    np.cumsum(matriz, axis=1, out=acumulado[:, 1:])
+    inicio = np.maximum(np.arange(1, matriz.shape[1] + 1) - ventana, 0)
+    return acumulado[:, 1:] - acumulado[:, inicio]
+
+
+def desplazar(matriz, dias):
+    """Desplaza la matriz ``dias`` días hacia adelante rellenando con ceros"""
+    resultado = np.zeros_like(matriz)
+    resultado[:, dias:] = matriz[:, :matriz.shape[1] - dias]
+    return resultado
+
+
+def pesos_intervalo_serial(media=MEDIA_INTERVALO_SERIAL, desviacion=DESVIACION_INTERVALO_SERIAL,
+                           max_dias=MAX_DIAS_INTERVALO_SERIAL):
+    """Distribución gamma del intervalo serial discretizada en los días 1..max_dias"""
+    forma = (media / desviacion) ** 2
+    escala = desviacion ** 2 / media
+    dias = np.arange(1, max_dias + 1, dtype=np.float64)
+    log_densidad = (forma - 1) * np.log(dias) - dias / escala - math.lgamma(forma) - forma * math.log(escala)
+    pesos = np.exp(log_densidad)
+    return pesos / pesos.sum()
+
+
+def infectividad(casos, pesos):
+    """Convolución de los casos con el intervalo serial: Λ_t = Σ_k w_k · I_{t-k}"""
+    total = np.zeros(casos.shape, dtype=np.float64)
+    for k, peso in enumerate(pesos, start=1):
+        total += peso * desplazar(casos, k)
+    return total
+
+
+def crecimiento(sumas, ventana):
+    """Variación (%) de la suma móvil frente a la de ``ventana`` días antes"""
+    anterior = desplazar(sumas, ventana)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(anterior > 0, (sumas / anterior - 1) * 100, np.nan)
+
+
+def calcular_indicadores(casos, fallecidos=None):
+    """
+    Series región × día de cada indicador a partir de las matrices de casos y
+    fallecidos diarios (regiones en el eje 0, días en el eje 1)
+    """
+    casos = np.asarray(casos, dtype=np.float64)
+    fallecidos = np.zeros_like(casos) if fallecidos is None else np.asarray(fallecidos, dtype=np.float64)
+    
+    semana = suma_movil(casos, 7)
+    quincena = suma_movil(casos, 14)
+    crecimiento_7d = crecimiento(semana, 7)
+    
+    # Duplicación con el crecimiento semanal: 7 · ln 2 / ln(S_t / S_{t-7}), solo si crece
+    razon = 1 + crecimiento_7d / 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tiempo_duplicacion = np.where(razon > 1, 7 * np.log(2) / np.log(razon), np.nan)
+    
+    casos_acumulados = np.cumsum(casos, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        letalidad = np.where(casos_acumulados > 0, np.cumsum(fallecidos, axis=1) / casos_acumulados * 100, np.nan)
+    
+    # Rt (Cori): media posterior con prior gamma sobre la ventana de VENTANA_RT días
+    lambda_ventana = suma_movil(infectividad(casos, pesos_intervalo_serial()), VENTANA_RT)
+    casos_ventana = suma_movil(casos, VENTANA_RT)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rt = np.where(
+            lambda_ventana > 0,
+            (PRIOR_FORMA_RT + casos_ventana) / (1 / PRIOR_ESCALA_RT + lambda_ventana),
+            np.nan
+        )
+    
+    return {
+        'incidencia': semana / 7,
+        'crecimiento_7d': crecimiento_7d,
+        'crecimiento_14d': crecimiento(quincena, 14),
+        'tiempo_duplicacion': tiempo_duplicacion,
+        'letalidad': letalidad,
+        'rt': rt,
+        'casos_7d': semana
+    }
+
+
+class IndicadoresEpidemiologicos:
+    def __init__(self, directorio='datos_procesados/indicadores', nombre='departamentos'):
+        self.directorio = directorio
+        self.nombre = nombre
+        self.ruta_series = os.path.join(directorio, f'{nombre}.npz')
+        self.ruta_metadatos = os.path.join(directorio, f'{nombre}.json')
+        self._series = None
+        self._metadatos = None
+    
+    def construir(self, tensor):
+        """Calcula los indicadores de todas las regiones de un TensorCasos y los guarda"""
+        metadatos_tensor = tensor.metadatos()
+        if metadatos_tensor is None:
+            return False
+        
+        print(f"📐 Calculando indicadores epidemiológicos por {self.nombre}...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        datos = tensor.tensor()
+        casos = datos.sum(axis=2)
+        estados = tensor.estados()
+        fallecidos = datos[:, :, estados.index(ESTADO_FALLECIDO)] if ESTADO_FALLECIDO in estados else None
+        
+        series = {nombre: valores.astype(np.float32) for nombre, valores in calcular_indicadores(casos, fallecidos).items()}
+        np.savez(self.ruta_series, **series)
+        
+        metadatos = {
+            'huella': metadatos_tensor.get('huella'),
+            'total_registros': metadatos_tensor['total_registros'],
+            'regiones': metadatos_tensor['regiones'],
+            'fecha_inicio': metadatos_tensor['fecha_inicio'],
+            'n_dias': metadatos_tensor['n_dias']
+        }
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2, ensure_ascii=False)
+        
+        print(f"   ✅ {len(metadatos['regiones']):,} regiones × {metadatos['n_dias']:,} días")
+        self._series = series
+        self._metadatos = metadatos
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self, huella):
+        """Indica si los indicadores guardados corresponden a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return corresponde(metadatos, huella) and os.path.exists(self.ruta_series)
+    
+    def series(self):
+        if self._series is None:
+            with np.load(self.ruta_series) as archivo:
+                self._series = {nombre: archivo[nombre] for nombre in archivo.files}
+        return self._series
+    
+    def fechas(self):
+        metadatos = self.metadatos()
+        return pd.date_range(metadatos['fecha_inicio'], periods=metadatos['n_dias'], freq='D')
+    
+    def serie(self, indicador, regiones):
+        """Serie diaria de un indicador (filas = fechas, columnas = regiones)"""
+        posicion = {r: i for i, r in enumerate(self.metadatos()['regiones'])}
+        presentes = [r for r in regiones if r in posicion]
+        valores = self.series()[indicador][[posicion[r] for r in presentes]]
+        return pd.DataFrame(valores.T, index=pd.Index(self.fechas(), name='Fecha'), columns=presentes)
+    
+    def resumen(self, fecha=None):
+        """Valor de cada indicador por región en una fecha (por defecto, el último día)"""
+        fechas = self.fechas()
+        dia = len(fechas) - 1 if fecha is None else int(np.clip(fechas.searchsorted(pd.Timestamp(fecha)), 0, len(fechas) - 1))
+        series = self.series()
+        return pd.DataFrame(
+            {nombre: valores[:, dia] for nombre, valores in series.items()},
+            index=pd.Index(self.metadatos()['regiones'], name='Región')
+        )
+    
+    def ranking(self, indicador, top_n=10, minimo_casos_7d=0, ascendente=False, fecha=None):
+        """Regiones ordenadas por un indicador, descartando las de pocos casos recientes"""
+        resumen = self.resumen(fecha)
+        resumen = resumen[(resumen['casos_7d'] >= minimo_casos_7d) & resumen[indicador].notna()]
+        return resumen.sort_values(indicador, ascending=ascendente).head(top_n)
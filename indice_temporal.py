@@ -0,0 +1,178 @@
+"""
+Índice temporal de sumas acumuladas por categoría.
+
+Para cada categoría se guarda el número de casos acumulado hasta cada día, con
+un cero inicial: el total de cualquier rango [A, B] es ``acumulado[B + 1] -
+acumulado[A]``, dos consultas y una resta en lugar de recorrer las filas. El
+cruce departamento × estado × sexo se guarda completo para responder los
+filtros combinados de la barra lateral; el grupo de edad va por separado.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from kernels_conteo import codificar, codigos_edad, codigos_periodo
+from muestreo import COLUMNA_DEPARTAMENTO, COLUMNA_FECHA, SIN_DATO
+from huella_datos import corresponde
+
+DIMENSIONES = ('departamento', 'estado', 'sexo', 'grupo_edad')
+# Se incrementa al cambiar los arreglos guardados, para reconstruir los índices anteriores
+VERSION_INDICE = 2
+
+
+class IndiceTemporal:
+    def __init__(self, directorio='datos_procesados/indice_temporal'):
+        self.directorio = directorio
+        self.ruta_arreglos = os.path.join(directorio, 'acumulados.npz')
+        self.ruta_metadatos = os.path.join(directorio, 'metadatos.json')
+        self._arreglos = None
+        self._metadatos = None
+    
+    @staticmethod
+    def _acumular(codigos_categoria, n_categorias, codigos_dia, n_dias):
+        """Conteo categoría × día y su suma acumulada sobre los días, con columna inicial en cero"""
+        combinados = codigos_categoria.astype(np.int64) * n_dias + codigos_dia
+        combinados[(codigos_categoria < 0) | (codigos_dia < 0)] = -1
+        conteos = np.bincount(combinados + 1, minlength=n_categorias * n_dias + 1)[1:]
+        acumulado = np.zeros((n_categorias, n_dias + 1), dtype=np.int64)
+        np.cumsum(conteos.reshape(n_categorias, n_dias), axis=1, out=acumulado[:, 1:])
+        return acumulado
+    
+    @staticmethod
+    def _codigos(df, columna):
+        if columna in df.columns:
+            return codificar(df[columna].astype(object).fillna(SIN_DATO))
+        return np.zeros(len(df), dtype=np.int64), np.array([SIN_DATO], dtype=object)
+    
+    def construir(self, df, huella=None):
+        """Calcula y guarda las sumas acumuladas diarias de cada dimensión"""
+        if df is None or len(df) == 0 or COLUMNA_FECHA not in df.columns:
+            return False
+        
+        print("➕ Construyendo índice temporal de sumas acumuladas...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        codigos_dia, dias = codigos_periodo(df[COLUMNA_FECHA], 'D')
+        n_dias = len(dias)
+        codigos_dpto, departamentos = self._codigos(df, COLUMNA_DEPARTAMENTO)
+        codigos_estado, estados = self._codigos(df, 'estado')
+        codigos_sexo, sexos = self._codigos(df, 'sexo')
+        if 'edad' in df.columns:
+            codigos_grupo, grupos = codigos_edad(df['edad'])
+        else:
+            codigos_grupo, grupos = np.full(len(df), -1, dtype=np.int64), np.array([], dtype=object)
+        
+        # Departamento × estado × sexo en una sola tabla para los filtros combinados
+        codigos_cruce = (codigos_dpto.astype(np.int64) * len(estados) + codigos_estado) * len(sexos) + codigos_sexo
+        cruce = self._acumular(codigos_cruce, len(departamentos) * len(estados) * len(sexos), codigos_dia, n_dias)
+        arreglos = {
+            'departamento_estado_sexo': cruce.reshape(len(departamentos), len(estados), len(sexos), n_dias + 1),
+            'grupo_edad': self._acumular(codigos_grupo, len(grupos), codigos_dia, n_dias)
+        }
+        np.savez(self.ruta_arreglos, **arreglos)
+        
+        metadatos = {
+            'version': VERSION_INDICE,
+            'huella': huella,
+            'total_registros': int(len(df)),
+            'fecha_inicio': str(dias[0]) if n_dias else None,
+            'n_dias': int(n_dias),
+            'etiquetas': {
+                'departamento': [str(d) for d in departamentos],
+                'estado': [str(e) for e in estados],
+                'sexo': [str(s) for s in sexos],
+                'grupo_edad': [str(g) for g in grupos]
+            }
+        }
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2, ensure_ascii=False)
+        
+        print(f"   ✅ {n_dias:,} días, {len(departamentos)} departamentos × {len(estados)} estados")
+        self._arreglos = arreglos
+        self._metadatos = metadatos
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self, huella):
+        """Indica si el índice guardado corresponde a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return (corresponde(metadatos, huella) and os.path.exists(self.ruta_arreglos)
+                and metadatos.get('version') == VERSION_INDICE)
+    
+    def arreglos(self):
+        if self._arreglos is None:
+            with np.load(self.ruta_arreglos) as archivo:
+                self._arreglos = {nombre: archivo[nombre] for nombre in archivo.files}
+        return self._arreglos
+    
+    def etiquetas(self, dimension):
+        return self.metadatos()['etiquetas'][dimension]
+    
+    def posiciones(self, fecha_inicio=None, fecha_fin=None):
+        """Columnas del acumulado que delimitan el rango de días [fecha_inicio, fecha_fin]"""
+        metadatos = self.metadatos()
+        origen = pd.Timestamp(metadatos['fecha_inicio'])
+        n_dias = metadatos['n_dias']
+        inicio = 0 if fecha_inicio is None else (pd.Timestamp(fecha_inicio).normalize() - origen).days
+        fin = n_dias if fecha_fin is None else (pd.Timestamp(fecha_fin).normalize() - origen).days + 1
+        inicio = min(max(inicio, 0), n_dias)
+        return inicio, min(max(fin, inicio), n_dias)
+    
+    def _seleccion(self, dimension, valores):
+        if not valores:
+            return slice(None)
+        posicion = {v: i for i, v in enumerate(self.etiquetas(dimension))}
+        return [posicion[v] for v in valores if v in posicion]
+    
+    def _bloque(self, inicio, fin, departamentos=None, estados=None):
+        """Casos departamento × estado × sexo entre las columnas ``inicio`` y ``fin`` con los filtros"""
+        acumulado = self.arreglos()['departamento_estado_sexo']
+        acumulado = acumulado[self._seleccion('departamento', departamentos)][:, self._seleccion('estado', estados)]
+        return acumulado[..., fin] - acumulado[..., inicio]
+    
+    def total(self, fecha_inicio=None, fecha_fin=None, departamentos=None, estados=None):
+        """Casos en el rango de fechas con los filtros de departamento y estado"""
+        inicio, fin = self.posiciones(fecha_inicio, fecha_fin)
+        return int(self._bloque(inicio, fin, departamentos, estados).sum())
+    
+    def totales_por(self, dimension, fecha_inicio=None, fecha_fin=None, departamentos=None, estados=None):
+        """
+        Casos por categoría de una dimensión en el rango de fechas, con los mismos
+        filtros de departamento y estado que ``total`` (el grupo de edad no se cruza
+        con ellos y solo admite el rango de fechas)
+        """
+        if dimension not in DIMENSIONES:
+            raise ValueError(f"Dimensión no soportada: {dimension}")
+        inicio, fin = self.posiciones(fecha_inicio, fecha_fin)
+        if dimension == 'grupo_edad':
+            if departamentos or estados:
+                raise ValueError("El grupo de edad no se cruza con los filtros de departamento y estado")
+            acumulado = self.arreglos()['grupo_edad']
+            return pd.Series(acumulado[:, fin] - acumulado[:, inicio], index=self.etiquetas(dimension), name='casos')
+        
+        bloque = self._bloque(inicio, fin, departamentos, estados)
+        eje = {'departamento': 0, 'estado': 1, 'sexo': 2}[dimension]
+        casos = bloque.sum(axis=tuple(e for e in range(3) if e != eje))
+        etiquetas = np.asarray(self.etiquetas(dimension), dtype=object)
+        filtro = {'departamento': departamentos, 'estado': estados}.get(dimension)
+        etiquetas = etiquetas[self._seleccion(dimension, filtro)]
+        return pd.Series(casos, index=etiquetas, name='casos')
+    
+    def comparar_periodos(self, fecha_inicio, fecha_fin, **filtros):
+        """Total del periodo y del periodo anterior de la misma duración, con su variación"""
+        inicio, fin = pd.Timestamp(fecha_inicio), pd.Timestamp(fecha_fin)
+        duracion = fin - inicio + pd.Timedelta(days=1)
+        actual = self.total(inicio, fin, **filtros)
+        anterior = self.total(inicio - duracion, inicio - pd.Timedelta(days=1), **filtros)
+        return {
+            'actual': actual,
+            'anterior': anterior,
+            'variacion': (actual - anterior) / anterior * 100 if anterior else None
+        }
@@ -0,0 +1,102 @@
+"""
+Instantánea de arranque del tablero.
+
+Tras un reinicio, la aplicación no espera a leer ``datos_covid.parquet``
+completo para dibujar: la instantánea guarda lo que necesita la primera
+pantalla y se lee en milisegundos, sea cual sea el tamaño del dataset. Son las
+estadísticas del dataset, los totales del periodo que muestra la pestaña
+inicial (los últimos 30 días frente a los 30 anteriores, por estado y por
+sexo) y una muestra estratificada pequeña con un mínimo de una fila por
+estrato. Se escribe al construir la caché, antes de ``estadisticas.json``.
+"""
+
+import os
+import json
+import pandas as pd
+
+from muestreo import MuestreadorEstratificado
+from huella_datos import huella_dataset, corresponde
+
+TAMAÑO_MUESTRA = 5_000
+DIAS_PERIODO = 30
+
+
+class InstantaneaArranque:
+    def __init__(self, directorio='datos_procesados/instantanea', indice_temporal=None):
+        self.directorio = directorio
+        self.indice_temporal = indice_temporal
+        self.ruta_metadatos = os.path.join(directorio, 'instantanea.json')
+        self.muestreador = MuestreadorEstratificado(
+            os.path.join(directorio, 'muestra'), niveles=(TAMAÑO_MUESTRA,), minimo_por_estrato=1
+        )
+        self._metadatos = None
+    
+    def _periodo_inicial(self, estadisticas):
+        """Totales del periodo por defecto de la barra lateral (None sin índice temporal)"""
+        fecha_max = (estadisticas.get('rango_fechas') or {}).get('max')
+        if not fecha_max or self.indice_temporal is None or self.indice_temporal.metadatos() is None:
+            return None
+        
+        fin = pd.Timestamp(fecha_max[:10])
+        inicio = fin - pd.Timedelta(days=DIAS_PERIODO)
+        return {
+            'fecha_inicio': inicio.date().isoformat(),
+            'fecha_fin': fin.date().isoformat(),
+            **self.indice_temporal.comparar_periodos(inicio, fin),
+            'por_estado': {k: int(v) for k, v in self.indice_temporal.totales_por('estado', inicio, fin).items()},
+            'por_sexo': {k: int(v) for k, v in self.indice_temporal.totales_por('sexo', inicio, fin).items()}
+        }
+    
+    def construir(self, df, estadisticas):
+        """Guarda la muestra pequeña y las estadísticas y totales de la primera pantalla"""
+        if df is None or len(df) == 0:
+            return False
+        
+        print("📸 Construyendo instantánea de arranque...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        # Con menos registros que el tamaño de la muestra no hay muestra: los datos
+        # completos se cargan igual de rápido
+        huella = huella_dataset(estadisticas)
+        self.muestreador.construir(df, huella)
+        nivel = self.muestreador.nivel_para_tamaño(TAMAÑO_MUESTRA)
+        
+        metadatos = {
+            'huella': huella,
+            'total_registros': int(len(df)),
+            'nivel_muestra': nivel,
+            'analisis': estadisticas,
+            'periodo': self._periodo_inicial(estadisticas)
+        }
+        temporal = f"{self.ruta_metadatos}.{os.getpid()}"
+        with open(temporal, 'w') as f:
+            json.dump(metadatos, f, ensure_ascii=False, default=str)
+        os.replace(temporal, self.ruta_metadatos)
+        
+        tamaño = os.path.getsize(self.ruta_metadatos) / 1024
+        print(f"   ✅ Estadísticas y periodo inicial ({tamaño:,.0f} KB), muestra de {nivel or 0:,}")
+        self._metadatos = metadatos
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self, huella):
+        """Indica si la instantánea guardada corresponde a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return corresponde(metadatos, huella)
+    
+    def analisis(self):
+        return self.metadatos()['analisis']
+    
+    def periodo(self):
+        """Totales del periodo inicial: fechas, actual, anterior, variación, por estado y por sexo"""
+        return self.metadatos()['periodo']
+    
+    def cargar_muestra(self):
+        """Muestra estratificada pequeña con su columna de pesos (None si el dataset es más pequeño)"""
+        nivel = self.metadatos()['nivel_muestra']
+        return self.muestreador.cargar_muestra(nivel) if nivel is not None else None
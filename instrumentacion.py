@@ -0,0 +1,160 @@
+"""
+Instrumentación por etapa: tiempo de reloj, tiempo de CPU, memoria residente y pico de asignación.
+
+``with medir_etapa('parseo'):`` (o el decorador ``@medido('estadisticas')``)
+mide lo que ocurre dentro y guarda un registro en ``REGISTRO``, compartido por
+las sesiones y los hilos del proceso. Si ``REGISTRO.ruta_log`` está definida,
+cada registro se añade como una línea JSON a ese archivo.
+
+Las medidas son del proceso: el tiempo de CPU incluye los hilos nativos de
+pyarrow y NumPy, y la variación de memoria residente (RSS, con psutil) la de
+cualquier otra sesión que trabaje a la vez. El pico de asignación viene de
+``tracemalloc``, que es opcional porque ralentiza cada asignación de Python:
+se activa con ``activar_tracemalloc()`` o con ``COVID_TRACEMALLOC=1``. Solo
+ve la memoria que reserva Python (no la de los búferes de Arrow).
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+MAX_REGISTROS = 500
+# El log se rota (se renombra a ``.1``) al superar este tamaño
+MAX_BYTES_LOG = 5 * 1024 * 1024
+MB = 1024 * 1024
+
+
+def memoria_rss_mb():
+    """Memoria residente del proceso en MB (None sin psutil)"""
+    if not PSUTIL_AVAILABLE:
+        return None
+    return psutil.Process().memory_info().rss / MB
+
+
+def activar_tracemalloc(activar=True):
+    """Activa o desactiva la medida del pico de asignación de cada etapa"""
+    if activar and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not activar and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+class RegistroEtapas:
+    def __init__(self, ruta_log=None, max_registros=MAX_REGISTROS):
+        self.ruta_log = ruta_log
+        self._registros = deque(maxlen=max_registros)
+        self._lock = threading.Lock()
+    
+    def agregar(self, registro):
+        with self._lock:
+            self._registros.append(registro)
+            if self.ruta_log:
+                self._escribir(registro)
+    
+    def _escribir(self, registro):
+        try:
+            directorio = os.path.dirname(self.ruta_log)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            if os.path.exists(self.ruta_log) and os.path.getsize(self.ruta_log) > MAX_BYTES_LOG:
+                os.replace(self.ruta_log, f"{self.ruta_log}.1")
+            with open(self.ruta_log, 'a') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"⚠️ No se pudo escribir el log de instrumentación: {e}")
+    
+    def registros(self, etapa=None):
+        """Registros guardados, del más antiguo al más reciente (solo los de ``etapa`` si se pasa)"""
+        with self._lock:
+            return [r for r in self._registros if etapa is None or r['etapa'] == etapa]
+    
+    def limpiar(self):
+        with self._lock:
+            self._registros.clear()
+
+
+REGISTRO = RegistroEtapas()
+if os.environ.get('COVID_TRACEMALLOC') == '1':
+    activar_tracemalloc()
+
+# Etapas abiertas con tracemalloc: el pico se reinicia al abrir cada una, así que
+# antes se reparte el pico visto hasta entonces entre las que la contienen
+_abiertas = []
+_lock_picos = threading.Lock()
+
+
+def _repartir_pico():
+    _, pico = tracemalloc.get_traced_memory()
+    for abierta in _abiertas:
+        abierta['pico'] = max(abierta['pico'], pico)
+
+
+@contextmanager
+def medir_etapa(etapa, detalle=None, registro=None):
+    """
+    Mide el bloque y guarda en ``registro`` (``REGISTRO`` por defecto) un dict
+    con la etapa, el detalle, el inicio, ``tiempo_s``, ``cpu_s``, ``rss_mb``,
+    ``delta_rss_mb`` y ``pico_mb`` (None sin tracemalloc). El dict se devuelve
+    al entrar y se completa al salir, también si el bloque lanza una excepción
+    """
+    resultado = {'etapa': etapa, 'detalle': detalle, 'inicio': datetime.now().isoformat(timespec='seconds')}
+    traza = None
+    if tracemalloc.is_tracing():
+        with _lock_picos:
+            _repartir_pico()
+            tracemalloc.reset_peak()
+            actual, _ = tracemalloc.get_traced_memory()
+            traza = {'inicio': actual, 'pico': actual}
+            _abiertas.append(traza)
+    rss_antes = memoria_rss_mb()
+    cpu_antes = time.process_time()
+    reloj_antes = time.perf_counter()
+    try:
+        yield resultado
+    finally:
+        resultado['tiempo_s'] = round(time.perf_counter() - reloj_antes, 4)
+        resultado['cpu_s'] = round(time.process_time() - cpu_antes, 4)
+        rss = memoria_rss_mb()
+        resultado['rss_mb'] = round(rss, 1) if rss is not None else None
+        resultado['delta_rss_mb'] = round(rss - rss_antes, 1) if rss is not None else None
+        resultado['pico_mb'] = None
+        if traza is not None:
+            with _lock_picos:
+                if tracemalloc.is_tracing():
+                    _repartir_pico()
+                    resultado['pico_mb'] = round((traza['pico'] - traza['inicio']) / MB, 1)
+                _abiertas.remove(traza)
+        (registro or REGISTRO).agregar(resultado)
+
+
+def medido(etapa):
+    """Decorador: mide cada llamada con ``medir_etapa(etapa, detalle=<nombre de la función>)``"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir_etapa(etapa, funcion.__name__):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def describir(registro):
+    """Resumen en una línea de un registro"""
+    partes = [f"{registro['tiempo_s']:.2f} s", f"CPU {registro['cpu_s']:.2f} s"]
+    if registro['delta_rss_mb'] is not None:
+        partes.append(f"ΔRSS {registro['delta_rss_mb']:+,.1f} MB")
+    if registro['pico_mb'] is not None:
+        partes.append(f"pico {registro['pico_mb']:,.1f} MB")
+    return ', '.join(partes)
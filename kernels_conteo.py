@@ -0,0 +1,173 @@
+"""
+Kernels de conteo sobre códigos enteros de categoría.
+
+Cada columna se reduce a un arreglo de códigos (-1 para nulos) y los conteos
+1-D y 2-D se calculan con np.bincount sobre los códigos combinados, sin copiar
+el DataFrame ni pasar por groupby/value_counts.
+"""
+
+import numpy as np
+import pandas as pd
+
+BORDES_EDAD = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 120]
+ETIQUETAS_EDAD = ['0-9', '10-19', '20-29', '30-39', '40-49', '50-59', '60-69', '70-79', '80-89', '90-99', '100+']
+
+UNIDADES_PERIODO = {'D': 'D', 'W': 'D', 'M': 'M', 'ME': 'M', 'MS': 'M', 'Y': 'Y', 'YE': 'Y', 'A': 'Y'}
+
+# Por encima de este número de celdas los conteos 2-D se hacen en forma dispersa
+MAX_CELDAS_DENSAS = 1 << 22
+
+
+def codificar(serie, ordenar=True):
+    """
+    Códigos enteros y categorías de una columna. Las columnas categóricas
+    reutilizan sus códigos; el resto se factoriza (ordenado si ``ordenar``).
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), np.asarray(serie.cat.categories, dtype=object)
+    codigos, categorias = pd.factorize(serie, sort=ordenar)
+    return codigos, np.asarray(categorias, dtype=object)
+
+
+def codigos_por_intervalos(valores, bordes):
+    """Código del intervalo [bordes[i], bordes[i+1]) de cada valor, -1 si queda fuera o es nulo"""
+    valores = pd.to_numeric(valores, errors='coerce')
+    valores = np.asarray(valores, dtype=np.float64)
+    codigos = np.searchsorted(np.asarray(bordes, dtype=np.float64), valores, side='right') - 1
+    codigos[(codigos >= len(bordes) - 1) | np.isnan(valores)] = -1
+    return codigos.astype(np.int64)
+
+
+def codigos_edad(edades):
+    """Códigos de grupo de edad con los mismos cortes de la pirámide"""
+    return codigos_por_intervalos(edades, BORDES_EDAD), np.asarray(ETIQUETAS_EDAD, dtype=object)
+
+
+def codigos_periodo(fechas, frecuencia='D'):
+    """
+    Códigos de periodo (día, semana, mes o año) de una columna de fechas y la
+    etiqueta de cada código. Las semanas terminan en domingo y se etiquetan con
+    ese día, como ``pd.Grouper(freq='W')``.
+    """
+    unidad = UNIDADES_PERIODO.get(frecuencia)
+    if unidad is None:
+        raise ValueError(f"Frecuencia no soportada: {frecuencia}")
+    
+    valores = pd.to_datetime(fechas, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    nulos = np.isnat(valores)
+    periodos = valores.astype(f'datetime64[{unidad}]').astype(np.int64)
+    if frecuencia == 'W':
+        # 1970-01-01 fue jueves: (día + 3) % 7 da 0 para el lunes
+        periodos = periodos + (6 - (periodos + 3) % 7)
+    if nulos.all():
+        return np.full(len(valores), -1, dtype=np.int64), np.array([], dtype=f'datetime64[{unidad}]')
+    
+    minimo = periodos[~nulos].min()
+    paso = 7 if frecuencia == 'W' else 1
+    codigos = (periodos - minimo) // paso
+    codigos[nulos] = -1
+    n = int(codigos.max()) + 1
+    etiquetas = (minimo + np.arange(n) * paso).astype(f'datetime64[{unidad}]')
+    return codigos, etiquetas
+
+
+def conteo_1d(codigos, n):
+    """Conteo por código (se ignoran los -1)"""
+    return np.bincount(np.add(codigos, 1, dtype=np.int64), minlength=n + 1)[1:]
+
+
+def conteo_2d(codigos_a, n_a, codigos_b, n_b):
+    """Tabla de conteos n_a × n_b con np.bincount sobre los códigos combinados"""
+    combinados = codigos_a.astype(np.int64) * n_b + codigos_b
+    combinados[(codigos_a < 0) | (codigos_b < 0)] = -1
+    return conteo_1d(combinados, n_a * n_b).reshape(n_a, n_b)
+
+
+def conteo_por_columna(serie, normalizar=False):
+    """Equivalente a ``value_counts()`` (orden descendente) basado en bincount"""
+    codigos, categorias = codificar(serie, ordenar=False)
+    conteos = conteo_1d(codigos, len(categorias))
+    orden = np.argsort(-conteos, kind='stable')
+    orden = orden[conteos[orden] > 0]
+    valores = conteos[orden]
+    if normalizar:
+        valores = valores / max(valores.sum(), 1)
+    return pd.Series(valores, index=pd.Index(categorias[orden], name=serie.name), name='count')
+
+
+def tabla_cruzada(serie_filas, serie_columnas, normalizar_filas=False):
+    """Tabla de contingencia densa entre dos columnas (solo categorías con casos)"""
+    codigos_f, categorias_f = codificar(serie_filas)
+    codigos_c, categorias_c = codificar(serie_columnas)
+    conteos = conteo_2d(codigos_f, len(categorias_f), codigos_c, len(categorias_c))
+    filas = conteos.sum(axis=1) > 0
+    columnas = conteos.sum(axis=0) > 0
+    conteos = conteos[filas][:, columnas]
+    if normalizar_filas:
+        conteos = conteos / conteos.sum(axis=1, keepdims=True)
+    return pd.DataFrame(
+        conteos,
+        index=pd.Index(categorias_f[filas], name=serie_filas.name),
+        columns=pd.Index(categorias_c[columnas], name=serie_columnas.name)
+    )
+
+
+def conteo_disperso(codigos_a, n_a, codigos_b, n_b):
+    """
+    Tabla de conteos n_a × n_b en forma dispersa (filas, columnas, conteos):
+    solo se devuelven las celdas con casos. Si la tabla densa es pequeña se
+    cuenta con bincount; si no, con np.unique sobre los códigos combinados.
+    """
+    validos = (codigos_a >= 0) & (codigos_b >= 0)
+    combinados = codigos_a[validos].astype(np.int64) * n_b + codigos_b[validos]
+    if n_a * n_b <= MAX_CELDAS_DENSAS:
+        conteos = np.bincount(combinados, minlength=n_a * n_b)
+        celdas = np.flatnonzero(conteos)
+        conteos = conteos[celdas]
+    else:
+        celdas, conteos = np.unique(combinados, return_counts=True)
+    return celdas // n_b, celdas % n_b, conteos
+
+
+def indices_top(totales, k):
+    """Índices (en orden de categoría) de los k totales mayores; todos los no nulos si k es None"""
+    orden = np.argsort(-totales, kind='stable')
+    orden = orden[totales[orden] > 0]
+    return np.sort(orden if k is None else orden[:k])
+
+
+def tabla_cruzada_dispersa(serie_filas, serie_columnas, top_filas=None, top_columnas=None, normalizar_filas=False):
+    """
+    Tabla de contingencia construida en forma dispersa a partir de los pares de
+    códigos. Se conservan las ``top_filas`` filas y ``top_columnas`` columnas
+    con más casos; la normalización por fila usa el total completo de la fila
+    (como ``pd.crosstab(normalize='index')``) y solo el bloque mostrado se
+    convierte a una matriz densa.
+    """
+    codigos_f, categorias_f = codificar(serie_filas)
+    codigos_c, categorias_c = codificar(serie_columnas)
+    n_f, n_c = len(categorias_f), len(categorias_c)
+    filas, columnas, conteos = conteo_disperso(codigos_f, n_f, codigos_c, n_c)
+    
+    totales_filas = np.bincount(filas, weights=conteos, minlength=n_f)
+    totales_columnas = np.bincount(columnas, weights=conteos, minlength=n_c)
+    valores = conteos / totales_filas[filas] if normalizar_filas else conteos
+    
+    filas_mostradas = indices_top(totales_filas, top_filas)
+    columnas_mostradas = indices_top(totales_columnas, top_columnas)
+    
+    # Posición de cada fila/columna en el bloque mostrado (-1 si se descarta)
+    posicion_fila = np.full(n_f, -1, dtype=np.int64)
+    posicion_fila[filas_mostradas] = np.arange(len(filas_mostradas))
+    posicion_columna = np.full(n_c, -1, dtype=np.int64)
+    posicion_columna[columnas_mostradas] = np.arange(len(columnas_mostradas))
+    i, j = posicion_fila[filas], posicion_columna[columnas]
+    en_bloque = (i >= 0) & (j >= 0)
+    
+    bloque = np.zeros((len(filas_mostradas), len(columnas_mostradas)), dtype=valores.dtype)
+    bloque[i[en_bloque], j[en_bloque]] = valores[en_bloque]
+    return pd.DataFrame(
+        bloque,
+        index=pd.Index(categorias_f[filas_mostradas], name=serie_filas.name),
+        columns=pd.Index(categorias_c[columnas_mostradas], name=serie_columnas.name)
+    )
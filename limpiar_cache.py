@@ -23,6 +23,19 @@ def limpiar_cache():
             except Exception as e:
                 print(f"❌ Error al eliminar {cache_file}: {e}")
     
+    # Eliminar las versiones publicadas por la reconstrucción en segundo plano
+    versiones_dir = os.path.join(cache_dir, 'versiones')
+    if os.path.exists(versiones_dir):
+        try:
+            os.remove(os.path.join(cache_dir, 'VERSION_ACTUAL'))
+        except FileNotFoundError:
+            pass
+        try:
+            shutil.rmtree(versiones_dir)
+            print(f"✅ Eliminado directorio: {versiones_dir}")
+        except Exception as e:
+            print(f"❌ Error al eliminar {versiones_dir}: {e}")
+    
     # Eliminar directorio de análisis si existe
     analisis_dir = os.path.join(cache_dir, 'analisis')
     if os.path.exists(analisis_dir):
@@ -0,0 +1,219 @@
+"""
+Muestreo estratificado por departamento × mes con niveles precalculados.
+
+Las muestras se construyen una sola vez al procesar el dataset y se guardan
+en disco, de modo que las vistas filtradas cargan la muestra más pequeña que
+conserva suficientes filas tras el filtro sin volver a muestrear.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from huella_datos import corresponde
+
+COLUMNA_DEPARTAMENTO = 'departamento_nom'
+COLUMNA_FECHA = 'fecha_de_notificación'
+COLUMNA_PESO = 'peso_muestral'
+
+NIVELES_MUESTRA = (10_000, 100_000, 1_000_000)
+MINIMO_POR_ESTRATO = 30
+# Filas esperadas tras el filtro por debajo de las cuales se sube de nivel
+MINIMO_FILAS_FILTRO = 20_000
+SIN_DATO = 'Sin dato'
+
+
+class MuestreadorEstratificado:
+    def __init__(self, directorio='datos_procesados/muestras', niveles=NIVELES_MUESTRA,
+                 minimo_por_estrato=MINIMO_POR_ESTRATO, semilla=42):
+        self.directorio = directorio
+        self.niveles = tuple(sorted(niveles))
+        self.minimo_por_estrato = minimo_por_estrato
+        self.semilla = semilla
+        self.ruta_estratos = os.path.join(directorio, 'estratos.parquet')
+        self.ruta_metadatos = os.path.join(directorio, 'metadatos.json')
+        self._muestras = {}
+        self._estratos = None
+        self._metadatos = None
+    
+    def ruta_muestra(self, nivel):
+        return os.path.join(self.directorio, f'muestra_{nivel}.parquet')
+    
+    @staticmethod
+    def claves_estrato(df):
+        """Devuelve las series de departamento y mes que definen el estrato de cada fila"""
+        if COLUMNA_DEPARTAMENTO in df.columns:
+            departamento = df[COLUMNA_DEPARTAMENTO].astype(object).fillna(SIN_DATO).astype(str)
+        else:
+            departamento = pd.Series(SIN_DATO, index=df.index)
+        
+        if COLUMNA_FECHA in df.columns:
+            fechas = pd.to_datetime(df[COLUMNA_FECHA], errors='coerce')
+            mes = fechas.dt.strftime('%Y-%m').fillna(SIN_DATO)
+        else:
+            mes = pd.Series(SIN_DATO, index=df.index)
+        
+        return departamento, mes
+    
+    def asignar_tamaños(self, poblacion, nivel):
+        """Asignación proporcional con un mínimo por estrato, acotada por la población"""
+        total = poblacion.sum()
+        proporcional = np.rint(poblacion * (nivel / total)).astype(np.int64)
+        minimo = np.minimum(poblacion, self.minimo_por_estrato)
+        return np.minimum(np.maximum(proporcional, minimo), poblacion)
+    
+    def construir(self, df, huella=None):
+        """Construye y guarda en disco las muestras estratificadas de todos los niveles"""
+        if df is None or len(df) == 0:
+            return False
+        
+        print("🎯 Construyendo muestras estratificadas por departamento × mes...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        departamento, mes = self.claves_estrato(df)
+        codigos_dpto, valores_dpto = pd.factorize(departamento, sort=True)
+        codigos_mes, valores_mes = pd.factorize(mes, sort=True)
+        codigos = codigos_dpto.astype(np.int64) * len(valores_mes) + codigos_mes
+        n_estratos = len(valores_dpto) * len(valores_mes)
+        poblacion = np.bincount(codigos, minlength=n_estratos)
+        
+        # Una sola permutación aleatoria sirve para todos los niveles: el rango
+        # de cada fila dentro de su estrato decide si entra en la muestra, así
+        # que los niveles pequeños quedan contenidos en los grandes.
+        rng = np.random.default_rng(self.semilla)
+        orden = np.lexsort((rng.random(len(df)), codigos))
+        inicio_estrato = np.concatenate(([0], np.cumsum(poblacion)[:-1]))
+        rango = np.empty(len(df), dtype=np.int64)
+        rango[orden] = np.arange(len(df)) - inicio_estrato[codigos[orden]]
+        
+        presentes = np.flatnonzero(poblacion)
+        estratos = pd.DataFrame({
+            'departamento': valores_dpto[presentes // len(valores_mes)],
+            'mes': valores_mes[presentes % len(valores_mes)],
+            'poblacion': poblacion[presentes]
+        })
+        
+        niveles_construidos = []
+        for nivel in self.niveles:
+            if nivel >= len(df):
+                continue
+            tamaños = self.asignar_tamaños(poblacion, nivel)
+            seleccion = rango < tamaños[codigos]
+            muestra = df.loc[seleccion].copy()
+            pesos = poblacion / np.maximum(tamaños, 1)
+            muestra[COLUMNA_PESO] = pesos[codigos[seleccion]]
+            muestra.to_parquet(self.ruta_muestra(nivel), index=False)
+            estratos[f'n_{nivel}'] = tamaños[presentes]
+            niveles_construidos.append(nivel)
+            print(f"   ✅ Nivel {nivel:,}: {len(muestra):,} filas en {len(presentes):,} estratos")
+        
+        estratos.to_parquet(self.ruta_estratos, index=False)
+        metadatos = {
+            'huella': huella,
+            'total_registros': int(len(df)),
+            'niveles': niveles_construidos,
+            'minimo_por_estrato': self.minimo_por_estrato,
+            'semilla': self.semilla
+        }
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2)
+        
+        self._muestras = {}
+        self._estratos = estratos
+        self._metadatos = metadatos
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def estratos(self):
+        if self._estratos is None and os.path.exists(self.ruta_estratos):
+            self._estratos = pd.read_parquet(self.ruta_estratos)
+        return self._estratos
+    
+    def esta_actualizado(self, huella):
+        """Indica si las muestras guardadas corresponden a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return corresponde(metadatos, huella)
+    
+    def niveles_disponibles(self):
+        metadatos = self.metadatos()
+        if metadatos is None:
+            return []
+        return [n for n in metadatos['niveles'] if os.path.exists(self.ruta_muestra(n))]
+    
+    def cargar_muestra(self, nivel):
+        """Carga desde disco (y memoriza) la muestra de un nivel"""
+        if nivel not in self._muestras:
+            self._muestras[nivel] = pd.read_parquet(self.ruta_muestra(nivel))
+        return self._muestras[nivel]
+    
+    def nivel_para_tamaño(self, tamaño_muestra):
+        """Nivel más pequeño con al menos ``tamaño_muestra`` filas (o el mayor disponible)"""
+        disponibles = self.niveles_disponibles()
+        if not disponibles:
+            return None
+        for nivel in disponibles:
+            if nivel >= tamaño_muestra:
+                return nivel
+        return disponibles[-1]
+    
+    @staticmethod
+    def fraccion_en_ventana(meses, fecha_inicio=None, fecha_fin=None):
+        """
+        Fracción de cada mes ('YYYY-MM') que cae dentro de la ventana de fechas,
+        suponiendo los registros repartidos uniformemente dentro del mes. Los
+        estratos sin fecha solo cuentan cuando no se filtra por fecha.
+        """
+        inicio_mes = pd.to_datetime(pd.Series(meses), format='%Y-%m', errors='coerce')
+        if not fecha_inicio and not fecha_fin:
+            return np.ones(len(inicio_mes))
+        fin_mes = inicio_mes + pd.offsets.MonthEnd(0)
+        desde = inicio_mes.clip(lower=pd.Timestamp(fecha_inicio).normalize()) if fecha_inicio else inicio_mes
+        hasta = fin_mes.clip(upper=pd.Timestamp(fecha_fin).normalize()) if fecha_fin else fin_mes
+        dias = ((hasta - desde).dt.days + 1).clip(lower=0)
+        fraccion = dias / inicio_mes.dt.days_in_month
+        return fraccion.fillna(0).to_numpy(dtype=float)
+    
+    def seleccionar_nivel(self, departamentos=None, fecha_inicio=None, fecha_fin=None,
+                          minimo_por_estrato=None, minimo_filas=MINIMO_FILAS_FILTRO):
+        """
+        Elige el nivel más pequeño que, con las filas que se esperan tras el filtro,
+        conserva al menos ``minimo_por_estrato`` filas en cada estrato afectado
+        (en proporción a la parte del mes que cubren las fechas) y ``minimo_filas``
+        en total (o todas las de la población si son menos).
+        Devuelve None si ningún nivel alcanza y hay que usar los datos completos.
+        """
+        estratos = self.estratos()
+        disponibles = self.niveles_disponibles()
+        if estratos is None or not disponibles:
+            return None
+        
+        if minimo_por_estrato is None:
+            minimo_por_estrato = self.minimo_por_estrato
+        
+        # Parte de cada estrato que cubre el filtro; una ventana de días dentro
+        # de un mes solo conserva esa fracción de las filas muestreadas del mes
+        fraccion = self.fraccion_en_ventana(estratos['mes'], fecha_inicio, fecha_fin)
+        if departamentos:
+            fraccion = fraccion * estratos['departamento'].isin(departamentos).to_numpy()
+        
+        mascara = fraccion > 0
+        if not mascara.any():
+            return disponibles[0]
+        fraccion = fraccion[mascara]
+        seleccion = estratos[mascara]
+        # Un estrato cubierto a medias conserva esa fracción de su muestra y de
+        # su población; el mínimo por estrato se reparte igual
+        poblacion = seleccion['poblacion'].to_numpy() * fraccion
+        requerido = np.minimum(poblacion, minimo_por_estrato * fraccion)
+        requerido_total = min(poblacion.sum(), minimo_filas)
+        for nivel in disponibles:
+            esperadas = seleccion[f'n_{nivel}'].to_numpy() * fraccion
+            if (esperadas >= requerido - 1e-9).all() and esperadas.sum() >= requerido_total - 1e-9:
+                return nivel
+        return None
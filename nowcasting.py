@@ -0,0 +1,238 @@
+"""
+Nowcasting de los casos recientes corregido por el retraso de reporte.
+
+Los casos de los últimos días aún no se han reportado por completo. Con la
+matriz región × día de inicio de síntomas × días de retraso hasta el reporte
+web se estiman factores de desarrollo (chain-ladder) sobre el triángulo
+observado: solo cuentan las celdas con ``día + retraso <= último reporte``.
+Cada cohorte reciente se escala por la fracción que ya debería estar
+reportada, con intervalos por muestreo binomial negativo. Todo se calcula a
+la vez para todos los departamentos y el total nacional.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from kernels_conteo import codificar
+from muestreo import COLUMNA_DEPARTAMENTO, SIN_DATO
+from retrasos import dias
+from huella_datos import corresponde
+
+COLUMNA_INICIO = 'fecha_inicio_sintomas'
+COLUMNA_REPORTE = 'fecha_reporte_web'
+REGION_TOTAL = 'Total nacional'
+
+MAX_RETRASO = 45
+VENTANA_ESTIMACION = 60
+DIAS_RECIENTES = 60
+MINIMO_CASOS_FACTOR = 50
+N_SIMULACIONES = 500
+
+
+def factores_desarrollo(acumulados, observable, minimo_casos=MINIMO_CASOS_FACTOR, factores_respaldo=None):
+    """
+    Factores chain-ladder f_d = Σ C[t, d] / Σ C[t, d-1] sobre las cohortes t con
+    el retraso d ya observable. ``acumulados`` es región × día × retraso (casos
+    acumulados por retraso) y ``observable`` la máscara día × retraso del
+    triángulo. Donde la región tiene menos de ``minimo_casos`` en el
+    denominador se usan los factores de respaldo (los nacionales).
+    """
+    mascara = observable[np.newaxis, :, 1:]
+    numerador = (acumulados[:, :, 1:] * mascara).sum(axis=1)
+    denominador = (acumulados[:, :, :-1] * mascara).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factores = np.where(denominador > 0, numerador / denominador, 1.0)
+    if factores_respaldo is not None:
+        factores = np.where(denominador >= minimo_casos, factores, factores_respaldo)
+    return factores
+
+
+def proporcion_reportada(factores):
+    """
+    Fracción de los casos finales ya reportada con k días de retraso:
+    F(k) = Π_{d > k} 1 / f_d, con F(máximo retraso) = 1
+    """
+    inversos = 1 / np.maximum(factores, 1.0)
+    # Producto acumulado desde el final: F[k] = Π_{d=k+1..D} inversos[d-1]
+    producto = np.cumprod(inversos[:, ::-1], axis=1)[:, ::-1]
+    return np.concatenate([producto, np.ones((factores.shape[0], 1))], axis=1)
+
+
+def nowcast_triangulo(matriz, max_retraso=MAX_RETRASO, ventana_estimacion=VENTANA_ESTIMACION,
+                      minimo_casos=MINIMO_CASOS_FACTOR):
+    """
+    Nowcast de una matriz región × día × retraso cuyo último día es la fecha del
+    último reporte. La fila 0 de la salida es el total de todas las regiones.
+    Devuelve casos observados, proporción reportada y casos estimados (región × día).
+    """
+    n_dias = matriz.shape[1]
+    matriz = np.concatenate([matriz.sum(axis=0, keepdims=True), matriz], axis=0).astype(np.float64)
+    acumulados = np.cumsum(matriz, axis=2)
+    
+    # Triángulo: el retraso d de la cohorte t es observable si t + d <= último día,
+    # y solo las últimas ``ventana_estimacion`` cohortes completas estiman los factores
+    dia = np.arange(n_dias)[:, np.newaxis]
+    retraso = np.arange(max_retraso + 1)[np.newaxis, :]
+    limite = n_dias - 1
+    observable = (dia + retraso <= limite) & (dia >= limite - max_retraso - ventana_estimacion)
+    
+    nacional = factores_desarrollo(acumulados[:1], observable)
+    factores = factores_desarrollo(acumulados, observable, minimo_casos, factores_respaldo=nacional)
+    reportada = proporcion_reportada(factores)
+    
+    # Retraso ya observado para cada cohorte y casos acumulados hasta ese retraso
+    observado_hasta = np.minimum(limite - np.arange(n_dias), max_retraso)
+    observados = np.take_along_axis(
+        acumulados, np.broadcast_to(observado_hasta[np.newaxis, :, np.newaxis], (matriz.shape[0], n_dias, 1)), axis=2
+    )[:, :, 0]
+    proporcion = reportada[:, observado_hasta]
+    return observados, proporcion, observados / proporcion
+
+
+def intervalos_nowcast(observados, proporcion, confianza=0.95, n_simulaciones=N_SIMULACIONES, semilla=42):
+    """
+    Simulaciones de los casos finales: observados + BN(observados, proporción)
+    aún no reportados, con media observados / proporción como la estimación
+    puntual. Devuelve las simulaciones (simulación × región × día) y los límites
+    del intervalo.
+    """
+    rng = np.random.default_rng(semilla)
+    p = np.clip(proporcion, 1e-6, 1.0)
+    # La binomial negativa exige n > 0: sin casos observados no hay faltantes
+    faltantes = rng.negative_binomial(np.maximum(observados, 1), p, size=(n_simulaciones,) + observados.shape)
+    simulaciones = observados + np.where((p < 1.0) & (observados > 0), faltantes, 0)
+    alfa = (1 - confianza) / 2
+    inferior, superior = np.quantile(simulaciones, [alfa, 1 - alfa], axis=0)
+    return simulaciones, inferior, superior
+
+
+class NowcastCasos:
+    def __init__(self, directorio='datos_procesados/nowcast', max_retraso=MAX_RETRASO,
+                 ventana_estimacion=VENTANA_ESTIMACION, dias_recientes=DIAS_RECIENTES):
+        self.directorio = directorio
+        self.max_retraso = max_retraso
+        self.ventana_estimacion = ventana_estimacion
+        self.dias_recientes = dias_recientes
+        self.ruta_resultados = os.path.join(directorio, 'nowcast.parquet')
+        self.ruta_metadatos = os.path.join(directorio, 'metadatos.json')
+        self._resultados = None
+        self._metadatos = None
+    
+    def construir(self, df, huella=None):
+        """Calcula el nowcast diario y semanal por departamento y nacional, y lo guarda"""
+        if df is None or len(df) == 0 or COLUMNA_INICIO not in df.columns or COLUMNA_REPORTE not in df.columns:
+            return False
+        
+        print("🔮 Calculando nowcast de casos recientes...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        dia_inicio, nulos_inicio = dias(df[COLUMNA_INICIO])
+        dia_reporte, nulos_reporte = dias(df[COLUMNA_REPORTE])
+        validos = ~(nulos_inicio | nulos_reporte)
+        if not validos.any():
+            return False
+        if COLUMNA_DEPARTAMENTO in df.columns:
+            codigos_region, regiones = codificar(df[COLUMNA_DEPARTAMENTO].astype(object).fillna(SIN_DATO))
+        else:
+            codigos_region, regiones = np.zeros(len(df), dtype=np.int64), np.array([SIN_DATO], dtype=object)
+        
+        # Cohortes de los últimos días hasta el último reporte; los retrasos
+        # mayores al máximo se acumulan en el último
+        ultimo = int(dia_reporte[validos].max())
+        n_dias = self.ventana_estimacion + self.max_retraso + self.dias_recientes
+        cohorte = dia_inicio - (ultimo - n_dias + 1)
+        retraso = np.clip(dia_reporte - dia_inicio, 0, self.max_retraso)
+        en_ventana = validos & (cohorte >= 0) & (cohorte < n_dias) & (dia_reporte >= dia_inicio)
+        n_retrasos = self.max_retraso + 1
+        combinados = (codigos_region[en_ventana].astype(np.int64) * n_dias + cohorte[en_ventana]) * n_retrasos + retraso[en_ventana]
+        matriz = np.bincount(combinados, minlength=len(regiones) * n_dias * n_retrasos).reshape(len(regiones), n_dias, n_retrasos)
+        
+        observados, proporcion, estimados = nowcast_triangulo(matriz, self.max_retraso, self.ventana_estimacion)
+        recientes = slice(n_dias - self.dias_recientes, n_dias)
+        observados, proporcion, estimados = observados[:, recientes], proporcion[:, recientes], estimados[:, recientes]
+        simulaciones, inferior, superior = intervalos_nowcast(observados, proporcion)
+        
+        fechas = pd.date_range(end=pd.Timestamp(ultimo, unit='D'), periods=self.dias_recientes, freq='D')
+        etiquetas = [REGION_TOTAL] + [str(r) for r in regiones]
+        diario = self._tabla(etiquetas, fechas, 'D', observados, estimados, inferior, superior, proporcion)
+        
+        # Semanas (terminadas en domingo): se suman las simulaciones antes de tomar
+        # cuantiles. Solo se guardan las semanas completas: la primera si la ventana
+        # no la cubre y la última si el corte no cae en domingo quedan fuera
+        semanas = fechas.to_period('W-SUN').end_time.normalize()
+        codigos_semana, fechas_semana = pd.factorize(semanas, sort=True)
+        completas = np.bincount(codigos_semana) == 7
+        
+        def agregar(valores):
+            return np.stack(
+                [valores[..., codigos_semana == i].sum(axis=-1) for i in np.flatnonzero(completas)], axis=-1
+            )
+        
+        fechas_semana = fechas_semana[completas]
+        simulaciones_semana = agregar(simulaciones)
+        inferior_semana, superior_semana = np.quantile(simulaciones_semana, [0.025, 0.975], axis=0)
+        observados_semana, estimados_semana = agregar(observados), agregar(estimados)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            proporcion_semana = np.where(estimados_semana > 0, observados_semana / estimados_semana, 1.0)
+        semanal = self._tabla(etiquetas, fechas_semana, 'W', observados_semana, estimados_semana,
+                              inferior_semana, superior_semana, proporcion_semana)
+        
+        resultados = pd.concat([diario, semanal], ignore_index=True)
+        resultados.to_parquet(self.ruta_resultados, index=False)
+        metadatos = {
+            'huella': huella,
+            'total_registros': int(len(df)),
+            'ultimo_reporte': str(fechas[-1].date()),
+            'max_retraso': self.max_retraso,
+            'ventana_estimacion': self.ventana_estimacion,
+            'dias_recientes': self.dias_recientes,
+            'regiones': etiquetas
+        }
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2, ensure_ascii=False)
+        
+        total = diario[diario['region'] == REGION_TOTAL]
+        print(f"   ✅ {len(etiquetas) - 1} departamentos; últimos {self.dias_recientes} días: "
+              f"{total['observados'].sum():,.0f} observados → {total['estimados'].sum():,.0f} estimados")
+        self._resultados = resultados
+        self._metadatos = metadatos
+        return True
+    
+    @staticmethod
+    def _tabla(regiones, fechas, periodo, observados, estimados, inferior, superior, proporcion):
+        """Tabla larga región × fecha con los resultados del nowcast"""
+        n_regiones, n_fechas = observados.shape
+        return pd.DataFrame({
+            'region': np.repeat(regiones, n_fechas),
+            'periodo': periodo,
+            'fecha': np.tile(np.asarray(fechas, dtype='datetime64[ns]'), n_regiones),
+            'observados': observados.ravel(),
+            'estimados': estimados.ravel(),
+            'limite_inferior': inferior.ravel(),
+            'limite_superior': superior.ravel(),
+            'proporcion_reportada': proporcion.ravel()
+        })
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self, huella):
+        """Indica si el nowcast guardado corresponde a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return corresponde(metadatos, huella) and os.path.exists(self.ruta_resultados)
+    
+    def regiones(self):
+        return self.metadatos()['regiones']
+    
+    def resultados(self, region=REGION_TOTAL, periodo='W'):
+        """Nowcast de una región ('D' diario o 'W' semanal), ordenado por fecha"""
+        if self._resultados is None:
+            self._resultados = pd.read_parquet(self.ruta_resultados)
+        tabla = self._resultados
+        seleccion = tabla[(tabla['region'] == region) & (tabla['periodo'] == periodo)]
+        return seleccion.drop(columns=['region', 'periodo']).sort_values('fecha').reset_index(drop=True)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Pipeline de datos sin interfaz: descarga, conversión, estadísticas, índices y caché.
+
+Prepara fuera de Streamlit todo lo que la aplicación construiría en su primer
+arranque, para que un despliegue lo precalcule antes de que ``run_app.py``
+empiece a servir. Cada etapa es un subcomando (con su nombre en inglés como
+alias) y ``todo`` las ejecuta en orden. De cada etapa y de cada artefacto se
+imprimen el tiempo de reloj y de CPU y la variación de memoria residente
+(``instrumentacion``), que también se añaden a ``instrumentacion.jsonl`` en el
+directorio de procesados; con ``--tiempos`` el resumen se guarda en JSON.
+
+    descargar     (download)         dataset fuente (archivo local, COVID_DATA_URL o gdown)
+    convertir     (convert)          CSV fuente a Parquet con fechas y edad tipadas (``--autoajustar``)
+    estadisticas  (build-stats)      caché de datos y estadisticas.json
+    indices       (build-indexes)    muestras, tensores, índice temporal, retrasos, nowcast e instantánea
+    calentar      (warm-cache)       indicadores, cambios, pronósticos y geometrías de cada nivel
+    verificar     (verify)           comprueba que cada artefacto corresponde al dataset
+
+Las etapas que escriben en el directorio de procesados toman el mismo bloqueo
+que la aplicación, así que una sesión que arranque mientras tanto espera y
+carga el resultado. ``--hilos`` construye en paralelo los artefactos
+independientes de una etapa y ``--procesos`` limita los procesos de los
+pronósticos.
+
+Uso: ``python pipeline_datos.py [--archivo CSV] [--directorio datos_procesados] [--hilos N] todo``
+"""
+
+import os
+import sys
+import json
+import argparse
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from procesamiento import ProcesadorCOVID
+from bloqueo_cache import BloqueoConstruccion
+from huella_datos import huella_dataset
+from instrumentacion import REGISTRO, medir_etapa, describir, activar_tracemalloc
+
+ARCHIVO_POR_DEFECTO = 'Casos_positivos_de_COVID-19_en_Colombia.csv'
+DIRECTORIO_POR_DEFECTO = 'datos_procesados'
+
+# Subcomando, alias en inglés y descripción, en el orden en que los ejecuta ``todo``
+ETAPAS = [
+    ('descargar', 'download', "Obtiene el dataset fuente"),
+    ('convertir', 'convert', "Convierte el CSV fuente a Parquet"),
+    ('estadisticas', 'build-stats', "Escribe la caché de datos y las estadísticas"),
+    ('indices', 'build-indexes', "Construye muestras, tensores, índice temporal, retrasos, nowcast e instantánea"),
+    ('calentar', 'warm-cache', "Precalcula indicadores, cambios, pronósticos y geometrías"),
+    ('verificar', 'verify', "Comprueba que cada artefacto corresponde al dataset")
+]
+ETAPAS_CON_BLOQUEO = ('estadisticas', 'indices', 'calentar')
+
+
+class PipelineDatos:
+    def __init__(self, ruta_archivo=ARCHIVO_POR_DEFECTO, directorio_procesados=DIRECTORIO_POR_DEFECTO,
+                 hilos=1, procesos=None, forzar=False, autoajuste=False):
+        self.procesador = ProcesadorCOVID(ruta_archivo, directorio_procesados)
+        self.hilos = max(1, int(hilos))
+        self.forzar = forzar
+        self.autoajuste = autoajuste
+        for pronosticos in self.procesador.pronosticos.values():
+            pronosticos.max_procesos = procesos
+        self.tiempos = []
+        self._df = None
+        self._estadisticas = None
+    
+    @contextmanager
+    def _medir(self, etapa):
+        try:
+            with medir_etapa(etapa, 'pipeline') as registro:
+                yield
+        finally:
+            self.tiempos.append(registro)
+            print(f"⏱️  {etapa}: {describir(registro)}")
+    
+    def _ejecutar_tareas(self, tareas):
+        """
+        Ejecuta ``[(nombre, funcion), ...]`` con ``self.hilos`` hilos, imprime el
+        tiempo de cada una y devuelve cuántas terminaron sin error. Un artefacto
+        cuyo ``construir`` devuelve False no aplica al dataset (le faltan columnas)
+        """
+        def medir(nombre, funcion):
+            with medir_etapa('artefacto', nombre) as registro:
+                try:
+                    if funcion() is False:
+                        print(f"ℹ️ {nombre}: el dataset no tiene los datos necesarios")
+                    resultado = True
+                except Exception as e:
+                    print(f"❌ {nombre}: {e}")
+                    resultado = False
+            print(f"   ⏱️  {nombre}: {describir(registro)}")
+            return resultado
+        
+        if self.hilos == 1 or len(tareas) <= 1:
+            return sum(medir(nombre, funcion) for nombre, funcion in tareas)
+        with ThreadPoolExecutor(max_workers=min(self.hilos, len(tareas))) as pool:
+            return sum(pool.map(lambda tarea: medir(*tarea), tareas))
+    
+    def _cache_vigente(self):
+        """Indica si la caché y las estadísticas son posteriores al dataset fuente"""
+        procesador = self.procesador
+        if not (os.path.exists(procesador.ruta_cache) and os.path.exists(procesador.ruta_estadisticas)):
+            return False
+        fuentes = [ruta for ruta in (procesador.ruta_parquet, procesador.ruta_archivo) if os.path.exists(ruta)]
+        modificacion = min(os.path.getmtime(procesador.ruta_cache), os.path.getmtime(procesador.ruta_estadisticas))
+        return all(os.path.getmtime(ruta) <= modificacion for ruta in fuentes)
+    
+    def _datos(self):
+        """Datos y estadísticas de la caché, leídos una sola vez por ejecución (None si no hay caché)"""
+        if self._df is None:
+            procesador = self.procesador
+            if not (os.path.exists(procesador.ruta_cache) and os.path.exists(procesador.ruta_estadisticas)):
+                print("❌ No hay caché de datos: ejecuta antes la etapa 'estadisticas'")
+                return None
+            import pandas as pd
+            self._df = pd.read_parquet(procesador.ruta_cache)
+            with open(procesador.ruta_estadisticas, 'r') as f:
+                self._estadisticas = json.load(f)
+            procesador.huella = huella_dataset(self._estadisticas)
+        return self._df
+    
+    def descargar(self):
+        return self.procesador.descargar_dataset()
+    
+    def convertir(self):
+        procesador = self.procesador
+        csv_disponible = os.path.exists(procesador.ruta_archivo)
+        if not (self.forzar or self.autoajuste) and os.path.exists(procesador.ruta_parquet) and (
+                not csv_disponible or os.path.getmtime(procesador.ruta_parquet) >= os.path.getmtime(procesador.ruta_archivo)):
+            print(f"✅ {procesador.ruta_parquet} ya está al día")
+            return True
+        if not csv_disponible:
+            print(f"❌ No se encontró el archivo: {procesador.ruta_archivo}")
+            return False
+        procesador.convertir_a_parquet(self.autoajuste)
+        return True
+    
+    def estadisticas(self):
+        procesador = self.procesador
+        if not self.forzar and self._cache_vigente():
+            print("✅ La caché y las estadísticas ya están al día")
+            return True
+        if not (os.path.exists(procesador.ruta_parquet) or os.path.exists(procesador.ruta_archivo)):
+            print(f"❌ No se encontró el archivo: {procesador.ruta_archivo}")
+            return False
+        df = procesador.leer_dataset()
+        print("🎯 Escribiendo caché de datos y estadísticas...")
+        procesador.guardar_cache(df)
+        estadisticas = procesador._generar_estadisticas(df)
+        procesador.guardar_estadisticas(estadisticas)
+        self._df, self._estadisticas = df, estadisticas
+        print(f"   ✅ {len(df):,} registros")
+        return True
+    
+    def indices(self):
+        df = self._datos()
+        if df is None:
+            return False
+        procesador = self.procesador
+        precalculados = [
+            ('muestras', procesador.muestreador),
+            ('tensor de departamentos', procesador.tensores['departamentos']),
+            ('tensor de municipios', procesador.tensores['municipios']),
+            ('índice temporal', procesador.indice_temporal),
+            ('retrasos', procesador.retrasos),
+            ('nowcast', procesador.nowcast)
+        ]
+        huella = procesador.huella
+        tareas = [(nombre, lambda artefacto=artefacto: artefacto.construir(df, huella))
+                  for nombre, artefacto in precalculados
+                  if self.forzar or not artefacto.esta_actualizado(huella)]
+        correctas, pendientes = self._ejecutar_tareas(tareas), len(tareas)
+        
+        # La instantánea usa el índice temporal: va después del resto
+        if self.forzar or not procesador.instantanea.esta_actualizado(huella):
+            correctas += self._ejecutar_tareas([
+                ('instantánea', lambda: procesador.instantanea.construir(df, self._estadisticas))
+            ])
+            pendientes += 1
+        if not pendientes:
+            print("✅ Todos los índices ya están al día")
+        return correctas == pendientes
+    
+    def calentar(self):
+        df = self._datos()
+        if df is None:
+            return False
+        procesador = self.procesador
+        tareas = []
+        for nivel in procesador.tensores:
+            if procesador.obtener_tensor(df, nivel) is None:
+                print(f"⚠️ Sin tensor de {nivel}: se omiten sus indicadores, cambios y pronósticos")
+                continue
+            for nombre, artefactos in (('indicadores', procesador.indicadores),
+                                       ('cambios', procesador.cambios),
+                                       ('pronósticos', procesador.pronosticos)):
+                artefacto = artefactos[nivel]
+                if self.forzar or not artefacto.esta_actualizado(procesador.huella):
+                    tareas.append((f"{nombre} de {nivel}",
+                                   lambda artefacto=artefacto, nivel=nivel: artefacto.construir(procesador.tensores[nivel])))
+        for nivel, geometrias in procesador.geometrias.items():
+            if geometrias.firma_limites() is None:
+                print(f"ℹ️ Sin archivo de límites para {nivel}: se omiten sus geometrías")
+            elif self.forzar or not geometrias.esta_actualizado():
+                tareas.append((f"geometrías de {nivel}", geometrias.construir))
+        
+        if not tareas:
+            print("✅ La caché de vistas ya está al día")
+        return self._ejecutar_tareas(tareas) == len(tareas)
+    
+    def verificar(self):
+        """Imprime el estado de cada artefacto y devuelve si todos corresponden al dataset"""
+        procesador = self.procesador
+        if not os.path.exists(procesador.ruta_estadisticas):
+            print("❌ Faltan las estadísticas: ejecuta la etapa 'estadisticas'")
+            return False
+        with open(procesador.ruta_estadisticas, 'r') as f:
+            estadisticas = json.load(f)
+        total, huella = estadisticas['total_registros'], huella_dataset(estadisticas)
+        
+        import pyarrow.parquet as pq
+        filas_cache = pq.ParquetFile(procesador.ruta_cache).metadata.num_rows if os.path.exists(procesador.ruta_cache) else None
+        estados = [('caché de datos', filas_cache == total)]
+        estados += [(nombre, artefacto.esta_actualizado(huella)) for nombre, artefacto in [
+            ('muestras', procesador.muestreador),
+            *((f"tensor de {nivel}", tensor) for nivel, tensor in procesador.tensores.items()),
+            ('índice temporal', procesador.indice_temporal),
+            ('retrasos', procesador.retrasos),
+            ('nowcast', procesador.nowcast),
+            ('instantánea', procesador.instantanea),
+            *((f"indicadores de {nivel}", artefacto) for nivel, artefacto in procesador.indicadores.items()),
+            *((f"cambios de {nivel}", artefacto) for nivel, artefacto in procesador.cambios.items()),
+            *((f"pronósticos de {nivel}", artefacto) for nivel, artefacto in procesador.pronosticos.items())
+        ]]
+        estados += [(f"geometrías de {nivel}", geometrias.esta_actualizado())
+                    for nivel, geometrias in procesador.geometrias.items() if geometrias.firma_limites() is not None]
+        
+        print(f"🔍 Artefactos para {total:,} registros:")
+        for nombre, actualizado in estados:
+            print(f"   {'✅' if actualizado else '❌'} {nombre}")
+        return all(actualizado for _, actualizado in estados)
+    
+    def ejecutar(self, etapas):
+        """Ejecuta las etapas en orden y se detiene en la primera que falla"""
+        bloqueo = None
+        if any(etapa in ETAPAS_CON_BLOQUEO for etapa in etapas):
+            os.makedirs(self.procesador.directorio_procesados, exist_ok=True)
+            bloqueo = BloqueoConstruccion(self.procesador.ruta_bloqueo)
+            while not bloqueo.adquirir():
+                print("⏳ Otro proceso está construyendo la caché; esperando a que termine...")
+                bloqueo.esperar()
+        try:
+            for etapa in etapas:
+                print(f"\n▶️  {etapa}")
+                if bloqueo is not None:
+                    bloqueo.marcar(f"Pipeline: {etapa}")
+                with self._medir(etapa):
+                    correcta = getattr(self, etapa)()
+                if not correcta:
+                    print(f"❌ La etapa '{etapa}' no terminó correctamente")
+                    return False
+            return True
+        finally:
+            if bloqueo is not None:
+                bloqueo.liberar()
+    
+    def resumen(self):
+        print("\n📋 Tiempo y memoria por etapa")
+        print(f"   {'':<14}{'reloj':>10}{'CPU':>10}{'ΔRSS':>12}")
+        for tiempo in self.tiempos:
+            delta = f"{tiempo['delta_rss_mb']:+,.1f} MB" if tiempo['delta_rss_mb'] is not None else '–'
+            print(f"   {tiempo['etapa']:<14}{tiempo['tiempo_s']:>8.2f} s{tiempo['cpu_s']:>8.2f} s{delta:>12}")
+        print(f"   {'total':<14}{sum(t['tiempo_s'] for t in self.tiempos):>8.2f} s"
+              f"{sum(t['cpu_s'] for t in self.tiempos):>8.2f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline de datos de COVID-19 sin interfaz")
+    parser.add_argument('--archivo', default=ARCHIVO_POR_DEFECTO)
+    parser.add_argument('--directorio', default=DIRECTORIO_POR_DEFECTO)
+    parser.add_argument('--hilos', type=int, default=min(4, os.cpu_count() or 1),
+                        help="artefactos de una etapa que se construyen a la vez")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help="procesos para ajustar los pronósticos (por defecto, todos los núcleos)")
+    parser.add_argument('--forzar', action='store_true', help="reconstruye aunque los artefactos estén al día")
+    parser.add_argument('--autoajustar', action='store_true',
+                        help="al convertir, elige códec, filas por grupo y diccionario midiendo candidatos")
+    parser.add_argument('--tiempos', help="archivo JSON donde guardar el tiempo y la memoria de cada etapa")
+    parser.add_argument('--tracemalloc', action='store_true', help="mide también el pico de asignación de cada etapa")
+    subparsers = parser.add_subparsers(dest='etapa', required=True)
+    alias = {}
+    for nombre, ingles, descripcion in ETAPAS:
+        subparsers.add_parser(nombre, aliases=[ingles], help=descripcion)
+        alias[ingles] = nombre
+    subparsers.add_parser('todo', aliases=['all'], help="Ejecuta todas las etapas en orden")
+    alias['all'] = 'todo'
+    args = parser.parse_args(argv)
+    
+    etapa = alias.get(args.etapa, args.etapa)
+    etapas = [nombre for nombre, _, _ in ETAPAS] if etapa == 'todo' else [etapa]
+    if args.tracemalloc:
+        activar_tracemalloc()
+    REGISTRO.ruta_log = os.path.join(args.directorio, 'instrumentacion.jsonl')
+    pipeline = PipelineDatos(args.archivo, args.directorio, args.hilos, args.procesos, args.forzar, args.autoajustar)
+    correcto = pipeline.ejecutar(etapas)
+    pipeline.resumen()
+    if args.tiempos:
+        with open(args.tiempos, 'w') as f:
+            json.dump({'etapas': pipeline.tiempos, 'correcto': correcto}, f, indent=2)
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
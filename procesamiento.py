@@ -1,25 +1,88 @@
 import pandas as pd
 import os
-import requests
 import json
 from pathlib import Path
 import re
+import importlib.util
+from muestreo import MuestreadorEstratificado
+from tensor_casos import TensorCasos, COLUMNA_MUNICIPIO, codificar_municipios
+from indice_temporal import IndiceTemporal
+from indicadores import IndicadoresEpidemiologicos
+from retrasos import AnalizadorRetrasos
+from nowcasting import NowcastCasos
+from pronosticos import PronosticosCasos
+from deteccion_cambios import DetectorCambios
+from geometrias import GeometriasDivipola, ARCHIVOS_LIMITES
+from bloqueo_cache import BloqueoConstruccion
+from huella_datos import huella_dataset
+from reconstruccion import directorio_publicado, ARCHIVO_BLOQUEO
+from instantanea import InstantaneaArranque
+from conversion_parquet import convertir_csv, escribir_parquet, cargar_ajustes
+from instrumentacion import medir_etapa, medido
+from kernels_conteo import codificar, codigos_edad, codigos_periodo, conteo_1d, conteo_2d, conteo_por_columna
 
-# Import gdown con manejo de errores
-GDOWN_AVAILABLE = False
-gdown = None
-try:
-    import gdown
-    GDOWN_AVAILABLE = True
-except ImportError:
+# requests y gdown solo se necesitan para descargar el dataset: se importan al
+# usarlos para no retrasar el arranque; aquí solo se comprueba si gdown existe
+GDOWN_AVAILABLE = importlib.util.find_spec('gdown') is not None
+if not GDOWN_AVAILABLE:
     print("⚠️  gdown no disponible. Instala con: pip install gdown")
 
+# Columnas de los conteos del análisis avanzado: el nombre en el dataset de
+# datos.gov.co y el del archivo de muestra
+COLUMNAS_CONTEO = {
+    'conteo_por_tipo_de_contagio': ('fuente_tipo_contagio', 'tipo'),
+    'conteo_por_recuperado': ('recuperado',),
+    'conteo_por_ubicacion_del_caso': ('ubicacion', 'ubicacion_del_caso'),
+    'conteo_por_pertenencia_etnica': ('pertenencia_etnica', 'per_etn_')
+}
+
+# Códigos de pertenencia étnica del dataset de datos.gov.co
+ETNIAS = {1: 'Indígena', 2: 'ROM', 3: 'Raizal', 4: 'Palenquero', 5: 'Negro', 6: 'Otro'}
+
+def _avisar(progreso, fraccion, mensaje):
+    """Informa el avance de una carga a quien lo pidió"""
+    if progreso is not None:
+        progreso(fraccion, mensaje)
+
 class ProcesadorCOVID:
-    def __init__(self, ruta_archivo='Casos_positivos_de_COVID-19_en_Colombia.csv'):
+    def __init__(self, ruta_archivo='Casos_positivos_de_COVID-19_en_Colombia.csv', directorio_procesados='datos_procesados'):
         self.ruta_archivo = ruta_archivo
-        self.ruta_cache = 'datos_procesados/datos_covid.parquet'
-        self.ruta_estadisticas = 'datos_procesados/estadisticas.json'
+        # El bloqueo vive en la raíz, común a todas las versiones de la caché
+        self.ruta_bloqueo = os.path.join(directorio_procesados, ARCHIVO_BLOQUEO)
+        self.directorio_raiz = directorio_procesados
+        self._usar_directorio(directorio_publicado(directorio_procesados))
+    
+    def _usar_directorio(self, directorio_procesados):
+        """Apunta todos los artefactos a ``directorio_procesados`` (la versión publicada de la caché)"""
+        self.directorio_procesados = directorio_procesados
+        self.ruta_cache = os.path.join(directorio_procesados, 'datos_covid.parquet')
+        self.ruta_estadisticas = os.path.join(directorio_procesados, 'estadisticas.json')
+        # Versión del dataset de las estadísticas leídas o escritas por última vez
+        self.huella = None
+        self.muestreador = MuestreadorEstratificado(os.path.join(directorio_procesados, 'muestras'))
+        self.tensores = {
+            'departamentos': TensorCasos(os.path.join(directorio_procesados, 'tensor'), 'departamentos'),
+            'municipios': TensorCasos(os.path.join(directorio_procesados, 'tensor'), 'municipios', COLUMNA_MUNICIPIO,
+                                      codificar_municipios)
+        }
+        self.indice_temporal = IndiceTemporal(os.path.join(directorio_procesados, 'indice_temporal'))
+        self.instantanea = InstantaneaArranque(os.path.join(directorio_procesados, 'instantanea'), self.indice_temporal)
+        self.retrasos = AnalizadorRetrasos(os.path.join(directorio_procesados, 'retrasos'))
+        self.nowcast = NowcastCasos(os.path.join(directorio_procesados, 'nowcast'))
+        self.indicadores = {
+            nivel: IndicadoresEpidemiologicos(os.path.join(directorio_procesados, 'indicadores'), nivel) for nivel in self.tensores
+        }
+        self.pronosticos = {
+            nivel: PronosticosCasos(os.path.join(directorio_procesados, 'pronosticos'), nivel) for nivel in self.tensores
+        }
+        self.cambios = {
+            nivel: DetectorCambios(os.path.join(directorio_procesados, 'cambios'), nivel) for nivel in self.tensores
+        }
+        self.geometrias = {
+            nivel: GeometriasDivipola(os.path.join(directorio_procesados, 'geometrias'), nivel) for nivel in ARCHIVOS_LIMITES
+        }
         
+    @medido('descarga')
     def descargar_dataset(self, file_id='1agwpqQa_Yv7GD5Gzu7RJuG0HqpOk2c0r'):
         """
         Maneja el dataset de COVID-19 con múltiples estrategias de descarga.
@@ -77,6 +140,7 @@ class ProcesadorCOVID:
     def _descargar_desde_url_directa(self, url):
         """Descarga desde URL directa con manejo de errores"""
         try:
+            import requests
             print(f"📥 Intentando descargar desde: {url}")
             print("⏳ Esto puede tardar varios minutos...")
             
@@ -131,11 +195,12 @@ class ProcesadorCOVID:
         
     def _descargar_con_gdown(self, file_id):
         """Descarga archivo usando gdown si está disponible"""
-        if not GDOWN_AVAILABLE or gdown is None:
+        if not GDOWN_AVAILABLE:
             print("❌ gdown no está disponible")
             return False
             
         try:
+            import gdown
             url = f'https://drive.google.com/uc?id={file_id}'
             print(f"📥 Descargando con gdown desde: {url}")
             gdown.download(url, self.ruta_archivo, quiet=False)
@@ -145,119 +210,142 @@ class ProcesadorCOVID:
             print(f"❌ Error en descarga con gdown: {e}")
             return False
             
-    def cargar_datos(self, remuestrear=False, forzar_analisis=False):
-        """Carga y procesa los datos del archivo CSV o Parquet"""
+    def cargar_datos(self, remuestrear=False, forzar_analisis=False, progreso=None):
+        """
+        Carga y procesa los datos del archivo CSV o Parquet. ``progreso(fraccion,
+        mensaje)``, si se pasa, recibe el avance de cada etapa
+        """
         try:
             # Verificar si existe caché y no se fuerza la recarga
             if not forzar_analisis and os.path.exists(self.ruta_cache) and os.path.exists(self.ruta_estadisticas):
                 print("Cargando datos desde caché...")
-                df = pd.read_parquet(self.ruta_cache)
+                _avisar(progreso, 0.1, "Leyendo la caché")
+                with medir_etapa('lectura_parquet', 'caché'):
+                    df = pd.read_parquet(self.ruta_cache)
                 with open(self.ruta_estadisticas, 'r') as f:
                     estadisticas = json.load(f)
+                self.huella = huella_dataset(estadisticas)
+                self._construir_precalculados(df, solo_desactualizados=True)
+                if not self.instantanea.esta_actualizado(self.huella):
+                    self.instantanea.construir(df, estadisticas)
                 return {'datos': df, 'analisis': estadisticas}
             
-            # Verificar si existe un archivo Parquet
-            parquet_file = self.ruta_archivo.replace('.csv', '.parquet')
-            if os.path.exists(parquet_file):
-                print("Cargando datos desde archivo Parquet...")
-                df = pd.read_parquet(parquet_file)
-            else:
-                print("Cargando datos desde archivo CSV...")
-                # Verificar si es un archivo grande y usar procesamiento por chunks
-                file_size = os.path.getsize(self.ruta_archivo) / (1024 * 1024)  # MB
-                if file_size > 1000:  # Archivo mayor a 1GB
-                    print(f"📁 Archivo grande detectado ({file_size:.1f} MB). Usando procesamiento optimizado...")
-                    df = self._cargar_csv_grande()
-                else:
-                    # Cargar datos con manejo de errores
-                    df = pd.read_csv(self.ruta_archivo, 
-                                   delimiter=',',
-                                   on_bad_lines='skip',
-                                   low_memory=False,
-                                   dtype=str)
-                
-                # Convertir columnas de fecha
-                columnas_fecha = ['fecha_de_notificación', 'fecha_reporte_web', 'fecha_inicio_sintomas', 'fecha_muerte', 'fecha_diagnostico', 'fecha_recuperado']
-                for col in columnas_fecha:
-                    if col in df.columns:
-                        df[col] = pd.to_datetime(df[col], errors='coerce')
-                
-                # Convertir columnas numéricas
-                columnas_numericas = ['edad']
-                for col in columnas_numericas:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                # Guardar en formato Parquet para futuras cargas más rápidas
-                print("Guardando datos en formato Parquet para cargas futuras más rápidas...")
-                df.to_parquet(parquet_file, index=False)
-            
-            # Guardar en caché
-            os.makedirs('datos_procesados', exist_ok=True)
-            df.to_parquet(self.ruta_cache, index=False)
-            
-            # Generar estadísticas
-            estadisticas = self._generar_estadisticas(df)
-            with open(self.ruta_estadisticas, 'w') as f:
-                json.dump(estadisticas, f, indent=2, default=str)
+            # Solo un proceso construye la caché; los demás esperan a que termine
+            # y cargan su resultado en lugar de repetir el trabajo
+            bloqueo = BloqueoConstruccion(self.ruta_bloqueo)
+            while not bloqueo.adquirir():
+                print("⏳ Otro proceso está construyendo la caché; esperando su resultado...")
+                bloqueo.esperar(al_avanzar=lambda marca: _avisar(
+                    progreso, marca.get('fraccion') or 0.0, f"Otro proceso: {marca.get('etapa')}"
+                ))
+                # Si el otro proceso publicó una versión nueva, se carga esa
+                self._usar_directorio(directorio_publicado(self.directorio_raiz))
+                if os.path.exists(self.ruta_cache) and os.path.exists(self.ruta_estadisticas):
+                    return self.cargar_datos(progreso=progreso)
             
-            return {'datos': df, 'analisis': estadisticas}
+            def avisar_y_marcar(fraccion, mensaje):
+                bloqueo.marcar(mensaje, fraccion)
+                _avisar(progreso, fraccion, mensaje)
+            try:
+                return self._construir_cache(avisar_y_marcar)
+            finally:
+                bloqueo.liberar()
             
         except Exception as e:
             print(f"Error al cargar datos: {e}")
             raise
             
-    def _cargar_csv_grande(self):
-        """Carga un archivo CSV grande usando chunks para evitar problemas de memoria"""
-        print("🔄 Procesando archivo CSV grande en chunks...")
+    def _construir_cache(self, progreso=None):
+        """Procesa el dataset fuente y escribe la caché, las estadísticas y los precalculados"""
+        _avisar(progreso, 0.05, "Leyendo el dataset")
+        df = self.leer_dataset()
         
-        # Leer solo las primeras filas para obtener la estructura
-        chunk_sample = pd.read_csv(self.ruta_archivo, 
-                                  delimiter=',',
-                                  on_bad_lines='skip',
-                                  low_memory=False,
-                                  dtype=str,
-                                  nrows=1000)
+        # Guardar en caché
+        _avisar(progreso, 0.35, "Guardando la caché de datos")
+        self.guardar_cache(df)
         
-        print(f"📊 Columnas detectadas: {len(chunk_sample.columns)}")
+        # Generar estadísticas
+        _avisar(progreso, 0.45, "Generando estadísticas")
+        estadisticas = self._generar_estadisticas(df)
+        self.huella = huella_dataset(estadisticas)
         
-        # Procesar en chunks
-        chunks = []
-        total_filas = 0
-        chunk_size = 50000  # Ajustar según memoria disponible
+        # Muestras, tensores e índice temporal precalculados para las vistas
+        self._construir_precalculados(df, progreso=progreso)
+        _avisar(progreso, 0.95, "Construyendo la instantánea de arranque")
+        self.instantanea.construir(df, estadisticas)
         
-        try:
-            for chunk in pd.read_csv(self.ruta_archivo, 
-                                   delimiter=',',
-                                   on_bad_lines='skip',
-                                   low_memory=False,
-                                   dtype=str,
-                                   chunksize=chunk_size):
-                chunks.append(chunk)
-                total_filas += len(chunk)
-                if total_filas % (chunk_size * 10) == 0:  # Mostrar progreso cada 500k filas
-                    print(f"📥 Procesadas {total_filas:,} filas...")
-            
-            print(f"✅ Lectura completada: {total_filas:,} filas en total")
-            
-            # Combinar todos los chunks
-            print("🔗 Combinando chunks...")
-            df = pd.concat(chunks, ignore_index=True)
-            print(f"📊 DataFrame final: {len(df):,} filas, {len(df.columns)} columnas")
-            
-            return df
-            
-        except Exception as e:
-            print(f"❌ Error procesando CSV grande: {e}")
-            # Fallback: intentar cargar con configuración más permisiva
-            print("🔄 Intentando método alternativo...")
-            return pd.read_csv(self.ruta_archivo, 
-                             delimiter=',',
-                             on_bad_lines='skip',
-                             low_memory=True,  # Menos memoria pero más lento
-                             dtype=str,
-                             engine='python')  # Engine más robusto
+        # Las estadísticas se escriben al final y de una vez: su presencia indica
+        # a los demás procesos que la caché está completa
+        self.guardar_estadisticas(estadisticas)
+        
+        return {'datos': df, 'analisis': estadisticas}
+    
+    @property
+    def ruta_parquet(self):
+        """Parquet convertido del dataset fuente, junto al CSV"""
+        return self.ruta_archivo.replace('.csv', '.parquet')
+    
+    @property
+    def ruta_ajustes_parquet(self):
+        """
+        Ajustes de escritura Parquet elegidos para el dataset; van junto al CSV
+        para que las reconstrucciones de la caché los sigan usando
+        """
+        return self.ruta_archivo.replace('.csv', '_ajustes_parquet.json')
+    
+    def leer_dataset(self):
+        """Lee el dataset fuente: el Parquet convertido si existe, si no el CSV (y lo convierte)"""
+        if os.path.exists(self.ruta_parquet):
+            print("Cargando datos desde archivo Parquet...")
+            with medir_etapa('lectura_parquet', 'fuente'):
+                return pd.read_parquet(self.ruta_parquet)
+        return self.convertir_a_parquet()
+    
+    def convertir_a_parquet(self, autoajuste=False):
+        """
+        Convierte el CSV fuente a Parquet con los ajustes de escritura guardados
+        (o los elige con ``autoajuste``) y devuelve los datos convertidos
+        """
+        return convertir_csv(self.ruta_archivo, self.ruta_parquet, autoajuste=autoajuste,
+                             ruta_ajustes=self.ruta_ajustes_parquet)
+    
+    def guardar_cache(self, df):
+        """Escribe la caché de datos que leen las sesiones"""
+        os.makedirs(self.directorio_procesados, exist_ok=True)
+        temporal = f"{self.ruta_cache}.{os.getpid()}"
+        with medir_etapa('escritura_parquet', 'caché'):
+            escribir_parquet(df, temporal, cargar_ajustes(self.ruta_ajustes_parquet))
+        os.replace(temporal, self.ruta_cache)
+    
+    def guardar_estadisticas(self, estadisticas):
+        """Escribe ``estadisticas.json`` de una vez (temporal y renombrado)"""
+        os.makedirs(self.directorio_procesados, exist_ok=True)
+        temporal = f"{self.ruta_estadisticas}.{os.getpid()}"
+        with open(temporal, 'w') as f:
+            json.dump(estadisticas, f, indent=2, default=str)
+        os.replace(temporal, self.ruta_estadisticas)
+        self.huella = huella_dataset(estadisticas)
     
+    def huella_actual(self):
+        """Huella de la versión del dataset publicada (se lee de ``estadisticas.json`` si aún no se conoce)"""
+        if self.huella is None:
+            self.cargar_analisis_cache()
+        return self.huella
+    
+    def _construir_precalculados(self, df, solo_desactualizados=False, progreso=None):
+        """
+        Construye las muestras estratificadas, los tensores de casos diarios, el
+        índice temporal de sumas acumuladas, los histogramas de retrasos y el
+        nowcast (solo los que no corresponden al dataset si ``solo_desactualizados``)
+        """
+        precalculados = [self.muestreador, *self.tensores.values(), self.indice_temporal, self.retrasos, self.nowcast]
+        for i, precalculado in enumerate(precalculados):
+            if not solo_desactualizados or not precalculado.esta_actualizado(self.huella):
+                _avisar(progreso, 0.5 + 0.45 * i / len(precalculados), f"Construyendo {type(precalculado).__name__}")
+                with medir_etapa('precalculados', type(precalculado).__name__):
+                    precalculado.construir(df, self.huella)
+    
+    @medido('estadisticas')
     def _generar_estadisticas(self, df):
         """Genera estadísticas básicas del dataset"""
         estadisticas = {
@@ -300,6 +388,49 @@ class ProcesadorCOVID:
                     'max': int(edad_series.max())
                 }
         
+        # Conteos de todas las categorías en orden descendente para los tableros
+        if 'departamento_nom' in df.columns:
+            estadisticas['top_departamentos'] = conteo_por_columna(df['departamento_nom']).to_dict()
+        # Municipios por código DIVIPOLA, con el nombre (y el departamento si se repite) como etiqueta
+        codigos_municipio, municipios = codificar_municipios(df)
+        if len(municipios):
+            conteos = pd.Series(conteo_1d(codigos_municipio, len(municipios)), index=municipios)
+            estadisticas['top_municipios'] = conteos[conteos > 0].sort_values(ascending=False, kind='stable').to_dict()
+        
+        for clave, columnas in COLUMNAS_CONTEO.items():
+            columna = next((c for c in columnas if c in df.columns), None)
+            if columna is not None:
+                serie = df[columna]
+                if columna == 'per_etn_':
+                    # El código llega como número o como texto; lo que no es código se deja igual
+                    serie = pd.to_numeric(serie, errors='coerce').map(ETNIAS).fillna(serie)
+                estadisticas[clave] = conteo_por_columna(serie).to_dict()
+        
+        # Casos por mes y por semana (terminada en domingo); la última semana se
+        # omite si aún no está completa para no simular una caída
+        if 'fecha_de_notificación' in df.columns:
+            for clave, frecuencia in (('casos_por_mes', 'M'), ('casos_por_semana', 'W')):
+                codigos, periodos = codigos_periodo(df['fecha_de_notificación'], frecuencia)
+                conteos = conteo_1d(codigos, len(periodos))
+                estadisticas[clave] = {str(p.astype('datetime64[D]')): int(c) for p, c in zip(periodos, conteos)}
+            semanas = estadisticas['casos_por_semana']
+            if semanas and pd.Timestamp(df['fecha_de_notificación'].max()).dayofweek != 6:
+                semanas.pop(max(semanas))
+        
+        # Distribución por grupo de edad, total y por sexo (los cortes de la pirámide)
+        if 'edad' in df.columns:
+            codigos_grupo, grupos = codigos_edad(df['edad'])
+            estadisticas['distribucion_por_edad'] = {
+                grupo: int(c) for grupo, c in zip(grupos, conteo_1d(codigos_grupo, len(grupos)))
+            }
+            if 'sexo' in df.columns:
+                codigos_sexo, sexos = codificar(df['sexo'])
+                conteos = conteo_2d(codigos_grupo, len(grupos), codigos_sexo, len(sexos))
+                estadisticas['distribucion_por_edad_y_sexo'] = {
+                    str(sexo): {grupo: int(c) for grupo, c in zip(grupos, conteos[:, j])}
+                    for j, sexo in enumerate(sexos)
+                }
+        
         return estadisticas
         
     def cargar_desde_cache(self):
@@ -312,14 +443,124 @@ class ProcesadorCOVID:
         """Carga análisis desde el archivo de caché"""
         if os.path.exists(self.ruta_estadisticas):
             with open(self.ruta_estadisticas, 'r') as f:
-                return json.load(f)
+                estadisticas = json.load(f)
+            self.huella = huella_dataset(estadisticas)
+            return estadisticas
         return None
         
+    @medido('muestra')
     def obtener_muestreo_aleatorio(self, df, tamaño_muestra=50000):
-        """Obtiene un muestreo aleatorio del dataset para visualización"""
-        if df is not None and len(df) > tamaño_muestra:
-            return df.sample(n=tamaño_muestra, random_state=42)
-        return df
+        """
+        Obtiene una muestra del dataset para visualización.
+        Usa el nivel precalculado de muestreo estratificado (departamento × mes)
+        más pequeño que cubre el tamaño pedido; las muestras se construyen y
+        guardan en disco la primera vez.
+        """
+        if df is None or len(df) <= tamaño_muestra:
+            return df
+        
+        try:
+            if not self.muestreador.esta_actualizado(self.huella_actual()):
+                self.muestreador.construir(df, self.huella_actual())
+            nivel = self.muestreador.nivel_para_tamaño(tamaño_muestra)
+            if nivel is not None:
+                return self.muestreador.cargar_muestra(nivel)
+        except Exception as e:
+            print(f"⚠️  No se pudo usar la muestra estratificada: {e}")
+        
+        return df.sample(n=tamaño_muestra, random_state=42)
+    
+    def obtener_tensor(self, df, nivel='departamentos'):
+        """
+        Tensor de casos diarios por región × día × estado del nivel pedido
+        ('departamentos' o 'municipios'); se construye si no corresponde al dataset
+        """
+        tensor = self.tensores[nivel]
+        if df is not None and not tensor.esta_actualizado(self.huella_actual()):
+            tensor.construir(df, self.huella_actual())
+        return tensor if tensor.metadatos() is not None else None
+    
+    def obtener_indicadores(self, df, nivel='departamentos'):
+        """
+        Indicadores epidemiológicos de todas las regiones del nivel pedido, calculados
+        en lote desde el tensor de casos; se recalculan si no corresponden al dataset
+        """
+        indicadores = self.indicadores[nivel]
+        if df is not None and not indicadores.esta_actualizado(self.huella_actual()):
+            tensor = self.obtener_tensor(df, nivel)
+            if tensor is None:
+                return None
+            indicadores.construir(tensor)
+        return indicadores if indicadores.metadatos() is not None else None
+    
+    def obtener_pronosticos(self, df, nivel='departamentos'):
+        """
+        Pronósticos de casos de todas las regiones del nivel pedido, ajustados en
+        paralelo desde el tensor de casos; se recalculan si no corresponden al dataset
+        """
+        pronosticos = self.pronosticos[nivel]
+        if df is not None and not pronosticos.esta_actualizado(self.huella_actual()):
+            tensor = self.obtener_tensor(df, nivel)
+            if tensor is None or not pronosticos.construir(tensor):
+                return None
+        return pronosticos if pronosticos.metadatos() is not None else None
+    
+    def obtener_cambios(self, df, nivel='departamentos'):
+        """
+        Cambios de tendencia y días anómalos de todas las regiones del nivel pedido;
+        si el dataset cambió solo se procesan los días nuevos y los de revisión
+        """
+        cambios = self.cambios[nivel]
+        if df is not None and not cambios.esta_actualizado(self.huella_actual()):
+            tensor = self.obtener_tensor(df, nivel)
+            if tensor is None or not cambios.construir(tensor):
+                return None
+        return cambios if cambios.metadatos() is not None else None
+    
+    def obtener_retrasos(self, df):
+        """Histogramas de retrasos entre fechas; se recalculan si no corresponden al dataset"""
+        if df is not None and not self.retrasos.esta_actualizado(self.huella_actual()):
+            self.retrasos.construir(df, self.huella_actual())
+        return self.retrasos if self.retrasos.metadatos() is not None else None
+    
+    def obtener_nowcast(self, df):
+        """
+        Nowcast de los casos recientes por departamento corregido por el retraso
+        de reporte; se recalcula si no corresponde al dataset
+        """
+        if df is not None and not self.nowcast.esta_actualizado(self.huella_actual()):
+            self.nowcast.construir(df, self.huella_actual())
+        return self.nowcast if self.nowcast.metadatos() is not None else None
+    
+    def obtener_geometrias(self, nivel='departamentos'):
+        """
+        Geometrías simplificadas del nivel pedido; se regeneran si cambió el archivo
+        de límites y son None si no hay archivo
+        """
+        geometrias = self.geometrias[nivel]
+        if not geometrias.esta_actualizado() and not geometrias.construir():
+            return None
+        return geometrias
+    
+    def obtener_indice_temporal(self, df):
+        """Índice de sumas acumuladas por día; se construye si no corresponde al dataset"""
+        if df is not None and not self.indice_temporal.esta_actualizado(self.huella_actual()):
+            self.indice_temporal.construir(df, self.huella_actual())
+        return self.indice_temporal if self.indice_temporal.metadatos() is not None else None
+    
+    def obtener_muestra_filtrada(self, df, departamentos=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Devuelve la muestra precalculada más pequeña que conserva suficientes filas
+        por estrato para el filtro dado, junto con su nivel (None = datos completos)
+        """
+        nivel = self.muestreador.seleccionar_nivel(
+            departamentos=departamentos,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin
+        )
+        if nivel is None:
+            return df, None
+        return self.muestreador.cargar_muestra(nivel), nivel
         
     def filtrar_por_fecha(self, df, fecha_inicio=None, fecha_fin=None):
         """Filtra el dataframe por rango de fechas"""
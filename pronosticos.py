@@ -0,0 +1,252 @@
+"""
+Pronósticos de casos diarios para todas las regiones.
+
+Se ajustan dos modelos ligeros sobre el logaritmo de la media móvil de 7 días
+de cada región: suavizado exponencial de Holt con tendencia amortiguada y
+crecimiento log-lineal de las últimas semanas. Cada bloque de regiones se
+ajusta vectorizado (todas las filas de la matriz región × día a la vez) y los
+bloques se reparten entre procesos; el error de cada modelo se mide con un
+pronóstico retrospectivo de las últimas dos semanas. El resultado se guarda
+por versión del dataset.
+"""
+
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from indicadores import suma_movil
+from huella_datos import corresponde
+
+HORIZONTE = 28
+DIAS_VALIDACION = 14
+VENTANA_AJUSTE = 90
+VENTANA_LOG_LINEAL = 21
+MODELOS = {
+    'holt': 'Suavizado exponencial (Holt amortiguado)',
+    'log_lineal': 'Crecimiento log-lineal'
+}
+
+# Rejilla de parámetros del suavizado; la amortiguación de la tendencia es fija
+ALFAS = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
+BETAS = np.array([0.01, 0.05, 0.1, 0.2, 0.3])
+AMORTIGUACION = 0.98
+Z_95 = 1.959964
+
+# Los bloques pequeños se ajustan en el mismo proceso: lanzar procesos cuesta más
+MIN_REGIONES_POR_PROCESO = 64
+
+
+def logaritmo_media_semanal(casos):
+    """log(1 + media móvil de 7 días) de cada región (eje 0) y día (eje 1)"""
+    return np.log1p(suma_movil(np.asarray(casos, dtype=np.float64), 7) / 7)
+
+
+def ajustar_holt(y, horizonte=HORIZONTE, alfas=ALFAS, betas=BETAS, amortiguacion=AMORTIGUACION):
+    """
+    Holt con tendencia amortiguada para cada fila de ``y`` (región × día), con
+    alfa y beta elegidos por región en la rejilla minimizando el error a un paso.
+    Devuelve el pronóstico (región × horizonte) y su desviación estándar.
+    """
+    n_regiones, n_dias = y.shape
+    alfa = np.repeat(alfas, len(betas))[:, np.newaxis, np.newaxis]
+    beta = np.tile(betas, len(alfas))[:, np.newaxis, np.newaxis]
+    forma = (alfa.shape[0], n_regiones, 1)
+    nivel = np.broadcast_to(y[:, :1], forma).copy()
+    tendencia = np.broadcast_to(y[:, 1:2] - y[:, :1], forma).copy()
+    errores = np.zeros(forma)
+    
+    # Una sola pasada por los días para todas las combinaciones y regiones a la vez
+    for t in range(1, n_dias):
+        prediccion = nivel + amortiguacion * tendencia
+        error = y[np.newaxis, :, t:t + 1] - prediccion
+        errores += error ** 2
+        nuevo_nivel = prediccion + alfa * error
+        tendencia = amortiguacion * tendencia + alfa * beta * error
+        nivel = nuevo_nivel
+    
+    mejor = np.argmin(errores[..., 0], axis=0)
+    regiones = np.arange(n_regiones)
+    nivel, tendencia = nivel[mejor, regiones], tendencia[mejor, regiones]
+    alfa, beta = alfa[mejor, 0], beta[mejor, 0]
+    sigma = np.sqrt(errores[mejor, regiones] / max(n_dias - 3, 1))
+    
+    # ŷ(h) = nivel + (φ + φ² + ... + φ^h) · tendencia
+    pasos = np.arange(1, horizonte + 1)
+    suma_amortiguacion = np.cumsum(amortiguacion ** pasos)
+    pronostico = nivel + suma_amortiguacion[np.newaxis, :] * tendencia
+    # Var(h) = σ² (1 + Σ_{j<h} c_j²), c_j = α (1 + β (φ + ... + φ^j))
+    coeficientes = alfa * (1 + beta * suma_amortiguacion[np.newaxis, :-1])
+    acumulado = np.concatenate([np.zeros((n_regiones, 1)), np.cumsum(coeficientes ** 2, axis=1)], axis=1)
+    return pronostico, sigma * np.sqrt(1 + acumulado)
+
+
+def ajustar_log_lineal(y, horizonte=HORIZONTE, ventana=VENTANA_LOG_LINEAL):
+    """
+    Recta por mínimos cuadrados sobre los últimos ``ventana`` días de cada fila
+    de ``y``; devuelve el pronóstico, su desviación estándar y la pendiente
+    (tasa de crecimiento diaria)
+    """
+    y = y[:, -ventana:]
+    n = y.shape[1]
+    t = np.arange(n, dtype=np.float64)
+    t_medio = t.mean()
+    sxx = ((t - t_medio) ** 2).sum()
+    pendiente = ((y - y.mean(axis=1, keepdims=True)) * (t - t_medio)).sum(axis=1, keepdims=True) / sxx
+    intercepto = y.mean(axis=1, keepdims=True) - pendiente * t_medio
+    residuos = y - (intercepto + pendiente * t)
+    sigma = np.sqrt((residuos ** 2).sum(axis=1, keepdims=True) / (n - 2))
+    
+    futuro = np.arange(n, n + horizonte, dtype=np.float64)
+    pronostico = intercepto + pendiente * futuro
+    desviacion = sigma * np.sqrt(1 + 1 / n + (futuro - t_medio) ** 2 / sxx)
+    return pronostico, desviacion, pendiente[:, 0]
+
+
+def error_relativo(pronostico, real):
+    """Error absoluto del pronóstico sobre el total real (WAPE) de cada región"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(real.sum(axis=1) > 0, np.abs(pronostico - real).sum(axis=1) / real.sum(axis=1), np.nan)
+
+
+def ajustar_bloque(casos, horizonte=HORIZONTE, dias_validacion=DIAS_VALIDACION, ventana=VENTANA_AJUSTE):
+    """
+    Ajusta los dos modelos a un bloque de regiones (región × día de casos) y los
+    valida contra sus últimos ``dias_validacion`` días. Se ejecuta en un proceso
+    del pool, por eso recibe y devuelve solo arreglos.
+    """
+    y = logaritmo_media_semanal(casos)[:, -(ventana + dias_validacion):]
+    entrenamiento, validacion = y[:, :-dias_validacion], np.expm1(y[:, -dias_validacion:])
+    
+    resultado = {}
+    for modelo in MODELOS:
+        ajustar = ajustar_holt if modelo == 'holt' else ajustar_log_lineal
+        previo = ajustar(entrenamiento, dias_validacion)[0]
+        pronostico, desviacion = ajustar(y[:, -ventana:], horizonte)[:2]
+        resultado[f'{modelo}__estimado'] = np.expm1(pronostico).clip(0)
+        resultado[f'{modelo}__inferior'] = np.expm1(pronostico - Z_95 * desviacion).clip(0)
+        resultado[f'{modelo}__superior'] = np.expm1(pronostico + Z_95 * desviacion)
+        resultado[f'{modelo}__error'] = error_relativo(np.expm1(previo).clip(0), validacion)
+    resultado['crecimiento_diario'] = ajustar_log_lineal(y[:, -ventana:], horizonte)[2]
+    resultado['ultimo_valor'] = np.expm1(y[:, -1])
+    return resultado
+
+
+def ajustar_en_paralelo(casos, max_procesos=None, **parametros):
+    """
+    Reparte las regiones en bloques y los ajusta en un pool de procesos; con
+    pocas regiones (o un solo procesador) se ajusta todo en el proceso actual
+    """
+    n_regiones = casos.shape[0]
+    max_procesos = max_procesos or os.cpu_count() or 1
+    n_bloques = int(min(max_procesos, max(1, n_regiones // MIN_REGIONES_POR_PROCESO)))
+    if n_bloques <= 1:
+        return ajustar_bloque(casos, **parametros), 1
+    
+    bloques = np.array_split(np.arange(n_regiones), n_bloques)
+    with ProcessPoolExecutor(max_workers=n_bloques) as pool:
+        futuros = [pool.submit(ajustar_bloque, np.ascontiguousarray(casos[indices]), **parametros) for indices in bloques]
+        resultados = [futuro.result() for futuro in futuros]
+    return {nombre: np.concatenate([r[nombre] for r in resultados]) for nombre in resultados[0]}, n_bloques
+
+
+class PronosticosCasos:
+    def __init__(self, directorio='datos_procesados/pronosticos', nombre='departamentos',
+                 horizonte=HORIZONTE, max_procesos=None):
+        self.directorio = directorio
+        self.nombre = nombre
+        self.horizonte = horizonte
+        self.max_procesos = max_procesos
+        self.ruta_pronosticos = os.path.join(directorio, f'{nombre}.npz')
+        self.ruta_metadatos = os.path.join(directorio, f'{nombre}.json')
+        self._pronosticos = None
+        self._metadatos = None
+    
+    def construir(self, tensor):
+        """Ajusta los modelos para todas las regiones de un TensorCasos y guarda los pronósticos"""
+        metadatos_tensor = tensor.metadatos()
+        if metadatos_tensor is None or metadatos_tensor['n_dias'] < VENTANA_LOG_LINEAL + DIAS_VALIDACION + 7:
+            return False
+        
+        print(f"🔮 Ajustando pronósticos por {self.nombre}...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        inicio = time.perf_counter()
+        casos = np.asarray(tensor.tensor().sum(axis=2), dtype=np.float64)
+        pronosticos, n_procesos = ajustar_en_paralelo(casos, self.max_procesos, horizonte=self.horizonte)
+        pronosticos = {nombre: valores.astype(np.float32) for nombre, valores in pronosticos.items()}
+        np.savez(self.ruta_pronosticos, **pronosticos)
+        segundos = time.perf_counter() - inicio
+        
+        fechas = tensor.fechas()
+        metadatos = {
+            'huella': metadatos_tensor.get('huella'),
+            'total_registros': metadatos_tensor['total_registros'],
+            'regiones': metadatos_tensor['regiones'],
+            'ultima_fecha': str(fechas[-1].date()),
+            'horizonte': self.horizonte,
+            'dias_validacion': DIAS_VALIDACION,
+            'procesos': n_procesos,
+            'segundos': round(segundos, 3)
+        }
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2, ensure_ascii=False)
+        
+        print(f"   ✅ {len(metadatos['regiones']):,} regiones × {self.horizonte} días "
+              f"en {segundos:.2f}s ({n_procesos} proceso{'s' if n_procesos > 1 else ''})")
+        self._pronosticos = pronosticos
+        self._metadatos = metadatos
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self, huella):
+        """Indica si los pronósticos guardados corresponden a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return corresponde(metadatos, huella) and os.path.exists(self.ruta_pronosticos)
+    
+    def pronosticos(self):
+        if self._pronosticos is None:
+            with np.load(self.ruta_pronosticos) as archivo:
+                self._pronosticos = {nombre: archivo[nombre] for nombre in archivo.files}
+        return self._pronosticos
+    
+    def regiones(self):
+        return self.metadatos()['regiones']
+    
+    def fechas(self):
+        """Días pronosticados, a partir del día siguiente al último dato"""
+        metadatos = self.metadatos()
+        inicio = pd.Timestamp(metadatos['ultima_fecha']) + pd.Timedelta(days=1)
+        return pd.date_range(inicio, periods=metadatos['horizonte'], freq='D')
+    
+    def serie(self, region, modelo='holt'):
+        """Pronóstico diario (media de 7 días) de una región con su intervalo del 95%"""
+        fila = self.regiones().index(region)
+        pronosticos = self.pronosticos()
+        return pd.DataFrame({
+            'estimado': pronosticos[f'{modelo}__estimado'][fila],
+            'limite_inferior': pronosticos[f'{modelo}__inferior'][fila],
+            'limite_superior': pronosticos[f'{modelo}__superior'][fila]
+        }, index=pd.Index(self.fechas(), name='Fecha'))
+    
+    def resumen(self, modelo='holt'):
+        """Por región: casos diarios actuales, pronóstico al final del horizonte y error de validación"""
+        pronosticos = self.pronosticos()
+        actual = pronosticos['ultimo_valor']
+        final = pronosticos[f'{modelo}__estimado'][:, -1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variacion = np.where(actual > 0, (final / actual - 1) * 100, np.nan)
+        return pd.DataFrame({
+            'actual': actual,
+            'pronostico': final,
+            'variacion': variacion,
+            'crecimiento_diario': pronosticos['crecimiento_diario'] * 100,
+            **{f'error_{m}': pronosticos[f'{m}__error'] * 100 for m in MODELOS}
+        }, index=pd.Index(self.regiones(), name='Región'))
@@ -0,0 +1,183 @@
+"""
+Reconstrucción de la caché en segundo plano con publicación atómica.
+
+"Forzar Actualización" ya no borra la caché y procesa dentro de la petición:
+un hilo construye todos los artefactos en un directorio nuevo
+``datos_procesados/versiones/<versión>`` y, al terminar, la publica
+reemplazando de una vez con ``os.replace`` el archivo ``VERSION_ACTUAL``, que
+nombra la versión vigente. Las sesiones resuelven su directorio al crear el
+procesador: hasta ese reemplazo ven la versión anterior completa y después la
+nueva completa, nunca una mezcla. Se conserva la versión anterior (las sesiones
+abiertas siguen leyendo de ella) y se borran las más viejas. La reconstrucción
+toma el mismo bloqueo ``.construccion.lock`` que la construcción inicial, así
+que nunca corren dos construcciones a la vez sobre el mismo directorio.
+
+Sin ``VERSION_ACTUAL`` (la primera construcción o una caché anterior a las
+versiones) los artefactos están directamente en ``datos_procesados``.
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+
+from huella_datos import huella_dataset
+from bloqueo_cache import BloqueoConstruccion
+
+DIRECTORIO_PROCESADOS = 'datos_procesados'
+DIRECTORIO_VERSIONES = 'versiones'
+ARCHIVO_VERSION = 'VERSION_ACTUAL'
+ARCHIVO_BLOQUEO = '.construccion.lock'
+ARCHIVO_ESTADISTICAS = 'estadisticas.json'
+
+# Artefactos de una caché construida directamente en la raíz (sin versiones)
+ARTEFACTOS_RAIZ = [
+    'datos_covid.parquet', ARCHIVO_ESTADISTICAS, 'muestras', 'tensor', 'indice_temporal', 'instantanea',
+    'retrasos', 'nowcast', 'indicadores', 'pronosticos', 'cambios', 'geometrias'
+]
+
+
+def version_publicada(raiz=DIRECTORIO_PROCESADOS):
+    """Nombre de la versión que indica ``VERSION_ACTUAL`` (None si no hay o su directorio no existe)"""
+    try:
+        with open(os.path.join(raiz, ARCHIVO_VERSION), 'r') as f:
+            nombre = f.read().strip()
+    except FileNotFoundError:
+        return None
+    if not nombre or not os.path.isdir(os.path.join(raiz, DIRECTORIO_VERSIONES, nombre)):
+        return None
+    return nombre
+
+
+def directorio_publicado(raiz=DIRECTORIO_PROCESADOS):
+    """Directorio con los artefactos de la versión publicada: el de la versión vigente o la raíz"""
+    nombre = version_publicada(raiz)
+    return raiz if nombre is None else os.path.join(raiz, DIRECTORIO_VERSIONES, nombre)
+
+
+def publicar(raiz, nombre):
+    """Hace vigente la versión ``nombre`` reemplazando ``VERSION_ACTUAL`` en un solo paso"""
+    temporal = os.path.join(raiz, f'.{ARCHIVO_VERSION}.tmp')
+    with open(temporal, 'w') as f:
+        f.write(nombre)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, os.path.join(raiz, ARCHIVO_VERSION))
+
+
+def descartar_versiones(raiz, conservar):
+    """Borra las versiones que no están en ``conservar`` (None representa la caché en la raíz)"""
+    directorio_versiones = os.path.join(raiz, DIRECTORIO_VERSIONES)
+    if os.path.isdir(directorio_versiones):
+        for nombre in os.listdir(directorio_versiones):
+            if nombre not in conservar:
+                shutil.rmtree(os.path.join(directorio_versiones, nombre), ignore_errors=True)
+    if None not in conservar:
+        for artefacto in ARTEFACTOS_RAIZ:
+            ruta = os.path.join(raiz, artefacto)
+            if os.path.isdir(ruta):
+                shutil.rmtree(ruta, ignore_errors=True)
+            elif os.path.exists(ruta):
+                os.remove(ruta)
+
+
+class ReconstructorCache:
+    def __init__(self, ruta_archivo='Casos_positivos_de_COVID-19_en_Colombia.csv', directorio=DIRECTORIO_PROCESADOS):
+        self.ruta_archivo = ruta_archivo
+        self.directorio = directorio
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._estado = {
+            'estado': 'inactivo',
+            'fraccion': 0.0,
+            'mensaje': '',
+            'error': None,
+            'inicio': None,
+            'fin': None,
+            'version': None
+        }
+    
+    def _actualizar(self, **cambios):
+        with self._lock:
+            self._estado.update(cambios)
+    
+    def _progreso(self, fraccion, mensaje):
+        self._actualizar(fraccion=fraccion, mensaje=mensaje)
+    
+    def iniciar(self):
+        """Lanza la reconstrucción en un hilo; devuelve False si ya hay una en curso"""
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return False
+            self._estado.update(estado='en_curso', fraccion=0.0, mensaje='Preparando', error=None,
+                                inicio=time.time(), fin=None, version=None)
+            self._hilo = threading.Thread(target=self._ejecutar, name='reconstruccion-cache', daemon=True)
+            self._hilo.start()
+        return True
+    
+    def _ejecutar(self):
+        # El procesador (y pandas) se importa en el hilo: consultar el estado en
+        # cada rerun de la aplicación no debe cargarlos
+        from procesamiento import ProcesadorCOVID
+        
+        # Si otro proceso ya está construyendo, se espera su resultado en lugar de repetirlo
+        bloqueo = BloqueoConstruccion(os.path.join(self.directorio, ARCHIVO_BLOQUEO))
+        if not bloqueo.adquirir():
+            print("⏳ Otro proceso está construyendo la caché; esperando su resultado...")
+            bloqueo.esperar(al_avanzar=lambda marca: self._progreso(
+                marca.get('fraccion') or 0.0, f"Otro proceso: {marca.get('etapa')}"
+            ))
+            self._actualizar(estado='terminado', fraccion=1.0, mensaje='Nueva versión lista', fin=time.time(),
+                             version=self._version_publicada())
+            return
+        
+        def avisar_y_marcar(fraccion, mensaje):
+            bloqueo.marcar(mensaje, fraccion)
+            self._progreso(fraccion, mensaje)
+        
+        anterior = version_publicada(self.directorio)
+        directorio_versiones = os.path.join(self.directorio, DIRECTORIO_VERSIONES)
+        os.makedirs(directorio_versiones, exist_ok=True)
+        version = tempfile.mkdtemp(prefix=time.strftime('%Y%m%d-%H%M%S-'), dir=directorio_versiones)
+        try:
+            print(f"🔄 Reconstruyendo la caché en {version}...")
+            # El bloqueo de la raíz ya está tomado: se construye directamente, sin el de cargar_datos
+            procesador = ProcesadorCOVID(self.ruta_archivo, directorio_procesados=version)
+            resultado = procesador._construir_cache(avisar_y_marcar)
+            avisar_y_marcar(0.97, "Publicando la nueva versión")
+            publicar(self.directorio, os.path.basename(version))
+            descartar_versiones(self.directorio, {os.path.basename(version), anterior})
+            self._actualizar(estado='terminado', fraccion=1.0, mensaje='Nueva versión lista', fin=time.time(),
+                             version=huella_dataset(resultado['analisis']))
+            print(f"   ✅ Caché reconstruida en {time.time() - self._estado['inicio']:.1f}s")
+        except Exception as e:
+            shutil.rmtree(version, ignore_errors=True)
+            self._actualizar(estado='error', error=str(e), fin=time.time())
+            print(f"❌ Error al reconstruir la caché: {e}")
+        finally:
+            bloqueo.liberar()
+    
+    def _version_publicada(self):
+        """Huella de las estadísticas de la versión publicada"""
+        try:
+            with open(os.path.join(directorio_publicado(self.directorio), ARCHIVO_ESTADISTICAS), 'r') as f:
+                return huella_dataset(json.load(f))
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def estado(self):
+        """Copia del estado: 'inactivo', 'en_curso', 'terminado' o 'error', con avance y mensaje"""
+        with self._lock:
+            return dict(self._estado)
+    
+    def en_curso(self):
+        return self.estado()['estado'] == 'en_curso'
+    
+    def esperar(self, timeout=None):
+        """Espera a que termine la reconstrucción en curso (útil en scripts)"""
+        hilo = self._hilo
+        if hilo is not None:
+            hilo.join(timeout)
+        return not self.en_curso()
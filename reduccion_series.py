@@ -0,0 +1,111 @@
+"""
+Reducción de series temporales antes de enviarlas al navegador.
+
+Largest-Triangle-Three-Buckets (LTTB) conserva la forma visual de la curva y
+sus picos con un número de puntos ligado al ancho del gráfico; la variante por
+cubetas min/max conserva exactamente los extremos de cada cubeta.
+"""
+
+import numpy as np
+import pandas as pd
+
+ANCHO_GRAFICO_PX = 1200
+PUNTOS_POR_PIXEL = 1.0
+TIPOS_SERIE = ('scatter', 'scattergl')
+
+
+def puntos_objetivo(ancho_px=None, puntos_por_pixel=PUNTOS_POR_PIXEL):
+    """Número de puntos por traza que el ancho del gráfico puede mostrar"""
+    return max(int((ancho_px or ANCHO_GRAFICO_PX) * puntos_por_pixel), 3)
+
+
+def a_numerico(valores):
+    """Convierte fechas u otros ejes a float64 para los cálculos de área"""
+    arreglo = np.asarray(valores)
+    if np.issubdtype(arreglo.dtype, np.number):
+        return arreglo.astype(np.float64)
+    fechas = pd.to_datetime(pd.Series(arreglo), errors='coerce')
+    return fechas.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+
+
+def lttb(x, y, n_objetivo):
+    """Índices de los puntos elegidos por Largest-Triangle-Three-Buckets"""
+    n = len(y)
+    if n_objetivo >= n or n_objetivo < 3:
+        return np.arange(n)
+    
+    x = a_numerico(x)
+    y = np.asarray(y, dtype=np.float64)
+    bordes = np.linspace(1, n - 1, n_objetivo - 1).astype(np.int64)
+    indices = np.empty(n_objetivo, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    a = 0
+    for i in range(n_objetivo - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        siguiente_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        prom_x = x[fin:siguiente_fin].mean()
+        prom_y = np.nanmean(y[fin:siguiente_fin]) if np.isfinite(y[fin:siguiente_fin]).any() else y[a]
+        
+        # Área del triángulo entre el punto elegido antes, cada candidato y el
+        # promedio de la cubeta siguiente
+        area = np.abs(
+            (x[a] - prom_x) * (y[inicio:fin] - y[a])
+            - (x[a] - x[inicio:fin]) * (prom_y - y[a])
+        )
+        area = np.where(np.isnan(area), -1.0, area)
+        a = inicio + int(np.argmax(area))
+        indices[i + 1] = a
+    
+    return indices
+
+
+def minmax_por_cubetas(y, n_objetivo):
+    """Índices del mínimo y el máximo de cada cubeta (más los extremos de la serie)"""
+    n = len(y)
+    if n_objetivo >= n or n_objetivo < 4:
+        return np.arange(n)
+    
+    y = np.asarray(y, dtype=np.float64)
+    n_cubetas = n_objetivo // 2
+    cubeta = (np.arange(n) * n_cubetas) // n
+    valores = np.where(np.isnan(y), -np.inf, y)
+    orden = np.lexsort((valores, cubeta))
+    limites = np.flatnonzero(np.diff(cubeta[orden])) + 1
+    primeros = np.concatenate(([0], limites))
+    ultimos = np.concatenate((limites - 1, [n - 1]))
+    return np.unique(np.concatenate((orden[primeros], orden[ultimos], [0, n - 1])))
+
+
+def reducir_serie(x, y, n_objetivo, metodo='lttb'):
+    """Índices a conservar de una serie según el método elegido"""
+    if metodo == 'minmax':
+        return minmax_por_cubetas(y, n_objetivo)
+    return lttb(x, y, n_objetivo)
+
+
+def reducir_figura(fig, ancho_px=None, metodo='lttb'):
+    """
+    Reduce en el lugar cada traza de línea de la figura al número de puntos que
+    admite el ancho del gráfico. Los arreglos por punto (texto, customdata) se
+    recortan con los mismos índices.
+    """
+    n_objetivo = puntos_objetivo(ancho_px)
+    for traza in fig.data:
+        if traza.type not in TIPOS_SERIE or traza.x is None or traza.y is None:
+            continue
+        n = len(traza.y)
+        if n <= n_objetivo:
+            continue
+        indices = reducir_serie(traza.x, traza.y, n_objetivo, metodo)
+        cambios = {
+            'x': np.asarray(traza.x)[indices],
+            'y': np.asarray(traza.y)[indices]
+        }
+        for atributo in ('text', 'hovertext', 'customdata'):
+            valor = getattr(traza, atributo, None)
+            if valor is not None and not isinstance(valor, str) and len(valor) == n:
+                cambios[atributo] = np.asarray(valor)[indices]
+        traza.update(cambios)
+    return fig
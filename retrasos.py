@@ -0,0 +1,192 @@
+"""
+Distribuciones de retrasos entre las fechas de cada caso.
+
+Los retrasos (inicio de síntomas → diagnóstico, diagnóstico → reporte, inicio
+de síntomas → muerte o recuperación) se calculan como diferencias de días en
+int16 sobre todas las filas y se agregan en histogramas por departamento,
+grupo de edad y mes con los kernels de conteo. Los cuantiles salen del
+histograma acumulado, sin ordenar las filas. El resultado se guarda por
+versión del dataset.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from kernels_conteo import codificar, codigos_edad, codigos_periodo, conteo_1d, conteo_2d
+from muestreo import COLUMNA_DEPARTAMENTO, COLUMNA_FECHA, SIN_DATO
+from huella_datos import corresponde
+
+# Retraso: (fecha inicial, fecha final)
+RETRASOS = {
+    'inicio_diagnostico': ('fecha_inicio_sintomas', 'fecha_diagnostico'),
+    'diagnostico_reporte': ('fecha_diagnostico', 'fecha_reporte_web'),
+    'inicio_muerte': ('fecha_inicio_sintomas', 'fecha_muerte'),
+    'inicio_recuperacion': ('fecha_inicio_sintomas', 'fecha_recuperado')
+}
+NOMBRES_RETRASOS = {
+    'inicio_diagnostico': 'Inicio de síntomas → diagnóstico',
+    'diagnostico_reporte': 'Diagnóstico → reporte',
+    'inicio_muerte': 'Inicio de síntomas → muerte',
+    'inicio_recuperacion': 'Inicio de síntomas → recuperación'
+}
+AGRUPACIONES = ('departamento', 'grupo_edad', 'mes')
+
+# Los retrasos negativos o mayores a este máximo se consideran errores de captura
+MAX_RETRASO = 120
+SIN_RETRASO = np.iinfo(np.int16).min
+
+
+def dias(fechas):
+    """Días desde 1970-01-01 de cada fecha (y máscara de nulos)"""
+    valores = pd.to_datetime(fechas, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    nulos = np.isnat(valores)
+    return valores.astype('datetime64[D]').astype(np.int64), nulos
+
+
+def retraso_en_dias(inicio, fin):
+    """
+    Diferencia en días (int16) entre dos columnas de fechas, dadas como series o
+    como el resultado de ``dias()``; SIN_RETRASO si falta alguna
+    """
+    dias_inicio, nulos_inicio = inicio if isinstance(inicio, tuple) else dias(inicio)
+    dias_fin, nulos_fin = fin if isinstance(fin, tuple) else dias(fin)
+    diferencia = np.clip(dias_fin - dias_inicio, SIN_RETRASO + 1, np.iinfo(np.int16).max).astype(np.int16)
+    diferencia[nulos_inicio | nulos_fin] = SIN_RETRASO
+    return diferencia
+
+
+def cuantiles_histograma(histogramas, cuantiles):
+    """Cuantiles (en días) de cada fila de una matriz de histogramas por día"""
+    totales = histogramas.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distribucion = np.cumsum(histogramas, axis=1) / totales
+    resultado = np.stack([np.argmax(distribucion >= q, axis=1) for q in cuantiles], axis=1).astype(np.float64)
+    resultado[totales[:, 0] == 0] = np.nan
+    return resultado
+
+
+class AnalizadorRetrasos:
+    def __init__(self, directorio='datos_procesados/retrasos', max_retraso=MAX_RETRASO):
+        self.directorio = directorio
+        self.max_retraso = max_retraso
+        self.ruta_histogramas = os.path.join(directorio, 'histogramas.npz')
+        self.ruta_metadatos = os.path.join(directorio, 'metadatos.json')
+        self._histogramas = None
+        self._metadatos = None
+    
+    @staticmethod
+    def codigos_agrupacion(df):
+        """Códigos y etiquetas de cada agrupación: departamento, grupo de edad y mes"""
+        agrupaciones = {}
+        if COLUMNA_DEPARTAMENTO in df.columns:
+            agrupaciones['departamento'] = codificar(df[COLUMNA_DEPARTAMENTO].astype(object).fillna(SIN_DATO))
+        if 'edad' in df.columns:
+            agrupaciones['grupo_edad'] = codigos_edad(df['edad'])
+        if COLUMNA_FECHA in df.columns:
+            codigos, meses = codigos_periodo(df[COLUMNA_FECHA], 'M')
+            agrupaciones['mes'] = (codigos, np.asarray([str(m) for m in meses], dtype=object))
+        return agrupaciones
+    
+    def construir(self, df, huella=None):
+        """Calcula los retrasos de todas las filas y guarda sus histogramas por agrupación"""
+        if df is None or len(df) == 0:
+            return False
+        
+        disponibles = {
+            nombre: columnas for nombre, columnas in RETRASOS.items()
+            if all(c in df.columns for c in columnas)
+        }
+        if not disponibles:
+            return False
+        
+        print("⏱️ Calculando distribuciones de retrasos...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        agrupaciones = self.codigos_agrupacion(df)
+        n_dias = self.max_retraso + 1
+        histogramas = {}
+        resumen = {}
+        # Cada columna de fecha se convierte a días una sola vez
+        dias_por_columna = {c: dias(df[c]) for c in {c for columnas in disponibles.values() for c in columnas}}
+        for nombre, (inicio, fin) in disponibles.items():
+            retraso = retraso_en_dias(dias_por_columna[inicio], dias_por_columna[fin])
+            validos = retraso != SIN_RETRASO
+            en_rango = validos & (retraso >= 0) & (retraso <= self.max_retraso)
+            codigos_retraso = np.where(en_rango, retraso, -1).astype(np.int64)
+            
+            histogramas[f'{nombre}__total'] = conteo_1d(codigos_retraso, n_dias)[np.newaxis, :]
+            for agrupacion, (codigos, etiquetas) in agrupaciones.items():
+                histogramas[f'{nombre}__{agrupacion}'] = conteo_2d(codigos, len(etiquetas), codigos_retraso, n_dias)
+            resumen[nombre] = {
+                'con_fechas': int(validos.sum()),
+                'en_rango': int(en_rango.sum()),
+                'fuera_de_rango': int((validos & ~en_rango).sum())
+            }
+        
+        np.savez(self.ruta_histogramas, **histogramas)
+        metadatos = {
+            'huella': huella,
+            'total_registros': int(len(df)),
+            'max_retraso': self.max_retraso,
+            'retrasos': list(disponibles),
+            'resumen': resumen,
+            'etiquetas': {agrupacion: [str(e) for e in etiquetas] for agrupacion, (_, etiquetas) in agrupaciones.items()}
+        }
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2, ensure_ascii=False)
+        
+        for nombre, valores in resumen.items():
+            print(f"   ✅ {NOMBRES_RETRASOS[nombre]}: {valores['en_rango']:,} casos "
+                  f"({valores['fuera_de_rango']:,} fuera de 0–{self.max_retraso} días)")
+        self._histogramas = histogramas
+        self._metadatos = metadatos
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self, huella):
+        """Indica si los histogramas guardados corresponden a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return corresponde(metadatos, huella) and os.path.exists(self.ruta_histogramas)
+    
+    def retrasos_disponibles(self):
+        metadatos = self.metadatos()
+        return [] if metadatos is None else metadatos['retrasos']
+    
+    def agrupaciones_disponibles(self):
+        metadatos = self.metadatos()
+        return [] if metadatos is None else [a for a in AGRUPACIONES if a in metadatos['etiquetas']]
+    
+    def _matriz(self, retraso, agrupacion=None):
+        if self._histogramas is None:
+            with np.load(self.ruta_histogramas) as archivo:
+                self._histogramas = {nombre: archivo[nombre] for nombre in archivo.files}
+        return self._histogramas[f"{retraso}__{agrupacion or 'total'}"]
+    
+    def histograma(self, retraso, agrupacion=None, grupo=None):
+        """Casos por día de retraso, en total o para un grupo de una agrupación"""
+        matriz = self._matriz(retraso, agrupacion)
+        fila = 0 if agrupacion is None else self.metadatos()['etiquetas'][agrupacion].index(grupo)
+        return pd.Series(matriz[fila], index=pd.RangeIndex(matriz.shape[1], name='Días'), name='Casos')
+    
+    def cuantiles(self, retraso, agrupacion=None, cuantiles=(0.25, 0.5, 0.75, 0.9)):
+        """Casos, media y cuantiles del retraso por grupo (o en total)"""
+        matriz = self._matriz(retraso, agrupacion)
+        etiquetas = ['Total'] if agrupacion is None else self.metadatos()['etiquetas'][agrupacion]
+        casos = matriz.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            media = (matriz * np.arange(matriz.shape[1])).sum(axis=1) / casos
+        tabla = pd.DataFrame(
+            cuantiles_histograma(matriz, cuantiles),
+            index=pd.Index(etiquetas, name=agrupacion or 'grupo'),
+            columns=[f'p{int(q * 100)}' for q in cuantiles]
+        )
+        tabla.insert(0, 'media', media)
+        tabla.insert(0, 'casos', casos)
+        return tabla[tabla['casos'] > 0]
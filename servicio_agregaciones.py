@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Servicio local de agregaciones sobre HTTP.
+
+Un solo proceso carga el dataset con ``ProcesadorCOVID`` y responde a todos
+los dashboards y scripts de la máquina: estadísticas, totales y conteos con los
+filtros de la barra lateral, series por periodo, la evolución diaria por región
+y las figuras de ``AnalizadorCOVID``. Las tablas viajan como JSON compacto
+(columnas + filas) o como Arrow IPC. La ETag de cada respuesta depende solo de
+la versión del dataset y de la consulta, así que un ``If-None-Match`` vigente
+se responde con 304 sin calcular nada; las respuestas recientes se guardan ya
+codificadas.
+
+Uso: ``python servicio_agregaciones.py [--host 127.0.0.1] [--puerto 8765]``
+"""
+
+import io
+import os
+import json
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import pandas as pd
+
+from procesamiento import ProcesadorCOVID
+from analisis import AnalizadorCOVID
+from huella_datos import huella_dataset
+from consultas_aproximadas import mascara_filtros
+from kernels_conteo import codigos_periodo, conteo_1d, conteo_por_columna
+from muestreo import COLUMNA_FECHA
+
+HOST_POR_DEFECTO = '127.0.0.1'
+PUERTO_POR_DEFECTO = 8765
+TIPO_JSON = 'application/json'
+TIPO_ARROW = 'application/vnd.apache.arrow.stream'
+MAX_RESPUESTAS = 256
+
+
+def filtros_de_consulta(consulta):
+    """Filtros de la barra lateral a partir de los parámetros de la URL (listas separadas por comas)"""
+    def lista(nombre):
+        valor = consulta.get(nombre)
+        return [v for v in valor.split(',') if v] if valor else None
+    return {
+        'departamentos': lista('departamentos'),
+        'estados': lista('estados'),
+        'fecha_inicio': consulta.get('fecha_inicio') or None,
+        'fecha_fin': consulta.get('fecha_fin') or None
+    }
+
+
+def codificar_tabla(tabla, formato):
+    """Bytes y tipo de contenido de un DataFrame en JSON compacto o Arrow IPC"""
+    if formato == 'arrow':
+        import pyarrow as pa
+        lote = pa.Table.from_pandas(tabla, preserve_index=False)
+        salida = io.BytesIO()
+        with pa.ipc.new_stream(salida, lote.schema) as escritor:
+            escritor.write_table(lote)
+        return salida.getvalue(), TIPO_ARROW
+    fechas = [c for c in tabla.columns if pd.api.types.is_datetime64_any_dtype(tabla[c])]
+    tabla = tabla.assign(**{c: tabla[c].dt.strftime('%Y-%m-%d') for c in fechas})
+    cuerpo = {
+        'columnas': [str(c) for c in tabla.columns],
+        'datos': tabla.astype(object).where(tabla.notna(), None).values.tolist(),
+        'fechas': [str(c) for c in fechas]
+    }
+    return json.dumps(cuerpo, ensure_ascii=False, default=str).encode('utf-8'), TIPO_JSON
+
+
+class ServicioAgregaciones:
+    def __init__(self, procesador=None, max_respuestas=MAX_RESPUESTAS):
+        self.procesador = procesador or ProcesadorCOVID()
+        self.max_respuestas = max_respuestas
+        self.datos = None
+        self.analisis = None
+        self.version = None
+        self._mtime_estadisticas = None
+        self._respuestas = OrderedDict()
+        self._lock = threading.Lock()
+        # Solo un hilo recarga el dataset; los demás esperan y usan la versión nueva
+        self._lock_recarga = threading.Lock()
+        self.solicitudes = 0
+        self.no_modificadas = 0
+        self.aciertos = 0
+        self.rutas = {
+            '/estado': self.estado,
+            '/estadisticas': self.estadisticas,
+            '/total': self.total,
+            '/conteo': self.conteo,
+            '/serie': self.serie,
+            '/figura': self.figura,
+            '/evolucion': self.evolucion
+        }
+    
+    def cargar(self):
+        """Carga el dataset (desde la caché si existe) y fija la versión de las respuestas"""
+        print("🌐 Cargando datos para el servicio de agregaciones...")
+        # La fecha se toma antes de cargar: si las estadísticas cambian durante la
+        # carga, la siguiente consulta vuelve a recargar
+        mtime = self._mtime()
+        resultado = self.procesador.cargar_datos()
+        with self._lock:
+            self.datos = resultado['datos']
+            self.analisis = resultado['analisis']
+            self.version = huella_dataset(self.analisis)
+            self._mtime_estadisticas = mtime
+            self._respuestas.clear()
+        print(f"   ✅ {len(self.datos):,} registros listos (versión {self.version})")
+        return True
+    
+    def _mtime(self):
+        ruta = self.procesador.ruta_estadisticas
+        return os.path.getmtime(ruta) if os.path.exists(ruta) else None
+    
+    def _desactualizado(self):
+        return self.datos is None or self._mtime() != self._mtime_estadisticas
+    
+    def recargar_si_cambio(self):
+        """
+        Vuelve a cargar si otro proceso regeneró las estadísticas del dataset. La
+        comprobación se repite con el bloqueo de recarga tomado, así que con varias
+        consultas a la vez solo una recarga y devuelve True.
+        """
+        if not self._desactualizado():
+            return False
+        with self._lock_recarga:
+            if not self._desactualizado():
+                return False
+            return self.cargar()
+    
+    # Consultas: cada una devuelve un dict (JSON), un DataFrame (tabla) o una figura
+    
+    def estado(self, consulta):
+        return {
+            'version': self.version,
+            'total_registros': len(self.datos),
+            'ultima_actualizacion': self.analisis.get('ultima_actualizacion'),
+            'solicitudes': self.solicitudes,
+            'no_modificadas': self.no_modificadas,
+            'aciertos': self.aciertos
+        }
+    
+    def estadisticas(self, consulta):
+        return self.analisis
+    
+    def total(self, consulta):
+        """Casos con los filtros: exacto desde el índice temporal si está disponible"""
+        filtros = filtros_de_consulta(consulta)
+        indice = self.procesador.obtener_indice_temporal(self.datos)
+        if indice is not None:
+            return {'total': indice.total(**filtros)}
+        return {'total': int(mascara_filtros(self.datos, **filtros).sum())}
+    
+    def _filtrados(self, consulta):
+        filtros = filtros_de_consulta(consulta)
+        if not any(filtros.values()):
+            return self.datos
+        return self.datos[mascara_filtros(self.datos, **filtros)]
+    
+    def conteo(self, consulta):
+        """Casos por categoría de ``columna`` con los filtros, de mayor a menor"""
+        columna = consulta.get('columna', 'departamento_nom')
+        if columna not in self.datos.columns:
+            raise KeyError(f"Columna no disponible: {columna}")
+        conteos = conteo_por_columna(self._filtrados(consulta)[columna])
+        if consulta.get('top'):
+            conteos = conteos.head(int(consulta['top']))
+        return pd.DataFrame({columna: conteos.index.astype(str), 'casos': conteos.to_numpy()})
+    
+    def serie(self, consulta):
+        """Casos por día, semana, mes o año de ``columna_fecha`` con los filtros"""
+        columna = consulta.get('columna_fecha', COLUMNA_FECHA)
+        if columna not in self.datos.columns:
+            raise KeyError(f"Columna no disponible: {columna}")
+        codigos, periodos = codigos_periodo(self._filtrados(consulta)[columna], consulta.get('frecuencia', 'D'))
+        return pd.DataFrame({
+            'Fecha': periodos.astype('datetime64[ns]'),
+            'casos': conteo_1d(codigos, len(periodos))
+        })
+    
+    def figura(self, consulta):
+        """Figura de ``AnalizadorCOVID`` sobre los datos filtrados (``tipo`` = nombre del gráfico)"""
+        analizador = AnalizadorCOVID(self._filtrados(consulta))
+        tipo = consulta.get('tipo')
+        if tipo == 'evolucion':
+            fig = analizador.generar_grafico_evolucion(
+                consulta.get('columna_fecha', COLUMNA_FECHA),
+                consulta.get('frecuencia', 'M'),
+                int(consulta['ancho_px']) if consulta.get('ancho_px') else None
+            )
+        elif tipo == 'barras':
+            fig = analizador.generar_grafico_barras(consulta['columna'], int(consulta.get('top', 10)), consulta.get('titulo'))
+        elif tipo == 'piramide':
+            fig = analizador.generar_grafico_piramide_edades()
+        elif tipo == 'histograma':
+            fig = analizador.generar_histograma(
+                consulta.get('columna', 'edad'),
+                color=consulta.get('color'),
+                ancho_bin=float(consulta['ancho_bin']) if consulta.get('ancho_bin') else None,
+                titulo=consulta.get('titulo')
+            )
+        elif tipo == 'mapa_calor':
+            fig = analizador.generar_mapa_calor(consulta['columna_x'], consulta['columna_y'])
+        else:
+            raise ValueError(f"Tipo de figura no soportado: {tipo}")
+        if fig is None:
+            raise KeyError(f"Sin datos para la figura: {tipo}")
+        return fig
+    
+    def evolucion(self, consulta):
+        """Casos diarios por región (una columna por región) desde el tensor de casos"""
+        filtros = filtros_de_consulta(consulta)
+        tensor = self.procesador.obtener_tensor(self.datos, consulta.get('nivel', 'departamentos'))
+        if tensor is None:
+            raise KeyError("No hay tensor de casos disponible")
+        regiones = consulta.get('regiones')
+        serie = tensor.serie(
+            regiones.split(',') if regiones else None,
+            filtros['estados'],
+            filtros['fecha_inicio'],
+            filtros['fecha_fin']
+        )
+        return serie.reset_index()
+    
+    def etag(self, ruta, consulta, formato):
+        """ETag de una respuesta: versión del dataset + consulta normalizada + formato"""
+        especificacion = json.dumps([self.version, ruta, sorted(consulta.items()), formato])
+        return '"' + hashlib.sha1(especificacion.encode('utf-8')).hexdigest()[:20] + '"'
+    
+    def responder(self, ruta, consulta, formato='json', etag_cliente=None):
+        """
+        Devuelve (estado HTTP, ETag, tipo de contenido, cuerpo). La ruta /estado
+        no se cachea porque incluye los contadores del servicio.
+        """
+        self.recargar_si_cambio()
+        if ruta not in self.rutas:
+            return 404, None, TIPO_JSON, json.dumps({'error': f'Ruta desconocida: {ruta}'}).encode('utf-8')
+        
+        etag = self.etag(ruta, consulta, formato)
+        with self._lock:
+            self.solicitudes += 1
+            if ruta != '/estado':
+                if etag_cliente == etag:
+                    self.no_modificadas += 1
+                    return 304, etag, None, b''
+                guardada = self._respuestas.get(etag)
+                if guardada is not None:
+                    self._respuestas.move_to_end(etag)
+                    self.aciertos += 1
+                    return (200, etag) + guardada
+        
+        resultado = self.rutas[ruta](consulta)
+        if isinstance(resultado, pd.DataFrame):
+            cuerpo, tipo = codificar_tabla(resultado, formato)
+        elif hasattr(resultado, 'to_json'):
+            cuerpo, tipo = resultado.to_json().encode('utf-8'), TIPO_JSON
+        else:
+            cuerpo, tipo = json.dumps(resultado, ensure_ascii=False, default=str).encode('utf-8'), TIPO_JSON
+        if ruta != '/estado':
+            with self._lock:
+                self._respuestas[etag] = (tipo, cuerpo)
+                while len(self._respuestas) > self.max_respuestas:
+                    self._respuestas.popitem(last=False)
+        return 200, etag, tipo, cuerpo
+
+
+def crear_manejador(servicio):
+    """Clase de manejador HTTP ligada a una instancia del servicio"""
+    class ManejadorAgregaciones(BaseHTTPRequestHandler):
+        def do_GET(self):
+            partes = urlsplit(self.path)
+            consulta = {clave: valores[-1] for clave, valores in parse_qs(partes.query).items()}
+            formato = consulta.pop('formato', None)
+            if formato is None:
+                formato = 'arrow' if TIPO_ARROW in self.headers.get('Accept', '') else 'json'
+            try:
+                estado, etag, tipo, cuerpo = servicio.responder(
+                    partes.path.rstrip('/') or '/estado',
+                    consulta,
+                    formato,
+                    self.headers.get('If-None-Match')
+                )
+            except (KeyError, ValueError) as e:
+                estado, etag, tipo = 400, None, TIPO_JSON
+                cuerpo = json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+            except Exception as e:
+                estado, etag, tipo = 500, None, TIPO_JSON
+                cuerpo = json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+            
+            self.send_response(estado)
+            if etag is not None:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            if tipo is not None:
+                self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+        
+        def log_message(self, formato, *args):
+            pass
+    
+    return ManejadorAgregaciones
+
+
+def crear_servidor(servicio, host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO):
+    """Servidor HTTP con un hilo por conexión (el puerto 0 elige uno libre)"""
+    servidor = ThreadingHTTPServer((host, puerto), crear_manejador(servicio))
+    servidor.daemon_threads = True
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de agregaciones de COVID-19")
+    parser.add_argument('--host', default=HOST_POR_DEFECTO)
+    parser.add_argument('--puerto', type=int, default=PUERTO_POR_DEFECTO)
+    parser.add_argument('--archivo', default='Casos_positivos_de_COVID-19_en_Colombia.csv')
+    args = parser.parse_args()
+    
+    servicio = ServicioAgregaciones(ProcesadorCOVID(args.archivo))
+    servicio.cargar()
+    servidor = crear_servidor(servicio, args.host, args.puerto)
+    print(f"🚀 Servicio de agregaciones en http://{args.host}:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servicio detenido")
+    finally:
+        servidor.server_close()
+
+if __name__ == "__main__":
+    main()
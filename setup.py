@@ -6,6 +6,12 @@ setup(
     description="Análisis de datos de COVID-19 en Colombia",
     author="FactorX",
     packages=find_packages(),
+    py_modules=[
+        "pipeline_datos", "procesamiento", "bloqueo_cache", "muestreo", "tensor_casos",
+        "indice_temporal", "indicadores", "retrasos", "nowcasting", "pronosticos",
+        "deteccion_cambios", "geometrias", "instantanea", "kernels_conteo", "conversion_parquet",
+        "instrumentacion", "huella_datos", "reconstruccion"
+    ],
     install_requires=[
         "streamlit>=1.38.0",
         "pandas>=2.2.2",
@@ -19,7 +25,7 @@ setup(
     python_requires=">=3.8",
     entry_points={
         "console_scripts": [
-            "covid-analisis=app_analisis_covid:main",
+            "covid-analisis=pipeline_datos:main",
         ],
     },
 )
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Tensor denso de casos diarios por región × día × estado.
+
+Se construye una sola vez al procesar el dataset y se guarda como .npy, que se
+abre en modo memory-map: la curva de una región, su media móvil o la
+comparación entre varias regiones son cortes del arreglo, no un groupby sobre
+millones de filas.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from kernels_conteo import codificar, codigos_periodo
+from muestreo import COLUMNA_DEPARTAMENTO, COLUMNA_FECHA, SIN_DATO
+from huella_datos import corresponde
+
+# Los municipios se identifican por su código DIVIPOLA: el nombre se repite entre
+# departamentos (Rionegro, Mosquera, La Unión...)
+COLUMNA_MUNICIPIO = 'ciudad_municipio'
+COLUMNA_NOMBRE_MUNICIPIO = 'ciudad_municipio_nom'
+COLUMNA_ESTADO = 'estado'
+
+
+def codificar_municipios(df):
+    """
+    Códigos de municipio (uno por código DIVIPOLA, -1 si falta) y su etiqueta.
+    La etiqueta es el nombre; si se repite, lleva el departamento entre
+    paréntesis. Sin la columna del código se identifica por departamento y nombre.
+    """
+    if COLUMNA_MUNICIPIO in df.columns:
+        claves = pd.to_numeric(df[COLUMNA_MUNICIPIO], errors='coerce')
+    elif COLUMNA_NOMBRE_MUNICIPIO in df.columns:
+        departamentos = (df[COLUMNA_DEPARTAMENTO].astype(str) if COLUMNA_DEPARTAMENTO in df.columns
+                         else pd.Series('', index=df.index))
+        claves = departamentos.str.cat(df[COLUMNA_NOMBRE_MUNICIPIO].astype(str), sep='|')
+        claves[df[COLUMNA_NOMBRE_MUNICIPIO].isna()] = None
+    else:
+        return np.full(len(df), -1, dtype=np.int64), np.array([], dtype=object)
+    codigos, valores = pd.factorize(claves, sort=True)
+    claves_texto = pd.Series([str(int(v)) if isinstance(v, float) else str(v) for v in valores], dtype=object)
+    
+    # Nombre y departamento de la primera fila de cada municipio
+    _, primeras = np.unique(codigos, return_index=True)
+    primeras = primeras[codigos[primeras] >= 0]
+    def primera_fila(columna):
+        if columna not in df.columns:
+            return pd.Series(None, index=claves_texto.index, dtype=object)
+        return df[columna].iloc[primeras].astype(object).reset_index(drop=True)
+    nombres = primera_fila(COLUMNA_NOMBRE_MUNICIPIO).fillna(claves_texto).astype(str)
+    departamentos = primera_fila(COLUMNA_DEPARTAMENTO).fillna(SIN_DATO).astype(str)
+    
+    etiquetas = nombres.where(~nombres.duplicated(keep=False), nombres + ' (' + departamentos + ')')
+    repetidas = etiquetas.duplicated(keep=False)
+    if repetidas.any():
+        etiquetas[repetidas] = etiquetas[repetidas] + ' · ' + claves_texto[repetidas]
+    return codigos.astype(np.int64), etiquetas.to_numpy(dtype=object)
+
+
+class TensorCasos:
+    def __init__(self, directorio='datos_procesados/tensor', nombre='departamentos',
+                 columna_region=COLUMNA_DEPARTAMENTO, codificador=None):
+        self.directorio = directorio
+        self.nombre = nombre
+        self.columna_region = columna_region
+        # Función df -> (códigos, etiquetas) para regiones que no son una sola columna
+        self.codificador = codificador
+        self.ruta_tensor = os.path.join(directorio, f'{nombre}.npy')
+        self.ruta_metadatos = os.path.join(directorio, f'{nombre}.json')
+        self._tensor = None
+        self._metadatos = None
+    
+    def construir(self, df, huella=None):
+        """Cuenta los casos por región × día × estado y guarda el tensor en disco"""
+        if df is None or len(df) == 0 or COLUMNA_FECHA not in df.columns:
+            return False
+        
+        print(f"🧮 Construyendo tensor de casos diarios por {self.nombre}...")
+        os.makedirs(self.directorio, exist_ok=True)
+        
+        if self.codificador is not None:
+            codigos_region, regiones = self.codificador(df)
+            if (codigos_region < 0).any():
+                codigos_region = np.where(codigos_region < 0, len(regiones), codigos_region)
+                regiones = np.append(regiones, SIN_DATO)
+        elif self.columna_region in df.columns:
+            codigos_region, regiones = codificar(df[self.columna_region].astype(object).fillna(SIN_DATO))
+        else:
+            codigos_region, regiones = np.zeros(len(df), dtype=np.int64), np.array([SIN_DATO], dtype=object)
+        if COLUMNA_ESTADO in df.columns:
+            codigos_estado, estados = codificar(df[COLUMNA_ESTADO].astype(object).fillna(SIN_DATO))
+        else:
+            codigos_estado, estados = np.zeros(len(df), dtype=np.int64), np.array(['Total'], dtype=object)
+        codigos_dia, dias = codigos_periodo(df[COLUMNA_FECHA], 'D')
+        
+        n_regiones, n_dias, n_estados = len(regiones), len(dias), len(estados)
+        combinados = (codigos_region.astype(np.int64) * n_dias + codigos_dia) * n_estados + codigos_estado
+        combinados[codigos_dia < 0] = -1
+        conteos = np.bincount(combinados + 1, minlength=n_regiones * n_dias * n_estados + 1)[1:]
+        tensor = conteos.reshape(n_regiones, n_dias, n_estados).astype(np.int32)
+        np.save(self.ruta_tensor, tensor)
+        
+        metadatos = {
+            'huella': huella,
+            'total_registros': int(len(df)),
+            'columna_region': self.columna_region,
+            'regiones': [str(r) for r in regiones],
+            'estados': [str(e) for e in estados],
+            'fecha_inicio': str(dias[0]) if n_dias else None,
+            'n_dias': int(n_dias)
+        }
+        with open(self.ruta_metadatos, 'w') as f:
+            json.dump(metadatos, f, indent=2, ensure_ascii=False)
+        
+        print(f"   ✅ {n_regiones:,} regiones × {n_dias:,} días × {n_estados} estados "
+              f"({tensor.nbytes / (1024 * 1024):.1f} MB)")
+        self._tensor = None
+        self._metadatos = metadatos
+        return True
+    
+    def metadatos(self):
+        if self._metadatos is None and os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, 'r') as f:
+                self._metadatos = json.load(f)
+        return self._metadatos
+    
+    def esta_actualizado(self, huella):
+        """Indica si el tensor guardado corresponde a la versión del dataset con esa huella"""
+        metadatos = self.metadatos()
+        return (corresponde(metadatos, huella) and metadatos.get('columna_region') == self.columna_region
+                and os.path.exists(self.ruta_tensor))
+    
+    def tensor(self):
+        """Arreglo región × día × estado abierto en modo memory-map (solo lectura)"""
+        if self._tensor is None:
+            self._tensor = np.load(self.ruta_tensor, mmap_mode='r')
+        return self._tensor
+    
+    def regiones(self):
+        return self.metadatos()['regiones']
+    
+    def estados(self):
+        return self.metadatos()['estados']
+    
+    def fechas(self):
+        metadatos = self.metadatos()
+        return pd.date_range(metadatos['fecha_inicio'], periods=metadatos['n_dias'], freq='D')
+    
+    def _indices(self, valores, disponibles):
+        """Índices y etiquetas de los valores pedidos que existen (todos si no se pide ninguno)"""
+        if not valores:
+            return slice(None), list(disponibles)
+        posicion = {v: i for i, v in enumerate(disponibles)}
+        presentes = [v for v in valores if v in posicion]
+        return [posicion[v] for v in presentes], presentes
+    
+    def _rango_dias(self, fecha_inicio=None, fecha_fin=None):
+        fechas = self.fechas()
+        inicio = fechas.searchsorted(pd.Timestamp(fecha_inicio)) if fecha_inicio is not None else 0
+        fin = fechas.searchsorted(pd.Timestamp(fecha_fin), side='right') if fecha_fin is not None else len(fechas)
+        return inicio, fin, fechas[inicio:fin]
+    
+    def serie(self, regiones=None, estados=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Casos diarios (filas = fechas, columnas = regiones) sumando los estados
+        elegidos; sin regiones se devuelven todas
+        """
+        inicio, fin, fechas = self._rango_dias(fecha_inicio, fecha_fin)
+        indices_region, etiquetas = self._indices(regiones, self.regiones())
+        indices_estado, _ = self._indices(estados, self.estados())
+        bloque = self.tensor()[indices_region, inicio:fin][:, :, indices_estado].sum(axis=2)
+        return pd.DataFrame(bloque.T, index=pd.Index(fechas, name='Fecha'), columns=etiquetas)
+    
+    def totales_por_estado(self, regiones=None, fecha_inicio=None, fecha_fin=None):
+        """Total de casos por región (filas) y estado (columnas) en el rango de fechas"""
+        inicio, fin, _ = self._rango_dias(fecha_inicio, fecha_fin)
+        indices_region, etiquetas = self._indices(regiones, self.regiones())
+        bloque = self.tensor()[indices_region, inicio:fin].sum(axis=1)
+        return pd.DataFrame(bloque, index=pd.Index(etiquetas, name='Región'), columns=self.estados())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Script para probar los gráficos del analizador contra sus equivalentes en pandas
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from analisis import AnalizadorCOVID
+
+def fechas_prueba(n=5000):
+    """Fechas de notificación aleatorias con algunos nulos"""
+    rng = np.random.default_rng(3)
+    fechas = pd.Series(pd.Timestamp('2020-03-01') + pd.to_timedelta(rng.integers(0, 700, n), unit='D'))
+    fechas[rng.random(n) < 0.02] = pd.NaT
+    return fechas
+
+def test_evolucion_por_periodo():
+    """Prueba que la evolución agrupa y etiqueta cada periodo como pd.Grouper"""
+    print("🚀 Probando la evolución por periodo")
+    print("====================================")
+    
+    fechas = fechas_prueba()
+    analizador = AnalizadorCOVID(pd.DataFrame({'fecha_de_notificación': fechas}))
+    for frecuencia, alias in [('D', 'D'), ('W', 'W'), ('M', 'ME'), ('MS', 'MS'), ('Y', 'YE')]:
+        fig = analizador.generar_grafico_evolucion(frecuencia=frecuencia, ancho_px=10000)
+        esperado = fechas.to_frame('f').groupby(pd.Grouper(key='f', freq=alias)).size()
+        
+        assert len(fig.data[0].x) == len(esperado), frecuencia
+        assert (pd.DatetimeIndex(fig.data[0].x) == esperado.index).all(), frecuencia
+        assert (np.asarray(fig.data[0].y) == esperado.to_numpy()).all(), frecuencia
+        print(f"📊 {frecuencia}: {len(esperado)} periodos, desde {esperado.index[0]:%Y-%m-%d}")
+    
+    print("✅ Evolución por periodo correcta")
+    return True
+
+def bordes_figura(fig):
+    """Bordes de los intervalos a partir de los centros y el ancho de las barras"""
+    centros = np.asarray(fig.data[0].x, dtype=float)
+    ancho = fig.data[0].width
+    return np.append(centros - ancho / 2, centros[-1] + ancho / 2), ancho
+
+def test_histograma():
+    """Prueba que los conteos y bordes del histograma coinciden con np.histogram"""
+    print("🚀 Probando el histograma agrupado")
+    print("==================================")
+    
+    rng = np.random.default_rng(5)
+    n = 20000
+    edades = pd.Series(rng.integers(0, 100, n).astype(object))
+    # Nulos, texto, infinitos y edades fuera del rango habitual (negativas o mayores de 120)
+    edades[rng.random(n) < 0.03] = np.nan
+    edades[:5] = ['desconocido', np.inf, -np.inf, -3, 135]
+    sexo = pd.Series(rng.choice(['F', 'M'], n))
+    analizador = AnalizadorCOVID(pd.DataFrame({'edad': edades, 'sexo': sexo}))
+    
+    numericas = pd.to_numeric(edades, errors='coerce').to_numpy(dtype=float)
+    finitas = numericas[np.isfinite(numericas)]
+    for ancho_bin in [None, 1, 5, 7.5]:
+        fig = analizador.generar_histograma('edad', ancho_bin=ancho_bin)
+        bordes, ancho = bordes_figura(fig)
+        
+        # Los bordes empiezan en el mínimo, avanzan de a un ancho y cubren el máximo
+        assert bordes[0] == np.floor(finitas.min()) and bordes[-1] > finitas.max()
+        assert np.allclose(np.diff(bordes), ancho)
+        if ancho_bin is not None:
+            assert ancho == ancho_bin
+        
+        esperado, _ = np.histogram(finitas, bins=bordes)
+        assert (np.asarray(fig.data[0].y) == esperado).all(), ancho_bin
+        assert esperado.sum() == len(finitas)
+        print(f"📊 Ancho {ancho:g}: {len(bordes) - 1} intervalos, {esperado.sum():,} de {n:,} filas con edad válida")
+    
+    # Con color, cada categoría coincide con np.histogram de sus propias filas
+    fig = analizador.generar_histograma('edad', color='sexo', ancho_bin=10)
+    bordes, _ = bordes_figura(fig)
+    for traza in fig.data:
+        del_sexo = numericas[(sexo == traza.name).to_numpy() & np.isfinite(numericas)]
+        esperado, _ = np.histogram(del_sexo, bins=bordes)
+        assert (np.asarray(traza.y) == esperado).all(), traza.name
+    assert sorted(traza.name for traza in fig.data) == ['F', 'M']
+    print("📊 Conteos por sexo correctos")
+    
+    # Sin ningún valor numérico no hay histograma
+    assert AnalizadorCOVID(pd.DataFrame({'edad': ['x', None]})).generar_histograma('edad') is None
+    assert analizador.generar_histograma('no_existe') is None
+    
+    print("✅ Histograma correcto")
+    return True
+
+if __name__ == "__main__":
+    success = test_evolucion_por_periodo() and test_histograma()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
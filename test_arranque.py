@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script para probar el arranque rápido: importaciones diferidas y carga en segundo plano
+"""
+
+import sys
+import time
+import subprocess
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from ejecucion_progresiva import EjecutorProgresivo
+
+def modulos_cargados(codigo):
+    """Ejecuta ``codigo`` en un intérprete nuevo y devuelve los módulos pesados que quedaron importados"""
+    salida = subprocess.run(
+        [sys.executable, '-c', codigo + "\nimport sys; print(' '.join(m for m in ('pandas', 'numpy', 'requests') if m in sys.modules))"],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return set(salida.strip().splitlines()[-1].split()) if salida.strip() else set()
+
+def test_arranque():
+    """Prueba que los módulos pesados se importan al usarlos y el avance de una carga en segundo plano"""
+    print("🚀 Probando arranque rápido")
+    print("===========================")
+    
+    # El sustituto no importa nada hasta que se usa un atributo
+    assert modulos_cargados("from importacion_diferida import importar_diferido; pd = importar_diferido('pandas')") == set()
+    assert 'pandas' in modulos_cargados("from importacion_diferida import importar_diferido; importar_diferido('pandas').DataFrame")
+    
+    # Consultar el estado de la reconstrucción no carga pandas, y requests solo se importa al descargar
+    assert modulos_cargados("from reconstruccion import ReconstructorCache; ReconstructorCache().estado()") == set()
+    assert 'requests' not in modulos_cargados("import procesamiento")
+    
+    # La tarea publica su avance mientras corre y el resultado se descarta una vez usado
+    ejecutor = EjecutorProgresivo()
+    clave = ('carga_inicial', 'prueba')
+    def cargar(progreso):
+        progreso(0.5, "Leyendo la caché")
+        time.sleep(0.3)
+        return 42
+    ejecutor.enviar(clave, cargar, lambda fraccion, mensaje: ejecutor.informar(clave, fraccion, mensaje))
+    time.sleep(0.1)
+    assert not ejecutor.listo(clave) and ejecutor.avance(clave) == (0.5, "Leyendo la caché")
+    while not ejecutor.listo(clave):
+        time.sleep(0.05)
+    assert ejecutor.resultado(clave) == 42
+    ejecutor.descartar(clave)
+    assert ejecutor.resultado(clave) is None and ejecutor.avance(clave) is None
+    print("📊 pandas, numpy y requests sin importar hasta su primer uso")
+    
+    print("✅ Arranque rápido correcto")
+    return True
+
+if __name__ == "__main__":
+    success = test_arranque()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Script para probar que la caché se construye una sola vez entre procesos
+"""
+
+import os
+import sys
+import socket
+import tempfile
+import subprocess
+import multiprocessing
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from bloqueo_cache import BloqueoConstruccion, proceso_vivo
+from procesamiento import ProcesadorCOVID
+from test_muestreo import crear_datos_prueba
+
+def cargar_en_proceso(construcciones, totales):
+    """Arranque en frío de una sesión: carga los datos y cuenta si tuvo que construir"""
+    construir = ProcesadorCOVID._construir_cache
+    def contar(self, progreso=None):
+        with construcciones.get_lock():
+            construcciones.value += 1
+        return construir(self, progreso)
+    ProcesadorCOVID._construir_cache = contar
+    totales.put(ProcesadorCOVID().cargar_datos()['analisis']['total_registros'])
+
+def test_bloqueo_cache():
+    """Prueba la exclusión, el bloqueo abandonado y varios arranques en frío simultáneos"""
+    print("🚀 Probando construcción única de la caché")
+    print("==========================================")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'construccion.lock')
+        primero, segundo = BloqueoConstruccion(ruta), BloqueoConstruccion(ruta)
+        assert primero.adquirir() and not segundo.adquirir()
+        primero.marcar('Leyendo el dataset', 0.1)
+        assert segundo.marca()['etapa'] == 'Leyendo el dataset' and segundo.marca()['pid'] == os.getpid()
+        assert not segundo.esperar(timeout=0.2)
+        primero.liberar()
+        assert segundo.esperar(timeout=1) and segundo.adquirir()
+        segundo.liberar()
+        
+        # El bloqueo de un proceso que ya terminó se considera abandonado
+        muerto = subprocess.Popen([sys.executable, '-c', 'pass'])
+        muerto.wait()
+        with open(ruta, 'w') as f:
+            f.write(f'{{"pid": {muerto.pid}, "equipo": "{socket.gethostname()}"}}')
+        assert BloqueoConstruccion(ruta).adquirir()
+        os.remove(ruta)
+        
+        # Comprobar si un proceso vive no lo termina (os.kill lo haría en Windows)
+        vivo = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)'])
+        try:
+            assert all(proceso_vivo(vivo.pid) for _ in range(5)) and vivo.poll() is None
+        finally:
+            vivo.kill()
+            vivo.wait()
+        assert not proceso_vivo(muerto.pid) and proceso_vivo(os.getpid())
+        
+        # Dos procesos ven el mismo bloqueo abandonado: el segundo en retirarlo
+        # no borra el que el primero acaba de tomar
+        with open(ruta, 'w') as f:
+            f.write(f'{{"pid": {muerto.pid}, "equipo": "{socket.gethostname()}"}}')
+        rezagado = BloqueoConstruccion(ruta)
+        leido = rezagado._leer()
+        assert rezagado.abandonado(leido)
+        primero = BloqueoConstruccion(ruta)
+        assert primero.adquirir()
+        rezagado.retirar_abandonado(leido)
+        assert os.path.exists(ruta) and primero.marca()['pid'] == os.getpid()
+        assert not rezagado.adquirir()
+        assert [a for a in os.listdir(directorio) if 'abandonado' in a] == []
+        primero.liberar()
+    
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        # El procesador trabaja con rutas relativas al directorio del proyecto
+        os.chdir(directorio)
+        try:
+            crear_datos_prueba(30000).to_csv('Casos_positivos_de_COVID-19_en_Colombia.csv', index=False)
+            contexto = multiprocessing.get_context('fork')
+            construcciones = contexto.Value('i', 0)
+            totales = contexto.Queue()
+            procesos = [contexto.Process(target=cargar_en_proceso, args=(construcciones, totales)) for _ in range(3)]
+            for proceso in procesos:
+                proceso.start()
+            for proceso in procesos:
+                proceso.join(120)
+            assert all(proceso.exitcode == 0 for proceso in procesos)
+            assert [totales.get(timeout=5) for _ in procesos] == [30000] * 3
+            assert construcciones.value == 1
+            assert not os.path.exists('datos_procesados/.construccion.lock')
+            print(f"📊 {len(procesos)} arranques en frío simultáneos, {construcciones.value} construcción")
+        finally:
+            os.chdir(directorio_original)
+    
+    print("✅ Construcción única correcta")
+    return True
+
+if __name__ == "__main__":
+    success = test_bloqueo_cache()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
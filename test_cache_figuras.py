@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Script para probar la caché compartida de figuras Plotly
+"""
+
+import sys
+import plotly.graph_objects as go
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from cache_figuras import CacheFiguras
+
+def figura(n):
+    """Figura de barras con ``n`` puntos"""
+    return go.Figure(go.Bar(x=list(range(n)), y=list(range(n))))
+
+def test_clave():
+    """Prueba que la clave cambia con cada parte de la especificación y no con el orden"""
+    print("🚀 Probando la clave de las figuras")
+    print("===================================")
+    
+    base = CacheFiguras.clave('bar', {'vista': 'a', 'top': 10}, {'departamentos': ['X']}, 'h1')
+    assert base == CacheFiguras.clave('bar', {'top': 10, 'vista': 'a'}, {'departamentos': ['X']}, 'h1')
+    variantes = [
+        CacheFiguras.clave('line', {'vista': 'a', 'top': 10}, {'departamentos': ['X']}, 'h1'),
+        CacheFiguras.clave('bar', {'vista': 'a', 'top': 20}, {'departamentos': ['X']}, 'h1'),
+        CacheFiguras.clave('bar', {'vista': 'a', 'top': 10}, {'departamentos': ['Y']}, 'h1'),
+        CacheFiguras.clave('bar', {'vista': 'a', 'top': 10}, {'departamentos': ['X']}, 'h2'),
+        CacheFiguras.clave('bar', {'vista': 'a', 'top': 10}, None, 'h1'),
+    ]
+    assert base not in variantes and len(set(variantes)) == len(variantes)
+    print("📊 Tipo, parámetros, filtros y huella distinguen la clave")
+    
+    print("✅ Clave correcta")
+    return True
+
+def test_aciertos():
+    """Prueba que un acierto devuelve la figura guardada sin volver a construirla"""
+    print("🚀 Probando aciertos y fallos")
+    print("=============================")
+    
+    cache = CacheFiguras()
+    construcciones = []
+    def construir():
+        construcciones.append(1)
+        return figura(5)
+    
+    primera = cache.obtener_o_construir('bar', {'vista': 'a'}, construir, huella='h1')
+    segunda = cache.obtener_o_construir('bar', {'vista': 'a'}, construir, huella='h1')
+    assert segunda is primera and len(construcciones) == 1
+    cache.obtener_o_construir('bar', {'vista': 'a'}, construir, huella='h2')
+    assert len(construcciones) == 2
+    
+    estadisticas = cache.estadisticas()
+    assert estadisticas['aciertos'] == 1 and estadisticas['fallos'] == 2 and estadisticas['entradas'] == 2
+    print(f"📊 {estadisticas}")
+    
+    print("✅ Aciertos correctos")
+    return True
+
+def test_limite_entradas():
+    """Prueba que se descarta la entrada usada menos recientemente al pasar el límite"""
+    print("🚀 Probando el límite de entradas")
+    print("=================================")
+    
+    cache = CacheFiguras(max_entradas=2)
+    cache.guardar('a', figura(3))
+    cache.guardar('b', figura(3))
+    assert cache.obtener('a') is not None
+    cache.guardar('c', figura(3))
+    
+    # 'b' era la menos usada: 'a' se consultó después de guardarla
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') is not None and cache.obtener('c') is not None
+    assert cache.estadisticas()['entradas'] == 2
+    print("📊 Se descartó la entrada menos usada")
+    
+    print("✅ Límite de entradas correcto")
+    return True
+
+def test_limite_bytes():
+    """Prueba que el total de bytes no pasa del límite y que reemplazar no duplica la cuenta"""
+    print("🚀 Probando el límite de bytes")
+    print("==============================")
+    
+    tamaño = CacheFiguras.tamaño(figura(200))
+    cache = CacheFiguras(max_bytes=int(tamaño * 2.5))
+    for clave in ['a', 'b', 'c']:
+        cache.guardar(clave, figura(200))
+    
+    estadisticas = cache.estadisticas()
+    assert estadisticas['entradas'] == 2 and estadisticas['bytes'] == 2 * tamaño
+    assert cache.obtener('a') is None and cache.obtener('b') is not None
+    
+    cache.guardar('c', figura(200))
+    assert cache.estadisticas()['bytes'] == 2 * tamaño
+    print(f"📊 {estadisticas['bytes']:,} bytes de {cache.max_bytes:,} permitidos")
+    
+    # Una figura mayor que el límite no se queda en la caché
+    cache.guardar('enorme', figura(2000))
+    assert cache.obtener('enorme') is None and cache.estadisticas()['bytes'] <= cache.max_bytes
+    
+    cache.limpiar()
+    assert cache.estadisticas()['entradas'] == 0 and cache.estadisticas()['bytes'] == 0
+    
+    print("✅ Límite de bytes correcto")
+    return True
+
+if __name__ == "__main__":
+    success = test_clave() and test_aciertos() and test_limite_entradas() and test_limite_bytes()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
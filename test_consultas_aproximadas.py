@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Script para probar las consultas aproximadas sobre las muestras estratificadas
+"""
+
+import sys
+import tempfile
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from muestreo import MuestreadorEstratificado
+from consultas_aproximadas import ConsultorAproximado
+from test_muestreo import crear_datos_prueba
+
+def test_estimacion_con_intervalo():
+    """Prueba que la muestra pequeña basta con un error holgado y el intervalo cubre el valor real"""
+    print("🚀 Probando estimación con intervalo")
+    print("====================================")
+    
+    df = crear_datos_prueba()
+    with tempfile.TemporaryDirectory() as directorio:
+        muestreador = MuestreadorEstratificado(directorio, niveles=(1000, 10000))
+        muestreador.construir(df)
+        consultor = ConsultorAproximado(muestreador, df)
+        
+        resultado = consultor.conteo_por_grupo('estado', error_relativo=0.5)
+        assert resultado['nivel'] == 1000 and not resultado['exacto']
+        assert resultado['error_relativo_max'] <= 0.5
+        real = df['estado'].value_counts()
+        for _, fila in resultado['tabla'].iterrows():
+            assert fila['limite_inferior'] <= real[fila['grupo']] <= fila['limite_superior']
+        print(f"📊 Nivel 1.000, error máximo {resultado['error_relativo_max']:.1%}")
+    
+    print("✅ Estimación con intervalo correcta")
+    return True
+
+def test_escalamiento_de_nivel():
+    """Prueba que un objetivo que no cumple la muestra pequeña pasa al nivel siguiente"""
+    print("\n🚀 Probando escalamiento de nivel")
+    print("=================================")
+    
+    df = crear_datos_prueba()
+    with tempfile.TemporaryDirectory() as directorio:
+        muestreador = MuestreadorEstratificado(directorio, niveles=(1000, 10000))
+        muestreador.construir(df)
+        consultor = ConsultorAproximado(muestreador, df)
+        
+        # El error de la muestra pequeña queda entre los dos objetivos
+        pequeña = consultor.conteo_por_grupo('estado', error_relativo=1.0)
+        assert pequeña['nivel'] == 1000
+        error_pequeña = pequeña['error_relativo_max']
+        assert 0.05 < error_pequeña <= 0.5
+        
+        resultado = consultor.conteo_por_grupo('estado', error_relativo=0.05)
+        assert resultado['nivel'] == 10000 and not resultado['exacto']
+        assert resultado['error_relativo_max'] <= 0.05 < error_pequeña
+        real = df['estado'].value_counts()
+        for _, fila in resultado['tabla'].iterrows():
+            assert fila['limite_inferior'] <= real[fila['grupo']] <= fila['limite_superior']
+        print(f"📊 Error {error_pequeña:.1%} en el nivel 1.000 → {resultado['error_relativo_max']:.1%} en el nivel 10.000")
+    
+    print("✅ Escalamiento de nivel correcto")
+    return True
+
+def test_conteo_exacto():
+    """Prueba el paso a los datos completos cuando ningún nivel alcanza el objetivo"""
+    print("\n🚀 Probando paso al conteo exacto")
+    print("=================================")
+    
+    df = crear_datos_prueba()
+    with tempfile.TemporaryDirectory() as directorio:
+        muestreador = MuestreadorEstratificado(directorio, niveles=(1000, 10000))
+        muestreador.construir(df)
+        consultor = ConsultorAproximado(muestreador, df)
+        
+        # Un objetivo imposible para las muestras termina en el conteo exacto
+        resultado = consultor.conteo_por_grupo('estado', error_relativo=0.001, departamentos=['Vaupés'])
+        assert resultado['exacto'] and resultado['nivel'] is None and resultado['error_relativo_max'] == 0
+        real = df.loc[df['departamento_nom'] == 'Vaupés', 'estado'].value_counts()
+        assert dict(zip(resultado['tabla']['grupo'], resultado['tabla']['estimado'])) == real.to_dict()
+        
+        total = consultor.total(error_relativo=0.0001, departamentos=['Vaupés'], estados=['Grave'])
+        esperado = ((df['departamento_nom'] == 'Vaupés') & (df['estado'] == 'Grave')).sum()
+        assert total['exacto'] and total['estimado'] == esperado
+        assert total['limite_inferior'] == total['limite_superior'] == esperado
+        print(f"📊 Total exacto Vaupés/Grave: {total['estimado']:,.0f}")
+        
+        # Sin datos completos queda la estimación del nivel mayor
+        total = ConsultorAproximado(muestreador).total(error_relativo=0.0001, departamentos=['Vaupés'], estados=['Grave'])
+        assert not total['exacto'] and total['nivel'] == 10000
+        assert total['limite_inferior'] <= esperado <= total['limite_superior']
+        
+        # Un estado que ninguna muestra recoge no cuenta como estimado con error 0
+        raro = df.copy()
+        raro.loc[[7, 70, 700], 'estado'] = 'Recuperado'
+        muestreador.construir(raro.drop(index=[7, 70, 700]))
+        ciego = ConsultorAproximado(muestreador, raro)
+        total = ciego.total(estados=['Recuperado'])
+        assert total['exacto'] and total['estimado'] == 3
+        # Sin datos completos queda la mejor estimación, con una cota superior positiva
+        total = ConsultorAproximado(muestreador).total(estados=['Recuperado'])
+        assert not total['exacto'] and total['estimado'] == 0 and total['limite_superior'] > 0
+        print(f"📊 Cota superior sin aciertos en la muestra: {total['limite_superior']:,.0f}")
+    
+    print("✅ Conteo exacto correcto")
+    return True
+
+if __name__ == "__main__":
+    success = test_estimacion_con_intervalo() and test_escalamiento_de_nivel() and test_conteo_exacto()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
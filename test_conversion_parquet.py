@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Script para probar la conversión a Parquet con ajustes configurables y autoajustados
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pyarrow.parquet as pq
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from conversion_parquet import convertir_csv, autoajustar, cargar_ajustes, CONFIGURACION_POR_DEFECTO
+from procesamiento import ProcesadorCOVID
+from test_muestreo import crear_datos_prueba
+
+def test_conversion_parquet():
+    """Prueba los tipos, los ajustes de escritura, el autoajuste y su uso en la caché"""
+    print("🚀 Probando conversión a Parquet")
+    print("================================")
+    
+    df = crear_datos_prueba(40000)
+    df['id_de_caso'] = np.arange(len(df)).astype(str)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_csv = os.path.join(directorio, 'casos.csv')
+        df.to_csv(ruta_csv, index=False)
+        
+        # Fechas y edad tipadas; códec, nivel, grupos, diccionario y estadísticas según la configuración
+        configuracion = {'codec': 'zstd', 'nivel': 3, 'filas_por_grupo': 10000,
+                         'diccionario': 'auto', 'estadisticas': ['fecha_de_notificación']}
+        convertido = convertir_csv(ruta_csv, configuracion=configuracion)
+        assert str(convertido['fecha_de_notificación'].dtype).startswith('datetime64')
+        metadatos = pq.ParquetFile(os.path.join(directorio, 'casos.parquet')).metadata
+        assert metadatos.num_rows == len(df) and metadatos.num_row_groups == 4
+        grupo = metadatos.row_group(0)
+        columnas = {grupo.column(i).path_in_schema: grupo.column(i) for i in range(grupo.num_columns)}
+        assert columnas['estado'].compression == 'ZSTD'
+        assert columnas['estado'].has_dictionary_page and not columnas['id_de_caso'].has_dictionary_page
+        assert columnas['fecha_de_notificación'].is_stats_set and not columnas['estado'].is_stats_set
+        
+        # El autoajuste devuelve el candidato de menor puntuación con sus medidas
+        candidatos = [{**CONFIGURACION_POR_DEFECTO, 'codec': codec} for codec in ('snappy', 'zstd', 'lz4')]
+        mejor, resultados = autoajustar(convertido, candidatos, tamaño_muestra=10000, repeticiones=1)
+        assert mejor == resultados[0]['configuracion'] and len(resultados) == 3
+        assert all(r['tamaño'] > 0 and r['lectura'] > 0 for r in resultados)
+        assert resultados[0]['puntuacion'] == min(r['puntuacion'] for r in resultados)
+        
+        # Los ajustes autoajustados se guardan junto al CSV y la caché se escribe con ellos
+        procesador = ProcesadorCOVID(ruta_csv, os.path.join(directorio, 'procesados'))
+        procesador.convertir_a_parquet(autoajuste=True)
+        ajustes = cargar_ajustes(procesador.ruta_ajustes_parquet)
+        assert ajustes is not None
+        procesador.guardar_cache(convertido)
+        def codec(ruta):
+            return pq.ParquetFile(ruta).metadata.row_group(0).column(0).compression
+        assert codec(procesador.ruta_cache) == codec(procesador.ruta_parquet)
+        print(f"📊 Ajustes elegidos: {ajustes['codec']}, {ajustes['filas_por_grupo']:,} filas por grupo")
+    
+    print("✅ Conversión a Parquet correcta")
+    return True
+
+if __name__ == "__main__":
+    success = test_conversion_parquet()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
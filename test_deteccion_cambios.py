@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Script para probar la detección en línea de cambios de tendencia y anomalías
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from deteccion_cambios import DetectorCambios, REGION_TOTAL
+from tensor_casos import TensorCasos
+
+# Días en que cambia la tasa de crecimiento diaria de la epidemia simulada
+CORTES = [100, 160, 250, 310, 400]
+TASAS = [0.0, 0.04, -0.03, 0.05, -0.04, 0.0]
+
+def crear_casos_por_olas(n_dias=500, semilla=0):
+    """Casos diarios de tres departamentos con olas exponenciales, efecto de día de la semana y dos fallas de reporte"""
+    rng = np.random.default_rng(semilla)
+    dias = np.arange(n_dias)
+    crecimiento = np.select([dias < c for c in CORTES], TASAS[:-1], TASAS[-1])
+    tasa = 30 * np.exp(np.cumsum(crecimiento)) * (1 + 0.3 * np.sin(2 * np.pi * dias / 7))
+    casos = {d: rng.poisson(tasa * escala) for d, escala in [('Antioquia', 2.0), ('Bogotá D.C.', 4.0), ('Vaupés', 0.5)]}
+    casos['Antioquia'][300] = 0
+    casos['Bogotá D.C.'][350] *= 6
+    fechas = pd.Timestamp('2020-03-01') + pd.to_timedelta(dias, unit='D')
+    return pd.DataFrame({
+        'fecha_de_notificación': np.concatenate([np.repeat(fechas, c) for c in casos.values()]),
+        'departamento_nom': np.concatenate([np.repeat(d, c.sum()) for d, c in casos.items()]),
+        'estado': 'Leve'
+    })
+
+def test_deteccion_cambios():
+    """Prueba que se detectan los cambios y las fallas, y que la actualización incremental coincide"""
+    print("🚀 Probando detección de cambios de tendencia")
+    print("=============================================")
+    
+    df = crear_casos_por_olas()
+    with tempfile.TemporaryDirectory() as directorio:
+        tensor = TensorCasos(os.path.join(directorio, 'tensor'))
+        assert tensor.construir(df, 'v1')
+        assert DetectorCambios(os.path.join(directorio, 'completo')).construir(tensor)
+        completo = DetectorCambios(os.path.join(directorio, 'completo'))
+        assert completo.esta_actualizado('v1') and not completo.esta_actualizado('v2')
+        
+        # Cada cambio de tendencia nacional se detecta cerca del día real
+        cambios = completo.eventos([REGION_TOTAL], ['aumento', 'descenso'])
+        inicio = pd.Timestamp('2020-03-01')
+        dias = (cambios['Fecha'] - inicio).dt.days.to_numpy()
+        for corte in CORTES:
+            assert np.abs(dias - corte).min() <= 15, corte
+        
+        anomalias = completo.eventos(tipos=['pico', 'caida'])
+        fallas = set(zip(anomalias['Región'], (anomalias['Fecha'] - inicio).dt.days, anomalias['tipo']))
+        assert ('Antioquia', 300, 'caida') in fallas
+        assert ('Bogotá D.C.', 350, 'pico') in fallas
+        
+        # Primero hasta un corte y luego con todos: solo se procesan los días nuevos y
+        # los eventos coinciden con el cálculo completo, también si el punto de
+        # control cae dentro de una racha del CUSUM que aún no ha dado la alarma
+        columnas = ['Región', 'Fecha', 'tipo', 'dia_deteccion']
+        for corte in [120, 180, 270, 325, 440]:
+            incremental = DetectorCambios(os.path.join(directorio, f'incremental_{corte}'))
+            anterior = df[df['fecha_de_notificación'] < inicio + pd.Timedelta(days=corte)]
+            tensor_anterior = TensorCasos(os.path.join(directorio, f'tensor_{corte}'))
+            assert tensor_anterior.construir(anterior)
+            assert incremental.construir(tensor_anterior)
+            assert incremental.metadatos()['dia_control'] == corte - 14
+            # Un detector nuevo retoma desde el estado guardado en disco
+            incremental = DetectorCambios(os.path.join(directorio, f'incremental_{corte}'))
+            assert incremental.construir(tensor)
+            assert incremental.eventos()[columnas].equals(completo.eventos()[columnas]), corte
+        print(f"📊 {len(cambios)} cambios de tendencia nacionales y {len(anomalias)} días anómalos")
+    
+    print("✅ Detección de cambios correcta")
+    return True
+
+if __name__ == "__main__":
+    success = test_deteccion_cambios()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
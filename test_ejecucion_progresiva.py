@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Script para probar el ejecutor de cálculos exactos en segundo plano
+"""
+
+import sys
+import time
+import threading
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from ejecucion_progresiva import EjecutorProgresivo
+
+def esperar(ejecutor, clave, limite=5.0):
+    """Espera a que termine la tarea de ``clave``"""
+    inicio = time.time()
+    while not ejecutor.listo(clave):
+        assert time.time() - inicio < limite, f"La tarea {clave} no terminó"
+        time.sleep(0.01)
+
+def test_envio_y_resultado():
+    """Prueba que una clave en curso no se vuelve a lanzar y su resultado queda disponible"""
+    print("🚀 Probando envío y resultado")
+    print("=============================")
+    
+    ejecutor = EjecutorProgresivo()
+    liberar = threading.Event()
+    llamadas = []
+    def calcular(valor):
+        llamadas.append(valor)
+        liberar.wait(5)
+        return valor * 2
+    
+    futuro = ejecutor.enviar('a', calcular, 21)
+    # Mientras corre no hay resultado ni error, y la misma clave reutiliza la tarea
+    assert not ejecutor.listo('a') and ejecutor.resultado('a') is None and ejecutor.error('a') is None
+    assert ejecutor.enviar('a', calcular, 99) is futuro
+    liberar.set()
+    esperar(ejecutor, 'a')
+    assert ejecutor.resultado('a') == 42 and ejecutor.error('a') is None
+    assert llamadas == [21]
+    # Una clave desconocida no tiene nada
+    assert ejecutor.resultado('b') is None and ejecutor.error('b') is None and not ejecutor.listo('b')
+    print("📊 Una sola ejecución por clave")
+    
+    print("✅ Envío y resultado correctos")
+    return True
+
+def test_errores():
+    """Prueba que la excepción de una tarea se informa y no se devuelve como resultado"""
+    print("\n🚀 Probando errores")
+    print("===================")
+    
+    ejecutor = EjecutorProgresivo()
+    def fallar():
+        raise ValueError("sin datos")
+    ejecutor.enviar('falla', fallar)
+    esperar(ejecutor, 'falla')
+    assert ejecutor.resultado('falla') is None
+    assert isinstance(ejecutor.error('falla'), ValueError) and str(ejecutor.error('falla')) == "sin datos"
+    
+    # Descartada la tarea fallida, la misma clave se vuelve a calcular
+    ejecutor.descartar('falla')
+    assert ejecutor.error('falla') is None
+    ejecutor.enviar('falla', lambda: 'recuperado')
+    esperar(ejecutor, 'falla')
+    assert ejecutor.resultado('falla') == 'recuperado' and ejecutor.error('falla') is None
+    print("📊 Error informado y reintento tras descartar")
+    
+    print("✅ Errores correctos")
+    return True
+
+def test_reemplazo_y_caducidad():
+    """Prueba el descarte de los resultados más antiguos y de los que nadie recoge"""
+    print("\n🚀 Probando reemplazo y caducidad")
+    print("=================================")
+    
+    ejecutor = EjecutorProgresivo(max_resultados=2)
+    for clave in ('a', 'b'):
+        ejecutor.enviar(clave, lambda clave=clave: clave)
+        esperar(ejecutor, clave)
+    # Volver a pedir 'a' la hace la más reciente: la tercera clave desplaza a 'b'
+    ejecutor.enviar('a', lambda: 'otra')
+    ejecutor.enviar('c', lambda: 'c')
+    esperar(ejecutor, 'c')
+    assert ejecutor.resultado('a') == 'a' and ejecutor.resultado('b') is None and ejecutor.resultado('c') == 'c'
+    
+    # El avance se olvida junto con la tarea
+    ejecutor.informar('c', 1.0, "Listo")
+    ejecutor.descartar('c')
+    assert ejecutor.avance('c') is None and ejecutor.resultado('c') is None
+    
+    # Un resultado sin recoger caduca; el temporizador de una tarea anterior
+    # no borra la que la reemplazó con la misma clave
+    caduca = EjecutorProgresivo(ttl_resultados=0.5)
+    caduca.enviar('x', lambda: 1)
+    esperar(caduca, 'x')
+    time.sleep(0.2)
+    caduca.descartar('x')
+    caduca.enviar('x', lambda: 2)
+    esperar(caduca, 'x')
+    time.sleep(0.4)
+    assert caduca.resultado('x') == 2
+    time.sleep(0.4)
+    assert caduca.resultado('x') is None
+    print("📊 Límite de resultados y caducidad respetados")
+    
+    print("✅ Reemplazo y caducidad correctos")
+    return True
+
+if __name__ == "__main__":
+    success = test_envio_y_resultado() and test_errores() and test_reemplazo_y_caducidad()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
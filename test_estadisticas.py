@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Script para probar las estadísticas de los tableros contra sus equivalentes en pandas
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from procesamiento import ProcesadorCOVID
+from kernels_conteo import BORDES_EDAD, ETIQUETAS_EDAD
+
+def crear_datos_prueba(n=20000, semilla=0):
+    """Dataset sintético con municipios homónimos, nulos y columnas del análisis avanzado"""
+    rng = np.random.default_rng(semilla)
+    municipios = pd.DataFrame({
+        'ciudad_municipio': [5615, 15638, 11001, 76001],
+        'ciudad_municipio_nom': ['Rionegro', 'Rionegro', 'Bogotá', 'Cali'],
+        'departamento_nom': ['Antioquia', 'Boyacá', 'Bogotá D.C.', 'Valle del Cauca']
+    })
+    df = municipios.iloc[rng.choice(len(municipios), n, p=[0.1, 0.05, 0.6, 0.25])].reset_index(drop=True)
+    df['fecha_de_notificación'] = pd.Timestamp('2020-03-01') + pd.to_timedelta(rng.integers(0, 200, n), unit='D')
+    df['edad'] = rng.integers(0, 110, n).astype(float)
+    df.loc[rng.random(n) < 0.02, 'edad'] = np.nan
+    df['sexo'] = rng.choice(['F', 'M'], n)
+    df['estado'] = rng.choice(['Leve', 'Grave', 'Fallecido'], n)
+    df['fuente_tipo_contagio'] = rng.choice(['Comunitaria', 'Relacionado', 'Importado'], n)
+    df['recuperado'] = rng.choice(['Recuperado', 'Fallecido', None], n, p=[0.9, 0.05, 0.05])
+    df['ubicacion'] = rng.choice(['Casa', 'Hospital', 'Hospital UCI'], n)
+    df['per_etn_'] = rng.choice([1, 2, 5, 6], n, p=[0.05, 0.01, 0.04, 0.9])
+    return df
+
+def test_conteos():
+    """Prueba los conteos por categoría y por municipio contra value_counts"""
+    print("🚀 Probando conteos de los tableros")
+    print("==================================")
+    
+    df = crear_datos_prueba()
+    estadisticas = ProcesadorCOVID()._generar_estadisticas(df)
+    
+    # Todas las categorías, de mayor a menor
+    assert estadisticas['top_departamentos'] == df['departamento_nom'].value_counts().to_dict()
+    assert list(estadisticas['top_departamentos'].values()) == sorted(estadisticas['top_departamentos'].values(), reverse=True)
+    assert estadisticas['conteo_por_tipo_de_contagio'] == df['fuente_tipo_contagio'].value_counts().to_dict()
+    assert estadisticas['conteo_por_recuperado'] == df['recuperado'].value_counts().to_dict()
+    assert estadisticas['conteo_por_ubicacion_del_caso'] == df['ubicacion'].value_counts().to_dict()
+    print(f"📊 {len(estadisticas['top_departamentos'])} departamentos y cuatro conteos del análisis avanzado")
+    
+    # Los códigos de pertenencia étnica se etiquetan, lleguen como número o como texto
+    esperado = {'Otro': (df['per_etn_'] == 6).sum(), 'Indígena': (df['per_etn_'] == 1).sum(),
+                'Negro': (df['per_etn_'] == 5).sum(), 'ROM': (df['per_etn_'] == 2).sum()}
+    assert estadisticas['conteo_por_pertenencia_etnica'] == esperado
+    como_texto = df.assign(per_etn_=df['per_etn_'].astype(str))
+    assert ProcesadorCOVID()._generar_estadisticas(como_texto)['conteo_por_pertenencia_etnica'] == esperado
+    
+    # Los municipios homónimos se cuentan por separado, por código DIVIPOLA
+    municipios = estadisticas['top_municipios']
+    assert municipios['Rionegro (Antioquia)'] == (df['ciudad_municipio'] == 5615).sum()
+    assert municipios['Rionegro (Boyacá)'] == (df['ciudad_municipio'] == 15638).sum()
+    assert municipios['Bogotá'] == (df['ciudad_municipio'] == 11001).sum()
+    assert sum(municipios.values()) == len(df)
+    assert list(municipios.values()) == sorted(municipios.values(), reverse=True)
+    print(f"📊 Municipios: {', '.join(municipios)}")
+    
+    # Sin las columnas opcionales no se generan sus claves
+    minimas = ProcesadorCOVID()._generar_estadisticas(df[['fecha_de_notificación', 'estado']])
+    for clave in ('top_departamentos', 'top_municipios', 'conteo_por_tipo_de_contagio', 'distribucion_por_edad'):
+        assert clave not in minimas, clave
+    
+    print("✅ Conteos correctos")
+    return True
+
+def test_casos_por_periodo():
+    """Prueba los casos por mes y por semana, y que la última semana incompleta se omite"""
+    print("🚀 Probando casos por mes y por semana")
+    print("======================================")
+    
+    df = crear_datos_prueba()
+    fechas = df['fecha_de_notificación']
+    estadisticas = ProcesadorCOVID()._generar_estadisticas(df)
+    
+    por_mes = fechas.to_frame('f').groupby(pd.Grouper(key='f', freq='MS')).size()
+    assert estadisticas['casos_por_mes'] == {str(p.date()): int(c) for p, c in por_mes.items()}
+    
+    # Semanas terminadas en domingo, etiquetadas con ese día; la última no ha terminado
+    por_semana = fechas.to_frame('f').groupby(pd.Grouper(key='f', freq='W')).size()
+    assert fechas.max().dayofweek != 6
+    assert estadisticas['casos_por_semana'] == {str(p.date()): int(c) for p, c in por_semana.iloc[:-1].items()}
+    print(f"📊 {len(estadisticas['casos_por_mes'])} meses y {len(estadisticas['casos_por_semana'])} semanas completas")
+    
+    # Si la última fecha es domingo, la última semana está completa y se conserva
+    domingo = fechas.max() + pd.Timedelta(days=6 - fechas.max().dayofweek)
+    completa = df[fechas <= domingo - pd.Timedelta(days=7)].copy()
+    completa.loc[completa.index[0], 'fecha_de_notificación'] = domingo - pd.Timedelta(days=7)
+    semanas = ProcesadorCOVID()._generar_estadisticas(completa)['casos_por_semana']
+    assert max(semanas) == str((domingo - pd.Timedelta(days=7)).date())
+    
+    print("✅ Casos por periodo correctos")
+    return True
+
+def test_distribucion_edad():
+    """Prueba la distribución por grupo de edad, total y por sexo, contra pd.cut"""
+    print("🚀 Probando distribución por edad")
+    print("=================================")
+    
+    df = crear_datos_prueba()
+    estadisticas = ProcesadorCOVID()._generar_estadisticas(df)
+    
+    grupos = pd.cut(df['edad'], bins=BORDES_EDAD, labels=ETIQUETAS_EDAD, right=False)
+    esperado = grupos.value_counts().reindex(ETIQUETAS_EDAD)
+    assert estadisticas['distribucion_por_edad'] == {g: int(c) for g, c in esperado.items()}
+    assert list(estadisticas['distribucion_por_edad']) == ETIQUETAS_EDAD
+    
+    por_sexo = pd.crosstab(grupos, df['sexo']).reindex(ETIQUETAS_EDAD, fill_value=0)
+    for sexo in ('F', 'M'):
+        assert estadisticas['distribucion_por_edad_y_sexo'][sexo] == {g: int(c) for g, c in por_sexo[sexo].items()}
+    print(f"📊 {esperado.sum():,} de {len(df):,} filas con edad; {len(por_sexo.columns)} sexos")
+    
+    print("✅ Distribución por edad correcta")
+    return True
+
+if __name__ == "__main__":
+    success = test_conteos() and test_casos_por_periodo() and test_distribucion_edad()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
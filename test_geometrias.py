@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Script para probar las geometrías simplificadas de los mapas coropléticos
+"""
+
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from geometrias import GeometriasDivipola, casos_por_codigo, douglas_peucker
+
+def anillo_ondulado(centro_x, centro_y, radio, n_puntos=4000):
+    """Anillo cerrado con bordes irregulares, como un límite real"""
+    angulos = np.linspace(0, 2 * np.pi, n_puntos, endpoint=False)
+    radios = radio * (1 + 0.2 * np.sin(9 * angulos) + 0.02 * np.sin(97 * angulos))
+    puntos = np.column_stack([centro_x + radios * np.cos(angulos), centro_y + radios * np.sin(angulos)])
+    return np.vstack([puntos, puntos[:1]])
+
+def crear_limites(ruta):
+    """Dos departamentos: uno con un hueco y otro con una isla diminuta"""
+    exterior = anillo_ondulado(-75.5, 6.5, 1.0)
+    hueco = anillo_ondulado(-75.5, 6.5, 0.2, 500)[::-1]
+    isla = anillo_ondulado(-81.7, 12.5, 0.001, 50)
+    features = [
+        {'type': 'Feature', 'properties': {'DPTO_CCDGO': '05', 'DPTO_CNMBR': 'ANTIOQUIA'},
+         'geometry': {'type': 'Polygon', 'coordinates': [exterior.tolist(), hueco.tolist()]}},
+        {'type': 'Feature', 'properties': {'DPTO_CCDGO': '08', 'DPTO_CNMBR': 'ATLÁNTICO'},
+         'geometry': {'type': 'MultiPolygon', 'coordinates': [
+             [anillo_ondulado(-74.9, 10.7, 0.3).tolist()], [isla.tolist()]
+         ]}}
+    ]
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+
+def test_geometrias():
+    """Prueba la simplificación por niveles, la codificación compacta y la unión por DIVIPOLA"""
+    print("🚀 Probando geometrías simplificadas")
+    print("====================================")
+    
+    # Douglas-Peucker deja todos los puntos originales a menos de la tolerancia
+    linea = np.column_stack([np.linspace(0, 1, 200), 0.01 * np.sin(np.linspace(0, 20, 200))])
+    conservados = linea[douglas_peucker(linea, 0.005)]
+    distancias = np.abs(np.interp(linea[:, 0], conservados[:, 0], conservados[:, 1]) - linea[:, 1])
+    assert len(conservados) < len(linea) and distancias.max() <= 0.005 + 1e-12
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'departamentos.geojson')
+        crear_limites(ruta)
+        assert GeometriasDivipola(directorio, 'departamentos', ruta).construir()
+        geometrias = GeometriasDivipola(directorio, 'departamentos', ruta)
+        assert geometrias.esta_actualizado()
+        assert geometrias.codigos().tolist() == [5, 8]
+        
+        # Menos puntos cuanto menor el detalle, siempre con el hueco y la isla
+        detalles = geometrias.metadatos()['detalles']
+        assert detalles['baja']['puntos'] < detalles['media']['puntos'] < detalles['alta']['puntos']
+        assert detalles['alta']['puntos'] < geometrias.metadatos()['puntos_originales'] / 4
+        baja = geometrias.geojson('baja')
+        antioquia, atlantico = baja['features']
+        assert antioquia['id'] == 5 and len(antioquia['geometry']['coordinates'][0]) == 2
+        assert len(atlantico['geometry']['coordinates']) == 2
+        for anillo in antioquia['geometry']['coordinates'][0]:
+            assert len(anillo) >= 4 and anillo[0] == anillo[-1]
+        
+        # Cada vértice decodificado es un vértice original salvo la cuantización
+        originales = anillo_ondulado(-75.5, 6.5, 1.0)
+        for vertice in geometrias.geojson('alta', [5])['features'][0]['geometry']['coordinates'][0][0]:
+            assert np.abs(originales - vertice).max(axis=1).min() <= 0.5e-4 + 1e-9
+        
+        # El zoom de un departamento pide más detalle que el del país
+        _, zoom_pais = geometrias.vista()
+        _, zoom_departamento = geometrias.vista([8])
+        assert zoom_departamento > zoom_pais
+        assert geometrias.detalle_para_zoom(zoom_pais) == 'baja'
+        
+        # Los distritos reportados como departamento se unen al suyo
+        casos = casos_por_codigo(['5', '05', 8001, 8, None, 'sin dato'], 'departamentos')
+        assert casos.to_dict() == {5: 2, 8: 2}
+        
+        print(f"📊 Puntos por detalle: { {d: v['puntos'] for d, v in detalles.items()} }")
+    
+    print("✅ Geometrías correctas")
+    return True
+
+if __name__ == "__main__":
+    success = test_geometrias()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script para probar los indicadores epidemiológicos en lote
+"""
+
+import sys
+import numpy as np
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from indicadores import (
+    calcular_indicadores, MEDIA_INTERVALO_SERIAL, DESVIACION_INTERVALO_SERIAL
+)
+
+def test_indicadores_crecimiento_exponencial():
+    """Con crecimiento exponencial constante los indicadores tienen valor conocido"""
+    print("🚀 Probando indicadores epidemiológicos")
+    print("======================================")
+    
+    r = 0.05
+    dias = np.arange(200)
+    casos = np.vstack([100 * np.exp(r * dias), np.full(200, 50.0)])
+    indicadores = calcular_indicadores(casos, casos * 0.02)
+    
+    # Región que crece: duplicación ln2/r, crecimiento semanal e^(7r) - 1
+    assert abs(indicadores['tiempo_duplicacion'][0, -1] - np.log(2) / r) < 1e-6
+    assert abs(indicadores['crecimiento_7d'][0, -1] - (np.exp(7 * r) - 1) * 100) < 1e-6
+    
+    # Rt = 1 / M(-r) del intervalo serial gamma (ecuación de Wallinga-Lipsitch)
+    forma = (MEDIA_INTERVALO_SERIAL / DESVIACION_INTERVALO_SERIAL) ** 2
+    escala = DESVIACION_INTERVALO_SERIAL ** 2 / MEDIA_INTERVALO_SERIAL
+    esperado = (1 + r * escala) ** forma
+    assert abs(indicadores['rt'][0, -1] - esperado) < 0.01
+    
+    # Región estable: Rt ≈ 1, sin crecimiento ni tiempo de duplicación
+    assert abs(indicadores['rt'][1, -1] - 1) < 0.01
+    assert indicadores['crecimiento_7d'][1, -1] == 0
+    assert np.isnan(indicadores['tiempo_duplicacion'][1, -1])
+    assert np.allclose(indicadores['letalidad'][:, -1], 2.0)
+    print(f"📊 Rt región creciente: {indicadores['rt'][0, -1]:.3f} (esperado {esperado:.3f})")
+    
+    print("✅ Indicadores correctos")
+    return True
+
+if __name__ == "__main__":
+    success = test_indicadores_crecimiento_exponencial()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Script para probar el índice temporal de sumas acumuladas
+"""
+
+import sys
+import tempfile
+import numpy as np
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from indice_temporal import IndiceTemporal
+from test_muestreo import crear_datos_prueba
+
+def test_indice_temporal():
+    """Prueba que los totales por rango coinciden con filtrar las filas"""
+    print("🚀 Probando índice temporal")
+    print("===========================")
+    
+    df = crear_datos_prueba()
+    df['sexo'] = np.where(df['edad'] % 3 == 0, 'M', 'F')
+    with tempfile.TemporaryDirectory() as directorio:
+        assert IndiceTemporal(directorio).construir(df, 'v1')
+        indice = IndiceTemporal(directorio)
+        assert indice.esta_actualizado('v1') and not indice.esta_actualizado('v2')
+        
+        fechas = df['fecha_de_notificación']
+        en_rango = (fechas >= '2020-04-10') & (fechas <= '2020-05-03')
+        assert indice.total('2020-04-10', '2020-05-03') == en_rango.sum()
+        
+        filtro = en_rango & (df['departamento_nom'] == 'Vaupés') & df['estado'].isin(['Grave', 'Leve'])
+        assert indice.total('2020-04-10', '2020-05-03', ['Vaupés'], ['Grave', 'Leve']) == filtro.sum()
+        
+        grupos = indice.totales_por('grupo_edad', '2020-04-10', '2020-05-03')
+        assert grupos.sum() == en_rango.sum()
+        
+        # Los totales por estado y por sexo aplican los mismos filtros que el total
+        por_estado = indice.totales_por('estado', '2020-04-10', '2020-05-03', ['Vaupés'], ['Grave', 'Leve'])
+        assert por_estado.to_dict() == df[filtro]['estado'].value_counts().to_dict()
+        por_sexo = indice.totales_por('sexo', '2020-04-10', '2020-05-03', ['Vaupés'], ['Grave', 'Leve'])
+        assert por_sexo.sum() == filtro.sum() and por_sexo['M'] == (filtro & (df['sexo'] == 'M')).sum()
+        assert indice.totales_por('sexo').to_dict() == df['sexo'].value_counts().to_dict()
+        
+        # Fuera del rango de datos no hay casos y sin fechas se cuenta todo
+        assert indice.total('2019-01-01', '2019-12-31') == 0
+        assert indice.total() == len(df)
+        
+        comparacion = indice.comparar_periodos('2020-04-10', '2020-05-03')
+        anterior = (fechas >= '2020-03-17') & (fechas <= '2020-04-09')
+        assert comparacion['anterior'] == anterior.sum()
+        print(f"📊 Periodo: {comparacion['actual']:,} casos ({comparacion['variacion']:+.1f}% vs. anterior)")
+    
+    print("✅ Índice temporal correcto")
+    return True
+
+if __name__ == "__main__":
+    success = test_indice_temporal()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Script para probar la instantánea de arranque
+"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from instantanea import InstantaneaArranque, TAMAÑO_MUESTRA
+from indice_temporal import IndiceTemporal
+from procesamiento import ProcesadorCOVID
+from huella_datos import huella_dataset
+from test_muestreo import crear_datos_prueba
+
+def test_instantanea():
+    """Prueba los totales del periodo inicial y la muestra pequeña"""
+    print("🚀 Probando instantánea de arranque")
+    print("===================================")
+    
+    df = crear_datos_prueba()
+    df['sexo'] = np.random.default_rng(1).choice(['F', 'M'], len(df))
+    estadisticas = ProcesadorCOVID()._generar_estadisticas(df)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        indice = IndiceTemporal(f'{directorio}/indice')
+        assert indice.construir(df)
+        assert InstantaneaArranque(f'{directorio}/instantanea', indice).construir(df, estadisticas)
+        
+        instantanea = InstantaneaArranque(f'{directorio}/instantanea')
+        assert instantanea.esta_actualizado(huella_dataset(estadisticas))
+        # Otra construcción con el mismo número de registros es otra versión
+        otra = dict(estadisticas, ultima_actualizacion='2099-01-01T00:00:00')
+        assert not instantanea.esta_actualizado(huella_dataset(otra))
+        assert instantanea.analisis()['total_registros'] == len(df)
+        
+        # Los totales del periodo inicial son los que calcularía el índice
+        periodo = instantanea.periodo()
+        comparacion = indice.comparar_periodos(periodo['fecha_inicio'], periodo['fecha_fin'])
+        assert periodo['actual'] == comparacion['actual'] and periodo['anterior'] == comparacion['anterior']
+        assert periodo['fecha_fin'] == str(df['fecha_de_notificación'].max().date())
+        assert sum(periodo['por_estado'].values()) == periodo['actual']
+        
+        # Muestra pequeña con todos los estratos y pesos que suman la población
+        muestra = instantanea.cargar_muestra()
+        assert len(muestra) <= TAMAÑO_MUESTRA * 1.1
+        assert set(muestra['departamento_nom']) == set(df['departamento_nom'])
+        assert abs(muestra['peso_muestral'].sum() - len(df)) / len(df) < 0.01
+        print(f"📊 Muestra de {len(muestra):,} filas; periodo {periodo['fecha_inicio']} a {periodo['fecha_fin']}: {periodo['actual']:,} casos")
+    
+    print("✅ Instantánea de arranque correcta")
+    return True
+
+if __name__ == "__main__":
+    success = test_instantanea()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script para probar la instrumentación de tiempo y memoria por etapa
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from instrumentacion import REGISTRO, RegistroEtapas, medir_etapa, medido, activar_tracemalloc, memoria_rss_mb
+
+def test_instrumentacion():
+    """Prueba tiempos, memoria residente, picos anidados con tracemalloc y el log JSON"""
+    print("🚀 Probando instrumentación por etapa")
+    print("=====================================")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        registro = RegistroEtapas(os.path.join(directorio, 'logs', 'instrumentacion.jsonl'))
+        assert memoria_rss_mb() > 0
+        
+        # Reloj frente a CPU: una espera no consume CPU
+        with medir_etapa('espera', registro=registro) as espera:
+            time.sleep(0.2)
+        assert espera['tiempo_s'] >= 0.2 and espera['cpu_s'] < 0.1
+        assert espera['pico_mb'] is None
+        
+        # Con tracemalloc, el pico de la etapa externa incluye el de la interna
+        activar_tracemalloc()
+        try:
+            with medir_etapa('externa', registro=registro) as externa:
+                with medir_etapa('interna', registro=registro) as interna:
+                    bloque = bytearray(40 * 1024 * 1024)
+                    del bloque
+                pequeño = bytearray(5 * 1024 * 1024)
+        finally:
+            activar_tracemalloc(False)
+        assert 39 <= interna['pico_mb'] <= 45 and externa['pico_mb'] >= interna['pico_mb']
+        assert externa['delta_rss_mb'] is not None and len(pequeño) > 0
+        
+        # Las excepciones se registran igual y el decorador usa el nombre de la función
+        @medido('calculo')
+        def sumar(a, b):
+            return a + b
+        try:
+            with medir_etapa('fallida', registro=registro):
+                raise ValueError("prueba")
+        except ValueError:
+            pass
+        
+        etapas = [r['etapa'] for r in registro.registros()]
+        assert etapas == ['espera', 'interna', 'externa', 'fallida']
+        with open(registro.ruta_log) as f:
+            assert [json.loads(linea)['etapa'] for linea in f] == etapas
+        assert sumar(2, 3) == 5 and REGISTRO.registros('calculo')[-1]['detalle'] == 'sumar'
+        print(f"📊 Pico interno {interna['pico_mb']:.1f} MB, externo {externa['pico_mb']:.1f} MB")
+    
+    print("✅ Instrumentación correcta")
+    return True
+
+if __name__ == "__main__":
+    success = test_instrumentacion()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Script para probar los kernels de conteo sobre códigos de categoría
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from kernels_conteo import (
+    conteo_por_columna, tabla_cruzada, codigos_periodo, codigos_edad,
+    conteo_1d, conteo_2d, conteo_disperso, tabla_cruzada_dispersa,
+    ETIQUETAS_EDAD, BORDES_EDAD
+)
+
+def crear_datos_prueba(n=20000, semilla=0):
+    """Crea un dataset sintético con nulos en las columnas categóricas y de fecha"""
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        'departamento_nom': rng.choice(['Antioquia', 'Bogotá D.C.', 'Valle', 'Vaupés'], n, p=[0.3, 0.5, 0.19, 0.01]),
+        'estado': rng.choice(['Leve', 'Moderado', 'Grave', 'Fallecido'], n),
+        'sexo': rng.choice(['F', 'M'], n),
+        'edad': rng.integers(0, 115, n).astype(float),
+        'fecha_de_notificación': pd.Timestamp('2020-03-01') + pd.to_timedelta(rng.integers(0, 400, n), unit='D')
+    })
+    nulos = rng.random(n) < 0.02
+    df.loc[nulos, 'estado'] = None
+    df.loc[rng.random(n) < 0.02, 'edad'] = np.nan
+    df.loc[rng.random(n) < 0.02, 'fecha_de_notificación'] = pd.NaT
+    df['sexo'] = df['sexo'].astype('category')
+    return df
+
+def test_conteos_1d():
+    """Prueba que los conteos por columna coinciden con value_counts"""
+    print("🚀 Probando conteos por columna")
+    print("===============================")
+    
+    df = crear_datos_prueba()
+    for columna in ('departamento_nom', 'estado', 'sexo'):
+        esperado = df[columna].value_counts()
+        obtenido = conteo_por_columna(df[columna])
+        assert list(obtenido.index) == list(esperado.index), columna
+        assert (obtenido.to_numpy() == esperado.to_numpy()).all(), columna
+        
+        esperado = df[columna].value_counts(normalize=True)
+        obtenido = conteo_por_columna(df[columna], normalizar=True)
+        assert np.allclose(obtenido.to_numpy(), esperado.to_numpy()), columna
+        print(f"   ✅ {columna}: {len(obtenido)} categorías")
+    
+    # Grupos de edad con los mismos cortes que pd.cut
+    codigos, etiquetas = codigos_edad(df['edad'])
+    esperado = pd.cut(df['edad'], bins=BORDES_EDAD, labels=ETIQUETAS_EDAD, right=False).value_counts(sort=False)
+    assert list(etiquetas) == list(esperado.index)
+    assert (conteo_1d(codigos, len(etiquetas)) == esperado.to_numpy()).all()
+    assert (codigos[df['edad'].isna().to_numpy()] == -1).all()
+    print(f"   ✅ edad: {len(etiquetas)} grupos")
+    
+    print("✅ Conteos 1-D iguales a value_counts")
+    return True
+
+def test_periodos():
+    """Prueba que los códigos de periodo agrupan igual que pd.Grouper"""
+    print("\n🚀 Probando códigos de periodo")
+    print("==============================")
+    
+    df = crear_datos_prueba()
+    fechas = df['fecha_de_notificación']
+    for frecuencia, grouper in (('D', 'D'), ('W', 'W'), ('M', 'MS'), ('Y', 'YS')):
+        codigos, etiquetas = codigos_periodo(fechas, frecuencia)
+        conteos = conteo_1d(codigos, len(etiquetas))
+        esperado = df.groupby(pd.Grouper(key='fecha_de_notificación', freq=grouper)).size()
+        assert len(conteos) == len(esperado), frecuencia
+        assert (conteos == esperado.to_numpy()).all(), frecuencia
+        if frecuencia in ('D', 'W'):
+            # Las semanas se etiquetan con el domingo en que terminan
+            assert (pd.DatetimeIndex(etiquetas) == esperado.index).all(), frecuencia
+        print(f"   ✅ {frecuencia}: {len(conteos)} periodos")
+    
+    codigos, etiquetas = codigos_periodo(pd.Series([pd.NaT, pd.NaT]), 'W')
+    assert (codigos == -1).all() and len(etiquetas) == 0
+    
+    try:
+        codigos_periodo(fechas, 'Q')
+        assert False, "Se esperaba ValueError"
+    except ValueError:
+        pass
+    
+    print("✅ Periodos iguales a pd.Grouper")
+    return True
+
+def test_tabla_cruzada():
+    """Prueba que la tabla de contingencia densa coincide con pd.crosstab"""
+    print("\n🚀 Probando tabla cruzada")
+    print("=========================")
+    
+    df = crear_datos_prueba()
+    for filas, columnas in (('departamento_nom', 'estado'), ('estado', 'sexo')):
+        esperado = pd.crosstab(df[filas], df[columnas])
+        obtenido = tabla_cruzada(df[filas], df[columnas])
+        assert list(obtenido.index) == list(esperado.index)
+        assert list(obtenido.columns) == list(esperado.columns)
+        assert (obtenido.to_numpy() == esperado.to_numpy()).all()
+        
+        esperado = pd.crosstab(df[filas], df[columnas], normalize='index')
+        obtenido = tabla_cruzada(df[filas], df[columnas], normalizar_filas=True)
+        assert np.allclose(obtenido.to_numpy(), esperado.to_numpy())
+        print(f"   ✅ {filas} × {columnas}: {obtenido.shape[0]}×{obtenido.shape[1]}")
+    
+    print("✅ Tablas iguales a pd.crosstab")
+    return True
+
+def test_tabla_cruzada_dispersa():
+    """Prueba la tabla de contingencia dispersa y el recorte a las categorías principales"""
+    print("\n🚀 Probando tabla cruzada dispersa")
+    print("==================================")
+    
+    df = crear_datos_prueba()
+    rng = np.random.default_rng(1)
+    # Muchas categorías poco pobladas, como municipio × edad
+    df['municipio'] = rng.zipf(1.5, len(df)).astype(str)
+    
+    # Las celdas dispersas reconstruyen la tabla densa, también por la vía de np.unique
+    a = rng.integers(-1, 300, 5000)
+    b = rng.integers(-1, 40, 5000)
+    densa = conteo_2d(a, 300, b, 40)
+    for n_a in (300, 1 << 22):
+        filas, columnas, conteos = conteo_disperso(a, n_a, b, 40)
+        reconstruida = np.zeros((n_a, 40), dtype=np.int64)
+        reconstruida[filas, columnas] = conteos
+        assert (reconstruida[:300] == densa).all() and (conteos > 0).all()
+    
+    esperado = pd.crosstab(df['municipio'], df['estado'])
+    obtenido = tabla_cruzada_dispersa(df['municipio'], df['estado'])
+    assert list(obtenido.index) == list(esperado.index)
+    assert list(obtenido.columns) == list(esperado.columns)
+    assert (obtenido.to_numpy() == esperado.to_numpy()).all()
+    print(f"   ✅ Tabla completa: {obtenido.shape[0]}×{obtenido.shape[1]}")
+    
+    # Recorte a las filas y columnas con más casos, en orden de categoría
+    obtenido = tabla_cruzada_dispersa(df['municipio'], df['edad'], top_filas=10, top_columnas=5)
+    esperado = pd.crosstab(df['municipio'], df['edad'])
+    filas = esperado.sum(axis=1).sort_values(ascending=False, kind='stable').index[:10]
+    columnas = esperado.sum(axis=0).sort_values(ascending=False, kind='stable').index[:5]
+    esperado = esperado.loc[sorted(filas), sorted(columnas)]
+    assert obtenido.shape == (10, 5)
+    assert list(obtenido.index) == list(esperado.index)
+    assert list(obtenido.columns) == list(esperado.columns)
+    assert (obtenido.to_numpy() == esperado.to_numpy()).all()
+    print(f"   ✅ Recorte: {obtenido.shape[0]}×{obtenido.shape[1]}")
+    
+    # La normalización usa el total completo de cada fila, no solo el del bloque mostrado
+    obtenido = tabla_cruzada_dispersa(df['municipio'], df['estado'], top_filas=10, top_columnas=2, normalizar_filas=True)
+    esperado = pd.crosstab(df['municipio'], df['estado'], normalize='index').loc[obtenido.index, obtenido.columns]
+    assert np.allclose(obtenido.to_numpy(), esperado.to_numpy())
+    assert (obtenido.sum(axis=1) < 1).all()
+    print("   ✅ Normalización por fila con el total completo")
+    
+    print("✅ Tablas dispersas iguales a pd.crosstab")
+    return True
+
+if __name__ == "__main__":
+    success = test_conteos_1d() and test_periodos() and test_tabla_cruzada() and test_tabla_cruzada_dispersa()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script para probar el muestreo estratificado por niveles
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from muestreo import MuestreadorEstratificado, COLUMNA_PESO
+
+def crear_datos_prueba(n=60000, semilla=0):
+    """Crea un dataset sintético con un departamento grande y uno muy pequeño"""
+    rng = np.random.default_rng(semilla)
+    departamentos = np.where(rng.random(n) < 0.995, 'Bogotá D.C.', 'Vaupés')
+    fechas = pd.Timestamp('2020-03-01') + pd.to_timedelta(rng.integers(0, 120, n), unit='D')
+    return pd.DataFrame({
+        'fecha_de_notificación': fechas,
+        'departamento_nom': departamentos,
+        'estado': rng.choice(['Leve', 'Grave', 'Fallecido'], n),
+        'edad': rng.integers(0, 100, n)
+    })
+
+def test_muestreo_estratificado():
+    """Prueba construcción, pesos y selección de nivel"""
+    print("🚀 Probando muestreo estratificado")
+    print("==================================")
+    
+    df = crear_datos_prueba()
+    with tempfile.TemporaryDirectory() as directorio:
+        muestreador = MuestreadorEstratificado(directorio, niveles=(1000, 10000))
+        assert muestreador.construir(df, 'v1')
+        assert muestreador.esta_actualizado('v1') and not muestreador.esta_actualizado('v2')
+        assert muestreador.niveles_disponibles() == [1000, 10000]
+        
+        pequeña = muestreador.cargar_muestra(1000)
+        grande = muestreador.cargar_muestra(10000)
+        print(f"📊 Niveles: {len(pequeña):,} y {len(grande):,} filas")
+        
+        # Los pesos reconstruyen el total de la población
+        assert abs(pequeña[COLUMNA_PESO].sum() - len(df)) < 1e-6 * len(df)
+        
+        # El departamento pequeño conserva filas en cada mes aunque sea raro
+        vaupes = pequeña[pequeña['departamento_nom'] == 'Vaupés']
+        assert vaupes['fecha_de_notificación'].dt.to_period('M').nunique() == 4
+        
+        # La muestra se carga desde disco con el mismo contenido
+        recargado = MuestreadorEstratificado(directorio, niveles=(1000, 10000))
+        assert len(recargado.cargar_muestra(1000)) == len(pequeña)
+        
+        # Un mínimo por estrato exigente obliga a subir de nivel o a los datos completos
+        assert recargado.seleccionar_nivel(departamentos=['Vaupés'], minimo_filas=100) == 1000
+        assert recargado.seleccionar_nivel(departamentos=['Bogotá D.C.'], minimo_por_estrato=500, minimo_filas=0) == 10000
+        assert recargado.seleccionar_nivel(minimo_por_estrato=500) is None
+        
+        # El nivel se elige por las filas que quedan tras el filtro: tres semanas de
+        # Bogotá dejan ~170 filas en la muestra pequeña y suben al nivel siguiente
+        ventana = dict(departamentos=['Bogotá D.C.'], fecha_inicio='2020-03-01', fecha_fin='2020-03-20')
+        assert recargado.seleccionar_nivel(minimo_filas=1000, **ventana) == 10000
+        # Sin filtro, con un mínimo total de 5.000 filas tampoco basta la muestra pequeña
+        assert recargado.seleccionar_nivel(minimo_filas=5000) == 10000
+        # Unos pocos días no alcanzan ni con el nivel mayor: se usan los datos completos
+        assert recargado.seleccionar_nivel(fecha_inicio='2020-03-01', fecha_fin='2020-03-03') is None
+        filtrada = muestreador.cargar_muestra(10000)
+        filtrada = filtrada[(filtrada['departamento_nom'] == 'Bogotá D.C.') &
+                            (filtrada['fecha_de_notificación'] <= '2020-03-20')]
+        print(f"📊 Filas tras el filtro en el nivel 10.000: {len(filtrada):,}")
+        assert len(filtrada) >= 1000
+    
+    print("✅ Muestreo estratificado correcto")
+    return True
+
+if __name__ == "__main__":
+    success = test_muestreo_estratificado()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
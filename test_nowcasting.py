@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script para probar el nowcast de casos recientes corregido por retraso
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from nowcasting import NowcastCasos, REGION_TOTAL
+
+def crear_casos_con_retraso(semilla=3):
+    """Casos con inicio de síntomas en 400 días y un retraso geométrico hasta el reporte"""
+    rng = np.random.default_rng(semilla)
+    dias = np.arange(400)
+    inicio = np.repeat(dias, rng.poisson(200 * np.exp(0.01 * dias)))
+    retraso = rng.geometric(1 / 8, len(inicio)) - 1
+    origen = pd.Timestamp('2020-03-01')
+    return pd.DataFrame({
+        'departamento_nom': rng.choice(['Antioquia', 'Bogotá D.C.', 'Vaupés'], len(inicio), p=[0.7, 0.29, 0.01]),
+        'fecha_inicio_sintomas': origen + pd.to_timedelta(inicio, unit='D'),
+        'fecha_reporte_web': origen + pd.to_timedelta(inicio + retraso, unit='D')
+    })
+
+def test_nowcasting():
+    """Prueba que el nowcast de las semanas recientes se acerca a los casos finales"""
+    print("🚀 Probando nowcast de casos recientes")
+    print("======================================")
+    
+    completos = crear_casos_con_retraso()
+    # Lo que se habría visto al cortar los reportes en el día 350
+    corte = pd.Timestamp('2020-03-01') + pd.Timedelta(days=350)
+    df = completos[completos['fecha_reporte_web'] <= corte]
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        assert NowcastCasos(directorio).construir(df, 'v1')
+        nowcast = NowcastCasos(directorio)
+        assert nowcast.esta_actualizado('v1') and not nowcast.esta_actualizado('v2')
+        assert nowcast.regiones()[0] == REGION_TOTAL
+        
+        semanal = nowcast.resultados(REGION_TOTAL, 'W')
+        semanas = completos['fecha_inicio_sintomas'].dt.to_period('W-SUN').dt.end_time.dt.normalize()
+        finales = completos.groupby(semanas).size().reindex(semanal['fecha']).to_numpy()
+        
+        # Los observados subestiman las últimas semanas; los estimados quedan cerca
+        ultima = semanal.iloc[-1]
+        assert ultima['observados'] < 0.5 * finales[-1]
+        error = np.abs(semanal['estimados'].to_numpy() / finales - 1)
+        assert error.max() < 0.05
+        assert (semanal['limite_inferior'] <= semanal['estimados']).all()
+        assert (semanal['estimados'] <= semanal['limite_superior']).all()
+        
+        # Los departamentos pequeños usan los factores nacionales y suman al total
+        diario = nowcast.resultados('Vaupés', 'D')
+        assert diario['estimados'].notna().all()
+        departamentos = [r for r in nowcast.regiones() if r != REGION_TOTAL]
+        suma = sum(nowcast.resultados(r, 'D')['observados'].sum() for r in departamentos)
+        assert suma == nowcast.resultados(REGION_TOTAL, 'D')['observados'].sum()
+        
+        # Con un corte a mitad de semana la semana incompleta no se publica como la última
+        miercoles = corte - pd.Timedelta(days=4)
+        parcial = NowcastCasos(os.path.join(directorio, 'parcial'))
+        assert parcial.construir(completos[completos['fecha_reporte_web'] <= miercoles])
+        assert parcial.resultados(REGION_TOTAL, 'W')['fecha'].iloc[-1] == corte - pd.Timedelta(days=7)
+        assert parcial.resultados(REGION_TOTAL, 'D')['fecha'].iloc[-1] == miercoles
+        print(f"📊 Última semana: {ultima['observados']:,.0f} observados → "
+              f"{ultima['estimados']:,.0f} estimados ({finales[-1]:,} finales)")
+    
+    print("✅ Nowcast correcto")
+    return True
+
+if __name__ == "__main__":
+    success = test_nowcasting()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Script para probar el pipeline de datos sin interfaz
+"""
+
+import os
+import ast
+import sys
+import json
+import tempfile
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from pipeline_datos import main
+from procesamiento import ProcesadorCOVID
+from test_muestreo import crear_datos_prueba
+from test_geometrias import crear_limites
+
+def test_pipeline_datos():
+    """Prueba todas las etapas en orden, la verificación y la reconstrucción de un artefacto"""
+    print("🚀 Probando pipeline de datos")
+    print("=============================")
+    
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        # El procesador trabaja con rutas relativas al directorio del proyecto
+        os.chdir(directorio)
+        try:
+            df = crear_datos_prueba(20000)
+            # Fechas de inicio, diagnóstico y reporte para que se construyan los retrasos y el nowcast
+            df['fecha_inicio_sintomas'] = df['fecha_de_notificación'] - pd.to_timedelta(df['edad'] % 7, unit='D')
+            df['fecha_diagnostico'] = df['fecha_de_notificación']
+            df['fecha_reporte_web'] = df['fecha_de_notificación'] + pd.to_timedelta(df['edad'] % 5, unit='D')
+            df.to_csv('casos.csv', index=False)
+            # Límites como los versionados en datos_geograficos/ (solo departamentos)
+            os.makedirs('datos_geograficos')
+            crear_limites(os.path.join('datos_geograficos', 'departamentos.geojson'))
+            opciones = ['--archivo', 'casos.csv', '--hilos', '2', '--procesos', '1']
+            assert main(opciones + ['--tiempos', 'tiempos.json', 'all']) == 0
+            
+            # Cada etapa tiene su tiempo y la caché es la que cargaría la aplicación
+            with open('tiempos.json') as f:
+                tiempos = json.load(f)
+            assert [t['etapa'] for t in tiempos['etapas']] == ['descargar', 'convertir', 'estadisticas', 'indices', 'calentar', 'verificar']
+            assert all(t['cpu_s'] >= 0 and t['rss_mb'] > 0 for t in tiempos['etapas'])
+            assert os.path.exists('datos_procesados/instrumentacion.jsonl')
+            assert os.path.exists('casos.parquet')
+            procesador = ProcesadorCOVID('casos.csv')
+            assert procesador.cargar_analisis_cache()['total_registros'] == len(df)
+            assert procesador.pronosticos['departamentos'].esta_actualizado(procesador.huella)
+            assert procesador.geometrias['departamentos'].esta_actualizado()
+            
+            # Sin cambios no se reconstruye nada; un artefacto borrado falla la verificación
+            assert main(opciones + ['build-stats']) == 0 and main(opciones + ['verify']) == 0
+            os.remove(procesador.indice_temporal.ruta_metadatos)
+            assert main(opciones + ['verify']) == 1
+            assert main(opciones + ['build-indexes']) == 0 and main(opciones + ['verify']) == 0
+            
+            # Un dataset corregido con el mismo número de registros es otra versión:
+            # los artefactos dejan de estar al día y se reconstruyen
+            df.loc[df.index[:500], 'estado'] = 'Recuperado'
+            df.to_csv('casos.csv', index=False)
+            assert main(opciones + ['convert']) == 0 and main(opciones + ['build-stats']) == 0
+            assert main(opciones + ['verify']) == 1
+            assert main(opciones + ['build-indexes']) == 0 and main(opciones + ['warm-cache']) == 0
+            assert main(opciones + ['verify']) == 0
+            assert 'Recuperado' in ProcesadorCOVID('casos.csv').tensores['departamentos'].metadatos()['estados']
+            print(f"📊 {len(tiempos['etapas'])} etapas en {sum(t['tiempo_s'] for t in tiempos['etapas']):.1f} s")
+        finally:
+            os.chdir(directorio_original)
+    
+    print("✅ Pipeline de datos correcto")
+    return True
+
+def modulos_importados(modulo, directorio='.'):
+    """Módulos del proyecto que importa ``modulo``, directa o indirectamente"""
+    pendientes, vistos = [modulo], set()
+    while pendientes:
+        nombre = pendientes.pop()
+        ruta = os.path.join(directorio, f'{nombre}.py')
+        if nombre in vistos or not os.path.exists(ruta):
+            continue
+        vistos.add(nombre)
+        with open(ruta, encoding='utf-8') as f:
+            arbol = ast.parse(f.read())
+        for nodo in ast.walk(arbol):
+            if isinstance(nodo, ast.Import):
+                pendientes.extend(alias.name.split('.')[0] for alias in nodo.names)
+            elif isinstance(nodo, ast.ImportFrom) and nodo.module and nodo.level == 0:
+                pendientes.append(nodo.module.split('.')[0])
+    return vistos
+
+def test_modulos_empaquetados():
+    """Prueba que setup.py instala todos los módulos que necesita el comando covid-analisis"""
+    print("🚀 Probando módulos de setup.py")
+    print("===============================")
+    
+    with open('setup.py', encoding='utf-8') as f:
+        arbol = ast.parse(f.read())
+    py_modules = next(ast.literal_eval(nodo.value) for nodo in ast.walk(arbol)
+                      if isinstance(nodo, ast.keyword) and nodo.arg == 'py_modules')
+    necesarios = modulos_importados('pipeline_datos')
+    faltantes = necesarios - set(py_modules)
+    print(f"📦 {len(necesarios)} módulos necesarios, {len(py_modules)} declarados")
+    assert not faltantes, f"Faltan en py_modules: {sorted(faltantes)}"
+    
+    print("✅ Módulos empaquetados correctos")
+    return True
+
+if __name__ == "__main__":
+    success = test_pipeline_datos() and test_modulos_empaquetados()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Script para probar los pronósticos de casos por región
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from pronosticos import PronosticosCasos, ajustar_en_paralelo, logaritmo_media_semanal
+from tensor_casos import TensorCasos
+from test_muestreo import crear_datos_prueba
+
+def test_pronosticos():
+    """Prueba que los modelos siguen un crecimiento exponencial y que el pool no cambia el resultado"""
+    print("🚀 Probando pronósticos de casos")
+    print("================================")
+    
+    # 130 regiones que crecen un 2% diario: el pronóstico debe seguir la curva
+    rng = np.random.default_rng(0)
+    dias = np.arange(200)
+    escala = rng.uniform(50, 500, (130, 1))
+    casos = rng.poisson(escala * np.exp(0.02 * dias))
+    futuro = np.expm1(logaritmo_media_semanal(escala * np.exp(0.02 * np.arange(228)))[:, -28:])
+    
+    en_linea, n_procesos = ajustar_en_paralelo(casos, max_procesos=1)
+    assert n_procesos == 1
+    for modelo in ('holt', 'log_lineal'):
+        error = np.abs(en_linea[f'{modelo}__estimado'] / futuro - 1)
+        assert np.median(error) < 0.1, modelo
+        assert (en_linea[f'{modelo}__inferior'] <= en_linea[f'{modelo}__estimado']).all()
+        assert (en_linea[f'{modelo}__estimado'] <= en_linea[f'{modelo}__superior']).all()
+    assert np.allclose(en_linea['crecimiento_diario'], 0.02, atol=0.005)
+    
+    # Repartido en dos procesos da lo mismo que en el proceso actual
+    en_paralelo, n_procesos = ajustar_en_paralelo(casos, max_procesos=2)
+    assert n_procesos == 2
+    for nombre, valores in en_linea.items():
+        assert np.allclose(valores, en_paralelo[nombre], equal_nan=True), nombre
+    
+    df = crear_datos_prueba()
+    with tempfile.TemporaryDirectory() as directorio:
+        tensor = TensorCasos(os.path.join(directorio, 'tensor'))
+        assert tensor.construir(df, 'v1')
+        assert PronosticosCasos(os.path.join(directorio, 'pronosticos')).construir(tensor)
+        pronosticos = PronosticosCasos(os.path.join(directorio, 'pronosticos'))
+        assert pronosticos.esta_actualizado('v1') and not pronosticos.esta_actualizado('v2')
+        assert len(pronosticos.serie('Vaupés')) == 28
+        resumen = pronosticos.resumen('log_lineal')
+        assert list(resumen.index) == tensor.regiones()
+        print(f"📊 {len(resumen)} regiones pronosticadas en {pronosticos.metadatos()['segundos']:.2f}s")
+    
+    print("✅ Pronósticos correctos")
+    return True
+
+if __name__ == "__main__":
+    success = test_pronosticos()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Script para probar la reconstrucción de la caché en segundo plano
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from reconstruccion import ReconstructorCache, directorio_publicado, version_publicada
+from bloqueo_cache import BloqueoConstruccion
+from procesamiento import ProcesadorCOVID
+from test_muestreo import crear_datos_prueba
+
+def total_en_cache():
+    with open(os.path.join(directorio_publicado(), 'estadisticas.json')) as f:
+        return json.load(f)['total_registros']
+
+def test_reconstruccion():
+    """Prueba que la versión anterior sigue publicada hasta cambiar el puntero y que luego queda la nueva"""
+    print("🚀 Probando reconstrucción en segundo plano")
+    print("===========================================")
+    
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        # El procesador trabaja con rutas relativas al directorio del proyecto
+        os.chdir(directorio)
+        try:
+            crear_datos_prueba(20000).to_csv('Casos_positivos_de_COVID-19_en_Colombia.csv', index=False)
+            ProcesadorCOVID().cargar_datos()
+            assert total_en_cache() == 20000
+            
+            # Nuevo dataset: mientras se reconstruye, la caché publicada no cambia
+            crear_datos_prueba(30000, semilla=1).to_csv('Casos_positivos_de_COVID-19_en_Colombia.csv', index=False)
+            os.remove('Casos_positivos_de_COVID-19_en_Colombia.parquet')
+            reconstructor = ReconstructorCache()
+            vistos = []
+            bloqueados = []
+            avisar = reconstructor._progreso
+            def vigilar(fraccion, mensaje):
+                vistos.append(total_en_cache())
+                # La reconstrucción tiene tomado el mismo bloqueo que la construcción inicial
+                bloqueados.append(not BloqueoConstruccion('datos_procesados/.construccion.lock').adquirir())
+                avisar(fraccion, mensaje)
+            reconstructor._progreso = vigilar
+            
+            assert reconstructor.iniciar()
+            assert not reconstructor.iniciar()
+            assert reconstructor.esperar(timeout=120)
+            estado = reconstructor.estado()
+            assert estado['estado'] == 'terminado', estado
+            assert len(vistos) > 3 and set(vistos) == {20000}
+            assert all(bloqueados)
+            assert not os.path.exists('datos_procesados/.reconstruccion.lock')
+            
+            # El puntero nombra la versión nueva y los procesadores nuevos la usan
+            primera = version_publicada()
+            assert primera is not None and total_en_cache() == 30000
+            procesador = ProcesadorCOVID()
+            assert procesador.directorio_procesados == os.path.join('datos_procesados', 'versiones', primera)
+            assert procesador.obtener_tensor(None).metadatos()['total_registros'] == 30000
+            # La caché anterior en la raíz se conserva para las sesiones que aún la usan
+            assert os.path.exists('datos_procesados/datos_covid.parquet')
+            
+            # Una segunda reconstrucción conserva solo la versión vigente y la anterior
+            crear_datos_prueba(25000, semilla=2).to_csv('Casos_positivos_de_COVID-19_en_Colombia.csv', index=False)
+            os.remove('Casos_positivos_de_COVID-19_en_Colombia.parquet')
+            reconstructor = ReconstructorCache()
+            assert reconstructor.iniciar() and reconstructor.esperar(timeout=120)
+            segunda = version_publicada()
+            assert segunda != primera and total_en_cache() == 25000
+            assert sorted(os.listdir('datos_procesados/versiones')) == sorted([primera, segunda])
+            assert not os.path.exists('datos_procesados/datos_covid.parquet')
+            assert not os.path.exists('datos_procesados/tensor')
+            print(f"📊 {len(vistos)} etapas con la versión anterior publicada; reconstrucción en {estado['fin'] - estado['inicio']:.1f}s")
+        finally:
+            os.chdir(directorio_original)
+    
+    print("✅ Reconstrucción correcta")
+    return True
+
+if __name__ == "__main__":
+    success = test_reconstruccion()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Script para probar la reducción de series antes de graficarlas
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from reduccion_series import lttb, minmax_por_cubetas, reducir_figura, puntos_objetivo
+
+def crear_serie_prueba(n=5000, semilla=0):
+    """Serie diaria con ruido y un pico aislado lejos de los extremos"""
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range('2020-03-01', periods=n, freq='D')
+    valores = 100 + np.cumsum(rng.normal(0, 1, n))
+    valores[1234] = valores.max() + 500
+    valores[3210] = valores.min() - 500
+    return fechas, valores
+
+def test_reduccion_series():
+    """Prueba que LTTB y min/max conservan los extremos y el pico"""
+    print("🚀 Probando reducción de series")
+    print("===============================")
+    
+    fechas, valores = crear_serie_prueba()
+    pico, valle = int(np.argmax(valores)), int(np.argmin(valores))
+    
+    indices = lttb(fechas, valores, 300)
+    print(f"📊 LTTB: {len(valores):,} → {len(indices):,} puntos")
+    assert len(indices) == 300
+    assert (np.diff(indices) > 0).all()
+    assert indices[0] == 0 and indices[-1] == len(valores) - 1
+    assert pico in indices and valle in indices
+    
+    indices = minmax_por_cubetas(valores, 300)
+    print(f"📊 Min/max: {len(valores):,} → {len(indices):,} puntos")
+    assert len(indices) <= 302
+    assert indices[0] == 0 and indices[-1] == len(valores) - 1
+    assert pico in indices and valle in indices
+    
+    # Las series cortas o con objetivo degenerado quedan intactas
+    assert (lttb(fechas[:100], valores[:100], 300) == np.arange(100)).all()
+    assert (minmax_por_cubetas(valores, 3) == np.arange(len(valores))).all()
+    
+    # Los nulos no se eligen como pico ni rompen el cálculo
+    con_nulos = valores.copy()
+    con_nulos[::50] = np.nan
+    indices = lttb(fechas, con_nulos, 300)
+    assert pico in indices and indices[-1] == len(valores) - 1
+    
+    print("✅ Extremos y pico conservados")
+    return True
+
+def test_reducir_figura():
+    """Prueba que la figura se recorta al ancho y arrastra los arreglos por punto"""
+    print("\n🚀 Probando reducción de figuras")
+    print("================================")
+    
+    fechas, valores = crear_serie_prueba()
+    fig = go.Figure([
+        go.Scatter(x=fechas, y=valores, customdata=np.arange(len(valores))),
+        go.Bar(x=fechas, y=valores)
+    ])
+    reducir_figura(fig, ancho_px=400)
+    
+    linea, barras = fig.data
+    assert len(linea.y) == puntos_objetivo(400)
+    assert len(barras.y) == len(valores)
+    # customdata guarda la posición original de cada punto conservado
+    posiciones = np.asarray(linea.customdata)
+    assert (np.asarray(linea.y) == valores[posiciones]).all()
+    assert valores.max() in linea.y
+    print(f"📊 Traza de línea: {len(valores):,} → {len(linea.y):,} puntos; barras sin cambios")
+    
+    print("✅ Figura reducida correctamente")
+    return True
+
+if __name__ == "__main__":
+    success = test_reduccion_series() and test_reducir_figura()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
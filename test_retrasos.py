@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script para probar las distribuciones de retrasos entre fechas
+"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from retrasos import AnalizadorRetrasos
+from test_muestreo import crear_datos_prueba
+
+def test_retrasos():
+    """Prueba que los cuantiles del histograma coinciden con los de las filas"""
+    print("🚀 Probando distribuciones de retrasos")
+    print("======================================")
+    
+    rng = np.random.default_rng(1)
+    df = crear_datos_prueba()
+    df['fecha_inicio_sintomas'] = df['fecha_de_notificación'] - pd.to_timedelta(rng.poisson(6, len(df)), unit='D')
+    df['fecha_diagnostico'] = df['fecha_de_notificación']
+    # Algunos casos sin fecha y otros con un retraso negativo (error de captura)
+    df.loc[df.index[:100], 'fecha_diagnostico'] = pd.NaT
+    df.loc[df.index[100:150], 'fecha_diagnostico'] -= pd.Timedelta(days=60)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        assert AnalizadorRetrasos(directorio).construir(df, 'v1')
+        retrasos = AnalizadorRetrasos(directorio)
+        assert retrasos.esta_actualizado('v1') and not retrasos.esta_actualizado('v2')
+        assert retrasos.retrasos_disponibles() == ['inicio_diagnostico']
+        
+        resumen = retrasos.metadatos()['resumen']['inicio_diagnostico']
+        assert resumen['con_fechas'] == len(df) - 100
+        assert resumen['fuera_de_rango'] == 50
+        
+        dias = (df['fecha_diagnostico'] - df['fecha_inicio_sintomas']).dt.days
+        dias = dias[(dias >= 0) & (dias <= 120)]
+        total = retrasos.cuantiles('inicio_diagnostico')
+        assert total['casos'].iloc[0] == len(dias)
+        assert total['p50'].iloc[0] == dias.quantile(0.5, interpolation='lower')
+        assert abs(total['media'].iloc[0] - dias.mean()) < 1e-9
+        
+        por_departamento = retrasos.cuantiles('inicio_diagnostico', 'departamento')
+        assert por_departamento['casos'].sum() == len(dias)
+        print(f"📊 Mediana inicio → diagnóstico: {total['p50'].iloc[0]:.0f} días")
+    
+    print("✅ Retrasos correctos")
+    return True
+
+if __name__ == "__main__":
+    success = test_retrasos()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
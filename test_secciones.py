@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script para probar el selector de secciones de la aplicación
+"""
+
+import os
+import ast
+import sys
+import time
+import tempfile
+
+# Añadir el directorio del proyecto al path: la aplicación se ejecuta desde un directorio temporal
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(DIRECTORIO_PROYECTO)
+
+from test_muestreo import crear_datos_prueba
+
+RUTA_APP = os.path.join(DIRECTORIO_PROYECTO, 'app_analisis_covid.py')
+
+def secciones_declaradas():
+    """Nombre de cada sección de ``SECCIONES`` y la función que la dibuja, leídos del código"""
+    with open(RUTA_APP, encoding='utf-8') as f:
+        arbol = ast.parse(f.read())
+    funciones = {nodo.name: nodo for nodo in arbol.body if isinstance(nodo, ast.FunctionDef)}
+    asignacion = next(nodo for nodo in arbol.body if isinstance(nodo, ast.Assign)
+                      and any(getattr(destino, 'id', None) == 'SECCIONES' for destino in nodo.targets))
+    secciones = {}
+    for clave, valor in zip(asignacion.value.keys, asignacion.value.values):
+        assert isinstance(valor, ast.Name), f"La sección {clave.value} no apunta a una función"
+        secciones[clave.value] = funciones.get(valor.id)
+        assert secciones[clave.value] is not None, f"{valor.id} no está definida en la aplicación"
+    return secciones
+
+def test_secciones_declaradas():
+    """Prueba que cada sección apunta a una función de la aplicación que se dibuja como fragmento"""
+    print("🚀 Probando secciones declaradas")
+    print("================================")
+    
+    secciones = secciones_declaradas()
+    assert len(secciones) == 8
+    for nombre, funcion in secciones.items():
+        decoradores = [ast.unparse(decorador) for decorador in funcion.decorator_list]
+        assert 'st.fragment' in decoradores, f"{funcion.name} no es un fragmento"
+        assert not [argumento for argumento in funcion.args.args], f"{funcion.name} no debe recibir argumentos"
+        print(f"   ✅ {nombre} → {funcion.name}")
+    
+    print("✅ Secciones declaradas correctamente")
+    return True
+
+def test_secciones_dibujadas():
+    """Prueba que el selector ofrece todas las secciones y cada una se dibuja sin excepciones"""
+    print("\n🚀 Probando selector de secciones")
+    print("=================================")
+    
+    from streamlit.testing.v1 import AppTest
+    
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        # La aplicación trabaja con rutas relativas al directorio del proyecto
+        os.chdir(directorio)
+        try:
+            crear_datos_prueba(5000).to_csv('Casos_positivos_de_COVID-19_en_Colombia.csv', index=False)
+            app = AppTest.from_file(RUTA_APP, default_timeout=120)
+            app.run()
+            # La carga inicial corre en segundo plano: se espera a que la sesión tenga los datos
+            inicio = time.time()
+            while not app.session_state['datos_cargados']:
+                assert time.time() - inicio < 120, "La carga inicial no terminó"
+                time.sleep(0.2)
+                app.run()
+            
+            selector = app.radio(key='seccion_activa')
+            assert list(selector.options) == list(secciones_declaradas())
+            for nombre in selector.options:
+                app.radio(key='seccion_activa').set_value(nombre)
+                app.run()
+                assert not app.exception, f"{nombre}: {[e.value for e in app.exception]}"
+                print(f"   ✅ {nombre}")
+        finally:
+            os.chdir(directorio_original)
+    
+    print("✅ Todas las secciones se dibujan")
+    return True
+
+if __name__ == "__main__":
+    success = test_secciones_declaradas() and test_secciones_dibujadas()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Script para probar el servicio local de agregaciones y su cliente
+"""
+
+import os
+import sys
+import tempfile
+import time
+import threading
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from servicio_agregaciones import ServicioAgregaciones, crear_servidor
+from cliente_agregaciones import ClienteAgregaciones
+from procesamiento import ProcesadorCOVID
+from test_muestreo import crear_datos_prueba
+
+def test_servicio_agregaciones():
+    """Prueba consultas en JSON y Arrow, revalidación con ETag y el caso sin servicio"""
+    print("🚀 Probando servicio de agregaciones")
+    print("====================================")
+    
+    df = crear_datos_prueba()
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        # El procesador trabaja con rutas relativas al directorio del proyecto
+        os.chdir(directorio)
+        try:
+            df.to_csv('Casos_positivos_de_COVID-19_en_Colombia.csv', index=False)
+            servicio = ServicioAgregaciones(ProcesadorCOVID())
+            assert servicio.cargar()
+            servidor = crear_servidor(servicio, puerto=0)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{servidor.server_address[1]}'
+            
+            arrow = ClienteAgregaciones(url)
+            json_compacto = ClienteAgregaciones(url, formato='json')
+            assert arrow.estado()['total_registros'] == len(df)
+            assert arrow.total() == len(df)
+            assert arrow.total(estados=['Grave']) == (df['estado'] == 'Grave').sum()
+            
+            # La misma tabla en los dos formatos
+            conteo = arrow.conteo('departamento_nom')
+            assert conteo.equals(json_compacto.conteo('departamento_nom'))
+            assert conteo['casos'].tolist() == df['departamento_nom'].value_counts().tolist()
+            mensual = json_compacto.serie(frecuencia='M', departamentos=['Vaupés'])
+            assert mensual['casos'].sum() == (df['departamento_nom'] == 'Vaupés').sum()
+            assert (mensual['Fecha'].values == arrow.serie(frecuencia='M', departamentos=['Vaupés'])['Fecha'].values).all()
+            assert arrow.evolucion(['Vaupés'])['Vaupés'].sum() == mensual['casos'].sum()
+            assert len(arrow.figura('histograma', columna='edad', ancho_bin=10).data) == 1
+            
+            # Repetir una consulta la revalida con la ETag: 304 sin cuerpo
+            assert arrow.conteo('departamento_nom').equals(conteo)
+            assert arrow.revalidadas == 1
+            assert servicio.estado({})['no_modificadas'] == 1
+            servidor.shutdown()
+            servidor.server_close()
+        finally:
+            os.chdir(directorio_original)
+    
+    # Sin servicio los métodos devuelven None para usar el camino local
+    sin_servicio = ClienteAgregaciones('http://127.0.0.1:9', timeout=0.5)
+    assert sin_servicio.estadisticas() is None and not sin_servicio.disponible()
+    print(f"📊 {servicio.solicitudes} solicitudes, {servicio.no_modificadas} revalidadas sin recalcular")
+    
+    print("✅ Servicio de agregaciones correcto")
+    return True
+
+def test_recarga_concurrente():
+    """Prueba que con muchas consultas a la vez el dataset se recarga una sola vez"""
+    print("🚀 Probando recarga concurrente")
+    print("===============================")
+    
+    df = crear_datos_prueba(20000)
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        try:
+            df.to_csv('Casos_positivos_de_COVID-19_en_Colombia.csv', index=False)
+            procesador = ProcesadorCOVID()
+            servicio = ServicioAgregaciones(procesador)
+            assert servicio.cargar()
+            
+            # Carga lenta para que todas las consultas vean las estadísticas cambiadas
+            cargas = []
+            cargar_datos = procesador.cargar_datos
+            def cargar_lento(*args, **kwargs):
+                cargas.append(threading.get_ident())
+                time.sleep(0.3)
+                return cargar_datos(*args, **kwargs)
+            procesador.cargar_datos = cargar_lento
+            marca = os.path.getmtime(procesador.ruta_estadisticas) + 10
+            os.utime(procesador.ruta_estadisticas, (marca, marca))
+            
+            hilos, consultas = 8, 25
+            barrera = threading.Barrier(hilos)
+            totales = []
+            def consultar():
+                barrera.wait()
+                for _ in range(consultas):
+                    estado, _, _, cuerpo = servicio.responder('/total', {'estados': 'Grave'})
+                    assert estado == 200
+                    totales.append(cuerpo)
+            trabajadores = [threading.Thread(target=consultar) for _ in range(hilos)]
+            for trabajador in trabajadores:
+                trabajador.start()
+            for trabajador in trabajadores:
+                trabajador.join()
+            
+            assert len(cargas) == 1
+            assert len(set(totales)) == 1 and len(totales) == hilos * consultas
+            # Los contadores no pierden incrementos entre hilos
+            assert servicio.estado({})['solicitudes'] == hilos * consultas
+            assert not servicio.recargar_si_cambio() and len(cargas) == 1
+            print(f"📊 {hilos * consultas} consultas en {hilos} hilos, {len(cargas)} recarga")
+        finally:
+            os.chdir(directorio_original)
+    
+    print("✅ Recarga concurrente correcta")
+    return True
+
+if __name__ == "__main__":
+    success = test_servicio_agregaciones() and test_recarga_concurrente()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Script para probar el tensor de casos diarios por región × día × estado
+"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar los módulos
+sys.path.append('.')
+
+from tensor_casos import TensorCasos, COLUMNA_MUNICIPIO, codificar_municipios
+from test_muestreo import crear_datos_prueba
+
+def test_tensor_casos():
+    """Prueba que los cortes del tensor coinciden con un groupby sobre las filas"""
+    print("🚀 Probando tensor de casos diarios")
+    print("===================================")
+    
+    df = crear_datos_prueba()
+    with tempfile.TemporaryDirectory() as directorio:
+        assert TensorCasos(directorio).construir(df, 'v1')
+        
+        # Se reabre desde disco en modo memory-map
+        tensor = TensorCasos(directorio)
+        assert tensor.esta_actualizado('v1') and not tensor.esta_actualizado('v2')
+        assert not tensor.esta_actualizado(None)
+        assert isinstance(tensor.tensor(), np.memmap)
+        assert tensor.tensor().sum() == len(df)
+        
+        serie = tensor.serie(['Vaupés'], ['Grave'], '2020-04-01', '2020-04-30')
+        filas = df[(df['departamento_nom'] == 'Vaupés') & (df['estado'] == 'Grave')]
+        esperado = filas.groupby(filas['fecha_de_notificación'].dt.normalize()).size()
+        esperado = esperado.reindex(serie.index, fill_value=0)
+        assert (serie['Vaupés'].to_numpy() == esperado.to_numpy()).all()
+        
+        totales = tensor.totales_por_estado(['Bogotá D.C.'])
+        assert totales.loc['Bogotá D.C.'].sum() == (df['departamento_nom'] == 'Bogotá D.C.').sum()
+        print(f"📊 {len(tensor.regiones())} regiones × {len(tensor.fechas())} días × {len(tensor.estados())} estados")
+    
+    print("✅ Tensor de casos correcto")
+    return True
+
+def test_municipios_homonimos():
+    """Prueba que los municipios con el mismo nombre en distintos departamentos no se suman"""
+    print("🚀 Probando municipios homónimos")
+    print("================================")
+    
+    df = crear_datos_prueba(20000)
+    rng = np.random.default_rng(1)
+    municipios = pd.DataFrame({
+        'ciudad_municipio': [5615, 15638, 25473, 52473, 11001],
+        'ciudad_municipio_nom': ['Rionegro', 'Rionegro', 'Mosquera', 'Mosquera', 'Bogotá'],
+        'departamento_nom': ['Antioquia', 'Boyacá', 'Cundinamarca', 'Nariño', 'Bogotá D.C.']
+    })
+    elegidos = municipios.iloc[rng.integers(0, len(municipios), len(df))].reset_index(drop=True)
+    df = df.drop(columns='departamento_nom').join(elegidos)
+    df.loc[rng.random(len(df)) < 0.01, 'ciudad_municipio'] = np.nan
+    
+    codigos, etiquetas = codificar_municipios(df)
+    assert sorted(etiquetas) == ['Bogotá', 'Mosquera (Cundinamarca)', 'Mosquera (Nariño)',
+                                 'Rionegro (Antioquia)', 'Rionegro (Boyacá)']
+    assert (codigos < 0).sum() == df['ciudad_municipio'].isna().sum()
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        tensor = TensorCasos(directorio, 'municipios', COLUMNA_MUNICIPIO, codificar_municipios)
+        assert tensor.construir(df, 'v1') and tensor.esta_actualizado('v1')
+        assert not TensorCasos(directorio, 'municipios', 'ciudad_municipio_nom').esta_actualizado('v1')
+        
+        totales = tensor.totales_por_estado().sum(axis=1)
+        assert totales['Rionegro (Boyacá)'] == (df['ciudad_municipio'] == 15638).sum()
+        assert totales['Mosquera (Nariño)'] == (df['ciudad_municipio'] == 52473).sum()
+        assert totales['Sin dato'] == df['ciudad_municipio'].isna().sum()
+        assert totales.sum() == len(df)
+        print(f"📊 {len(tensor.regiones())} regiones: {', '.join(tensor.regiones())}")
+    
+    # Sin el código se distinguen por departamento y nombre
+    codigos, etiquetas = codificar_municipios(df.drop(columns='ciudad_municipio'))
+    assert len(etiquetas) == 5 and (codigos >= 0).all()
+    
+    print("✅ Municipios homónimos correctos")
+    return True
+
+if __name__ == "__main__":
+    success = test_tensor_casos() and test_municipios_homonimos()
+    
+    if success:
+        print("\n🎉 ¡Prueba completada exitosamente!")